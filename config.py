@@ -33,6 +33,7 @@ EXCEL_CONFIG = {
     "screen_updating": False,  # 是否启用屏幕更新
     "calculation": "automatic", # 计算模式: automatic, manual, semiautomatic
     "enable_events": True,     # 是否启用事件
+    "backend": "com",          # 后端类型: com（win32com Excel）, headless（纯 Python 无界面后端）
 }
 
 # 文件操作配置
@@ -41,6 +42,10 @@ FILE_CONFIG = {
     "auto_save": True,        # 是否自动保存
     "save_format": "xlsx",    # 默认保存格式
     "encoding": "utf-8",      # 文件编码
+    "cache_formula_values": True,  # 保存时计算公式并写入缓存值（无界面后端）
+    "trust_cached_values": True,   # 打开文件时直接采用公式缓存值，不重新计算（无界面后端）
+    "lazy_open": False,            # 打开文件时按需载入工作表（无界面后端）
+    "lazy_max_loaded_sheets": 2,   # 按需载入时同时保留解析结果的工作表数
 }
 
 # 日志配置
@@ -61,6 +66,10 @@ PERFORMANCE_CONFIG = {
     "timeout": 300,            # 操作超时时间（秒）
     "max_retries": 3,          # 最大重试次数
     "retry_delay": 1,          # 重试延迟（秒）
+    "max_workers": None,       # 并行生成报表的工作进程数（None 表示使用 CPU 核数）
+    "tracing": False,          # 是否记录各模块方法的调用次数和耗时（见 utils/tracing.py）
+    "shared_strings_cache": 4096,  # 读取 xlsx 时缓存的已解码共享字符串数量
+    "max_shared_strings": 1000000,  # 流式写入时共享字符串表的不同字符串上限
 }
 
 # 图表默认配置
@@ -70,6 +79,9 @@ CHART_CONFIG = {
     "height": 300,             # 默认高度
     "left": 100,               # 默认左边距
     "top": 50,                 # 默认上边距
+    "downsample_threshold": 4000,  # 数据点超过该数量时降采样（0 表示不降采样）
+    "downsample_method": "minmax",  # 降采样方法：minmax（分桶最大/最小值）或 lttb
+    "helper_sheet": "_chart_data",  # 存放降采样数据的隐藏工作表
 }
 
 # 数据透视表默认配置
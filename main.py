@@ -41,7 +41,10 @@ from modules.excel_chart import ExcelChart
 from modules.excel_data import ExcelData
 from modules.excel_print import ExcelPrint
 from modules.excel_format import ExcelFormat
-from config import get_config, OUTPUT_DIR
+from utils.frame_bridge import records_to_frame
+from utils.headless_backend import create_excel_manager
+from utils.tracing import TRACER, enable_tracing
+from config import get_config, OUTPUT_DIR, PERFORMANCE_CONFIG
 
 # 配置日志
 log_config = get_config('log')
@@ -733,15 +736,9 @@ def demo_comprehensive_example(excel_mgr: ExcelManager) -> None:
             ['音响', 0]
         ]
         
-        # 计算各产品总销售额
-        product_totals = {}
-        for row in sales_data[1:]:
-            product = row[1]
-            total = row[6]
-            if product in product_totals:
-                product_totals[product] += total
-            else:
-                product_totals[product] = total
+        # 计算各产品总销售额（按列转换后向量化分组汇总）
+        sales_frame = records_to_frame(sales_data)
+        product_totals = sales_frame.groupby('产品')['总额'].sum().to_dict()
         
         for i, product in enumerate(['笔记本电脑', '台式机', '显示器', '键盘', '鼠标', '音响']):
             chart_data[i + 1][1] = product_totals.get(product, 0)
@@ -853,8 +850,12 @@ def main():
         # 确保输出目录存在
         OUTPUT_DIR.mkdir(exist_ok=True)
         
-        # 使用 Excel 管理器
-        with ExcelManager(visible=True, alerts=False) as excel_mgr:
+        # 按配置启用调用追踪
+        if PERFORMANCE_CONFIG['tracing']:
+            enable_tracing()
+        
+        # 使用 Excel 管理器（后端由 EXCEL_CONFIG['backend'] 决定）
+        with create_excel_manager(visible=True, alerts=False) as excel_mgr:
             logger.info("Excel 应用程序初始化成功")
             
             # 演示各个功能模块
@@ -893,6 +894,10 @@ def main():
         for file in output_files:
             logger.info(f"  - {file.name}")
         
+        if TRACER.enabled:
+            logger.info("调用耗时统计：\n" + TRACER.format_summary(limit=20))
+            TRACER.export_chrome_trace(str(OUTPUT_DIR / "trace.json"))
+        
     except Exception as e:
         logger.error(f"程序执行失败: {e}")
         raise
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 上午09:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：conftest.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+测试公共夹具
+所有测试都使用无界面后端，不需要 Windows 和 Excel。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.headless_backend import create_excel_manager  # noqa: E402
+
+
+@pytest.fixture
+def excel_app():
+    """无界面后端的 Application 对象"""
+    manager = create_excel_manager('headless')
+    application = manager.start()
+    yield application
+    manager.quit()
+
+
+@pytest.fixture
+def workbook(excel_app):
+    """新建的空白工作簿"""
+    return excel_app.Workbooks.Add()
+
+
+@pytest.fixture
+def worksheet(workbook):
+    """新建工作簿的第一个工作表"""
+    return workbook.Worksheets(1)
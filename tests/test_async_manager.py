@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午04:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_async_manager.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+asyncio 接口：背压、超时、取消和实例重建
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.async_manager import AsyncExcelManager, operation_cancelled
+from utils.report_runner import ReportJob
+
+
+class _Manager:
+    """记录创建和关闭次数的管理器"""
+
+    created = []
+
+    def __init__(self):
+        self.closed = False
+        _Manager.created.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def _clear_managers():
+    _Manager.created = []
+
+
+def _async_manager(**kwargs):
+    return AsyncExcelManager(factory=_Manager, reset=lambda manager: None, **kwargs)
+
+
+def _wait_for(gate: threading.Event):
+    def func(manager):
+        assert gate.wait(5)
+        return manager
+    return func
+
+
+def test_run_uses_headless_backend_in_worker_thread():
+    def count_workbooks(manager):
+        manager.get_application().Workbooks.Add()
+        return threading.current_thread().name, manager.get_application().Workbooks.Count
+
+    async def main():
+        async with AsyncExcelManager(workers=1, backend='headless') as excel:
+            first = await excel.run(count_workbooks)
+            second = await excel.run(count_workbooks)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == ('excel-worker-1', 1)
+    # 每个操作结束后关闭残留的工作簿
+    assert second == ('excel-worker-1', 1)
+
+
+def test_submitters_wait_when_queue_is_full():
+    gate = threading.Event()
+
+    async def main():
+        async with _async_manager(workers=1, queue_size=1) as excel:
+            tasks = [asyncio.ensure_future(excel.run(_wait_for(gate), timeout=10)) for _ in range(4)]
+            await asyncio.sleep(0.2)
+            # 一个在执行、一个在排队，其余两个在等待空位
+            queued, saturated = excel.pending, excel._slots.locked()
+            gate.set()
+            results = await asyncio.gather(*tasks)
+        return queued, saturated, results
+
+    queued, saturated, results = asyncio.run(main())
+    assert queued == 1
+    assert saturated
+    assert len(results) == 4 and len(_Manager.created) == 1
+
+
+def test_timed_out_queued_operation_is_skipped():
+    gate = threading.Event()
+    executed = []
+
+    def record(manager):
+        executed.append(manager)
+
+    async def main():
+        async with _async_manager(workers=1) as excel:
+            blocker = asyncio.ensure_future(excel.run(_wait_for(gate), timeout=10))
+            await asyncio.sleep(0.05)
+            with pytest.raises(TimeoutError):
+                await excel.run(record, timeout=0.1)
+            gate.set()
+            await blocker
+            await excel.run(lambda manager: None)
+
+    asyncio.run(main())
+    assert executed == []
+
+
+def test_timed_out_running_operation_rebuilds_manager():
+    observed = threading.Event()
+
+    def long_running(manager):
+        while not operation_cancelled():
+            threading.Event().wait(0.01)
+        observed.set()
+        return manager
+
+    async def main():
+        async with _async_manager(workers=1) as excel:
+            with pytest.raises(TimeoutError):
+                await excel.run(long_running, timeout=0.1)
+            return await excel.run(lambda manager: manager)
+
+    manager = asyncio.run(main())
+    assert observed.is_set()
+    first, second = _Manager.created
+    assert first.closed and manager is second
+
+
+def test_errors_and_job_summary():
+    def fail(manager):
+        raise ValueError('失败')
+
+    async def main():
+        async with _async_manager(workers=2) as excel:
+            with pytest.raises(ValueError):
+                await excel.run(fail)
+            return await excel.run_jobs([
+                ReportJob('成功', lambda manager, value: value * 2, (21,)),
+                ReportJob('失败', fail),
+            ])
+
+    summary = asyncio.run(main())
+    assert [result.result for result in summary.succeeded] == [42]
+    assert [result.name for result in summary.failed] == ['失败']
+    assert 'ValueError' in summary.failed[0].error
+
+
+def test_instances_are_rebuilt_after_max_uses():
+    async def main():
+        async with _async_manager(workers=1, max_uses=2) as excel:
+            return [await excel.run(lambda manager: manager) for _ in range(5)]
+
+    managers = asyncio.run(main())
+    assert len(_Manager.created) == 3
+    assert managers[0] is managers[1] is not managers[2]
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午03:00
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_benchmark.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+性能基准测试：对象模型调用计数和阶段峰值内存
+"""
+
+import time
+
+from utils import benchmark
+from utils.headless_backend import HeadlessRange, HeadlessWorksheet, _StyleProxy
+
+BLOCK_SIZE = 64 * 2 ** 20
+
+
+def _write_and_format(worksheet):
+    cell_range = worksheet.Range('A1:B2')
+    cell_range.Value = [[1, 2], [3, 4]]
+    assert cell_range.Value == ((1, 2), (3, 4))
+    cell_range.Font.Bold = True
+
+
+def test_count_calls_includes_property_gets_and_sets(worksheet):
+    # Range、Value=、Value、Font、Bold= 各一次
+    assert benchmark.count_calls(_write_and_format, worksheet) == 5
+
+
+def test_count_calls_ignores_nested_object_model_calls(worksheet):
+    def pipeline(sheet):
+        sheet.Range('A1:C3').Clear()
+
+    assert benchmark.count_calls(pipeline, worksheet) == 2
+
+
+def test_count_calls_restores_object_model(worksheet):
+    originals = (vars(HeadlessWorksheet)['Range'], vars(HeadlessRange)['Value'], vars(_StyleProxy)['__setattr__'])
+    benchmark.count_calls(_write_and_format, worksheet)
+    assert (vars(HeadlessWorksheet)['Range'], vars(HeadlessRange)['Value'],
+            vars(_StyleProxy)['__setattr__']) == originals
+
+
+def test_stage_peak_memory_counts_allocations_inside_stage():
+    with benchmark.StagePeakMemory() as memory:
+        block = b'\x01' * BLOCK_SIZE
+        del block
+    assert memory.peak >= BLOCK_SIZE * 3 // 4
+
+
+def test_stage_peak_memory_excludes_memory_allocated_before():
+    block = b'\x01' * BLOCK_SIZE
+    with benchmark.StagePeakMemory() as memory:
+        sum(range(1000))
+    del block
+    assert memory.peak < BLOCK_SIZE // 2
+
+
+def test_stage_peak_memory_samples_without_reset(monkeypatch):
+    monkeypatch.setattr(benchmark, 'reset_peak_rss', lambda: False)
+    with benchmark.StagePeakMemory(interval=0.005) as memory:
+        block = b'\x01' * BLOCK_SIZE
+        time.sleep(0.05)
+        del block
+    assert memory.peak >= BLOCK_SIZE * 3 // 4
+
+
+def test_measure_reports_calls_and_stage_memory():
+    result = benchmark._measure('basic', 100, seed=0)
+
+    assert result.error is None
+    assert result.calls > 0
+    assert result.calls_per_row == result.calls / 100
+    assert 0 < result.peak_rss < benchmark.peak_rss_bytes()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午02:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_bulk_replace.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+按映射表批量替换：整格替换、子串替换和写回
+"""
+
+import pytest
+
+from utils.bulk_replace import AhoCorasick, replace_many, write_changes
+
+
+def test_whole_cell_replacement_counts(worksheet):
+    worksheet.Range('A1:C2').Value = [['北京', '上海', '北京'], ['广州', '北京市', 5]]
+
+    counts = replace_many(worksheet, {'北京': 'BJ', '上海': 'SH', '深圳': 'SZ'})
+
+    assert counts == {'北京': 2, '上海': 1, '深圳': 0}
+    assert worksheet.Range('A1:C2').Value == (('BJ', 'SH', 'BJ'), ('广州', '北京市', 5))
+
+
+def test_whole_cell_keys_are_typed(worksheet):
+    worksheet.Range('A1:C1').Value = [[1, True, 1.0]]
+
+    counts = replace_many(worksheet, {True: '是'})
+
+    assert counts == {True: 1}
+    assert worksheet.Range('A1:C1').Value == ((1, '是', 1.0),)
+
+
+@pytest.mark.parametrize('indexed', [False, True], ids=['scan', 'index'])
+def test_new_values_one_and_true_stay_distinct(worksheet, indexed):
+    worksheet.Range('A1:D1').Value = [['x', 'y', 'x', 'y']]
+    if indexed:
+        worksheet.cell_index()
+
+    replace_many(worksheet, {'x': 1, 'y': True})
+
+    values = worksheet.Range('A1:D1').Value[0]
+    assert values == (1, True, 1, True)
+    assert [type(value) for value in values] == [int, bool, int, bool]
+
+
+def test_formulas_are_not_replaced(worksheet):
+    worksheet.Range('A1').Value = 'a'
+    worksheet.Range('B1').Formula = '=A1&"a"'
+
+    replace_many(worksheet, {'a': 'b'}, whole_cell=False)
+
+    assert worksheet.Range('A1').Value == 'b'
+    assert worksheet.Range('B1').Formula == '=A1&"a"'
+
+
+def test_substring_replacement_is_simultaneous(worksheet):
+    worksheet.Range('A1:A2').Value = [['abc-ab-a'], ['无匹配']]
+
+    counts = replace_many(worksheet, {'a': 'b', 'ab': 'X', 'b': 'a'}, whole_cell=False)
+
+    # 同一起点取最长的键，替换结果不会再被其他键匹配
+    assert worksheet.Range('A1').Value == 'Xc-X-b'
+    assert worksheet.Range('A2').Value == '无匹配'
+    assert counts == {'a': 1, 'ab': 2, 'b': 0}
+
+
+def test_aho_corasick_finds_overlapping_matches():
+    matcher = AhoCorasick({'he': '', 'she': '', 'his': '', 'hers': ''})
+
+    found = {(start, matcher.patterns[pattern_id]) for start, pattern_id in matcher.find_all('ushers')}
+
+    assert found == {(1, 'she'), (2, 'he'), (2, 'hers')}
+
+
+def test_write_changes_uses_fewer_calls(worksheet):
+    changes = {(row, 1): '相同' for row in range(1, 101)}
+
+    assert write_changes(worksheet, changes) == 1
+    assert worksheet.Range('A100').Value == '相同'
+
+    changes = {(1, col): col for col in range(1, 51)}
+
+    assert write_changes(worksheet, changes) == 1
+    assert worksheet.Range('AX1').Value == 50
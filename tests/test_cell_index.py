@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午04:10
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_cell_index.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+单元格值倒排索引：值类别区分、增量维护、查询和替换
+"""
+
+import pytest
+
+from utils.cell_index import CellIndex, value_key
+
+
+@pytest.fixture
+def sheet(worksheet):
+    worksheet.Range('A1:C3').Value = [
+        ['技术部', 1, True],
+        ['技术支持', 1.0, False],
+        ['市场部', '=B1+B2', 1],
+    ]
+    return worksheet
+
+
+def test_value_keys_separate_numbers_and_booleans():
+    assert value_key(1) == value_key(1.0)
+    assert value_key(1) != value_key(True)
+    assert value_key(0) != value_key(False)
+    assert value_key('1') != value_key(1)
+
+
+def test_find_distinguishes_one_and_true(sheet):
+    index = sheet.cell_index()
+
+    assert index.find_cells(1) == ['B1', 'B2', 'C3']
+    assert index.find_cells(True) == ['C1']
+    assert index.find_cells(False) == ['C2']
+    assert 0 not in index
+
+
+def test_formula_cells_are_not_indexed(sheet):
+    index = sheet.cell_index()
+
+    assert index.find_cells('=B1+B2') == []
+    assert index.find_cells(2) == []
+    index.replace('B', 'X', whole_cell=False)
+    assert sheet.Range('B3').Formula == '=B1+B2'
+
+
+def test_prefix_and_regex_queries(sheet):
+    index = sheet.cell_index()
+
+    assert index.find_cells('技术', match='prefix') == ['A1', 'A2']
+    assert index.find_cells(r'部$', match='regex') == ['A1', 'A3']
+    with pytest.raises(ValueError):
+        index.find_cells('技术', match='fuzzy')
+
+
+def test_live_index_follows_writes(sheet):
+    index = sheet.cell_index()
+    sheet.Range('A1').Value = 'IT部'
+    sheet.Range('D5').Value = '技术部'
+
+    assert index.live
+    assert index.find_cells('技术部') == ['D5']
+    assert index.find_cells('IT部') == ['A1']
+
+
+def test_replace_map_keeps_one_and_true_apart(sheet):
+    index = sheet.cell_index()
+
+    assert index.replace_map({True: '是', '市场部': '市场部'}) == {True: 1, '市场部': 0}
+    assert sheet.Range('C1').Value == '是'
+    assert sheet.Range('B1').Value == 1
+    assert sheet.Range('C2').Value is False
+
+    assert index.replace_map({1: '一'}) == {1: 3}
+    assert sheet.Range('B1:C3').Value[0] == ('一', '是')
+    assert sheet.Range('C3').Value == '一'
+    assert index.find_cells('一') == ['B1', 'B2', 'C3']
+    assert index.find_cells(1) == []
+
+
+def test_substring_replace(sheet):
+    index = sheet.cell_index()
+
+    assert index.replace('技术', 'IT', whole_cell=False) == 2
+    assert sheet.Range('A1:A2').Value == (('IT部',), ('IT支持',))
+    assert index.find_cells('IT', match='prefix') == ['A1', 'A2']
+
+
+def test_snapshot_index_tracks_its_own_replacements(sheet):
+    index = CellIndex(sheet)
+
+    assert not index.live
+    assert index.replace('技术部', 'IT部') == 1
+    assert index.find_cells('IT部') == ['A1']
+    sheet.Range('A3').Value = '销售部'
+    assert index.find_cells('销售部') == []
+    index.rebuild()
+    assert index.find_cells('销售部') == ['A3']
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午05:00
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_chart_downsample.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+图表降采样：minmax / LTTB 选点、多系列合并和图表描述降采样
+"""
+
+import numpy as np
+import pytest
+
+from utils.chart_downsample import downsample_spec, downsample_values, lttb_indices, minmax_indices, select_points
+from utils.chart_renderer import ChartSpec
+
+
+def _wave(count=1000):
+    x = np.arange(count, dtype=float)
+    return np.sin(x / 37.0) * 10 + np.cos(x / 5.0)
+
+
+@pytest.mark.parametrize('select', [minmax_indices, lttb_indices])
+def test_indices_keep_endpoints_and_limit(select):
+    indices = select(_wave(), 50)
+
+    assert indices[0] == 0 and indices[-1] == 999
+    assert len(indices) <= 50
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize('select', [minmax_indices, lttb_indices])
+def test_short_series_is_kept_whole(select):
+    assert select(np.arange(10, dtype=float), 10).tolist() == list(range(10))
+
+
+def test_minmax_keeps_bucket_extrema():
+    values = _wave()
+    values[123], values[777] = 500.0, -500.0
+    indices = minmax_indices(values, 40)
+
+    assert 123 in indices and 777 in indices
+    # 每个桶的最大值和最小值都被保留
+    buckets = (40 - 2) // 2
+    interior = np.arange(1, 999)
+    bucket = (interior - 1) * buckets // 998
+    for number in range(buckets):
+        members = interior[bucket == number]
+        assert members[values[members].argmax()] in indices
+        assert members[values[members].argmin()] in indices
+
+
+def test_minmax_ignores_nan():
+    values = _wave()
+    values[100:200] = np.nan
+    indices = minmax_indices(values, 40)
+
+    kept = values[indices[1:-1]]
+    assert np.isfinite(kept).sum() >= len(kept) - 2
+
+
+def test_lttb_picks_spike():
+    values = np.zeros(1000)
+    values[555] = 100.0
+
+    assert 555 in lttb_indices(values, 20)
+    assert len(lttb_indices(values, 20)) == 20
+
+
+def test_lttb_interpolates_nan():
+    values = _wave()
+    values[300:400] = np.nan
+    values[650] = 300.0
+    indices = lttb_indices(values, 30)
+
+    assert 650 in indices
+    assert len(indices) == 30 and indices[0] == 0 and indices[-1] == 999
+
+
+def test_lttb_all_nan_spreads_evenly():
+    indices = lttb_indices(np.full(100, np.nan), 5)
+
+    assert indices.tolist() == [0, 24, 49, 74, 99]
+
+
+def test_select_points_merges_series():
+    first, second = np.zeros(1000), np.zeros(1000)
+    first[200], second[800] = 50.0, -50.0
+    kept = select_points(np.column_stack([first, second]), 40, 'minmax')
+
+    assert 200 in kept and 800 in kept
+    assert len(kept) <= 40
+
+
+def test_select_points_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        select_points(np.zeros((10, 1)), 5, 'mean')
+
+
+def test_downsample_values_keeps_header_and_labels():
+    values = [(None, '销量')] + [(f'第{index}天', float(index % 7)) for index in range(500)]
+    reduced, _ = downsample_values(values, 30, 'lttb')
+
+    assert reduced[0] == (None, '销量')
+    assert reduced[1] == ('第0天', 0.0) and reduced[-1] == ('第499天', 499 % 7)
+    assert len(reduced) - 1 <= 30
+
+
+def test_downsample_spec_reduces_categories():
+    values = _wave().tolist()
+    values[10] = None
+    spec = ChartSpec(categories=[str(index) for index in range(1000)], series=[('波形', values)], title='波形')
+    reduced = downsample_spec(spec, 60, 'minmax')
+
+    assert reduced.title == '波形'
+    assert len(reduced.categories) <= 60
+    assert reduced.categories[0] == '0' and reduced.categories[-1] == '999'
+    kept = [int(category) for category in reduced.categories]
+    assert reduced.series[0][1] == [values[index] for index in kept]
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午04:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_chart_renderer.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+图表渲染：数据拆分、SVG/PNG 输出和保存到 xlsx 的图表部件
+"""
+
+import struct
+import sys
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+import numpy as np
+import pytest
+
+from utils.chart_renderer import CHART_TYPES, PALETTE, XL_ROWS, ChartSpec, chart_spec_from_values, render_chart
+
+SVG = '{http://www.w3.org/2000/svg}'
+DATA = [
+    [None, '销量', '利润'],
+    ['一月', 10, 4],
+    ['二月', float('nan'), 5],
+    ['三月', 30, float('inf')],
+]
+
+
+def _png_image(data):
+    """解码内置光栅化输出的 PNG（8 位 RGB、无滤波）"""
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    width, height = struct.unpack('>II', data[16:24])
+    raw = np.frombuffer(zlib.decompress(data[41:-12]), dtype=np.uint8).reshape(height, width * 3 + 1)
+    return raw[:, 1:].reshape(height, width, 3)
+
+
+def test_spec_from_values_uses_labels_and_skips_non_finite():
+    spec = chart_spec_from_values(DATA, 'xlColumnClustered', title='月度')
+
+    assert spec.categories == ['一月', '二月', '三月']
+    assert spec.series == [('销量', [10.0, None, 30.0]), ('利润', [4.0, 5.0, None])]
+    assert spec.kind == 'column'
+
+
+def test_spec_from_values_by_rows():
+    spec = chart_spec_from_values(DATA, 'xlLine', plot_by=XL_ROWS)
+
+    assert spec.categories == ['销量', '利润']
+    assert [name for name, _ in spec.series] == ['一月', '二月', '三月']
+
+
+def test_unsupported_type_and_format(tmp_path):
+    with pytest.raises(ValueError):
+        ChartSpec(['a'], [('s', [1.0])], chart_type='xl3DArea').kind
+    with pytest.raises(ValueError):
+        render_chart(ChartSpec(['a'], [('s', [1.0])]), tmp_path / 'chart.gif')
+
+
+def test_svg_column_chart(tmp_path):
+    spec = chart_spec_from_values(DATA, 'xlColumnClustered', title='月度销量')
+    path = render_chart(spec, tmp_path / 'chart.svg')
+
+    root = ElementTree.parse(path).getroot()
+    assert root.get('width') == str(spec.width) and root.get('height') == str(spec.height)
+    texts = [element.text for element in root.iter(f'{SVG}text')]
+    assert '月度销量' in texts and '一月' in texts and '利润' in texts
+    fills = [element.get('fill') for element in root.iter(f'{SVG}rect')]
+    # 两个系列各有两个有限值的柱形（另外还有图例色块）
+    assert fills.count(PALETTE[0]) >= 2 and fills.count(PALETTE[1]) >= 2
+
+
+def test_svg_pie_chart_has_one_slice_per_category(tmp_path):
+    spec = chart_spec_from_values([['地区', '销量'], ['北京', 1], ['上海', 3]], 'xlPie')
+    root = ElementTree.parse(render_chart(spec, tmp_path / 'pie.svg')).getroot()
+
+    slices = [element for element in root.iter() if element.tag in (f'{SVG}path', f'{SVG}polygon')
+              and element.get('fill') in PALETTE]
+    assert len(slices) == 2
+
+
+def test_png_built_in_rasterizer(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'cairosvg', None)
+    spec = chart_spec_from_values(DATA, CHART_TYPES['xlColumnClustered'])
+    path = render_chart(spec, tmp_path / 'chart.png')
+
+    with open(path, 'rb') as f:
+        image = _png_image(f.read())
+    assert image.shape == (spec.height, spec.width, 3)
+    first_color = np.array([int(PALETTE[0][index:index + 2], 16) for index in (1, 3, 5)], dtype=np.uint8)
+    assert (image == first_color).all(axis=2).sum() > 100
+
+
+def test_headless_chart_export_and_save(worksheet, tmp_path):
+    worksheet.Range('A1:C4').Value = [['月份', '销量', '利润'], ['一月', 10, 4], ['二月', 20, 5], ['三月', 30, 6]]
+    chart = worksheet.ChartObjects().Add(100, 50, 400, 300).Chart
+    chart.SetSourceData(worksheet.Range('A1:C4'))
+    chart.ChartType = CHART_TYPES['xlLine']
+    chart.HasTitle = True
+    chart.ChartTitle.Text = '趋势'
+
+    assert chart.Export(str(tmp_path / 'trend.svg'))
+    assert '趋势' in (tmp_path / 'trend.svg').read_text(encoding='utf-8')
+
+    path = tmp_path / 'charts.xlsx'
+    worksheet.Parent.SaveAs(str(path))
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        chart_xml = archive.read('xl/charts/chart1.xml').decode('utf-8')
+        content_types = archive.read('[Content_Types].xml').decode('utf-8')
+    assert 'xl/drawings/drawing1.xml' in names
+    assert 'xl/worksheets/_rels/sheet1.xml.rels' in names
+    assert '/xl/charts/chart1.xml' in content_types
+    assert '<c:lineChart>' in chart_xml and '趋势' in chart_xml
+    assert "<c:f>'Sheet1'!$C$1</c:f>" in chart_xml
+    assert "<c:f>'Sheet1'!$A$2:$A$4</c:f>" in chart_xml
+    assert "<c:f>'Sheet1'!$B$2:$B$4</c:f>" in chart_xml
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午03:10
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_format_batch.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+批量格式事务：重叠区域合并、矩形合并和地址拼接
+"""
+
+import numpy as np
+
+from utils.format_batch import NAMED_COLORS, FormatTransaction, coalesce_rects, join_addresses, mask_to_rects
+
+BOLD = {'font_bold': True}
+RED = {'fill_color': NAMED_COLORS['RED']}
+
+
+def _cells(rects):
+    return {(row, col) for first_row, first_col, last_row, last_col in rects
+            for row in range(first_row, last_row + 1) for col in range(first_col, last_col + 1)}
+
+
+def test_coalesce_merges_overlapping_updates():
+    table = coalesce_rects([
+        ([(1, 1, 10, 3)], BOLD),
+        ([(5, 2, 20, 4)], RED),
+    ])
+
+    both = tuple(sorted({**BOLD, **RED}.items()))
+    assert set(table) == {tuple(BOLD.items()), tuple(RED.items()), both}
+    assert _cells(table[both]) == {(row, col) for row in range(5, 11) for col in (2, 3)}
+    assert len(_cells(table[tuple(BOLD.items())])) == 30 - 12
+    assert len(_cells(table[tuple(RED.items())])) == 48 - 12
+
+
+def test_coalesce_later_updates_override():
+    table = coalesce_rects([
+        ([(1, 1, 4, 4)], {'fill_color': 1}),
+        ([(1, 1, 4, 4)], {'fill_color': 2}),
+    ])
+
+    assert table == {(('fill_color', 2),): [(1, 1, 4, 4)]}
+
+
+def test_coalesce_joins_adjacent_ranges_with_same_style():
+    table = coalesce_rects([
+        ([(1, 1, 1, 5)], BOLD),
+        ([(2, 1, 3, 5)], BOLD),
+        ([(4, 1, 4, 2), (4, 3, 4, 5)], BOLD),
+    ])
+
+    assert table == {tuple(BOLD.items()): [(1, 1, 4, 5)]}
+
+
+def test_coalesce_many_rows_stays_on_block_grid():
+    # 每行一个区域时块数等于行数，合并后只剩一个矩形
+    table = coalesce_rects([([(row, 1, row, 7)], BOLD) for row in range(1, 2001)])
+
+    assert table == {tuple(BOLD.items()): [(1, 1, 2000, 7)]}
+
+
+def test_coalesce_empty():
+    assert coalesce_rects([]) == {}
+
+
+def test_mask_to_rects_merges_columns_with_same_rows():
+    mask = np.array([
+        [1, 1, 0, 1],
+        [1, 1, 0, 1],
+        [0, 0, 0, 1],
+    ], dtype=bool)
+
+    assert mask_to_rects(mask, 2, 3) == [(2, 3, 3, 4), (2, 6, 4, 6)]
+    assert mask_to_rects(np.array([True, False, True]), 1, 1) == [(1, 1, 1, 1), (3, 1, 3, 1)]
+    assert mask_to_rects(np.zeros((3, 3), dtype=bool)) == []
+
+
+def test_join_addresses_respects_length_limit():
+    rects = [(row, 1, row, 1) for row in range(1, 200, 2)]
+    addresses = join_addresses(rects, max_length=40)
+
+    assert all(len(address) <= 40 for address in addresses)
+    assert ','.join(addresses).split(',') == [f"A{row}" for row in range(1, 200, 2)]
+
+
+def test_commit_applies_merged_styles(worksheet):
+    worksheet.Range('A1:D20').Value = [[1] * 4] * 20
+    with FormatTransaction() as transaction:
+        for row in range(1, 21):
+            transaction.set_font(worksheet, f"A{row}:D{row}", bold=True)
+        transaction.set_fill(worksheet, 'B:B', fill_color='RED')
+
+    assert worksheet.Range('A1:A20').Font.Bold is True
+    assert worksheet.Range('B1:B20').Interior.Color == NAMED_COLORS['RED']
+    assert worksheet.Range('B1:B20').Font.Bold is True
+    assert worksheet.Range('C1').Interior.Color != NAMED_COLORS['RED']
+
+
+def test_commit_stats(worksheet):
+    worksheet.Range('A1:D20').Value = [[1] * 4] * 20
+    transaction = FormatTransaction()
+    for row in range(1, 21):
+        transaction.set_font(worksheet, f"A{row}:D{row}", bold=True)
+    transaction.set_fill(worksheet, 'B:B', fill_color='RED')
+
+    stats = transaction.commit()
+
+    assert stats['operations'] == 21
+    assert stats['styles'] == 2
+    # 加粗：A 列和 C:D 列两个矩形；加粗+红底：B1:B20 一个矩形
+    assert stats['ranges'] == 3
+    assert stats['calls'] == 3
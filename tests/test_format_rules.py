@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午03:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_format_rules.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+按规则批量设置格式：条件计算、掩码合并和样式应用
+"""
+
+import pytest
+
+from utils.format_batch import NAMED_COLORS, FormatTransaction
+from utils.format_rules import FormatRule, apply_rules, evaluate_rules
+
+DATA = [
+    ['姓名', '工资', '绩效'],
+    ['张三', 12000, '优秀'],
+    ['李四', 8000, '良好'],
+    ['王五', 15000, '一般'],
+    ['赵六', '待定', '优秀'],
+    ['钱七', 20000, '良好'],
+]
+
+
+@pytest.fixture
+def sheet(worksheet):
+    worksheet.Range('A1:C6').Value = DATA
+    return worksheet
+
+
+def test_evaluate_comparison_merges_consecutive_rows(sheet):
+    [(_, rects)] = evaluate_rules(sheet, 'A1:C6', [FormatRule('工资', ('>', 10000), bold=True)])
+
+    # 文本“待定”不参与数值比较
+    assert rects == [(2, 2, 2, 2), (4, 2, 4, 2), (6, 2, 6, 2)]
+
+
+def test_evaluate_row_target_and_membership(sheet):
+    rule = FormatRule('C', ('in', ['优秀', '良好']), target='row', fill_color='YELLOW')
+    [(_, rects)] = evaluate_rules(sheet, 'A1:C6', [rule])
+
+    assert rects == [(2, 1, 3, 3), (5, 1, 6, 3)]
+
+
+def test_evaluate_function_predicate_and_between(sheet):
+    rules = [
+        FormatRule(2, lambda values: values < 10000, font_color='RED'),
+        FormatRule('工资', ('between', 12000, 15000), italic=True),
+    ]
+    [(_, low), (_, middle)] = evaluate_rules(sheet, 'A1:C6', rules)
+
+    assert low == [(3, 2, 3, 2)]
+    assert middle == [(2, 2, 2, 2), (4, 2, 4, 2)]
+
+
+def test_apply_rules_sets_styles_immediately(sheet):
+    stats = apply_rules(sheet, 'A1:C6', [FormatRule('工资', ('>', 10000), fill_color='YELLOW', bold=True)])
+
+    assert stats == {'cells': 3, 'ranges': 3, 'calls': 2}
+    assert sheet.Range('B2').Interior.Color == NAMED_COLORS['YELLOW']
+    assert sheet.Range('B6').Font.Bold is True
+    assert not sheet.Range('B3').Font.Bold
+
+
+def test_apply_rules_records_into_transaction(sheet):
+    transaction = FormatTransaction()
+    rules = [
+        FormatRule('绩效', ('==', '优秀'), target='row', fill_color='LIGHT_BLUE'),
+        FormatRule('工资', ('>', 10000), fill_color='YELLOW'),
+    ]
+    stats = apply_rules(sheet, 'A1:C6', rules, transaction=transaction)
+
+    assert stats['calls'] == 0
+    assert sheet.Range('B2').Interior.Color != NAMED_COLORS['YELLOW']
+    transaction.commit()
+    # 后面的规则覆盖前面规则的同名属性
+    assert sheet.Range('B2').Interior.Color == NAMED_COLORS['YELLOW']
+    assert sheet.Range('A2').Interior.Color == NAMED_COLORS['LIGHT_BLUE']
+    assert sheet.Range('C5').Interior.Color == NAMED_COLORS['LIGHT_BLUE']
+
+
+def test_transaction_record_and_apply_style(sheet):
+    transaction = FormatTransaction()
+    transaction.record(sheet, 'A1:C1', {'font_bold': True, 'font_size': None})
+    transaction.record(sheet, 'A2', {'font_size': None})
+    stats = transaction.commit()
+
+    assert stats['operations'] == 1
+    assert sheet.Range('A1:C1').Font.Bold is True
+    assert FormatTransaction.apply_style(sheet.Range('A2'), {'font_italic': True, 'number_format': '0.00'}) == 2
+    assert sheet.Range('A2').Font.Italic is True
+    assert sheet.Range('A2').NumberFormat == '0.00'
+
+
+def test_rule_rejects_unknown_style():
+    with pytest.raises(ValueError):
+        FormatRule('工资', ('>', 1), glow=True)
+    with pytest.raises(ValueError):
+        FormatRule('工资', ('>', 1), target='column', bold=True)
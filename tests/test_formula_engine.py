@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午08:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_formula_engine.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+公式引擎：修改单元格后只重新计算受影响的公式
+"""
+
+
+def test_recalculates_dependents_after_change(workbook, worksheet):
+    worksheet.Range('A1:B4').Value = [[1, 10], [2, 20], [3, 30], [4, 40]]
+    worksheet.Range('C1:C4').Formula = [[f'=A{row}+B{row}'] for row in range(1, 5)]
+    worksheet.Range('D1').Formula = '=SUM(C1:C4)'
+    engine = workbook.formula_engine()
+    engine.recalculate()
+    assert worksheet.Range('D1').Value == 110
+
+    worksheet.Range('A2').Value = 102
+
+    assert engine.pending > 0
+    assert worksheet.Range('C2').Value == 122
+    assert worksheet.Range('D1').Value == 210
+    assert engine.pending == 0
+
+
+def test_whole_column_reference_follows_appended_rows(workbook, worksheet):
+    worksheet.Range('A1:A3').Value = [[1], [2], [3]]
+    worksheet.Range('B1').Formula = '=SUM(A:A)'
+    engine = workbook.formula_engine()
+    engine.recalculate()
+    assert worksheet.Range('B1').Value == 6
+
+    worksheet.Range('A4').Value = 4
+    engine.recalculate()
+
+    assert worksheet.Range('B1').Value == 10
+
+
+def test_cross_sheet_reference(workbook, worksheet):
+    other = workbook.Worksheets.Add(After=worksheet)
+    other.Name = '数据'
+    other.Range('A1').Value = 5
+    worksheet.Range('A1').Formula = "='数据'!A1*2"
+    engine = workbook.formula_engine()
+    engine.recalculate()
+    assert worksheet.Range('A1').Value == 10
+
+    other.Range('A1').Value = 7
+
+    assert worksheet.Range('A1').Value == 14
+
+
+def test_value_computes_formulas_without_explicit_engine(workbook, worksheet):
+    worksheet.Range('A1:A3').Value = [[1], [2], [3]]
+    worksheet.Range('B1').Formula = '=SUM(A1:A3)'
+
+    assert worksheet.Range('B1').Value == 6
+    assert worksheet.Range('A1:B1').Value == ((1, 6),)
+    assert worksheet.Range('B1').Formula == '=SUM(A1:A3)'
+
+    # 首次读取时创建的引擎继续跟踪之后的写入
+    worksheet.Range('A3').Value = 30
+
+    assert worksheet.Range('B1').Value == 33
+
+
+def test_value_without_formulas_does_not_create_engine(workbook, worksheet):
+    worksheet.Range('A1:B2').Value = [[1, '=']] * 2
+
+    assert worksheet.Range('A1:B2').Value == ((1, '='), (1, '='))
+    assert workbook._formula_engine is None
+
+
+def test_opened_workbook_value_type_matches_new_workbook(excel_app, workbook, worksheet, tmp_path):
+    worksheet.Range('A1:A2').Value = [[4], [5]]
+    worksheet.Range('B1').Formula = '=A1*A2'
+    path = tmp_path / 'formulas.xlsx'
+    workbook.SaveAs(str(path))
+    workbook.Close()
+
+    for options in ({}, {'Lazy': True}):
+        sheet = excel_app.Workbooks.Open(str(path), **options).Worksheets(1)
+        assert sheet.Range('B1').Value == 20
+        sheet.Parent.Close()
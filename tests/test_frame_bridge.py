@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午03:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_frame_bridge.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+NumPy / pandas 数据桥接：列类型推断、重复标题和往返转换
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.frame_bridge import column_names, column_to_array, from_frame, read_xlsx_frame, records_to_frame, \
+    to_frame
+from utils.xlsx_stream import StreamingXlsxWriter
+
+
+def test_column_dtypes():
+    assert column_to_array([1, 2, np.int32(3)]).dtype == np.int64
+    assert column_to_array([1, 2.5]).dtype == np.float64
+    nullable = column_to_array([1, None, 3])
+    assert nullable.dtype == np.float64 and np.isnan(nullable[1])
+    assert column_to_array([True, False]).dtype == bool
+    assert column_to_array([True, None]).dtype == object
+    assert column_to_array([1, True]).dtype == object
+    assert column_to_array([date(2024, 1, 2), datetime(2024, 1, 3, 8)]).dtype == np.dtype('datetime64[ns]')
+    assert column_to_array(['a', 1]).dtype == object
+    assert np.isnan(column_to_array([None, None])).all()
+
+
+def test_duplicate_and_empty_headers():
+    assert column_names(['数量', None, '数量', '数量.1', '数量'], 6) == ['数量', '列2', '数量.1', '数量.1.1', '数量.2', '列6']
+
+
+def test_records_to_frame_pads_short_rows():
+    frame = records_to_frame([('地区', '数量', '地区'), ('北京', 1), ('上海', 2, '华东')])
+
+    assert list(frame.columns) == ['地区', '数量', '地区.1']
+    assert frame['数量'].dtype == np.int64
+    assert frame['地区.1'].isna().tolist() == [True, False]
+    assert frame['地区.1'][1] == '华东'
+
+
+def test_worksheet_round_trip(worksheet):
+    frame = pd.DataFrame({
+        '产品': pd.Categorical(['键盘', '鼠标', '键盘']),
+        '数量': [1, 2, 3],
+        '单价': [1.5, np.nan, 3.0],
+        '日期': pd.to_datetime(['2024-01-01', None, '2024-01-03']),
+    })
+
+    address = from_frame(worksheet, frame, start_cell='B2')
+    assert address == 'B2:E5'
+    assert worksheet.Range('C4').Value == 2
+    assert worksheet.Range('D4').Value is None
+
+    result = to_frame(worksheet, address)
+    assert result['产品'].tolist() == ['键盘', '鼠标', '键盘']
+    assert result['数量'].dtype == np.int64
+    assert result['单价'].dtype == np.float64
+    assert result['日期'].dtype == np.dtype('datetime64[ns]')
+    assert result['日期'].isna().tolist() == [False, True, False]
+
+
+def test_read_xlsx_frame_merges_chunks_with_different_types(tmp_path):
+    path = tmp_path / 'chunks.xlsx'
+    rows = [['编号', '数量', '数量']] + [[row, row if row < 8 else f'{row}件', row * 0.5] for row in range(1, 11)]
+    with StreamingXlsxWriter(path) as writer:
+        writer.write_sheet('数据', rows)
+
+    frame = read_xlsx_frame(str(path), chunk_size=4)
+    assert list(frame.columns) == ['编号', '数量', '数量.1']
+    assert frame['编号'].dtype == np.int64
+    # 前面的块是整数，后面的块出现文本，整列按 object 处理，结果与一次转换整列相同
+    assert frame['数量'].dtype == object
+    assert frame['数量'].tolist()[6:] == [7, '8件', '9件', '10件']
+    assert frame['数量.1'].dtype == np.float64
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 上午09:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_headless_backend.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+无界面后端：区域读写、样式和保存为 xlsx
+"""
+
+import importlib.util
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from config import EXCEL_CONFIG
+from utils.excel_manager import ExcelManager
+from utils.headless_backend import HeadlessExcelManager, create_excel_manager
+
+NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def test_range_value_shapes(worksheet):
+    worksheet.Range('A1:C2').Value = [[1, 'a', True], [2.5, None, 'b']]
+
+    assert worksheet.Range('A1').Value == 1
+    assert worksheet.Range('A1:C2').Value == ((1, 'a', True), (2.5, None, 'b'))
+    assert worksheet.Range('B1:B2').Value == (('a',), (None,))
+    assert worksheet.Cells(2, 3).Value == 'b'
+
+
+def test_scalar_assignment_fills_range(worksheet):
+    worksheet.Range('B2:C3').Value = 0
+
+    assert worksheet.Range('B2:C3').Value == ((0, 0), (0, 0))
+    assert worksheet.UsedRange.Address == '$B$2:$C$3'
+
+
+def test_short_rows_clear_remaining_cells(worksheet):
+    worksheet.Range('A1:B2').Value = 9
+    worksheet.Range('A1:B2').Value = [[1]]
+
+    assert worksheet.Range('A1:B2').Value == ((1, None), (None, None))
+
+
+def test_styles_apply_to_each_cell(worksheet):
+    cells = worksheet.Range('A1:B2')
+    cells.Font.Bold = True
+    cells.Interior.Color = 255
+    worksheet.Range('B2').Font.Bold = False
+
+    assert worksheet.Range('A1').Font.Bold is True
+    assert worksheet.Range('B1').Interior.Color == 255
+    assert not worksheet.Range('B2').Font.Bold
+
+
+def test_save_as_writes_openxml_package(workbook, worksheet, tmp_path):
+    worksheet.Range('A1:B2').Value = [['名称', 3], ['苹果', 2.5]]
+    worksheet.Range('A1:B1').Font.Bold = True
+    path = tmp_path / 'book.xlsx'
+
+    workbook.SaveAs(str(path))
+
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        assert {'[Content_Types].xml', 'xl/workbook.xml', 'xl/styles.xml',
+                'xl/worksheets/sheet1.xml'} <= names
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        cells = {cell.get('r'): cell for cell in sheet.iter(f"{{{NS['s']}}}c")}
+        assert cells['B1'].find('s:v', NS).text == '3'
+        assert cells['B2'].find('s:v', NS).text == '2.5'
+        strings = archive.read('xl/sharedStrings.xml').decode('utf-8')
+        assert '名称' in strings and '苹果' in strings
+        assert b'<b/>' in archive.read('xl/styles.xml')
+
+
+def test_create_excel_manager_follows_config(monkeypatch):
+    monkeypatch.setitem(EXCEL_CONFIG, 'backend', 'headless')
+    assert isinstance(create_excel_manager(), HeadlessExcelManager)
+
+    monkeypatch.setitem(EXCEL_CONFIG, 'backend', 'com')
+    manager = create_excel_manager(visible=True, alerts=False)
+    assert isinstance(manager, ExcelManager)
+    assert (manager.visible, manager.alerts) == (True, False)
+
+    with pytest.raises(ValueError):
+        create_excel_manager('unknown')
+
+
+@pytest.mark.skipif(importlib.util.find_spec('win32com') is not None, reason='已安装 pywin32')
+def test_com_manager_without_pywin32_reports_missing_dependency():
+    manager = ExcelManager()
+
+    with pytest.raises(RuntimeError, match='pywin32'):
+        manager.start()
+    assert not manager.is_alive()
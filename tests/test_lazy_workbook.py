@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午04:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_lazy_workbook.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+按需载入的工作簿：工作表代理、按需解析、释放和保存
+"""
+
+import pytest
+
+from utils.lazy_workbook import LazyWorkbook
+
+SHEETS = ('销售', '库存', '人员', '汇总')
+
+
+@pytest.fixture
+def source(excel_app, tmp_path):
+    """四个工作表的工作簿，每个工作表的 A1 为表名、B2:C3 为数值"""
+    workbook = excel_app.Workbooks.Add()
+    sheet = workbook.Worksheets(1)
+    for position, name in enumerate(SHEETS):
+        if position:
+            sheet = workbook.Worksheets.Add(After=sheet)
+        sheet.Name = name
+        sheet.Range('A1').Value = name
+        sheet.Range('B2:C3').Value = [[position, position + 1], [position + 2, position + 3]]
+    path = tmp_path / 'source.xlsx'
+    workbook.SaveAs(str(path))
+    workbook.Close()
+    return path
+
+
+@pytest.fixture
+def lazy(excel_app, source):
+    workbook = excel_app.Workbooks.Open(str(source), Lazy=True)
+    yield workbook
+    workbook.Close()
+
+
+def _loaded(workbook):
+    return [sheet.Name for sheet in workbook.Worksheets if sheet.is_loaded]
+
+
+def test_open_parses_no_sheets(lazy):
+    assert isinstance(lazy, LazyWorkbook)
+    assert [sheet.Name for sheet in lazy.Worksheets] == list(SHEETS)
+    assert lazy.Worksheets('库存').Dimensions == 'A1:C3'
+    assert _loaded(lazy) == []
+
+
+def test_only_accessed_sheet_is_parsed(lazy):
+    assert lazy.Worksheets('人员').Range('C3').Value == 5
+
+    assert _loaded(lazy) == ['人员']
+
+
+def test_least_recently_used_sheets_are_released(lazy):
+    lazy.max_loaded_sheets = 2
+    for name in SHEETS:
+        assert lazy.Worksheets(name).Range('A1').Value == name
+
+    assert _loaded(lazy) == ['人员', '汇总']
+    # 释放后再次访问重新解析
+    assert lazy.Worksheets('销售').Range('B2').Value == 0
+    assert _loaded(lazy) == ['销售', '汇总']
+
+
+def test_modified_sheets_are_kept(lazy):
+    sheet = lazy.Worksheets('销售')
+    sheet.Range('D4').Value = '新增'
+
+    assert sheet.is_modified
+    assert not sheet.release()
+    assert lazy.release_all() == 0
+    assert lazy.Worksheets('库存').Range('A1').Value == '库存'
+    assert lazy.release_all() == 1
+    assert _loaded(lazy) == ['销售']
+
+
+def test_save_includes_released_and_unparsed_sheets(excel_app, lazy, tmp_path):
+    lazy.Worksheets('库存').Range('B2').Value = 100
+    lazy.Worksheets('人员').Range('A1').Value
+    lazy.Worksheets('人员').release()
+    target = tmp_path / 'copy.xlsx'
+    lazy.SaveAs(str(target))
+
+    copy = excel_app.Workbooks.Open(str(target))
+    assert [sheet.Range('A1').Value for sheet in copy.Worksheets] == list(SHEETS)
+    assert copy.Worksheets('库存').Range('B2:C3').Value == ((100, 2), (3, 4))
+    assert copy.Worksheets('汇总').Range('C3').Value == 6
+
+
+def test_save_over_source_file(excel_app, lazy, source):
+    lazy.Worksheets('汇总').Range('A1').Value = '总计'
+    lazy.SaveAs(str(source))
+    lazy.Close()
+
+    reopened = excel_app.Workbooks.Open(str(source), Lazy=True)
+    assert [sheet.Range('A1').Value for sheet in reopened.Worksheets] == ['销售', '库存', '人员', '总计']
+    reopened.Close()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午02:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_manager_pool.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+Excel 管理器池：借出归还、回收重建、超时以及 COM 实例在线程之间的封送
+"""
+
+import sys
+import threading
+import types
+
+import pytest
+
+from utils.headless_backend import HeadlessExcelManager
+from utils.manager_pool import ExcelManagerPool
+
+
+class _CountingFactory:
+    """记录创建的管理器"""
+
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        manager = HeadlessExcelManager()
+        self.created.append(manager)
+        return manager
+
+
+def test_checkin_returns_warm_instance():
+    factory = _CountingFactory()
+    with ExcelManagerPool(factory=factory, size=1) as pool:
+        with pool.manager() as first:
+            first.get_application().Workbooks.Add()
+        with pool.manager() as second:
+            # 归还时关闭了残留的工作簿
+            assert second.get_application().Workbooks.Count == 0
+
+    assert first is second
+    assert len(factory.created) == 1
+    assert first.app is None
+
+
+def test_instances_are_recycled_after_max_uses():
+    factory = _CountingFactory()
+    with ExcelManagerPool(factory=factory, size=1, max_uses=2) as pool:
+        used = []
+        for _ in range(3):
+            with pool.manager() as manager:
+                used.append(manager)
+
+    assert used[0] is used[1] is not used[2]
+    assert len(factory.created) == 2
+    assert not used[0].is_alive()
+
+
+def test_dead_instance_is_replaced_on_checkout():
+    factory = _CountingFactory()
+    with ExcelManagerPool(factory=factory, size=1) as pool:
+        factory.created[0].quit()
+        with pool.manager() as manager:
+            assert manager is not factory.created[0]
+            assert manager.is_alive()
+
+
+def test_checkout_times_out_when_exhausted():
+    with ExcelManagerPool(factory=_CountingFactory(), size=1) as pool:
+        manager = pool.checkout()
+        with pytest.raises(TimeoutError):
+            pool.checkout(timeout=0.05)
+        pool.checkin(manager)
+        assert pool.idle_count == 1 and pool.in_use_count == 0
+
+
+def test_extra_idle_instances_are_evicted():
+    factory = _CountingFactory()
+    with ExcelManagerPool(factory=factory, size=1, max_size=2, idle_timeout=0) as pool:
+        first, second = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+
+        assert pool.evict_idle() == 1
+        assert pool.idle_count == 1
+
+
+class _FakeDispatch:
+    """模拟 COM 代理，记录它所属的线程"""
+
+    def __init__(self, thread):
+        self._oleobj_ = self
+        self.thread = thread
+
+
+class _ComManager:
+    def __init__(self):
+        self.app = None
+        self.calls = []
+
+    def __enter__(self):
+        self.app = _FakeDispatch(threading.get_ident())
+        return self
+
+    def __exit__(self, *exc_info):
+        self.calls.append(('quit', self.app.thread, threading.get_ident()))
+        self.app = None
+
+    def is_alive(self):
+        # COM 代理只能在取得它的线程（套间）调用
+        self.calls.append(('is_alive', self.app.thread, threading.get_ident()))
+        return self.app.thread == threading.get_ident()
+
+
+@pytest.fixture
+def fake_com(monkeypatch):
+    """模拟 pythoncom 和 win32com：封送后在解封的线程得到新的代理"""
+    pythoncom = types.ModuleType('pythoncom')
+    pythoncom.IID_IDispatch = object()
+    pythoncom.com_error = OSError
+    pythoncom.CoInitialize = lambda: None
+    pythoncom.CoMarshalInterThreadInterfaceInStream = lambda iid, dispatch: ('stream', dispatch)
+    pythoncom.CoGetInterfaceAndReleaseStream = lambda stream, iid: _FakeDispatch(threading.get_ident())
+    client = types.ModuleType('win32com.client')
+    client.Dispatch = lambda dispatch: dispatch
+    win32com = types.ModuleType('win32com')
+    win32com.client = client
+    monkeypatch.setitem(sys.modules, 'pythoncom', pythoncom)
+    monkeypatch.setitem(sys.modules, 'win32com', win32com)
+    monkeypatch.setitem(sys.modules, 'win32com.client', client)
+
+
+def test_com_instances_are_marshalled_between_threads(fake_com):
+    managers = []
+
+    def factory():
+        managers.append(_ComManager())
+        return managers[-1]
+
+    pool = ExcelManagerPool(factory=factory, size=1, reset=lambda manager: None)
+    borrowed = []
+
+    def borrow():
+        with pool.manager() as manager:
+            borrowed.append(manager.app.thread == threading.get_ident())
+
+    for _ in range(2):
+        worker = threading.Thread(target=borrow)
+        worker.start()
+        worker.join()
+    pool.close()
+
+    assert len(managers) == 1
+    assert borrowed == [True, True]
+    # 每次调用都使用调用线程的代理，包括关闭
+    assert all(owner == caller for _, owner, caller in managers[0].calls)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午11:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_pagination.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+分页：行高、列宽、写入和页面设置变化后分页结果随之更新
+"""
+
+from utils.pagination import fits_to_pages
+
+
+def _fill(worksheet, rows: int, columns: int = 5) -> None:
+    worksheet.Range(worksheet.Cells(1, 1), worksheet.Cells(rows, columns)).Value = \
+        [[row * columns + col for col in range(columns)] for row in range(rows)]
+
+
+def test_row_height_change_invalidates_pages(worksheet):
+    _fill(worksheet, 100)
+    pagination = worksheet.pagination()
+    before = pagination.page_count
+
+    worksheet.Range('A1:A100').RowHeight = 60
+
+    assert pagination.page_count > before
+    assert pagination.page_count == type(pagination)(worksheet).page_count
+
+
+def test_appended_rows_invalidate_pages(worksheet):
+    _fill(worksheet, 40)
+    pagination = worksheet.pagination()
+    before = pagination.page_count
+
+    worksheet.Range('A400').Value = '末行'
+
+    assert pagination.page_count > before
+    assert pagination.areas[0][2] == 400
+
+
+def test_column_width_change_invalidates_pages(worksheet):
+    _fill(worksheet, 10)
+    pagination = worksheet.pagination()
+    assert pagination.page_count == 1
+
+    worksheet.Range('A1:E1').ColumnWidth = 60
+
+    assert pagination.page_count > 1
+
+
+def test_fit_to_pages_requires_zoom_off(worksheet):
+    _fill(worksheet, 150)
+    page_setup = worksheet.PageSetup
+    page_setup.FitToPagesWide = 1
+    page_setup.FitToPagesTall = 1
+    pagination = worksheet.pagination()
+
+    # Zoom 不为 False 时按页数缩放的设置不生效（与 Excel 一致）
+    assert not fits_to_pages(page_setup)
+    assert pagination.page_count > 1
+
+    page_setup.Zoom = False
+
+    assert fits_to_pages(page_setup)
+    assert pagination.page_count == 1
+    scale = pagination.scale
+    assert scale < 1
+
+    # 行高变化后重新计算缩放比例，仍然缩放到一页
+    worksheet.Range('A1:A150').RowHeight = 30
+
+    assert pagination.page_count == 1
+    assert pagination.scale < scale
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午11:00
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_pdf_writer.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+PDF 输出：交叉引用表中的每个偏移量都指向对应的对象
+"""
+
+import re
+
+import pytest
+
+from utils.pdf_writer import XL_TYPE_PDF, export_pdf
+
+
+def _check_xref(data: bytes) -> int:
+    """校验交叉引用表，返回页数"""
+    assert data.startswith(b'%PDF-')
+    assert data.rstrip().endswith(b'%%EOF')
+    xref = int(re.search(rb'startxref\s+(\d+)\s+%%EOF\s*$', data).group(1))
+    assert data[xref:xref + 5] == b'xref\n'
+    header = re.match(rb'xref\n0 (\d+)\n', data[xref:])
+    count = int(header.group(1))
+    entries = data[xref + header.end():].split(b'\n')[:count]
+    assert entries[0] == b'0000000000 65535 f '
+    for number, entry in enumerate(entries[1:], start=1):
+        offset, generation, kind = entry.split()
+        assert (generation, kind) == (b'00000', b'n')
+        assert data[int(offset):].startswith(b'%d 0 obj' % number), f'对象 {number} 的偏移量错误'
+    trailer = re.search(rb'trailer\s*<<\s*/Size (\d+)', data)
+    assert int(trailer.group(1)) == count
+    return int(re.search(rb'/Type /Pages /Count (\d+)', data).group(1))
+
+
+def test_single_sheet_xref(worksheet, tmp_path):
+    worksheet.Range('A1:D200').Value = [[f'第{row}行', row, row * 1.5, None] for row in range(200)]
+    path = tmp_path / 'sheet.pdf'
+
+    worksheet.ExportAsFixedFormat(XL_TYPE_PDF, str(path))
+
+    assert _check_xref(path.read_bytes()) > 1
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_multi_sheet_xref(workbook, worksheet, tmp_path, max_workers):
+    second = workbook.Worksheets.Add(After=worksheet)
+    worksheet.Range('A1:B120').Value = [[row, row * 2] for row in range(120)]
+    second.Range('A1:C80').Value = [['文本', row, True] for row in range(80)]
+    path = tmp_path / f'sheets_{max_workers}.pdf'
+
+    total = export_pdf([worksheet, second], str(path), max_workers=max_workers)
+
+    assert _check_xref(path.read_bytes()) == total > 2
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 下午04:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_pivot_engine.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+透视引擎：行、列总计以及空白项
+"""
+
+import pytest
+
+from utils.pivot_engine import BLANK_ITEM, PivotEngine
+
+SOURCE = [['地区', '产品', '销量'],
+          ['华东', 'A', 10],
+          ['华东', 'B', 5],
+          ['华北', 'A', 7],
+          [None, 'B', 3],
+          ['华北', 'B', 2]]
+
+
+@pytest.fixture
+def pivot(worksheet):
+    worksheet.Range('A1:C6').Value = SOURCE
+    engine = PivotEngine()
+    table = engine.create_pivot_table(worksheet, 'A1:C6', worksheet, 'E1', '销量透视')
+    engine.add_row_field(table, '地区')
+    engine.add_column_field(table, '产品')
+    engine.add_data_field(table, '销量', 'xlSum')
+    return engine, table
+
+
+def _rows_by_label(data):
+    return {row[0]: row[1:] for row in data[2:]}
+
+
+def test_row_and_column_totals(pivot):
+    engine, table = pivot
+    data = engine.get_pivot_table_data(table)
+
+    assert data[1] == ['地区', 'A', 'B', '总计']
+    rows = _rows_by_label(data)
+    assert rows['华东'] == [10, 5, 15]
+    assert rows['华北'] == [7, 2, 9]
+    assert rows['总计'] == [17, 10, 27]
+
+
+def test_blank_items_are_labelled_and_sorted_last(pivot):
+    engine, table = pivot
+    data = engine.get_pivot_table_data(table)
+
+    assert [row[0] for row in data[2:]] == ['华东', '华北', BLANK_ITEM, '总计']
+    assert _rows_by_label(data)[BLANK_ITEM] == [None, 3, 3]
+
+
+def test_totals_follow_appended_rows(pivot, worksheet):
+    engine, table = pivot
+    engine.append_source_rows(worksheet, 'A1:C6', [['华东', 'A', 1]])
+    rows = _rows_by_label(engine.get_pivot_table_data(table))
+
+    assert rows['华东'] == [11, 5, 16]
+    assert rows['总计'] == [18, 10, 28]
+    assert worksheet.Range('E1').Value == '求和项:销量'
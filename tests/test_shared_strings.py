@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午04:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_shared_strings.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+共享字符串表：mmap 偏移索引、按需解码和 LRU 缓存
+"""
+
+import io
+import zipfile
+
+import pytest
+
+from utils.shared_strings import SHARED_STRINGS_PART, SharedStringTable, decode_shared_string
+from utils.xlsx_writer import NS_MAIN
+
+ITEMS = (
+    '<si><t>北京</t></si>'
+    '<si><t xml:space="preserve"> 上海 </t></si>'
+    '<si><r><rPr><b/></rPr><t>富</t></r><r><t>文本</t></r><rPh sb="0" eb="1"><t>フ</t></rPh></si>'
+    '<si/>'
+    '<si><t>A&amp;B &lt;1&gt;</t></si>'
+    '<si><t>换行_x000D_回车</t></si>'
+)
+EXPECTED = ['北京', ' 上海 ', '富文本', '', 'A&B <1>', '换行\r回车']
+
+
+def _archive(content):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        if content is not None:
+            archive.writestr(SHARED_STRINGS_PART, content)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+@pytest.fixture
+def table():
+    content = f'<?xml version="1.0"?><sst xmlns="{NS_MAIN}" count="6" uniqueCount="6">{ITEMS}</sst>'
+    with SharedStringTable(_archive(content.encode('utf-8')), cache_size=2) as table:
+        yield table
+
+
+def test_strings_are_decoded_by_index(table):
+    assert len(table) == 6
+    assert [table[index] for index in range(6)] == EXPECTED
+    assert list(table) == EXPECTED
+
+
+def test_only_accessed_strings_are_decoded(table):
+    assert table[4] == 'A&B <1>'
+    assert list(table._cache) == [4]
+
+
+def test_cache_keeps_most_recent_strings(table):
+    table[0]
+    table[1]
+    table[0]
+    table[2]
+
+    assert list(table._cache) == [0, 2]
+
+
+def test_index_out_of_range(table):
+    with pytest.raises(IndexError):
+        table[6]
+    with pytest.raises(IndexError):
+        table[-1]
+
+
+def test_namespace_prefixed_items():
+    content = f'<x:sst xmlns:x="{NS_MAIN}"><x:si><x:t>前缀</x:t></x:si><x:si><x:t>第二项</x:t></x:si></x:sst>'
+    with SharedStringTable(_archive(content.encode('utf-8'))) as table:
+        assert list(table) == ['前缀', '第二项']
+
+
+def test_missing_or_empty_part():
+    with SharedStringTable(_archive(None)) as table:
+        assert len(table) == 0
+    with SharedStringTable(_archive(b'')) as table:
+        assert len(table) == 0
+
+
+def test_close_releases_mapping(table):
+    table.close()
+
+    assert table._map is None and table._file is None
+
+
+def test_decode_shared_string_ignores_phonetic_runs():
+    assert decode_shared_string('<si><t>漢字</t><rPh><t>かんじ</t></rPh></si>'.encode('utf-8')) == '漢字'
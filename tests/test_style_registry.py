@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午04:00
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_style_registry.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+样式注册表：样式去重、默认值归一化和单元格共享编号
+"""
+
+import re
+import zipfile
+
+import pytest
+
+from config import FORMAT_CONFIG
+from utils.style_registry import DEFAULT_STYLE_ID, STYLE_REGISTRY, StyleRegistry
+
+
+@pytest.fixture
+def registry():
+    return StyleRegistry()
+
+
+def test_equal_styles_share_one_id(registry):
+    first = registry.intern({'font_bold': True, 'fill_color': 255})
+    second = registry.intern({'fill_color': 255, 'font_bold': True})
+
+    assert first == second != DEFAULT_STYLE_ID
+    assert len(registry) == 2
+    assert dict(registry.get(first)) == {'fill_color': 255, 'font_bold': True}
+
+
+def test_default_values_normalize_to_default_id(registry):
+    style = {
+        'font_name': FORMAT_CONFIG['default_font'],
+        'font_size': FORMAT_CONFIG['default_font_size'],
+        'font_bold': False,
+        'fill_color': None,
+    }
+
+    assert registry.intern(style) == DEFAULT_STYLE_ID
+    assert registry.intern({'font_bold': True, 'font_size': FORMAT_CONFIG['default_font_size']}) == \
+        registry.intern({'font_bold': True})
+
+
+def test_styles_are_read_only(registry):
+    style_id = registry.intern({'font_bold': True})
+    with pytest.raises(TypeError):
+        registry.get(style_id)['font_bold'] = False
+
+
+def test_update_is_memoised(registry):
+    bold = registry.intern({'font_bold': True})
+    red_bold = registry.update(bold, {'font_color': 255})
+
+    assert registry.update(bold, {'font_color': 255}) == red_bold
+    assert registry.update(red_bold, {'font_bold': False}) == registry.intern({'font_color': 255})
+    assert len(registry._updates) == 2
+    apply = registry.updater({'font_italic': True})
+    assert apply(bold) == apply(bold) == registry.intern({'font_bold': True, 'font_italic': True})
+
+
+def test_cells_share_registry_ids(worksheet):
+    worksheet.Range('A1:C3').Font.Bold = True
+    worksheet.Range('C3').Interior.Color = 255
+
+    styles = worksheet._styles
+    assert len(styles) == 9
+    assert len({styles[(row, col)] for row in (1, 2, 3) for col in (1, 2, 3)}) == 2
+    assert dict(STYLE_REGISTRY.get(styles[(1, 1)])) == {'font_bold': True}
+    assert dict(STYLE_REGISTRY.get(styles[(3, 3)])) == {'fill_color': 255, 'font_bold': True}
+
+
+def test_saved_workbook_has_one_xf_per_style(workbook, tmp_path):
+    worksheet = workbook.ActiveSheet
+    worksheet.Range('A1:D100').Value = [[1] * 4] * 100
+    worksheet.Range('A1:D1').Font.Bold = True
+    worksheet.Range('A2:D100').NumberFormat = '0.00'
+    path = tmp_path / 'styles.xlsx'
+    workbook.SaveAs(str(path))
+
+    with zipfile.ZipFile(path) as archive:
+        styles = archive.read('xl/styles.xml').decode('utf-8')
+    # 默认样式、加粗、数字格式各一个
+    assert re.search(r'<cellXfs count="(\d+)"', styles).group(1) == '3'
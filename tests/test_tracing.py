@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午02:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_tracing.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+调用追踪：调用次数、单元格数、写出字节数和 trace 导出
+"""
+
+import json
+
+import pytest
+
+from utils.tracing import Tracer
+
+
+class _Report:
+    """被追踪的示例类"""
+
+    def write_values(self, worksheet, range_address, value):
+        worksheet.Range(range_address).Value = value
+
+    def rename_sheet(self, worksheet, name):
+        worksheet.Name = name
+
+    def copy_range(self, source, target_cell='A1'):
+        return source
+
+    def save(self, workbook, path):
+        workbook.SaveAs(path)
+
+    def fail(self):
+        raise ValueError('失败')
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    tracer.instrument(_Report)
+    yield tracer
+    tracer.uninstrument()
+
+
+def _stats(tracer):
+    return {item['name']: item for item in tracer.summary()}
+
+
+def test_counts_calls_and_errors(tracer):
+    report = _Report()
+    for _ in range(3):
+        report.copy_range(None)
+    with pytest.raises(ValueError):
+        report.fail()
+
+    stats = _stats(tracer)
+    assert stats['_Report.copy_range']['count'] == 3
+    assert stats['_Report.fail']['errors'] == 1
+    assert sum(stats['_Report.copy_range']['histogram'].values()) == 3
+
+
+def test_cells_come_only_from_address_arguments(tracer, worksheet):
+    report = _Report()
+    report.write_values(worksheet, 'A1:B10', 'ABC123')
+    report.write_values(worksheet, range_address='C1', value='D1:D100')
+    report.rename_sheet(worksheet, 'AB12')
+    report.copy_range(worksheet.Range('A1:C3'), target_cell='E5')
+
+    stats = _stats(tracer)
+    # 形如地址的写入值和工作表名称不计入
+    assert stats['_Report.write_values']['cells'] == 21
+    assert stats['_Report.rename_sheet']['cells'] == 0
+    assert stats['_Report.copy_range']['cells'] == 10
+
+
+def test_written_bytes_count_changed_files_only(tracer, workbook, worksheet, tmp_path):
+    worksheet.Range('A1').Value = '数据'
+    path = str(tmp_path / 'report.xlsx')
+    report = _Report()
+    report.save(workbook, path)
+    size = (tmp_path / 'report.xlsx').stat().st_size
+
+    assert _stats(tracer)['_Report.save']['bytes_written'] == size
+
+
+def test_uninstrument_restores_methods(tracer):
+    original = _Report.copy_range.__wrapped__
+    tracer.uninstrument()
+
+    _Report().copy_range(None)
+
+    assert _Report.copy_range is original
+    assert not tracer.enabled
+    assert tracer.summary() == []
+
+
+def test_chrome_trace_export(tracer, tmp_path):
+    _Report().copy_range(None, target_cell='B2:C3')
+    path = tmp_path / 'trace.json'
+
+    tracer.export_chrome_trace(str(path))
+
+    events = json.loads(path.read_text(encoding='utf-8'))['traceEvents']
+    assert [event['name'] for event in events] == ['_Report.copy_range']
+    assert events[0]['ph'] == 'X' and events[0]['args'] == {'cells': 4}
+
+
+class _Cell:
+    """带属性的被追踪类"""
+
+    def __init__(self):
+        self._value = None
+
+    @property
+    def Value(self):
+        return self._value
+
+    @Value.setter
+    def Value(self, value):
+        self._value = value
+
+    def Clear(self):
+        self.Value = None
+
+
+def test_properties_count_gets_and_sets():
+    tracer = Tracer()
+    tracer.instrument(_Cell, properties=True)
+    try:
+        cell = _Cell()
+        cell.Value = 1
+        assert cell.Value == 1
+        cell.Clear()
+    finally:
+        tracer.uninstrument()
+
+    stats = _stats(tracer)
+    assert stats['_Cell.Value']['count'] == 1
+    assert stats['_Cell.Value=']['count'] == 2
+    assert vars(_Cell)['Value'].fget.__name__ == 'Value'
+
+
+def test_outermost_calls_only_when_not_nested():
+    tracer = Tracer(nested=False)
+    tracer.instrument(_Cell, properties=True)
+    try:
+        cell = _Cell()
+        cell.Clear()
+        cell.Value = 2
+    finally:
+        tracer.uninstrument()
+
+    stats = _stats(tracer)
+    assert stats['_Cell.Clear']['count'] == 1
+    assert stats['_Cell.Value=']['count'] == 1
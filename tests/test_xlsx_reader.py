@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午03:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_xlsx_reader.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+分块 xlsx 读取：单元格类型解析、列投影、分块和内存占用
+"""
+
+import tracemalloc
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from utils.xlsx_reader import XlsxReader, parse_iso_datetime
+from utils.xlsx_stream import StreamingXlsxWriter
+from utils.xlsx_writer import NS_MAIN
+
+SHEET_ROWS = (
+    '<row r="1">'
+    '<c r="A1" t="d"><v>2024-01-02T08:30:00Z</v></c>'
+    '<c r="B1" t="d"><v>2024-03-04</v></c>'
+    '<c r="C1" t="d"><v>12:15:30.25</v></c>'
+    '<c r="D1" t="d"><v>不是日期</v></c>'
+    '</row>'
+    '<row r="2">'
+    '<c r="A2" t="inlineStr"><is><t xml:space="preserve"> 内联 </t></is></c>'
+    '<c r="B2" t="inlineStr"><is><r><t>富</t></r><r><t>文本</t></r><rPh><t>フ</t></rPh></is></c>'
+    '<c r="D2" t="inlineStr"><is/></c>'
+    '</row>'
+)
+
+
+@pytest.fixture
+def typed_workbook(tmp_path):
+    """用流式写入器生成工作簿，再替换工作表 XML 为手写的单元格"""
+    source = tmp_path / 'source.xlsx'
+    with StreamingXlsxWriter(source) as writer:
+        writer.write_sheet('数据', [])
+    path = tmp_path / 'typed.xlsx'
+    with zipfile.ZipFile(source) as original, zipfile.ZipFile(path, 'w') as archive:
+        for item in original.infolist():
+            data = original.read(item.filename)
+            if item.filename == 'xl/worksheets/sheet1.xml':
+                data = (f'<worksheet xmlns="{NS_MAIN}"><sheetData>{SHEET_ROWS}</sheetData></worksheet>').encode()
+            archive.writestr(item, data)
+    return path
+
+
+def test_date_cells_are_parsed_as_datetime(typed_workbook):
+    with XlsxReader(str(typed_workbook)) as reader:
+        first = next(reader.iter_rows())
+
+    assert first == [datetime(2024, 1, 2, 8, 30), datetime(2024, 3, 4),
+                     datetime(1899, 12, 30, 12, 15, 30, 250000), '不是日期']
+
+
+def test_inline_strings_join_runs_and_keep_whitespace(typed_workbook):
+    with XlsxReader(str(typed_workbook)) as reader:
+        assert reader.read_range('数据', 'A2:D2') == [[' 内联 ', '富文本', None, '']]
+
+
+def test_parse_iso_datetime():
+    assert parse_iso_datetime('2024-01-02T08:30:00+08:00') == datetime(2024, 1, 2, 8, 30)
+    assert parse_iso_datetime('2024-01-02T08:30') == datetime(2024, 1, 2, 8, 30)
+    assert parse_iso_datetime('2024-02-30') is None
+    assert parse_iso_datetime('') is None
+
+
+def _write_sales(path, rows):
+    with StreamingXlsxWriter(path, shared_strings=False) as writer:
+        writer.write_sheet('数据', ([row, f"产品{row % 50}", f"地区{row % 7}", row * 1.5, f"备注{row}"]
+                                  for row in range(1, rows + 1)))
+    return path
+
+
+@pytest.fixture(scope='module')
+def large_workbook(tmp_path_factory):
+    return _write_sales(tmp_path_factory.mktemp('reader') / 'large.xlsx', 50000)
+
+
+def test_chunks_and_projection(large_workbook):
+    with XlsxReader(str(large_workbook)) as reader:
+        chunks = reader.iter_chunks('数据', chunk_size=4096, columns=['D', 'A'])
+        sizes = []
+        for chunk in chunks:
+            sizes.append(len(chunk))
+            last = chunk[-1]
+
+    assert sizes == [4096] * 12 + [50000 - 4096 * 12]
+    assert last == [75000.0, 50000]
+
+
+def test_chunked_reading_memory_is_bounded(tmp_path):
+    with XlsxReader(str(_write_sales(tmp_path / 'memory.xlsx', 8000))) as reader:
+        tracemalloc.start()
+        try:
+            rows = 0
+            for chunk in reader.iter_chunks('数据', chunk_size=200):
+                rows += len(chunk)
+            _, chunked_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            everything = list(reader.iter_rows('数据'))
+            _, full_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert rows == len(everything) == 8000
+    # 分块读取的峰值只与单个行块有关，远小于一次性读取全部行
+    assert chunked_peak < full_peak / 4
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午02:10
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_xlsx_roundtrip.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+xlsx 写入后重新打开：单元格值、样式和页面设置保持不变
+"""
+
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture(params=[False, True], ids=['eager', 'lazy'])
+def reopen(request, excel_app, workbook, tmp_path):
+    """保存工作簿后重新打开（分别测试一次性加载和延迟加载）"""
+
+    def _reopen():
+        path = tmp_path / 'roundtrip.xlsx'
+        workbook.SaveAs(str(path))
+        workbook.Close()
+        if request.param:
+            return excel_app.Workbooks.Open(str(path), Lazy=True)
+        return excel_app.Workbooks.Open(str(path))
+
+    return _reopen
+
+
+def test_values_survive_roundtrip(worksheet, reopen):
+    rows = [['名称', '数量', '单价', '日期', '有效'],
+            ['苹果', 3, 2.5, datetime(2024, 1, 31), True],
+            ['香蕉', 12, 0.75, datetime(2024, 2, 29), False]]
+    worksheet.Range('A1:E3').Value = rows
+    worksheet.Range('D2:D3').NumberFormat = 'yyyy-mm-dd'
+    worksheet.Range('F2').Formula = '=B2*C2'
+
+    sheet = reopen().Worksheets(1)
+
+    assert sheet.Range('A1:C3').Value == tuple(tuple(row[:3]) for row in rows)
+    assert sheet.Range('D2').Value == datetime(2024, 1, 31)
+    assert sheet.Range('E2:E3').Value == ((True,), (False,))
+    assert sheet.Range('F2').Formula == '=B2*C2'
+
+
+def test_styles_survive_roundtrip(worksheet, reopen):
+    worksheet.Range('A1:C3').Value = [[1, 2, 3], [4, 5, 6], ['a', 'b', 'c']]
+    header = worksheet.Range('A1:B1')
+    header.Font.Bold = True
+    header.Interior.Color = 255
+    header.NumberFormat = '0.00'
+    worksheet.Range('C3').HorizontalAlignment = -4108
+
+    sheet = reopen().Worksheets(1)
+
+    assert sheet.Range('A1').Font.Bold is True
+    assert sheet.Range('B1').Interior.Color == 255
+    assert sheet.Range('A1').NumberFormat == '0.00'
+    assert sheet.Range('C3').HorizontalAlignment == -4108
+    assert not sheet.Range('C1').Font.Bold
+
+
+def test_page_setup_survives_roundtrip(worksheet, reopen):
+    worksheet.Range('A1:C40').Value = [[row, row * 2, row * 3] for row in range(40)]
+    page_setup = worksheet.PageSetup
+    page_setup.Orientation = 2
+    page_setup.PrintArea = '$A$1:$C$40'
+    page_setup.PrintTitleRows = '$1:$1'
+    page_setup.CenterFooter = '第 &P 页'
+    page_setup.Zoom = False
+    page_setup.FitToPagesWide = 1
+    page_setup.FitToPagesTall = False
+
+    loaded = reopen().Worksheets(1).PageSetup
+
+    assert loaded.Orientation == 2
+    assert loaded.PrintArea == '$A$1:$C$40'
+    assert loaded.PrintTitleRows == '$1:$1'
+    assert loaded.CenterFooter == '第 &P 页'
+    assert loaded.Zoom is False
+    assert loaded.FitToPagesWide == 1
+    assert loaded.FitToPagesTall is False
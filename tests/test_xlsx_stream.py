@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午03:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：test_xlsx_stream.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+流式 xlsx 写入：逐行写入的往返、共享字符串登记、分类列编码和空白保留
+"""
+
+import zipfile
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.xlsx_reader import XlsxReader
+from utils.xlsx_stream import StreamingXlsxWriter, stream_range_values
+
+PADDED = ['  前导空格', '尾随空格  ', '\t制表符', '无空白']
+
+
+def _part(path, name):
+    with zipfile.ZipFile(path) as archive:
+        return archive.read(name).decode('utf-8')
+
+
+def _rows(path, sheet=1):
+    with XlsxReader(str(path)) as reader:
+        return list(reader.iter_rows(sheet))
+
+
+def test_repeated_strings_are_stored_once(tmp_path):
+    path = tmp_path / 'shared.xlsx'
+    with StreamingXlsxWriter(path, batch_size=7) as writer:
+        writer.write_sheet('数据', (['华东', '笔记本电脑', row] for row in range(100)))
+
+    shared = _part(path, 'xl/sharedStrings.xml')
+    assert 'count="200" uniqueCount="2"' in shared
+    assert _rows(path)[99] == ['华东', '笔记本电脑', 99]
+
+
+def test_categorical_columns_are_encoded_once(tmp_path):
+    frame = pd.DataFrame({
+        '地区': pd.Categorical(['北京', '上海', '北京', None, '上海']),
+        '数量': [1, 2, 3, 4, 5],
+    })
+    path = tmp_path / 'category.xlsx'
+    with StreamingXlsxWriter(path) as writer:
+        assert writer.write_frame('数据', frame) == 6
+
+    shared = _part(path, 'xl/sharedStrings.xml')
+    assert 'uniqueCount="4"' in shared
+    assert _rows(path) == [['地区', '数量'], ['北京', 1], ['上海', 2], ['北京', 3], [None, 4], ['上海', 5]]
+
+
+def test_shared_strings_preserve_surrounding_whitespace(tmp_path):
+    path = tmp_path / 'padded_shared.xlsx'
+    with StreamingXlsxWriter(path) as writer:
+        writer.write_sheet('数据', [PADDED])
+
+    shared = _part(path, 'xl/sharedStrings.xml')
+    assert shared.count('xml:space="preserve"') == 3
+    assert _rows(path) == [PADDED]
+
+
+def test_inline_strings_preserve_surrounding_whitespace(tmp_path):
+    path = tmp_path / 'padded_inline.xlsx'
+    with StreamingXlsxWriter(path, shared_strings=False) as writer:
+        writer.write_sheet('数据', [PADDED])
+
+    sheet = _part(path, 'xl/worksheets/sheet1.xml')
+    assert sheet.count('t="inlineStr"') == 4
+    assert sheet.count('<t xml:space="preserve">') == 3
+    assert _rows(path) == [PADDED]
+
+
+def test_strings_beyond_shared_limit_are_written_inline(tmp_path):
+    path = tmp_path / 'limit.xlsx'
+    with StreamingXlsxWriter(path, max_shared_strings=2) as writer:
+        writer.write_sheet('数据', [['甲', '乙', '丙 '], ['甲', '丁', '乙']])
+
+    sheet = _part(path, 'xl/worksheets/sheet1.xml')
+    assert sheet.count('t="inlineStr"') == 2
+    assert _rows(path) == [['甲', '乙', '丙 '], ['甲', '丁', '乙']]
+
+
+def test_round_trip_mixed_values(tmp_path):
+    rows = [
+        ['文本', 1, 2.5, True, date(2024, 1, 2), datetime(2024, 1, 2, 8, 30), None, '=B1*2'],
+        [np.int64(7), np.float64(1.25), np.bool_(False), float('nan'), '', 'a<b&c'],
+    ]
+    path = tmp_path / 'mixed.xlsx'
+    with StreamingXlsxWriter(path) as writer:
+        writer.write_sheet('数据', iter(rows))
+
+    first, second = _rows(path)
+    assert first[:6] == ['文本', 1, 2.5, True, datetime(2024, 1, 2), datetime(2024, 1, 2, 8, 30)]
+    assert first[6] is None
+    assert second[:3] == [7, 1.25, False]
+    assert second[3:] == [None, None, 'a<b&c']
+    with XlsxReader(str(path)) as reader:
+        assert reader.read_range('数据', 'H1', formulas=True) == [['=B1*2']]
+
+
+def test_generator_rows_are_flushed_in_batches(tmp_path):
+    consumed = []
+
+    def rows():
+        for row in range(1, 1001):
+            consumed.append(row)
+            yield [row, f"行{row % 10}"]
+
+    path = tmp_path / 'batches.xlsx'
+    with StreamingXlsxWriter(path, batch_size=64) as writer:
+        assert writer.write_sheet('数据', rows(), start_cell='B3') == 1000
+
+    assert consumed == list(range(1, 1001))
+    with XlsxReader(str(path)) as reader:
+        assert reader.read_range('数据', 'B3:C4') == [[1, '行1'], [2, '行2']]
+        assert reader.read_range('数据', 'B1002') == [[1000]]
+
+
+def test_stream_range_values_and_sheet_names(tmp_path):
+    path = tmp_path / 'single.xlsx'
+    assert stream_range_values(str(path), ([row] for row in range(5)), sheet_name='明细') == 5
+    with XlsxReader(str(path)) as reader:
+        assert reader.sheet_names == ['明细']
+
+    with StreamingXlsxWriter(tmp_path / 'names.xlsx') as writer:
+        writer.write_sheet('数据', [])
+        with pytest.raises(ValueError):
+            writer.write_sheet('数据', [])
+    with pytest.raises(ValueError):
+        writer.write_sheet('其他', [])
+
+
+def test_empty_writer_creates_default_sheet(tmp_path):
+    path = tmp_path / 'empty.xlsx'
+    StreamingXlsxWriter(path).close()
+
+    with XlsxReader(str(path)) as reader:
+        assert reader.sheet_names == ['Sheet1']
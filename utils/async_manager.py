@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午09:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：async_manager.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+asyncio 接口
+在专用工作线程（或工作进程）中执行 Excel 操作，事件循环只等待结果，不会被阻塞。
+每个工作线程持有一个 Excel 管理器，COM 对象只在创建它的线程中使用；
+待执行的操作数有上限，超过时提交方 await 等待（背压）；
+每个操作都有超时，超时或被取消时尚未开始的操作不再执行，
+已在执行的操作无法强行中断，结束后其所在线程（或进程）的 Excel 实例会被重建。
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+from loguru import logger
+
+from config import PERFORMANCE_CONFIG
+from utils.manager_pool import close_open_workbooks
+from utils.report_runner import JobResult, ReportJob, RunSummary, _init_worker, _run_job
+
+# 当前线程正在执行的操作（供 operation_cancelled 查询）
+_current = threading.local()
+
+
+def operation_cancelled() -> bool:
+    """
+    当前操作是否已超时或被取消
+
+    长时间运行的操作函数可以在循环中检查此标志并提前结束。
+    """
+    item = getattr(_current, 'item', None)
+    return item is not None and item.cancelled.is_set()
+
+
+class _WorkItem:
+    """一个待执行的操作"""
+
+    __slots__ = ('func', 'args', 'kwargs', 'future', 'loop', 'cancelled')
+
+    def __init__(self, func: Callable[..., Any], args: tuple, kwargs: dict,
+                 future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.loop = loop
+        self.cancelled = threading.Event()
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class _Worker(threading.Thread):
+    """工作线程：在线程内创建并独占一个 Excel 管理器"""
+
+    def __init__(self, owner: 'AsyncExcelManager', index: int):
+        super().__init__(name=f"excel-worker-{index}", daemon=True)
+        self.owner = owner
+        self.manager: Any = None
+        self.uses = 0
+
+    def run(self) -> None:
+        pythoncom = self._com_initialize()
+        try:
+            while True:
+                item = self.owner._queue.get()
+                if item is None:
+                    break
+                try:
+                    self._execute(item)
+                finally:
+                    self.owner._release_slot(item.loop)
+        finally:
+            self._close_manager()
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def _execute(self, item: _WorkItem) -> None:
+        if item.cancelled.is_set() or item.future.done():
+            return
+        _current.item = item
+        result, error = None, None
+        try:
+            if self.manager is None:
+                self.manager = self.owner._create_manager()
+            self.uses += 1
+            result = item.func(self.manager, *item.args, **item.kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            _current.item = None
+        try:
+            item.loop.call_soon_threadsafe(_resolve, item.future, result, error)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+        if item.cancelled.is_set() or self.uses >= self.owner.max_uses:
+            # 超时的操作可能留下不一致的状态，重建实例
+            self._close_manager()
+        elif self.manager is not None:
+            try:
+                self.owner.reset(self.manager)
+            except Exception as e:
+                logger.warning(f"清理 Excel 实例失败，将重建: {e}")
+                self._close_manager()
+
+    def _close_manager(self) -> None:
+        if self.manager is not None:
+            try:
+                self.manager.__exit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"关闭 Excel 实例失败: {e}")
+            self.manager = None
+            self.uses = 0
+
+    @staticmethod
+    def _com_initialize() -> Any:
+        try:
+            import pythoncom
+        except ImportError:
+            return None
+        pythoncom.CoInitialize()
+        return pythoncom
+
+
+class AsyncExcelManager:
+    """
+    异步 Excel 管理器
+
+    用法:
+        async with AsyncExcelManager(workers=2, backend='headless') as excel:
+            result = await excel.run(build_report, '销售报告.xlsx')
+            summary = await excel.run_jobs(jobs)
+
+    操作函数的第一个参数为 Excel 管理器，与 main.py 中 demo_* 函数的签名一致。
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = None, backend: str = None,
+                 factory: Callable[[], Any] = None, use_processes: bool = False,
+                 max_uses: int = 50, reset: Callable[[Any], None] = close_open_workbooks):
+        """
+        Args:
+            workers: 工作线程（或进程）数
+            queue_size: 等待执行的操作数上限，默认为 workers 的两倍；队列满时提交方等待
+            backend: Excel 后端类型（仅在未提供 factory 时使用）
+            factory: 创建管理器的函数，在工作线程内调用
+            use_processes: 为 True 时在工作进程中执行（操作函数和参数必须可以在进程间传递）
+            max_uses: 单个实例执行的操作数上限，达到后关闭并重建
+            reset: 每个操作结束后的清理函数
+        """
+        if factory is None:
+            from utils.headless_backend import create_excel_manager
+
+            def factory():
+                return create_excel_manager(backend)
+
+        self.workers = workers
+        self.queue_size = workers * 2 if queue_size is None else queue_size
+        self.backend = backend
+        self.factory = factory
+        self.use_processes = use_processes
+        self.max_uses = max_uses
+        self.reset = reset
+        self._queue: 'queue.Queue[Optional[_WorkItem]]' = queue.Queue()
+        self._threads: List[_Worker] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._started = False
+
+    @property
+    def pending(self) -> int:
+        """已提交但尚未开始执行的操作数"""
+        return self._queue.qsize()
+
+    async def start(self) -> 'AsyncExcelManager':
+        """启动工作线程（或进程池）"""
+        if self._started:
+            return self
+        self._slots = asyncio.Semaphore(self.queue_size + self.workers)
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.backend, {}))
+        else:
+            self._threads = [_Worker(self, index) for index in range(1, self.workers + 1)]
+            for thread in self._threads:
+                thread.start()
+        self._started = True
+        logger.info(f"异步 Excel 管理器已启动: {self.workers} 个工作{'进程' if self.use_processes else '线程'}")
+        return self
+
+    async def run(self, func: Callable[..., Any], *args, timeout: float = None, **kwargs) -> Any:
+        """
+        执行一个 Excel 操作
+
+        Args:
+            func: 操作函数，第一个参数为 Excel 管理器
+            *args: 传递给 func 的位置参数
+            timeout: 超时时间（秒），默认取 PERFORMANCE_CONFIG['timeout']，包括排队等待的时间
+            **kwargs: 传递给 func 的关键字参数
+
+        Returns:
+            func 的返回值
+        """
+        if not self._started:
+            await self.start()
+        timeout = PERFORMANCE_CONFIG['timeout'] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        # 背压：待执行的操作达到上限时在这里等待
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"等待 Excel 工作线程超时（{timeout} 秒）") from None
+        if self.use_processes:
+            return await self._run_in_process(func, args, kwargs, deadline, timeout)
+
+        loop = asyncio.get_running_loop()
+        item = _WorkItem(func, args, kwargs, loop.create_future(), loop)
+        self._queue.put_nowait(item)
+        try:
+            return await asyncio.wait_for(item.future, max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            item.cancelled.set()
+            raise TimeoutError(f"Excel 操作超时（{timeout} 秒）: {getattr(func, '__name__', func)}") from None
+        except asyncio.CancelledError:
+            item.cancelled.set()
+            raise
+
+    async def run_jobs(self, jobs: Sequence[ReportJob], timeout: float = None) -> RunSummary:
+        """
+        并发执行多个报表任务，单个任务失败不影响其他任务
+
+        Args:
+            jobs: 报表任务列表
+            timeout: 每个任务的超时时间（秒）
+
+        Returns:
+            汇总结果
+        """
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._run_job(job, timeout) for job in jobs))
+        summary = RunSummary(list(results), time.perf_counter() - start)
+        logger.info(f"异步报表生成结束: 成功 {len(summary.succeeded)} 个，失败 {len(summary.failed)} 个，"
+                    f"耗时 {summary.duration:.2f}s")
+        return summary
+
+    async def close(self) -> None:
+        """等待已提交的操作结束后停止工作线程（或进程池）"""
+        if not self._started:
+            return
+        self._started = False
+        loop = asyncio.get_running_loop()
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await loop.run_in_executor(None, executor.shutdown)
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            await loop.run_in_executor(None, thread.join)
+        self._threads = []
+        logger.info("异步 Excel 管理器已关闭")
+
+    async def __aenter__(self) -> 'AsyncExcelManager':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def _create_manager(self) -> Any:
+        retries = PERFORMANCE_CONFIG['max_retries']
+        last_error: Optional[Exception] = None
+        for attempt in range(1, retries + 1):
+            try:
+                manager = self.factory()
+                manager.__enter__()
+                return manager
+            except Exception as e:
+                last_error = e
+                logger.warning(f"启动 Excel 实例失败（第 {attempt}/{retries} 次）: {e}")
+                if attempt < retries:
+                    time.sleep(PERFORMANCE_CONFIG['retry_delay'])
+        raise RuntimeError(f"无法启动 Excel 实例: {last_error}")
+
+    async def _run_in_process(self, func: Callable[..., Any], args: tuple, kwargs: dict,
+                              deadline: float, timeout: float) -> Any:
+        loop = asyncio.get_running_loop()
+        job = ReportJob(getattr(func, '__name__', str(func)), func, args, kwargs)
+        # 工作进程用墙上时间判断是否超时，超时的任务结束后由工作进程重建其 Excel 实例
+        future = self._executor.submit(_run_job, job, time.time() + max(deadline - time.monotonic(), 0))
+        future.add_done_callback(lambda _: self._release_slot(loop))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            # 尚未开始的任务直接取消，已在执行的任务只能等待其结束
+            future.cancel()
+            raise TimeoutError(f"Excel 操作超时（{timeout} 秒）: {job.name}") from None
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        if not result.success:
+            raise RuntimeError(f"{job.name} 执行失败: {result.error}")
+        return result.result
+
+    def _release_slot(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    async def _run_job(self, job: ReportJob, timeout: float) -> JobResult:
+        start = time.perf_counter()
+        try:
+            result = await self.run(job.func, *job.args, timeout=timeout, **job.kwargs)
+            return JobResult(job.name, True, result=result, duration=time.perf_counter() - start,
+                             worker_pid=os.getpid())
+        except Exception as e:
+            logger.error(f"报表任务失败: {job.name}: {e}")
+            return JobResult(job.name, False, error=f"{type(e).__name__}: {e}",
+                             duration=time.perf_counter() - start, worker_pid=os.getpid())
@@ -0,0 +1,630 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午04:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：benchmark.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+性能基准测试
+按行数参数化 main.py 中各个 demo_* 流程，在无界面后端上运行，
+记录耗时、峰值内存和对象模型调用次数，结果保存为 JSON 并与基线比较。
+
+用法:
+    python -m utils.benchmark --rows 100 10000 100000
+    python -m utils.benchmark --pipelines pivot format --update-baseline
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from loguru import logger
+
+from config import OUTPUT_DIR
+from utils.format_batch import FormatTransaction
+from utils.frame_bridge import records_to_frame
+from utils.pivot_engine import PivotEngine
+from utils.range_address import format_range
+
+# 默认的行数梯度
+ROW_COUNTS = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+BENCHMARK_DIR = OUTPUT_DIR / "benchmarks"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+
+# 判定为性能回退的相对阈值，以及耗时的绝对噪声下限（秒）
+DEFAULT_TOLERANCE = 0.2
+MIN_TIME_DELTA = 0.05
+
+SALES_HEADER = ['日期', '产品', '地区', '销售员', '数量', '单价', '总额']
+PRODUCTS = ['笔记本电脑', '台式机', '显示器', '键盘', '鼠标', '音响']
+REGIONS = ['北京', '上海', '广州', '深圳', '杭州', '南京']
+SALESPEOPLE = ['张三', '李四', '王五', '赵六', '钱七', '孙八']
+PRICE_RANGES = {
+    '笔记本电脑': (3000, 8000),
+    '台式机': (2000, 6000),
+    '显示器': (800, 3000),
+    '键盘': (50, 500),
+    '鼠标': (30, 300),
+    '音响': (100, 1000),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """单个流程在某一行数下的测量结果"""
+
+    pipeline: str
+    rows: int
+    wall_time: float = 0.0
+    # 流程执行期间在起始常驻内存之上新增的峰值（字节），不含测试数据本身
+    peak_rss: int = 0
+    calls: int = 0
+    calls_per_row: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.pipeline}@{self.rows}"
+
+
+def generate_sales_data(rows: int, seed: int = 0) -> List[List[Any]]:
+    """
+    生成与综合示例相同结构的模拟销售数据（含标题行）
+
+    Args:
+        rows: 数据行数
+        seed: 随机种子，保证每次运行的数据一致
+
+    Returns:
+        二维列表
+    """
+    rng = random.Random(seed)
+    start_date = datetime(2023, 1, 1)
+    data = [list(SALES_HEADER)]
+    for _ in range(rows):
+        product = rng.choice(PRODUCTS)
+        quantity = rng.randint(1, 20)
+        unit_price = rng.randint(*PRICE_RANGES[product])
+        data.append([
+            (start_date + timedelta(days=rng.randint(0, 365))).strftime('%Y-%m-%d'),
+            product, rng.choice(REGIONS), rng.choice(SALESPEOPLE),
+            quantity, unit_price, quantity * unit_price,
+        ])
+    return data
+
+
+# ---- 参数化的演示流程（对应 main.py 中的 demo_* 函数） ----
+
+def _write_data(workbook: Any, name: str, data: List[List[Any]]) -> Any:
+    worksheet = workbook.ActiveSheet
+    worksheet.Name = name
+    worksheet.Range(format_range(1, 1, len(data), len(data[0]))).Value = data
+    return worksheet
+
+
+def bench_basic_operations(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """对应 demo_basic_operations：写入、查找、替换、自动列宽、保存"""
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = _write_data(wb, "基础操作演示", data)
+    used = ws.UsedRange
+    values = [list(row) for row in used.Value]
+    found = [(row, col) for row, line in enumerate(values) for col, value in enumerate(line) if value == '显示器']
+    for row, col in found:
+        values[row][col] = '显示设备'
+    used.Value = values
+    used.Columns.AutoFit()
+    wb.SaveAs(str(output_dir / "basic_operations_bench.xlsx"))
+    wb.Close()
+
+
+def bench_format_operations(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """对应 demo_format_operations：标题样式、数字格式、汇总行、边框、保存"""
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = _write_data(wb, "格式演示", data)
+    last = len(data)
+    total_row = last + 1
+    ws.Range(format_range(total_row, 1, total_row, 7)).Value = [
+        ['总计', '', '', '', f'=SUM(E2:E{last})', f'=AVERAGE(F2:F{last})', f'=SUM(G2:G{last})']
+    ]
+    with FormatTransaction() as fmt:
+        fmt.apply_header_style(ws, 'A1:G1')
+        fmt.apply_predefined_format(ws, f'E2:E{last}', 'integer')
+        fmt.apply_predefined_format(ws, f'F2:G{total_row}', 'currency')
+        fmt.set_font(ws, f'A{total_row}:G{total_row}', bold=True, font_size=12)
+        fmt.set_fill(ws, f'A{total_row}:G{total_row}', fill_color='LIGHT_GRAY')
+        fmt.set_borders(ws, f'A{total_row}:G{total_row}', border_weight='xlMedium')
+    ws.UsedRange.Columns.AutoFit()
+    wb.SaveAs(str(output_dir / "format_operations_bench.xlsx"))
+    wb.Close()
+
+
+def bench_chart_operations(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """对应 demo_chart_operations：准备图表数据源（按产品汇总）并保存"""
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = _write_data(wb, "图表演示", data)
+    totals = records_to_frame(data).groupby('产品')['总额'].sum()
+    chart_data = [['产品', '总销售额']] + [[product, int(totals.get(product, 0))] for product in PRODUCTS]
+    ws.Range(format_range(1, 9, len(chart_data), 10)).Value = chart_data
+    wb.SaveAs(str(output_dir / "chart_operations_bench.xlsx"))
+    wb.Close()
+
+
+def bench_chart_export(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """图表导出：按产品汇总的柱形图和饼图、整列数据的折线图（超过阈值时降采样），导出图片并保存"""
+    from utils.chart_downsample import downsample_chart_source
+
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = _write_data(wb, "图表导出", data)
+    totals = records_to_frame(data).groupby('产品')['总额'].sum()
+    chart_data = [['产品', '总销售额']] + [[product, int(totals.get(product, 0))] for product in PRODUCTS]
+    summary = format_range(1, 9, len(chart_data), 10)
+    ws.Range(summary).Value = chart_data
+
+    charts = ws.ChartObjects()
+    for index, chart_type in enumerate(('xlColumnClustered', 'xlPie')):
+        chart = charts.Add(600, 20 + index * 320, 480, 300).Chart
+        chart.SetSourceData(ws.Range(summary))
+        chart.ChartType = chart_type
+        chart.HasTitle = True
+        chart.ChartTitle.Text = '各产品销售额'
+        chart.Export(str(output_dir / f"chart_{chart_type}_bench.png"))
+    trend = charts.Add(600, 660, 720, 300).Chart
+    trend.ChartType = 'xlLine'
+    downsample_chart_source(trend, ws, f'G1:G{len(data)}')
+    trend.Export(str(output_dir / "chart_trend_bench.svg"))
+    trend.Export(str(output_dir / "chart_trend_bench.png"))
+    wb.SaveAs(str(output_dir / "chart_export_bench.xlsx"))
+    wb.Close()
+
+
+def bench_pdf_export(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """PDF 导出：带标题行、页眉页脚和边框的报表，按页宽缩放后导出为 PDF"""
+    from utils.pdf_writer import XL_TYPE_PDF
+
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = wb.ActiveSheet
+    ws.Name = "PDF 导出"
+    last = len(data) + 2
+    ws.Range('A1').Value = '月度销售报表'
+    ws.Range(format_range(3, 1, last, 7)).Value = data
+    with FormatTransaction() as fmt:
+        fmt.set_font(ws, 'A1', font_size=16, bold=True)
+        fmt.apply_header_style(ws, 'A3:G3')
+        fmt.apply_predefined_format(ws, f'F4:G{last}', 'currency')
+        fmt.set_borders(ws, f'A3:G{last}')
+    page_setup = ws.PageSetup
+    page_setup.PrintArea = f'$A$1:$G${last}'
+    page_setup.PrintTitleRows = '$3:$3'
+    page_setup.CenterHeader = '公司月度销售报表'
+    page_setup.CenterFooter = '第 &P 页，共 &N 页'
+    page_setup.Zoom = False
+    page_setup.FitToPagesWide = 1
+    page_setup.FitToPagesTall = False
+    wb.ExportAsFixedFormat(XL_TYPE_PDF, str(output_dir / "pdf_export_bench.pdf"))
+    wb.Close()
+
+
+def bench_pivot_operations(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """对应 demo_pivot_operations：同一数据源上的两个透视表"""
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = _write_data(wb, "销售数据", data)
+    source = format_range(1, 1, len(data), len(data[0]))
+    pivot_ws = wb.Worksheets.Add()
+    pivot_ws.Name = "数据透视表"
+    pivot = PivotEngine()
+
+    table = pivot.create_pivot_table(ws, source, pivot_ws, 'A1', '销售数据透视表')
+    pivot.add_row_field(table, '产品')
+    pivot.add_column_field(table, '地区')
+    pivot.add_data_field(table, '总额', 'xlSum', '销售总额')
+    pivot.add_data_field(table, '数量', 'xlSum', '销售数量')
+    pivot.format_pivot_table(table, 'TableStyleMedium9')
+
+    table2 = pivot.create_pivot_table(ws, source, pivot_ws, 'A20', '销售员业绩透视表')
+    pivot.add_row_field(table2, '销售员')
+    pivot.add_data_field(table2, '总额', 'xlSum', '销售总额')
+    pivot.add_data_field(table2, '数量', 'xlSum', '销售数量')
+    pivot.add_data_field(table2, '总额', 'xlAverage', '平均销售额')
+    pivot.format_pivot_table(table2, 'TableStyleMedium6')
+
+    wb.SaveAs(str(output_dir / "pivot_operations_bench.xlsx"))
+    wb.Close()
+
+
+def bench_print_operations(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """对应 demo_print_operations：报表格式、打印区域、页眉页脚、保存"""
+    wb = excel_mgr.get_application().Workbooks.Add()
+    ws = wb.ActiveSheet
+    ws.Name = "打印演示"
+    ws.Range('A1').Value = '月度销售报表'
+    ws.Range('A1:G1').Merge()
+    last = len(data) + 2
+    ws.Range(format_range(3, 1, last, 7)).Value = data
+    with FormatTransaction() as fmt:
+        fmt.set_font(ws, 'A1', font_size=16, bold=True)
+        fmt.set_alignment(ws, 'A1', horizontal='center')
+        fmt.apply_header_style(ws, 'A3:G3')
+        fmt.apply_predefined_format(ws, f'F4:G{last}', 'currency')
+        fmt.set_borders(ws, f'A3:G{last}')
+    page_setup = ws.PageSetup
+    page_setup.PrintArea = f'$A$1:$G${last}'
+    page_setup.PrintTitleRows = '$3:$3'
+    page_setup.CenterHeader = '公司月度销售报表'
+    page_setup.LeftFooter = '机密文件'
+    page_setup.CenterFooter = '第 &P 页，共 &N 页'
+    page_setup.RightFooter = '&D &T'
+    page_setup.PrintGridlines = True
+    wb.SaveAs(str(output_dir / "print_operations_bench.xlsx"))
+    wb.Close()
+
+
+def bench_comprehensive_example(excel_mgr: Any, data: List[List[Any]], output_dir: Path) -> None:
+    """对应 demo_comprehensive_example：原始数据、透视表、图表数据和打印设置"""
+    wb = excel_mgr.get_application().Workbooks.Add()
+    data_ws = _write_data(wb, "原始数据", data)
+    last = len(data)
+    with FormatTransaction() as fmt:
+        fmt.apply_header_style(data_ws, 'A1:G1')
+        fmt.apply_predefined_format(data_ws, f'E2:G{last}', 'integer')
+        fmt.apply_predefined_format(data_ws, f'F2:F{last}', 'currency')
+        fmt.apply_predefined_format(data_ws, f'G2:G{last}', 'currency')
+    data_ws.UsedRange.Columns.AutoFit()
+
+    pivot_ws = wb.Worksheets.Add(After=data_ws)
+    pivot_ws.Name = "数据透视表"
+    source = format_range(1, 1, last, 7)
+    pivot = PivotEngine()
+    table = pivot.create_pivot_table(data_ws, source, pivot_ws, 'A1', '产品地区销售透视表')
+    pivot.add_row_field(table, '产品')
+    pivot.add_column_field(table, '地区')
+    pivot.add_data_field(table, '总额', 'xlSum', '销售总额')
+    pivot.format_pivot_table(table, 'TableStyleMedium9')
+    table2 = pivot.create_pivot_table(data_ws, source, pivot_ws, 'A15', '销售员业绩透视表')
+    pivot.add_row_field(table2, '销售员')
+    pivot.add_data_field(table2, '总额', 'xlSum', '销售总额')
+    pivot.add_data_field(table2, '数量', 'xlSum', '销售数量')
+    pivot.format_pivot_table(table2, 'TableStyleMedium6')
+
+    chart_ws = wb.Worksheets.Add(After=pivot_ws)
+    chart_ws.Name = "图表分析"
+    totals = records_to_frame(data).groupby('产品')['总额'].sum()
+    chart_data = [['产品', '总销售额']] + [[product, int(totals.get(product, 0))] for product in PRODUCTS]
+    chart_ws.Range(format_range(1, 1, len(chart_data), 2)).Value = chart_data
+
+    data_ws.PageSetup.PrintArea = f'$A$1:$G${last}'
+    data_ws.PageSetup.PrintTitleRows = '$1:$1'
+    wb.SaveAs(str(output_dir / "comprehensive_bench.xlsx"))
+    wb.Close()
+
+
+PIPELINES: Dict[str, Callable[[Any, List[List[Any]], Path], None]] = {
+    'basic': bench_basic_operations,
+    'format': bench_format_operations,
+    'chart': bench_chart_operations,
+    'chart_export': bench_chart_export,
+    'pdf_export': bench_pdf_export,
+    'pivot': bench_pivot_operations,
+    'print': bench_print_operations,
+    'comprehensive': bench_comprehensive_example,
+}
+
+
+# ---- 测量 ----
+
+# 计入调用次数的无界面对象模型类，每次方法调用、属性读取或赋值对应 COM 后端的一次跨进程调用
+CALL_COUNTED_CLASSES = (
+    'HeadlessApplication', 'HeadlessWorkbooks', 'HeadlessWorkbook', 'HeadlessSheets', 'HeadlessWorksheet',
+    'HeadlessRange', 'HeadlessChartObjects', 'HeadlessChartObject', 'HeadlessChart',
+)
+
+# 样式代理（Font、Interior、Borders）上的属性读写，如 rng.Font.Bold = True 中的 Bold
+STYLE_PROXY_METHODS = ('__getattr__', '__setattr__')
+
+
+def peak_rss_bytes() -> int:
+    """当前进程的峰值常驻内存（字节）"""
+    if sys.platform.startswith('linux'):
+        hwm = _proc_status_kb('VmHWM')
+        if hwm is not None:
+            return hwm * 1024
+    try:
+        import resource
+    except ImportError:
+        return _windows_memory_counters().PeakWorkingSetSize
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes() -> int:
+    """当前进程的常驻内存（字节），无法读取当前值的平台上退化为峰值"""
+    if sys.platform.startswith('linux'):
+        rss = _proc_status_kb('VmRSS')
+        if rss is not None:
+            return rss * 1024
+    if sys.platform == 'win32':
+        return _windows_memory_counters().WorkingSetSize
+    return peak_rss_bytes()
+
+
+def reset_peak_rss() -> bool:
+    """
+    将进程的峰值常驻内存重置为当前值（仅 Linux 支持）
+
+    Returns:
+        是否重置成功
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def _proc_status_kb(field: str) -> Optional[int]:
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            match = re.search(rf'^{field}:\s+(\d+)', f.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+
+class StagePeakMemory:
+    """
+    测量一段代码执行期间新增的峰值内存
+
+    进入时记录当前常驻内存并重置进程峰值；无法重置时改为后台线程定期采样。
+    退出后 peak 为执行期间的峰值减去进入时的常驻内存。
+
+    用法:
+        with StagePeakMemory() as memory:
+            ...
+        print(memory.peak)
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval: 无法重置峰值时的采样间隔（秒）
+        """
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._sampled = 0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'StagePeakMemory':
+        self.baseline = current_rss_bytes()
+        self._sampled = self.baseline
+        if not reset_peak_rss():
+            self._sampler = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+            self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            peak = max(self._sampled, current_rss_bytes())
+        else:
+            peak = peak_rss_bytes()
+        self.peak = max(peak - self.baseline, 0)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sampled = max(self._sampled, current_rss_bytes())
+
+
+def _windows_memory_counters() -> Any:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+    return counters
+
+
+def count_calls(pipeline: Callable[..., None], *args: Any) -> int:
+    """
+    统计一次流程执行中的对象模型调用次数
+
+    通过调用追踪器包装无界面后端的对象模型类，方法调用、属性读取和赋值各计为一次，
+    对应 COM 后端中的一次跨进程调用；对象模型内部的嵌套调用不重复计数。
+
+    Args:
+        pipeline: 流程函数
+        *args: 传给流程函数的参数
+
+    Returns:
+        调用次数
+    """
+    from utils import headless_backend
+    from utils.tracing import Tracer
+
+    tracer = Tracer(max_events=0, nested=False)
+    for name in CALL_COUNTED_CLASSES:
+        tracer.instrument(getattr(headless_backend, name), properties=True)
+    tracer.instrument(headless_backend._StyleProxy, STYLE_PROXY_METHODS)
+    try:
+        pipeline(*args)
+    finally:
+        tracer.uninstrument()
+    return sum(item['count'] for item in tracer.summary())
+
+
+def _measure(pipeline: str, rows: int, seed: int) -> BenchmarkResult:
+    from utils.headless_backend import HeadlessExcelManager
+
+    result = BenchmarkResult(pipeline, rows)
+    data = generate_sales_data(rows, seed)
+    try:
+        # 计时和内存测量只包含流程本身；追踪包装有额外开销，调用次数在之后单独执行一遍统计
+        with tempfile.TemporaryDirectory() as output_dir, HeadlessExcelManager() as excel_mgr:
+            with StagePeakMemory() as memory:
+                start = time.perf_counter()
+                PIPELINES[pipeline](excel_mgr, data, Path(output_dir))
+                result.wall_time = time.perf_counter() - start
+        result.peak_rss = memory.peak
+        with tempfile.TemporaryDirectory() as output_dir, HeadlessExcelManager() as excel_mgr:
+            result.calls = count_calls(PIPELINES[pipeline], excel_mgr, data, Path(output_dir))
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.calls_per_row = result.calls / max(rows, 1)
+    return result
+
+
+def run_benchmarks(pipelines: Sequence[str] = None, row_counts: Sequence[int] = ROW_COUNTS,
+                   seed: int = 0) -> Dict[str, Any]:
+    """
+    运行基准测试，每个用例在独立的子进程中执行，互不影响内存和对象模型状态
+
+    Args:
+        pipelines: 要运行的流程名称，默认全部
+        row_counts: 行数梯度
+        seed: 数据随机种子
+
+    Returns:
+        测试报告（可直接保存为 JSON）
+    """
+    pipelines = list(pipelines or PIPELINES)
+    unknown = [name for name in pipelines if name not in PIPELINES]
+    if unknown:
+        raise ValueError(f"未知的基准流程: {unknown}")
+
+    results = []
+    for pipeline in pipelines:
+        for rows in row_counts:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(_measure, pipeline, rows, seed).result()
+            if result.error:
+                logger.error(f"基准用例失败: {result.key}: {result.error}")
+            else:
+                logger.info(f"{result.key}: {result.wall_time:.3f}s，峰值内存 {result.peak_rss / 2 ** 20:.1f}MB，"
+                            f"调用 {result.calls} 次")
+            results.append(asdict(result))
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': 'headless',
+        'results': results,
+    }
+
+
+def save_report(report: Dict[str, Any], path: Path) -> None:
+    """将测试报告保存为 JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    logger.info(f"基准测试结果已保存: {path}")
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    """读取 JSON 测试报告"""
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    与基线比较，找出性能回退的用例
+
+    耗时和峰值内存超过基线的 (1 + tolerance) 倍视为回退（耗时另有绝对噪声下限），
+    调用次数是确定值，任何增加都视为回退。
+
+    Args:
+        report: 本次测试报告
+        baseline: 基线报告
+        tolerance: 相对阈值
+
+    Returns:
+        回退描述列表，为空表示没有回退
+    """
+    previous = {f"{item['pipeline']}@{item['rows']}": item for item in baseline.get('results', [])}
+    regressions = []
+    for item in report.get('results', []):
+        key = f"{item['pipeline']}@{item['rows']}"
+        base = previous.get(key)
+        if base is None or base.get('error'):
+            continue
+        if item.get('error'):
+            regressions.append(f"{key}: 执行失败（{item['error']}）")
+            continue
+        if item['wall_time'] > base['wall_time'] * (1 + tolerance) and \
+                item['wall_time'] - base['wall_time'] > MIN_TIME_DELTA:
+            regressions.append(f"{key}: 耗时 {base['wall_time']:.3f}s -> {item['wall_time']:.3f}s")
+        if item['peak_rss'] > base['peak_rss'] * (1 + tolerance):
+            regressions.append(f"{key}: 峰值内存 {base['peak_rss'] / 2 ** 20:.1f}MB -> "
+                               f"{item['peak_rss'] / 2 ** 20:.1f}MB")
+        if item['calls'] > base['calls']:
+            regressions.append(f"{key}: 调用次数 {base['calls']} -> {item['calls']}")
+    return regressions
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Excel 自动化流程性能基准测试")
+    parser.add_argument('--pipelines', nargs='+', choices=list(PIPELINES), help="要运行的流程，默认全部")
+    parser.add_argument('--rows', nargs='+', type=int, default=list(ROW_COUNTS), help="行数梯度")
+    parser.add_argument('--seed', type=int, default=0, help="数据随机种子")
+    parser.add_argument('--output', type=Path, help="结果文件路径，默认按时间命名")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help="基线文件路径")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="回退判定的相对阈值")
+    parser.add_argument('--update-baseline', action='store_true', help="将本次结果保存为新的基线")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.pipelines, args.rows, args.seed)
+    output = args.output or BENCHMARK_DIR / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    save_report(report, output)
+
+    if args.update_baseline:
+        save_report(report, args.baseline)
+        return 0
+    if not args.baseline.exists():
+        logger.warning(f"基线文件不存在，跳过回退检查: {args.baseline}")
+        return 0
+    regressions = find_regressions(report, load_report(args.baseline), args.tolerance)
+    for regression in regressions:
+        logger.error(f"性能回退: {regression}")
+    if not regressions:
+        logger.info("未发现性能回退")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
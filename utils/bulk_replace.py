@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午08:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：bulk_replace.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+按映射表批量替换
+一次读取已使用区域，在内存中按整个映射表完成替换后只写回发生变化的单元格。
+子串模式使用 Aho–Corasick 多模式匹配，扫描一遍文本即可找出所有键的出现位置。
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Mapping, Tuple
+from loguru import logger
+
+from utils.cell_index import read_constants, value_key
+from utils.format_batch import cells_to_rects, join_addresses
+from utils.range_address import format_range
+
+Coordinate = Tuple[int, int]
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick 多模式匹配自动机
+
+    replace() 在每个位置取最长的匹配，匹配之间不重叠（从左到右），
+    所有键同时替换，替换结果不会再被其他键匹配。
+    """
+
+    def __init__(self, patterns: Mapping[str, str]):
+        """
+        Args:
+            patterns: 子串到替换文本的映射（空串会被忽略）
+        """
+        self.patterns = [key for key in patterns if key]
+        self.replacements = [patterns[key] for key in self.patterns]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 每个状态上以该位置结尾的最长模式编号（-1 表示无），以及沿失败链的下一个输出状态
+        self._match: List[int] = [-1]
+        self._output_link: List[int] = [0]
+        for pattern_id, pattern in enumerate(self.patterns):
+            self._insert(pattern, pattern_id)
+        self._build_links()
+
+    def _insert(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._match.append(-1)
+                self._output_link.append(0)
+            state = next_state
+        self._match[state] = pattern_id
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                fail_state = self._fail[next_state]
+                self._output_link[next_state] = fail_state if self._match[fail_state] >= 0 \
+                    else self._output_link[fail_state]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        查找所有匹配（可重叠）
+
+        Returns:
+            (起始位置, 模式编号) 列表
+        """
+        matches = []
+        goto, fail, match, output_link = self._goto, self._fail, self._match, self._output_link
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            output = state if match[state] >= 0 else output_link[state]
+            while output:
+                pattern_id = match[output]
+                matches.append((position - len(self.patterns[pattern_id]) + 1, pattern_id))
+                output = output_link[output]
+        return matches
+
+    def replace(self, text: str, counts: List[int] = None) -> str:
+        """
+        替换文本中的所有键
+
+        Args:
+            text: 原文本
+            counts: 按模式编号累计命中次数的列表（可选）
+
+        Returns:
+            替换后的文本
+        """
+        matches = self.find_all(text)
+        if not matches:
+            return text
+        # 同一起点取最长的模式，再从左到右选取互不重叠的匹配
+        matches.sort(key=lambda item: (item[0], -len(self.patterns[item[1]])))
+        parts = []
+        position = 0
+        for start, pattern_id in matches:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(self.replacements[pattern_id])
+            position = start + len(self.patterns[pattern_id])
+            if counts is not None:
+                counts[pattern_id] += 1
+        parts.append(text[position:])
+        return ''.join(parts)
+
+
+def replace_many(worksheet: Any, mapping: Mapping[Any, Any], whole_cell: bool = True,
+                 range_address: str = None) -> Dict[Any, int]:
+    """
+    按映射表一次性替换工作表中的值
+
+    Args:
+        worksheet: 工作表对象
+        mapping: 旧值到新值的映射
+        whole_cell: True 时只替换整个单元格等于键的单元格；
+                    False 时替换文本中出现的键（子串），键和值都按文本处理
+        range_address: 替换范围，默认为已使用区域
+
+    Returns:
+        每个键的命中次数（整格模式为单元格数，子串模式为出现次数）
+    """
+    index = getattr(worksheet, '_index', None)
+    if whole_cell and range_address is None and index is not None:
+        # 无界面后端已建立倒排索引时直接按索引替换，不必扫描（索引同样不登记公式单元格）
+        return index.replace_map(mapping)
+
+    cell_range = worksheet.Range(range_address) if range_address else worksheet.UsedRange
+    first_row, first_col = cell_range.Row, cell_range.Column
+
+    changes: Dict[Coordinate, Any] = {}
+    if whole_cell:
+        # 常量按值比较（COM 的 Formula 会把数值返回为文本），公式单元格保持不变
+        values = read_constants(cell_range)
+        counts = dict.fromkeys(mapping, 0)
+        # 按值的类别匹配，1 与 True 不是同一个键
+        keys = {value_key(key): key for key in mapping}
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                if value is None or value == '':
+                    continue
+                typed = value_key(value)
+                try:
+                    if typed not in keys:
+                        continue
+                except TypeError:
+                    continue
+                key = keys[typed]
+                new_value = mapping[key]
+                if value_key(new_value) != typed:
+                    counts[key] += 1
+                    changes[(first_row + row_offset, first_col + col_offset)] = new_value
+    else:
+        # 读取公式而不是值，公式单元格保持不变
+        values = cell_range.Formula
+        if not isinstance(values, tuple):
+            values = ((values,),)
+        matcher = AhoCorasick({str(key): str(value) for key, value in mapping.items()})
+        hits = [0] * len(matcher.patterns)
+        # 相同文本只匹配一次，结果和命中次数都缓存
+        cache: Dict[str, Tuple[str, List[Tuple[int, int]]]] = {}
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                if not isinstance(value, str) or not value or value.startswith('='):
+                    continue
+                cached = cache.get(value)
+                if cached is None:
+                    counts_for_text = [0] * len(matcher.patterns)
+                    replaced = matcher.replace(value, counts_for_text)
+                    cached = cache[value] = (replaced, [(pattern_id, count) for pattern_id, count
+                                                        in enumerate(counts_for_text) if count])
+                replaced, text_hits = cached
+                if replaced != value:
+                    for pattern_id, count in text_hits:
+                        hits[pattern_id] += count
+                    changes[(first_row + row_offset, first_col + col_offset)] = replaced
+        by_text = dict(zip(matcher.patterns, hits))
+        counts = {key: by_text.get(str(key), 0) for key in mapping}
+
+    write_changes(worksheet, changes)
+    logger.info(f"批量替换完成: {len(mapping)} 个键，修改 {len(changes)} 个单元格")
+    return counts
+
+
+def write_changes(worksheet: Any, changes: Mapping[Coordinate, Any]) -> int:
+    """
+    写回修改过的单元格，自动选择调用次数较少的方式：
+    按新值分组写入合并后的多区域地址，或按行写入连续的单元格段
+
+    Args:
+        worksheet: 工作表对象
+        changes: 坐标到新值的映射
+
+    Returns:
+        写入调用次数
+    """
+    if not changes:
+        return 0
+    # 按值的类别分组（1 与 True 相等且哈希相同，但要分别写入），同时保留原始值
+    by_value: Dict[Tuple[int, Any], List[Coordinate]] = {}
+    new_values: Dict[Tuple[int, Any], Any] = {}
+    for coordinate, value in changes.items():
+        key = value_key(value)
+        new_values[key] = value
+        by_value.setdefault(key, []).append(coordinate)
+    value_writes = {key: join_addresses(cells_to_rects(coordinates)) for key, coordinates in by_value.items()}
+    value_calls = sum(len(addresses) for addresses in value_writes.values())
+
+    runs: List[Tuple[int, int, int]] = []
+    for row, col in sorted(changes):
+        if runs and runs[-1][0] == row and runs[-1][2] == col - 1:
+            runs[-1] = (row, runs[-1][1], col)
+        else:
+            runs.append((row, col, col))
+
+    if value_calls <= len(runs):
+        for key, addresses in value_writes.items():
+            for address in addresses:
+                worksheet.Range(address).Value = new_values[key]
+        return value_calls
+    for row, first_col, last_col in runs:
+        worksheet.Range(format_range(row, first_col, row, last_col)).Value = [
+            [changes[(row, col)] for col in range(first_col, last_col + 1)]
+        ]
+    return len(runs)
+
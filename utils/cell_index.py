@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午07:00
+@Author  ：庄洪奎（ARTHUR)
+@FileName：cell_index.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+单元格值倒排索引
+为工作表建立“值 -> 单元格坐标”的索引，查找和替换只访问命中的单元格，
+不再逐次扫描整张表。支持精确、前缀和正则查询，以及按映射表批量替换。
+
+无界面后端的工作表通过 worksheet.cell_index() 获取索引，写入时自动增量维护；
+COM 工作表可用 CellIndex(worksheet) 从 UsedRange 一次读取建立快照，
+通过索引进行的替换会同步更新快照，其他途径的修改需调用 rebuild()。
+索引键区分值的类别（1 与 True 不相同），公式单元格不登记，查找和替换都不会改动公式。
+"""
+
+import bisect
+import re
+from datetime import date, time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Set, Tuple, Union
+
+import numpy as np
+
+from utils.format_batch import cells_to_rects, join_addresses
+from utils.range_address import format_cell
+
+Coordinate = Tuple[int, int]
+
+MATCH_MODES = ('exact', 'prefix', 'regex')
+
+# 值的类别：数值不区分 int 和 float（与 Excel 一致），布尔值和文本各自独立
+_BOOL, _NUMBER, _TEXT, _DATE, _OTHER = range(5)
+
+
+def value_key(value: Any) -> Tuple[int, Any]:
+    """
+    单元格值的索引键
+
+    Args:
+        value: 单元格值
+
+    Returns:
+        (类别, 值)，例如 1 和 1.0 为同一个键，True 为另一个键
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return _BOOL, bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return _NUMBER, value
+    if isinstance(value, str):
+        return _TEXT, value
+    if isinstance(value, (date, time)):
+        return _DATE, value
+    return _OTHER, value
+
+
+def is_formula_text(value: Any) -> bool:
+    """是否为公式文本"""
+    return isinstance(value, str) and len(value) > 1 and value.startswith('=')
+
+
+def read_constants(cell_range: Any) -> Tuple[tuple, ...]:
+    """
+    读取区域中的常量，公式单元格为 None
+
+    COM 的 Range.Formula 把数值和布尔常量返回为文本（'5'、'TRUE'），
+    因此用 Formula 判断公式、用 Value 取常量。
+
+    Args:
+        cell_range: 区域对象
+
+    Returns:
+        二维元组
+    """
+    formulas = cell_range.Formula
+    if not isinstance(formulas, tuple):
+        formulas = ((formulas,),)
+    values = cell_range.Value
+    if not isinstance(values, tuple):
+        values = ((values,),)
+    return tuple(
+        tuple(None if is_formula_text(formula) else value for formula, value in zip(formula_row, value_row))
+        for formula_row, value_row in zip(formulas, values)
+    )
+
+
+class CellIndex:
+    """
+    工作表单元格值的倒排索引
+
+    精确查询直接按值取坐标集合；前缀查询在排序后的字符串键上二分；
+    正则查询只对去重后的字符串键求值，相同的值无论出现多少次都只匹配一次。
+    """
+
+    def __init__(self, worksheet: Any):
+        """
+        Args:
+            worksheet: 工作表对象
+        """
+        self.worksheet = worksheet
+        self._cells: Dict[Tuple[int, Any], Set[Coordinate]] = {}
+        self._sorted_keys: Optional[List[str]] = None
+        self.rebuild()
+
+    @property
+    def live(self) -> bool:
+        """索引是否由工作表在写入时自动维护"""
+        return getattr(self.worksheet, '_index', None) is self
+
+    def __len__(self) -> int:
+        """不同值的个数"""
+        return len(self._cells)
+
+    def __contains__(self, value: Any) -> bool:
+        return value_key(value) in self._cells
+
+    def rebuild(self) -> None:
+        """重新读取工作表内容建立索引"""
+        self._cells.clear()
+        self._sorted_keys = None
+        cells = getattr(self.worksheet, '_cells', None)
+        if cells is not None:
+            for coordinate, value in cells.items():
+                self.add(coordinate, value)
+            return
+        # COM 工作表：一次读取已使用区域，公式单元格不登记
+        used = self.worksheet.UsedRange
+        values = read_constants(used)
+        first_row, first_col = used.Row, used.Column
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                self.add((first_row + row_offset, first_col + col_offset), value)
+
+    # ---- 维护 ----
+
+    def add(self, coordinate: Coordinate, value: Any) -> None:
+        """登记单元格的值（公式单元格不登记）"""
+        if value is None or value == '' or is_formula_text(value):
+            return
+        key = value_key(value)
+        coordinates = self._cells.get(key)
+        if coordinates is None:
+            coordinates = self._cells[key] = set()
+            if key[0] == _TEXT:
+                self._sorted_keys = None
+        coordinates.add(coordinate)
+
+    def discard(self, coordinate: Coordinate, value: Any) -> None:
+        """移除单元格原来的值"""
+        key = value_key(value)
+        coordinates = self._cells.get(key)
+        if coordinates is None:
+            return
+        coordinates.discard(coordinate)
+        if not coordinates:
+            del self._cells[key]
+            if key[0] == _TEXT:
+                self._sorted_keys = None
+
+    def move(self, coordinate: Coordinate, old_value: Any, new_value: Any) -> None:
+        """单元格的值由 old_value 变为 new_value"""
+        if old_value is not None:
+            self.discard(coordinate, old_value)
+        self.add(coordinate, new_value)
+
+    # ---- 查询 ----
+
+    def find(self, value: Any) -> List[Coordinate]:
+        """精确匹配，返回按行排序的坐标"""
+        return sorted(self._cells.get(value_key(value), ()))
+
+    def find_prefix(self, prefix: str) -> List[Coordinate]:
+        """查找以 prefix 开头的文本单元格"""
+        keys = self._string_keys()
+        start = bisect.bisect_left(keys, prefix)
+        found: List[Coordinate] = []
+        for key in keys[start:]:
+            if not key.startswith(prefix):
+                break
+            found.extend(self._cells[(_TEXT, key)])
+        return sorted(found)
+
+    def find_regex(self, pattern: Union[str, Pattern], flags: int = 0) -> List[Coordinate]:
+        """查找文本中包含正则匹配的单元格"""
+        regex = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+        found: List[Coordinate] = []
+        for key in self._string_keys():
+            if regex.search(key):
+                found.extend(self._cells[(_TEXT, key)])
+        return sorted(found)
+
+    def find_cells(self, query: Any, match: str = 'exact') -> List[str]:
+        """
+        查找单元格
+
+        Args:
+            query: 查询值、前缀或正则表达式
+            match: 匹配方式，'exact'、'prefix' 或 'regex'
+
+        Returns:
+            单元格地址列表，例如 ['B2', 'B4']
+        """
+        if match == 'exact':
+            coordinates = self.find(query)
+        elif match == 'prefix':
+            coordinates = self.find_prefix(query)
+        elif match == 'regex':
+            coordinates = self.find_regex(query)
+        else:
+            raise ValueError(f"未知的匹配方式: {match}，可选 {MATCH_MODES}")
+        return [format_cell(row, col) for row, col in coordinates]
+
+    # ---- 替换 ----
+
+    def replace(self, old_value: Any, new_value: Any, whole_cell: bool = True) -> int:
+        """
+        替换单元格内容
+
+        Args:
+            old_value: 要查找的值
+            new_value: 替换值
+            whole_cell: True 时只替换整个单元格等于 old_value 的单元格，
+                        False 时替换文本中出现的 old_value 子串
+
+        Returns:
+            被修改的单元格数
+        """
+        if whole_cell:
+            return sum(self.replace_map({old_value: new_value}).values())
+        old_text, new_text = str(old_value), str(new_value)
+        updates: Dict[Any, List[Tuple[Coordinate, Any]]] = {}
+        for key in self._string_keys():
+            if old_text in key:
+                updates.setdefault(key.replace(old_text, new_text), []).extend(
+                    (coordinate, key) for coordinate in self._cells[(_TEXT, key)])
+        return sum(self._apply(value, changes) for value, changes in updates.items())
+
+    def replace_map(self, mapping: Mapping[Any, Any]) -> Dict[Any, int]:
+        """
+        按映射表整格替换，每个新值只写入一次（相邻单元格合并为区域）
+
+        Args:
+            mapping: 旧值到新值的映射
+
+        Returns:
+            每个旧值被替换的单元格数
+        """
+        counts: Dict[Any, int] = {}
+        updates: Dict[Tuple[int, Any], List[Tuple[Coordinate, Any]]] = {}
+        new_values: Dict[Tuple[int, Any], Any] = {}
+        for old_value, new_value in mapping.items():
+            coordinates = self._cells.get(value_key(old_value))
+            unchanged = value_key(old_value) == value_key(new_value)
+            counts[old_value] = len(coordinates) if coordinates and not unchanged else 0
+            if counts[old_value]:
+                new_key = value_key(new_value)
+                new_values[new_key] = new_value
+                updates.setdefault(new_key, []).extend((coordinate, old_value) for coordinate in coordinates)
+        for new_key, changes in updates.items():
+            self._apply(new_values[new_key], changes)
+        return counts
+
+    def _apply(self, new_value: Any, changes: Iterable[Tuple[Coordinate, Any]]) -> int:
+        changes = list(changes)
+        rects = cells_to_rects(coordinate for coordinate, _ in changes)
+        for address in join_addresses(rects):
+            self.worksheet.Range(address).Value = new_value
+        if not self.live:
+            for coordinate, old_value in changes:
+                self.move(coordinate, old_value, new_value)
+        return len(changes)
+
+    def _string_keys(self) -> List[str]:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(value for kind, value in self._cells if kind == _TEXT)
+        return self._sorted_keys
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午10:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：chart_downsample.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+图表数据降采样
+数据点远多于图表能显示的像素时，先选出保留曲线形状的少量数据点，
+写入隐藏的辅助工作表，再把图表的数据源指向辅助区域，Excel 和导出的图片都只需绘制这些点。
+支持两种方法（均为 NumPy 向量化计算）：
+- minmax：按等宽分桶，保留每个桶的最小值和最大值，峰值和谷值不会丢失，点的间隔均匀
+- lttb：Largest-Triangle-Three-Buckets，每个桶保留与前后点构成三角形面积最大的点
+多个系列分别选点后取并集，所有系列使用相同的分类。
+"""
+
+import dataclasses
+from typing import Any, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import CHART_CONFIG
+from utils.chart_renderer import XL_ROWS, ChartSpec, _number, split_chart_values
+from utils.headless_backend import XL_SHEET_HIDDEN
+from utils.range_address import format_cell, format_range
+
+METHODS = ('minmax', 'lttb')
+
+# 辅助区域第一行的标记：标记单元格之后的列为一个图表的数据块，数据从第二行开始
+HELPER_KEY_PREFIX = '@chart:'
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    分桶最大/最小值降采样
+
+    Args:
+        values: 一维数据（缺失值为 NaN）
+        max_points: 保留的点数上限
+
+    Returns:
+        保留的下标（升序，包含首尾两点）
+    """
+    count = len(values)
+    if count <= max_points:
+        return np.arange(count)
+    buckets = max((max_points - 2) // 2, 1)
+    interior = np.arange(1, count - 1)
+    bucket = (interior - 1) * buckets // (count - 2)
+    finite = np.isfinite(values[1:-1])
+    low = np.where(finite, values[1:-1], np.inf)
+    high = np.where(finite, values[1:-1], -np.inf)
+    # 以桶号为主键排序，每个桶的第一个是最小值、最后一个是最大值
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], len(bucket)) - 1
+    minimums = interior[np.lexsort((low, bucket))[starts]]
+    maximums = interior[np.lexsort((high, bucket))[ends]]
+    return np.unique(np.concatenate(([0], minimums, maximums, [count - 1])))
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样（横坐标取下标）
+
+    Args:
+        values: 一维数据（缺失值为 NaN，计算时按线性插值补齐）
+        max_points: 保留的点数（不少于 3）
+
+    Returns:
+        保留的下标（升序，包含首尾两点）
+    """
+    count = len(values)
+    if count <= max_points or max_points < 3:
+        return np.arange(count)
+    x = np.arange(count, dtype=float)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.linspace(0, count - 1, max_points).astype(int)
+    y = values if finite.all() else np.interp(x, x[finite], values[finite])
+    # 首尾两点之间分为 max_points - 2 个桶，一次算出每个桶的平均点
+    edges = np.linspace(1, count - 1, max_points - 1).astype(int)
+    sizes = np.diff(edges)
+    average_x = np.add.reduceat(x[:-1], edges[:-1]) / sizes
+    average_y = np.add.reduceat(y[:-1], edges[:-1]) / sizes
+    # 第 b 个桶的参照点是第 b + 1 个桶的平均点，最后一个桶参照末点
+    next_x = np.append(average_x[1:], x[-1])
+    next_y = np.append(average_y[1:], y[-1])
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        px, py = x[previous], y[previous]
+        area = np.abs((px - next_x[bucket]) * (y[start:stop] - py) - (px - x[start:stop]) * (next_y[bucket] - py))
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def select_points(matrix: np.ndarray, max_points: int, method: str = None) -> np.ndarray:
+    """
+    为多个系列选出共同保留的数据点
+
+    Args:
+        matrix: 二维数据，每列一个系列
+        max_points: 保留的点数上限
+        method: 'minmax' 或 'lttb'，默认取 CHART_CONFIG['downsample_method']
+
+    Returns:
+        保留的行下标（升序）
+    """
+    method = method or CHART_CONFIG.get('downsample_method', 'minmax')
+    if method not in METHODS:
+        raise ValueError(f"不支持的降采样方法: {method}，可选 {list(METHODS)}")
+    count, series_count = matrix.shape
+    if count <= max_points:
+        return np.arange(count)
+    if series_count == 0:
+        return np.linspace(0, count - 1, max_points).astype(int)
+    select = minmax_indices if method == 'minmax' else lttb_indices
+    # 每个系列分得相同的点数，取并集后不超过上限
+    budget = max(max_points // series_count, 3)
+    return np.unique(np.concatenate([select(matrix[:, column], budget) for column in range(series_count)]))
+
+
+def _series_matrix(rows: Sequence[Sequence[Any]], first: int) -> np.ndarray:
+    width = len(rows[0]) if rows else first
+    return np.array([[_number(value) for value in row[first:width]] for row in rows],
+                    dtype=float).reshape(len(rows), width - first)
+
+
+def downsample_values(values: Sequence[Sequence[Any]], max_points: int = None, method: str = None,
+                      plot_by: int = None) -> Tuple[Tuple[tuple, ...], int]:
+    """
+    对图表数据区域降采样，保留系列名称行和分类列
+
+    Args:
+        values: 二维数据（Range.Value）
+        max_points: 保留的点数上限，默认取 CHART_CONFIG['downsample_threshold']
+        method: 'minmax' 或 'lttb'
+        plot_by: XL_ROWS 或 XL_COLUMNS，默认按 Excel 的规则判断
+
+    Returns:
+        (降采样后的二维数据（与输入方向相同）, plot_by)
+    """
+    max_points = max_points or CHART_CONFIG.get('downsample_threshold', 4000)
+    header, rows, has_labels, plot_by = split_chart_values(values, plot_by)
+    kept = select_points(_series_matrix(rows, 1 if has_labels else 0), max_points, method)
+    reduced = [rows[index] for index in kept]
+    if header is not None:
+        reduced.insert(0, header)
+    if plot_by == XL_ROWS:
+        reduced = list(zip(*reduced))
+    logger.debug(f"图表数据降采样: {len(rows)} -> {len(kept)} 个点")
+    return tuple(tuple(row) for row in reduced), plot_by
+
+
+def downsample_spec(spec: ChartSpec, max_points: int = None, method: str = None) -> ChartSpec:
+    """
+    对图表描述降采样（导出图片时使用）
+
+    Args:
+        spec: 图表描述
+        max_points: 保留的点数上限，默认取 CHART_CONFIG['downsample_threshold']
+        method: 'minmax' 或 'lttb'
+
+    Returns:
+        新的图表描述
+    """
+    max_points = max_points or CHART_CONFIG.get('downsample_threshold', 4000)
+    matrix = np.array([data for _, data in spec.series], dtype=float).reshape(len(spec.series), -1).T
+    kept = select_points(matrix, max_points, method)
+    return dataclasses.replace(
+        spec,
+        categories=[spec.categories[index] for index in kept],
+        series=[(name, [data[index] for index in kept]) for name, data in spec.series],
+    )
+
+
+def helper_sheet(workbook: Any, name: str = None) -> Any:
+    """
+    获取（或新建）存放降采样数据的隐藏工作表
+
+    Args:
+        workbook: 工作簿对象（COM 或无界面后端）
+        name: 工作表名称，默认取 CHART_CONFIG['helper_sheet']
+
+    Returns:
+        工作表对象
+    """
+    name = name or CHART_CONFIG.get('helper_sheet', '_chart_data')
+    for sheet in workbook.Worksheets:
+        if sheet.Name.lower() == name.lower():
+            return sheet
+    active = workbook.ActiveSheet
+    sheet = workbook.Worksheets.Add(After=workbook.Worksheets(workbook.Worksheets.Count))
+    sheet.Name = name
+    sheet.Visible = XL_SHEET_HIDDEN
+    active.Activate()
+    return sheet
+
+
+def write_helper_range(workbook: Any, values: Sequence[Sequence[Any]], key: str,
+                       sheet_name: str = None) -> Any:
+    """
+    把数据写入辅助工作表中 key 对应的数据块（一次 Range.Value 赋值）
+
+    同一个 key 再次写入时覆盖原来的数据块；原位置放不下（后面紧接着其他数据块）时
+    清除原数据块并写到已使用区域的右侧。刷新图表不会让辅助工作表不断变宽。
+
+    Args:
+        workbook: 工作簿对象
+        values: 二维数据
+        key: 数据块的标识，例如图表名称或源数据地址
+        sheet_name: 辅助工作表名称
+
+    Returns:
+        写入的区域对象
+    """
+    sheet = helper_sheet(workbook, sheet_name)
+    height, width = len(values), len(values[0])
+    blocks, last_row, last_col = _helper_blocks(sheet)
+    column = None
+    for index, (start, block_key) in enumerate(blocks):
+        if block_key != key:
+            continue
+        # 数据块可用到下一个数据块之前（保留一个空列），最后一个数据块不受限制
+        limit = blocks[index + 1][0] - 2 if index + 1 < len(blocks) else None
+        sheet.Range(format_range(1, start, last_row, limit or last_col)).ClearContents()
+        if limit is None or start + width - 1 <= limit:
+            column = start
+        break
+    if column is None:
+        column = last_col + 2 if last_col else 1
+    sheet.Range(format_cell(1, column)).Value = HELPER_KEY_PREFIX + key
+    target = sheet.Range(format_range(2, column, height + 1, column + width - 1))
+    target.Value = values
+    return target
+
+
+def _helper_blocks(sheet: Any) -> Tuple[list, int, int]:
+    """读取辅助工作表第一行的数据块标记，返回 ([(起始列, key)], 已使用的最后一行, 最后一列)"""
+    used = sheet.UsedRange
+    if used.Value is None:
+        return [], 0, 0
+    last_row = used.Row + used.Rows.Count - 1
+    last_col = used.Column + used.Columns.Count - 1
+    header = sheet.Range(format_range(1, 1, 1, last_col)).Value
+    header = header[0] if isinstance(header, tuple) else (header,)
+    blocks = [(col, value[len(HELPER_KEY_PREFIX):]) for col, value in enumerate(header, start=1)
+              if isinstance(value, str) and value.startswith(HELPER_KEY_PREFIX)]
+    return blocks, last_row, last_col
+
+
+def downsample_chart_source(chart: Any, worksheet: Any, data_range: str, max_points: int = None,
+                            method: str = None, plot_by: int = None) -> Any:
+    """
+    为图表设置数据源，数据点超过上限时先降采样到隐藏的辅助区域再绑定
+
+    Args:
+        chart: 图表对象（ChartObject.Chart）
+        worksheet: 数据所在工作表
+        data_range: 数据区域地址，例如 'A1:D200001'
+        max_points: 保留的点数上限，默认取 CHART_CONFIG['downsample_threshold']，为 0 时不降采样
+        method: 'minmax' 或 'lttb'，默认取 CHART_CONFIG['downsample_method']
+        plot_by: XL_ROWS 或 XL_COLUMNS
+
+    Returns:
+        图表实际使用的数据区域
+    """
+    if max_points is None:
+        max_points = CHART_CONFIG.get('downsample_threshold', 0)
+    source = worksheet.Range(data_range)
+    values = source.Value
+    points = max(len(values), len(values[0])) if isinstance(values, tuple) else 1
+    if not max_points or points <= max_points:
+        if plot_by is None:
+            chart.SetSourceData(source)
+        else:
+            chart.SetSourceData(source, plot_by)
+        return source
+    reduced, plot_by = downsample_values(values, max_points, method, plot_by)
+    target = write_helper_range(worksheet.Parent, reduced, _chart_key(chart, worksheet, data_range))
+    chart.SetSourceData(target, plot_by)
+    logger.info(f"图表数据已降采样: {data_range}（{points} 个点）-> {target.Address}")
+    return target
+
+
+def _chart_key(chart: Any, worksheet: Any, data_range: str) -> str:
+    """辅助数据块的标识：嵌入式图表为“工作表/图表名称”，否则为源数据地址"""
+    try:
+        chart_object = chart.Parent
+        return f"{chart_object.Parent.Name}/{chart_object.Name}"
+    except Exception:
+        # 图表工作表等没有 ChartObject 容器的图表
+        return f"{worksheet.Name}!{data_range}"
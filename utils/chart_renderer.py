@@ -0,0 +1,591 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午09:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：chart_renderer.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+图表渲染
+不依赖 Excel，直接根据区域数据绘制簇状柱形图（xlColumnClustered）、
+折线图（xlLine / xlLineMarkers）和饼图（xlPie），输出 SVG 或 PNG。
+图表先布局为一组图元，再分别序列化为 SVG 或用 NumPy 光栅化为 PNG；
+安装了 cairosvg 时 PNG 由 SVG 转换（包含文字），否则使用内置光栅化（不绘制文字）。
+大量图表可以通过 render_charts 在多个进程中并行渲染。
+"""
+
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+from loguru import logger
+
+from config import CHART_CONFIG, PERFORMANCE_CONFIG
+
+# 图表类型常量（与 COM 取值一致）
+CHART_TYPES = {
+    'xlColumnClustered': 51,
+    'xlLine': 4,
+    'xlLineMarkers': 65,
+    'xlPie': 5,
+}
+_KINDS = {51: 'column', 4: 'line', 65: 'line', 5: 'pie'}
+
+# 数据系列方向（PlotBy）
+XL_ROWS = 1
+XL_COLUMNS = 2
+
+# Office 默认主题色
+PALETTE = ('#4472C4', '#ED7D31', '#A5A5A5', '#FFC000', '#5B9BD5', '#70AD47',
+           '#264478', '#9E480E', '#636363', '#997300')
+
+FONT_FAMILY = "'Microsoft YaHei', 'PingFang SC', 'Noto Sans CJK SC', sans-serif"
+TEXT_COLOR = '#595959'
+GRID_COLOR = '#D9D9D9'
+AXIS_COLOR = '#BFBFBF'
+
+Point = Tuple[float, float]
+
+# 缺少 cairosvg 的警告只记录一次
+_text_warning_logged = False
+
+
+@dataclass
+class ChartSpec:
+    """图表描述：类型、数据和标题等，可在进程间传递"""
+
+    categories: List[str]
+    series: List[Tuple[str, List[Optional[float]]]]
+    chart_type: Union[str, int] = CHART_CONFIG['default_type']
+    title: str = ''
+    x_title: str = ''
+    y_title: str = ''
+    legend: Optional[str] = 'right'
+    show_values: bool = False
+    show_percentage: bool = False
+    show_category: bool = False
+    width: int = CHART_CONFIG['width']
+    height: int = CHART_CONFIG['height']
+    colors: Sequence[str] = field(default_factory=lambda: PALETTE)
+
+    @property
+    def kind(self) -> str:
+        """绘制方式：column、line 或 pie"""
+        code = CHART_TYPES.get(self.chart_type, self.chart_type)
+        if code not in _KINDS:
+            raise ValueError(f"不支持的图表类型: {self.chart_type}，可选 {list(CHART_TYPES)}")
+        return _KINDS[code]
+
+    @property
+    def markers(self) -> bool:
+        return CHART_TYPES.get(self.chart_type, self.chart_type) == CHART_TYPES['xlLineMarkers']
+
+
+def _number(value: Any) -> Optional[float]:
+    """转换为数值，非数值和非有限值（NaN、inf、'nan'）为 None，与空单元格一样不绘制"""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def split_chart_values(values: Sequence[Sequence[Any]], plot_by: int = None) \
+        -> Tuple[Optional[list], List[list], bool, int]:
+    """
+    按 Excel 的规则拆分图表数据区域
+
+    第一行为系列名称、第一列为分类（左上角为空或为文本标题）；
+    未指定 plot_by 时，行数多于列数则按列取系列，否则按行取系列。
+
+    Args:
+        values: 二维数据（Range.Value）
+        plot_by: XL_ROWS 或 XL_COLUMNS
+
+    Returns:
+        (系列名称行或 None, 数据行, 首列是否为分类, plot_by)，按行取系列时数据已转置为每列一个系列
+    """
+    rows = [list(row) for row in values]
+    if not rows or not rows[0]:
+        raise ValueError("图表数据区域为空")
+    if plot_by is None:
+        plot_by = XL_COLUMNS if len(rows) >= len(rows[0]) else XL_ROWS
+    if plot_by == XL_ROWS:
+        rows = [list(column) for column in zip(*rows)]
+    # 与 Excel 一致：左上角为空时首行首列都是标签，否则含文本的首行/首列视为标签
+    corner_empty = rows[0][0] is None or rows[0][0] == ''
+    has_header = corner_empty or any(_number(value) is None for value in (rows[0][1:] or rows[0]))
+    has_labels = len(rows[0]) > 1 and (corner_empty or any(
+        _number(row[0]) is None for row in rows[1 if has_header else 0:]))
+    header = rows.pop(0) if has_header else None
+    return header, rows, has_labels, plot_by
+
+
+def chart_spec_from_values(values: Sequence[Sequence[Any]], chart_type: Union[str, int] = None,
+                           plot_by: int = None, **options) -> ChartSpec:
+    """
+    按 Excel 的规则从区域数据生成图表描述（见 split_chart_values）
+
+    Args:
+        values: 二维数据（Range.Value）
+        chart_type: 图表类型名称或常量，默认取 CHART_CONFIG['default_type']
+        plot_by: XL_ROWS 或 XL_COLUMNS
+        **options: ChartSpec 的其他字段（title、legend 等）
+
+    Returns:
+        ChartSpec
+    """
+    header, rows, has_labels, _ = split_chart_values(values, plot_by)
+    first = 1 if has_labels else 0
+    categories = [str(row[0]) if has_labels else str(index) for index, row in enumerate(rows, start=1)]
+    series = []
+    for col in range(first, len(rows[0]) if rows else first):
+        name = str(header[col]) if header is not None and header[col] is not None else f"系列{col - first + 1}"
+        series.append((name, [_number(row[col]) for row in rows]))
+    return ChartSpec(categories, series, chart_type or CHART_CONFIG['default_type'], **options)
+
+
+def chart_spec_from_range(worksheet: Any, data_range: str, chart_type: Union[str, int] = None,
+                          plot_by: int = None, **options) -> ChartSpec:
+    """
+    读取工作表区域生成图表描述（一次 Range.Value 访问）
+
+    Args:
+        worksheet: 工作表对象（COM 或无界面后端）
+        data_range: 数据区域地址，例如 'A1:D7'
+        chart_type: 图表类型名称或常量
+        plot_by: XL_ROWS 或 XL_COLUMNS
+        **options: ChartSpec 的其他字段
+
+    Returns:
+        ChartSpec
+    """
+    values = worksheet.Range(data_range).Value
+    if not isinstance(values, tuple):
+        values = ((values,),)
+    return chart_spec_from_values(values, chart_type, plot_by, **options)
+
+
+# ---- 布局 ----
+
+def nice_ticks(low: float, high: float, count: int = 5) -> List[float]:
+    """
+    计算坐标轴刻度（1、2、5 乘以 10 的幂）
+
+    Args:
+        low: 数据最小值
+        high: 数据最大值
+        count: 期望的刻度数
+
+    Returns:
+        从小到大的刻度值，覆盖 [low, high]
+    """
+    if high <= low:
+        high = low + 1
+    raw = (high - low) / max(count, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    start = math.floor(low / step) * step
+    stop = math.ceil(high / step) * step
+    return [start + index * step for index in range(int(round((stop - start) / step)) + 1)]
+
+
+def format_label(value: float) -> str:
+    """数值标签：整数不带小数，大数使用千分位"""
+    if abs(value - round(value)) < 1e-9:
+        return f"{int(round(value)):,}"
+    return f"{value:,.2f}".rstrip('0').rstrip('.')
+
+
+class _Scene:
+    """图元列表"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.items: List[tuple] = []
+
+    def rect(self, x: float, y: float, w: float, h: float, fill: str) -> None:
+        self.items.append(('rect', x, y, w, h, fill))
+
+    def line(self, points: Sequence[Point], color: str, width: float = 1.0) -> None:
+        self.items.append(('line', list(points), color, width))
+
+    def polygon(self, points: Sequence[Point], fill: str, stroke: str = None) -> None:
+        self.items.append(('polygon', list(points), fill, stroke))
+
+    def circle(self, cx: float, cy: float, r: float, fill: str) -> None:
+        self.items.append(('circle', cx, cy, r, fill))
+
+    def text(self, x: float, y: float, text: str, size: float = 10, anchor: str = 'middle',
+             color: str = TEXT_COLOR, rotate: float = 0, bold: bool = False) -> None:
+        self.items.append(('text', x, y, text, size, anchor, color, rotate, bold))
+
+
+def layout_chart(spec: ChartSpec) -> _Scene:
+    """
+    将图表描述布局为图元
+
+    Args:
+        spec: 图表描述
+
+    Returns:
+        图元场景
+    """
+    scene = _Scene(spec.width, spec.height)
+    scene.rect(0, 0, spec.width, spec.height, '#FFFFFF')
+    left, top, right, bottom = 10.0, 10.0, spec.width - 10.0, spec.height - 10.0
+    if spec.title:
+        scene.text(spec.width / 2, top + 12, spec.title, size=14, bold=True)
+        top += 26
+    names = [name for name, _ in spec.series] if spec.kind != 'pie' else spec.categories
+    if spec.legend and names:
+        top, right, bottom, left = _legend(scene, spec, names, top, right, bottom, left)
+    if spec.kind == 'pie':
+        _pie(scene, spec, left, top, right, bottom)
+    else:
+        _axes_chart(scene, spec, left, top, right, bottom)
+    return scene
+
+
+def _legend(scene: _Scene, spec: ChartSpec, names: List[str], top: float, right: float,
+            bottom: float, left: float) -> Tuple[float, float, float, float]:
+    colors = spec.colors
+    widths = [14 + 7 * sum(2 if ord(ch) > 0x2E80 else 1 for ch in name) + 10 for name in names]
+    if spec.legend in ('bottom', 'top'):
+        y = bottom - 8 if spec.legend == 'bottom' else top + 6
+        x = (left + right - sum(widths)) / 2
+        for index, (name, width) in enumerate(zip(names, widths)):
+            scene.rect(x, y - 4, 8, 8, colors[index % len(colors)])
+            scene.text(x + 12, y + 4, name, size=9, anchor='start')
+            x += width
+        if spec.legend == 'bottom':
+            return top, right, bottom - 20, left
+        return top + 20, right, bottom, left
+    column_width = min(max(widths), (right - left) / 3)
+    x = right - column_width if spec.legend == 'right' else left
+    y = (top + bottom) / 2 - len(names) * 8
+    for index, name in enumerate(names):
+        scene.rect(x, y + index * 16 - 4, 8, 8, colors[index % len(colors)])
+        scene.text(x + 12, y + index * 16 + 4, name, size=9, anchor='start')
+    if spec.legend == 'right':
+        return top, right - column_width - 6, bottom, left
+    return top, right, bottom, left + column_width + 6
+
+
+def _axes_chart(scene: _Scene, spec: ChartSpec, left: float, top: float, right: float, bottom: float) -> None:
+    values = [value for _, data in spec.series for value in data if value is not None]
+    ticks = nice_ticks(min(values + [0.0]), max(values + [0.0])) if values else [0.0, 1.0]
+    label_width = 7 * max(len(format_label(tick)) for tick in ticks) + 6
+    if spec.y_title:
+        scene.text(left + 8, (top + bottom) / 2, spec.y_title, size=10, rotate=-90)
+        left += 16
+    if spec.x_title:
+        scene.text((left + label_width + right) / 2, bottom - 2, spec.x_title, size=10)
+        bottom -= 16
+    plot_left, plot_right, plot_top, plot_bottom = left + label_width, right, top + 6, bottom - 18
+    low, high = ticks[0], ticks[-1]
+
+    def y_of(value: float) -> float:
+        return plot_bottom - (value - low) / (high - low) * (plot_bottom - plot_top)
+
+    for tick in ticks:
+        y = y_of(tick)
+        scene.line([(plot_left, y), (plot_right, y)], GRID_COLOR)
+        scene.text(plot_left - 4, y + 3, format_label(tick), size=9, anchor='end')
+    baseline = y_of(min(max(0.0, low), high))
+    scene.line([(plot_left, baseline), (plot_right, baseline)], AXIS_COLOR)
+
+    count = max(len(spec.categories), 1)
+    band = (plot_right - plot_left) / count
+    step = max(1, int(math.ceil(count * 40 / max(plot_right - plot_left, 1))))
+    for index, category in enumerate(spec.categories):
+        if index % step == 0:
+            scene.text(plot_left + band * (index + 0.5), plot_bottom + 13, category, size=9)
+
+    colors = spec.colors
+    if spec.kind == 'column':
+        series_count = max(len(spec.series), 1)
+        bar = band * 0.8 / series_count
+        for series_index, (_, data) in enumerate(spec.series):
+            color = colors[series_index % len(colors)]
+            for index, value in enumerate(data):
+                if value is None:
+                    continue
+                x = plot_left + band * index + band * 0.1 + bar * series_index
+                y = y_of(value)
+                scene.rect(x, min(y, baseline), bar, abs(baseline - y), color)
+                if spec.show_values:
+                    scene.text(x + bar / 2, min(y, baseline) - 3, format_label(value), size=8)
+        return
+
+    for series_index, (_, data) in enumerate(spec.series):
+        color = colors[series_index % len(colors)]
+        points = [(plot_left + band * (index + 0.5), y_of(value))
+                  for index, value in enumerate(data) if value is not None]
+        if len(points) > 1:
+            scene.line(points, color, 2.0)
+        if spec.markers and len(points) <= 500:
+            for x, y in points:
+                scene.circle(x, y, 3, color)
+        if spec.show_values:
+            for (x, y), value in zip(points, [value for value in data if value is not None]):
+                scene.text(x, y - 6, format_label(value), size=8)
+
+
+def _pie(scene: _Scene, spec: ChartSpec, left: float, top: float, right: float, bottom: float) -> None:
+    data = [max(value or 0.0, 0.0) for value in spec.series[0][1]] if spec.series else []
+    total = sum(data)
+    if total <= 0:
+        return
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    radius = max(min(right - left, bottom - top) / 2 - 6, 1)
+    colors = spec.colors
+    # 与 Excel 一致：从 12 点方向开始顺时针
+    angle = -math.pi / 2
+    for index, value in enumerate(data):
+        if value <= 0:
+            continue
+        sweep = value / total * 2 * math.pi
+        steps = max(2, int(sweep / (2 * math.pi) * 120))
+        points = [(cx, cy)] + [
+            (cx + radius * math.cos(angle + sweep * step / steps), cy + radius * math.sin(angle + sweep * step / steps))
+            for step in range(steps + 1)
+        ]
+        scene.polygon(points, colors[index % len(colors)], '#FFFFFF')
+        labels = []
+        if spec.show_category:
+            labels.append(spec.categories[index])
+        if spec.show_values:
+            labels.append(format_label(value))
+        if spec.show_percentage:
+            labels.append(f"{value / total:.0%}")
+        if labels:
+            middle = angle + sweep / 2
+            scene.text(cx + radius * 0.65 * math.cos(middle), cy + radius * 0.65 * math.sin(middle) + 3,
+                       '; '.join(labels), size=9, color='#FFFFFF')
+        angle += sweep
+
+
+# ---- 输出 ----
+
+def scene_to_svg(scene: _Scene) -> str:
+    """图元序列化为 SVG 文本"""
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{scene.width}" height="{scene.height}" '
+        f'viewBox="0 0 {scene.width} {scene.height}" font-family={quoteattr(FONT_FAMILY)}>'
+    ]
+    for item in scene.items:
+        kind = item[0]
+        if kind == 'rect':
+            _, x, y, w, h, fill = item
+            parts.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}" fill="{fill}"/>')
+        elif kind == 'line':
+            _, points, color, width = item
+            path = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+            parts.append(f'<polyline points="{path}" fill="none" stroke="{color}" stroke-width="{width}" '
+                         f'stroke-linejoin="round"/>')
+        elif kind == 'polygon':
+            _, points, fill, stroke = item
+            path = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+            stroke_attr = f' stroke="{stroke}" stroke-width="1"' if stroke else ''
+            parts.append(f'<polygon points="{path}" fill="{fill}"{stroke_attr}/>')
+        elif kind == 'circle':
+            _, cx, cy, r, fill = item
+            parts.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{r}" fill="{fill}"/>')
+        else:
+            _, x, y, text, size, anchor, color, rotate, bold = item
+            transform = f' transform="rotate({rotate} {x:.1f} {y:.1f})"' if rotate else ''
+            weight = ' font-weight="bold"' if bold else ''
+            parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" text-anchor="{anchor}" '
+                         f'fill="{color}"{weight}{transform}>{escape(text)}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    color = color.lstrip('#')
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+class _Raster:
+    """NumPy 光栅化（按 scale 倍超采样后缩小，边缘平滑）"""
+
+    def __init__(self, width: int, height: int, scale: int = 2):
+        self.scale = scale
+        self.pixels = np.full((height * scale, width * scale, 3), 255, dtype=np.uint8)
+
+    def fill_mask(self, x0: int, y0: int, mask: np.ndarray, color: str) -> None:
+        if mask.size:
+            self.pixels[y0:y0 + mask.shape[0], x0:x0 + mask.shape[1]][mask] = _rgb(color)
+
+    def _box(self, xs: Sequence[float], ys: Sequence[float]) -> Tuple[int, int, int, int]:
+        height, width = self.pixels.shape[:2]
+        x0 = max(int(math.floor(min(xs))), 0)
+        y0 = max(int(math.floor(min(ys))), 0)
+        x1 = min(int(math.ceil(max(xs))) + 1, width)
+        y1 = min(int(math.ceil(max(ys))) + 1, height)
+        return x0, y0, x1, y1
+
+    def rect(self, x: float, y: float, w: float, h: float, color: str) -> None:
+        s = self.scale
+        x0, y0, x1, y1 = self._box([x * s, (x + w) * s - 1], [y * s, (y + h) * s - 1])
+        if x1 > x0 and y1 > y0:
+            self.pixels[y0:y1, x0:x1] = _rgb(color)
+
+    def polygon(self, points: Sequence[Point], color: str) -> None:
+        s = self.scale
+        xs = np.array([x * s for x, _ in points])
+        ys = np.array([y * s for _, y in points])
+        x0, y0, x1, y1 = self._box(xs, ys)
+        if x1 <= x0 or y1 <= y0:
+            return
+        px = np.arange(x0, x1) + 0.5
+        py = (np.arange(y0, y1) + 0.5)[:, None]
+        inside = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+        # 偶奇规则
+        for xa, ya, xb, yb in zip(xs, ys, np.roll(xs, -1), np.roll(ys, -1)):
+            if ya == yb:
+                continue
+            crosses = (ya > py) != (yb > py)
+            x_cross = xa + (py - ya) * (xb - xa) / (yb - ya)
+            inside ^= crosses & (px < x_cross)
+        self.fill_mask(x0, y0, inside, color)
+
+    def line(self, points: Sequence[Point], color: str, width: float) -> None:
+        half = max(width, 1.0) / 2
+        for (xa, ya), (xb, yb) in zip(points, points[1:]):
+            length = math.hypot(xb - xa, yb - ya) or 1.0
+            nx, ny = -(yb - ya) / length * half, (xb - xa) / length * half
+            self.polygon([(xa + nx, ya + ny), (xb + nx, yb + ny), (xb - nx, yb - ny), (xa - nx, ya - ny)], color)
+
+    def circle(self, cx: float, cy: float, r: float, color: str) -> None:
+        s = self.scale
+        x0, y0, x1, y1 = self._box([(cx - r) * s, (cx + r) * s], [(cy - r) * s, (cy + r) * s])
+        px = np.arange(x0, x1) + 0.5 - cx * s
+        py = (np.arange(y0, y1) + 0.5)[:, None] - cy * s
+        self.fill_mask(x0, y0, px ** 2 + py ** 2 <= (r * s) ** 2, color)
+
+    def image(self) -> np.ndarray:
+        s = self.scale
+        height, width = self.pixels.shape[0] // s, self.pixels.shape[1] // s
+        blocks = self.pixels.reshape(height, s, width, s, 3).astype(np.uint16)
+        return (blocks.sum(axis=(1, 3)) // (s * s)).astype(np.uint8)
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    """
+    将 RGB 图像编码为 PNG
+
+    Args:
+        image: 形状为 (高, 宽, 3) 的 uint8 数组
+
+    Returns:
+        PNG 文件内容
+    """
+    height, width = image.shape[:2]
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + \
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b'')
+
+
+def scene_to_png(scene: _Scene) -> bytes:
+    """
+    图元光栅化为 PNG
+
+    安装了 cairosvg 时由 SVG 转换（包含文字）；否则使用内置光栅化，文字不绘制（第一次时记录警告）。
+    """
+    global _text_warning_logged
+    try:
+        import cairosvg
+    except ImportError:
+        cairosvg = None
+    if cairosvg is not None:
+        return cairosvg.svg2png(bytestring=scene_to_svg(scene).encode('utf-8'))
+    if not _text_warning_logged:
+        _text_warning_logged = True
+        logger.warning("未安装 cairosvg，PNG 图表不包含标题、坐标轴标签和图例文字；"
+                       "请安装 cairosvg 或导出为 .svg")
+
+    raster = _Raster(scene.width, scene.height)
+    for item in scene.items:
+        kind = item[0]
+        if kind == 'rect':
+            raster.rect(*item[1:5], item[5])
+        elif kind == 'line':
+            raster.line(item[1], item[2], item[3])
+        elif kind == 'polygon':
+            raster.polygon(item[1], item[2])
+        elif kind == 'circle':
+            raster.circle(*item[1:4], item[4])
+    return encode_png(raster.image())
+
+
+def render_chart(spec: ChartSpec, path: str) -> str:
+    """
+    渲染图表并写入文件，格式由扩展名决定（.svg 或 .png）
+
+    Args:
+        spec: 图表描述
+        path: 输出文件路径
+
+    Returns:
+        输出文件路径
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    threshold = CHART_CONFIG.get('downsample_threshold')
+    if threshold and spec.kind != 'pie' and len(spec.categories) > threshold:
+        from utils.chart_downsample import downsample_spec
+        spec = downsample_spec(spec, threshold)
+    scene = layout_chart(spec)
+    suffix = path.suffix.lower()
+    if suffix == '.svg':
+        path.write_text(scene_to_svg(scene), encoding='utf-8')
+    elif suffix == '.png':
+        path.write_bytes(scene_to_png(scene))
+    else:
+        raise ValueError(f"不支持的图片格式: {path.suffix}，可选 .svg、.png")
+    return str(path)
+
+
+def _render_task(task: Tuple[ChartSpec, str]) -> str:
+    return render_chart(*task)
+
+
+def render_charts(tasks: Sequence[Tuple[ChartSpec, str]], max_workers: int = None) -> List[str]:
+    """
+    在多个进程中并行渲染一批图表
+
+    Args:
+        tasks: (图表描述, 输出路径) 列表
+        max_workers: 工作进程数，默认取 PERFORMANCE_CONFIG['max_workers']，为 1 或任务很少时在当前进程渲染
+
+    Returns:
+        输出文件路径列表（与 tasks 顺序一致）
+    """
+    workers = max_workers or PERFORMANCE_CONFIG.get('max_workers') or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 8:
+        return [_render_task(task) for task in tasks]
+    # 每个进程分几批领取任务，减少进程间通信的次数
+    chunk_size = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        paths = list(executor.map(_render_task, tasks, chunksize=chunk_size))
+    logger.info(f"已渲染 {len(paths)} 个图表（{workers} 个进程）")
+    return paths
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午02:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：excel_manager.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+Excel 应用程序管理器
+通过 win32com 启动独立的 Excel 进程（DispatchEx），按 EXCEL_CONFIG 设置界面选项，
+退出时关闭所有工作簿并结束进程。与 HeadlessExcelManager 的接口相同，
+由 create_excel_manager('com') 创建。
+"""
+
+from typing import Any, Optional
+
+from loguru import logger
+
+from config import EXCEL_CONFIG
+
+
+class ExcelManager:
+    """
+    COM Excel 管理器
+
+    用法:
+        with ExcelManager(visible=True) as excel:
+            workbook = excel.get_application().Workbooks.Add()
+    """
+
+    def __init__(self, visible: bool = None, alerts: bool = None):
+        """
+        Args:
+            visible: 是否显示 Excel 界面，默认取 EXCEL_CONFIG['visible']
+            alerts: 是否显示警告对话框，默认取 EXCEL_CONFIG['display_alerts']
+        """
+        self.visible = EXCEL_CONFIG['visible'] if visible is None else visible
+        self.alerts = EXCEL_CONFIG['display_alerts'] if alerts is None else alerts
+        self.app: Optional[Any] = None
+
+    def start(self) -> Any:
+        """启动 Excel 进程"""
+        if self.app is None:
+            try:
+                import win32com.client
+            except ImportError as e:
+                raise RuntimeError("COM 后端需要在 Windows 上安装 pywin32，"
+                                   "也可以设置 EXCEL_CONFIG['backend'] = 'headless'") from e
+            self.app = win32com.client.DispatchEx('Excel.Application')
+            self.app.Visible = self.visible
+            self.app.DisplayAlerts = self.alerts
+            self.app.ScreenUpdating = EXCEL_CONFIG['screen_updating']
+            self.app.EnableEvents = EXCEL_CONFIG['enable_events']
+            logger.info("Excel 应用程序已启动")
+        return self.app
+
+    def get_application(self) -> Any:
+        """获取应用程序对象，未启动时自动启动"""
+        return self.start()
+
+    def is_alive(self) -> bool:
+        """Excel 进程是否仍然可用（进程被结束后访问会抛出 COM 异常）"""
+        if self.app is None:
+            return False
+        try:
+            self.app.Workbooks.Count
+            return True
+        except Exception:
+            return False
+
+    def quit(self) -> None:
+        """关闭所有工作簿（不保存）并退出 Excel"""
+        if self.app is None:
+            return
+        try:
+            for index in range(self.app.Workbooks.Count, 0, -1):
+                self.app.Workbooks(index).Close(SaveChanges=False)
+            self.app.Quit()
+            logger.info("Excel 应用程序已退出")
+        except Exception as e:
+            logger.warning(f"退出 Excel 时出错: {e}")
+        finally:
+            self.app = None
+
+    def __enter__(self) -> 'ExcelManager':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.quit()
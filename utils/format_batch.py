@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 上午09:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：format_batch.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+批量格式事务
+收集 set_font / set_fill / set_borders / apply_predefined_format 等格式调用，
+提交时以所有区域的边界把工作表切分为若干块（而不是逐个单元格），在块上合并重叠区域，
+将相同的样式组合归并为共享样式，再按样式把块合并成尽量少的矩形区域一次性应用。
+计算量与块数成正比（最坏为区域数的平方），与区域包含的单元格数无关；支持整列（'D:D'）和整行（'3:3'）地址。
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import FORMAT_CONFIG
+from utils.range_address import MAX_COLUMNS, MAX_ROWS, format_range, parse_areas
+
+# 常用颜色（COM 颜色值，BGR 顺序）
+NAMED_COLORS = {
+    'BLACK': 0x000000,
+    'WHITE': 0xFFFFFF,
+    'RED': 0x0000FF,
+    'GREEN': 0x00FF00,
+    'BLUE': 0xFF0000,
+    'YELLOW': 0x00FFFF,
+    'ORANGE': 0x00A5FF,
+    'PURPLE': 0x800080,
+    'GRAY': 0x808080,
+    'LIGHT_GRAY': 0xD3D3D3,
+    'DARK_BLUE': 0x8B0000,
+    'LIGHT_BLUE': 0xE6D8AD,
+    'HEADER_BLUE': 0xC47244,
+}
+
+# 预定义数字格式
+PREDEFINED_FORMATS = {
+    'number': FORMAT_CONFIG['number_format'],
+    'currency': '¥#,##0.00',
+    'percentage': FORMAT_CONFIG['percentage_format'],
+    'integer': '#,##0',
+    'date': FORMAT_CONFIG['date_format'],
+    'text': '@',
+}
+
+HORIZONTAL = {'center': -4108, 'left': -4131, 'right': -4152, 'general': 1, 'justify': -4130}
+VERTICAL = {'center': -4108, 'top': -4160, 'bottom': -4107, 'justify': -4130}
+LINE_STYLES = {'xlContinuous': 1, 'xlDash': -4115, 'xlDot': -4118, 'xlDouble': -4119, 'xlLineStyleNone': -4142}
+BORDER_WEIGHTS = {'xlHairline': 1, 'xlThin': 2, 'xlMedium': -4138, 'xlThick': 4}
+
+# 样式键到 COM 属性路径的映射
+STYLE_ATTRIBUTES = {
+    'font_name': ('Font', 'Name'),
+    'font_size': ('Font', 'Size'),
+    'font_bold': ('Font', 'Bold'),
+    'font_italic': ('Font', 'Italic'),
+    'font_underline': ('Font', 'Underline'),
+    'font_color': ('Font', 'Color'),
+    'fill_color': ('Interior', 'Color'),
+    'border_style': ('Borders', 'LineStyle'),
+    'border_weight': ('Borders', 'Weight'),
+    'border_color': ('Borders', 'Color'),
+    'number_format': (None, 'NumberFormat'),
+    'horizontal_alignment': (None, 'HorizontalAlignment'),
+    'vertical_alignment': (None, 'VerticalAlignment'),
+    'wrap_text': (None, 'WrapText'),
+}
+
+# 单个 Range 地址字符串的最大长度（COM 限制）
+MAX_ADDRESS_LENGTH = 255
+
+Style = Tuple[Tuple[str, Any], ...]
+Rect = Tuple[int, int, int, int]
+
+
+def resolve_color(color: Any) -> Optional[int]:
+    """
+    解析颜色
+
+    Args:
+        color: 颜色名称（如 'RED'）、COM 颜色值或 (r, g, b) 元组
+
+    Returns:
+        COM 颜色值
+    """
+    if color is None:
+        return None
+    if isinstance(color, str):
+        name = color.upper()
+        if name not in NAMED_COLORS:
+            raise ValueError(f"未知的颜色名称: {color}")
+        return NAMED_COLORS[name]
+    if isinstance(color, (tuple, list)):
+        red, green, blue = color
+        return red + green * 256 + blue * 65536
+    return int(color)
+
+
+def cells_to_rects(cells: Iterable[Tuple[int, int]]) -> List[Rect]:
+    """
+    将单元格集合合并为尽量少的矩形区域
+
+    先把每行的连续列合并成行段，再把列范围相同的相邻行段纵向合并。
+
+    Args:
+        cells: (行, 列) 坐标集合
+
+    Returns:
+        (起始行, 起始列, 结束行, 结束列) 列表
+    """
+    runs: Dict[int, List[Tuple[int, int]]] = {}
+    for row, col in sorted(cells):
+        row_runs = runs.setdefault(row, [])
+        if row_runs and row_runs[-1][1] == col - 1:
+            row_runs[-1] = (row_runs[-1][0], col)
+        else:
+            row_runs.append((col, col))
+
+    rects: List[Rect] = []
+    open_rects: Dict[Tuple[int, int], int] = {}
+    previous_row = None
+    for row in sorted(runs):
+        continued: Dict[Tuple[int, int], int] = {}
+        for span in runs[row]:
+            if previous_row == row - 1 and span in open_rects:
+                continued[span] = open_rects.pop(span)
+            else:
+                continued[span] = row
+        for (first_col, last_col), first_row in open_rects.items():
+            rects.append((first_row, first_col, previous_row, last_col))
+        open_rects = continued
+        previous_row = row
+    for (first_col, last_col), first_row in open_rects.items():
+        rects.append((first_row, first_col, previous_row, last_col))
+    return sorted(rects)
+
+
+def mask_to_rects(mask: np.ndarray, first_row: int = 1, first_col: int = 1) -> List[Rect]:
+    """
+    把单元格掩码合并为矩形区域（向量化计算），适用于稠密的区域
+
+    先求每列中连续为 True 的行段，再把行范围相同的相邻列合并。
+
+    Args:
+        mask: 一维（单列）或二维布尔数组
+        first_row: 掩码第一行对应的行号
+        first_col: 掩码第一列对应的列号
+
+    Returns:
+        (起始行, 起始列, 结束行, 结束列) 列表
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.ndim == 1:
+        mask = mask[:, None]
+    padded = np.zeros((mask.shape[0] + 2, mask.shape[1]), dtype=np.int8)
+    padded[1:-1] = mask
+    # 转置后按列扫描，每列的起点和终点按顺序一一对应
+    edges = np.diff(padded, axis=0).T
+    columns, starts = np.nonzero(edges == 1)
+    _, stops = np.nonzero(edges == -1)
+    if not len(starts):
+        return []
+    ends = stops - 1
+    order = np.lexsort((columns, ends, starts))
+    starts, ends, columns = starts[order], ends[order], columns[order]
+    new_rect = np.ones(len(starts), dtype=bool)
+    new_rect[1:] = (starts[1:] != starts[:-1]) | (ends[1:] != ends[:-1]) | (columns[1:] != columns[:-1] + 1)
+    heads = np.nonzero(new_rect)[0]
+    tails = np.append(heads[1:], len(starts)) - 1
+    return sorted(zip((starts[heads] + first_row).tolist(), (columns[heads] + first_col).tolist(),
+                      (ends[heads] + first_row).tolist(), (columns[tails] + first_col).tolist()))
+
+
+def coalesce_rects(operations: Iterable[Tuple[List[Rect], Dict[str, Any]]]) -> Dict[Style, List[Rect]]:
+    """
+    合并重叠区域上的样式修改，后记录的属性覆盖先记录的
+
+    所有区域的起止行、列把工作表切分为块，每个块内的单元格样式相同。
+    用整数数组记录每个块的样式编号，逐个区域更新数组切片，
+    最后用 mask_to_rects 把每种样式的相邻块合并为矩形。
+
+    Args:
+        operations: (区域列表, 样式修改) 列表，按记录顺序
+
+    Returns:
+        样式到矩形区域列表的映射
+    """
+    operations = list(operations)
+    row_edges = sorted({edge for rects, _ in operations for rect in rects for edge in (rect[0], rect[2] + 1)})
+    col_edges = sorted({edge for rects, _ in operations for rect in rects for edge in (rect[1], rect[3] + 1)})
+    if not row_edges:
+        return {}
+    # 块 (i, j) 为第 row_edges[i]..row_edges[i+1]-1 行、第 col_edges[j]..col_edges[j+1]-1 列，编号 0 表示未设置
+    blocks = np.zeros((len(row_edges) - 1, len(col_edges) - 1), dtype=np.int32)
+    styles: List[Style] = [()]
+    style_ids: Dict[Style, int] = {(): 0}
+    for rects, updates in operations:
+        for first_row, first_col, last_row, last_col in rects:
+            area = blocks[bisect_left(row_edges, first_row):bisect_left(row_edges, last_row + 1),
+                          bisect_left(col_edges, first_col):bisect_left(col_edges, last_col + 1)]
+            current, inverse = np.unique(area, return_inverse=True)
+            merged = []
+            for style_id in current.tolist():
+                style = tuple(sorted({**dict(styles[style_id]), **updates}.items()))
+                if style not in style_ids:
+                    style_ids[style] = len(styles)
+                    styles.append(style)
+                merged.append(style_ids[style])
+            area[...] = np.asarray(merged, dtype=np.int32)[inverse].reshape(area.shape)
+
+    # 相邻的块在原坐标中也相邻，按块坐标合并后换算回行列
+    return {
+        styles[style_id]: [(row_edges[top], col_edges[left], row_edges[bottom + 1] - 1, col_edges[right + 1] - 1)
+                           for top, left, bottom, right in mask_to_rects(blocks == style_id, 0, 0)]
+        for style_id in np.unique(blocks).tolist() if style_id
+    }
+
+
+def clip_to_used(worksheet: Any, rects: List[Rect]) -> List[Rect]:
+    """
+    无界面后端按单元格保存样式，整列、整行区域裁剪到已使用区域（COM 工作表原样返回）
+
+    Args:
+        worksheet: 工作表对象
+        rects: 矩形区域列表
+
+    Returns:
+        裁剪后的矩形区域列表
+    """
+    used_bounds = getattr(worksheet, 'used_bounds', None)
+    if used_bounds is None or not any(rect[2] == MAX_ROWS or rect[3] == MAX_COLUMNS for rect in rects):
+        return rects
+    bounds = used_bounds()
+    if bounds is None:
+        return [rect for rect in rects if rect[2] != MAX_ROWS and rect[3] != MAX_COLUMNS]
+    clipped = []
+    for first_row, first_col, last_row, last_col in rects:
+        if last_row == MAX_ROWS:
+            last_row = max(first_row - 1, min(last_row, bounds[2]))
+        if last_col == MAX_COLUMNS:
+            last_col = max(first_col - 1, min(last_col, bounds[3]))
+        if first_row <= last_row and first_col <= last_col:
+            clipped.append((first_row, first_col, last_row, last_col))
+    return clipped
+
+
+def join_addresses(rects: List[Rect], max_length: int = MAX_ADDRESS_LENGTH) -> List[str]:
+    """
+    将矩形区域拼接为多区域地址，单个地址不超过 COM 的长度限制
+
+    Args:
+        rects: 矩形区域列表
+        max_length: 单个地址的最大长度
+
+    Returns:
+        地址字符串列表
+    """
+    addresses: List[str] = []
+    current: List[str] = []
+    length = 0
+    for rect in rects:
+        address = format_range(*rect)
+        if current and length + len(address) + 1 > max_length:
+            addresses.append(','.join(current))
+            current, length = [], 0
+        current.append(address)
+        length += len(address) + 1
+    if current:
+        addresses.append(','.join(current))
+    return addresses
+
+
+class FormatTransaction:
+    """
+    格式事务
+
+    方法签名与 ExcelFormat 的同名方法一致。调用只会被记录，commit() 时统一应用；
+    作为上下文管理器使用时，正常退出会自动提交。
+    """
+
+    def __init__(self, format_module: Any = None):
+        """
+        Args:
+            format_module: ExcelFormat 实例，用于转发条件格式、表格样式等非单元格样式操作（可选）
+        """
+        self.format_module = format_module
+        self._worksheets: Dict[int, Any] = {}
+        self._operations: List[Tuple[int, str, Dict[str, Any]]] = []
+        self._forwarded: List[Tuple[str, tuple, Dict[str, Any]]] = []
+
+    # ---- 单元格样式 ----
+
+    def record(self, worksheet: Any, range_address: str, updates: Dict[str, Any]) -> None:
+        """
+        记录一组样式修改，值为 None 的属性忽略
+
+        Args:
+            worksheet: 工作表对象
+            range_address: 区域地址
+            updates: 样式键（STYLE_ATTRIBUTES 中的键，如 'font_bold'、'fill_color'）到值的映射
+        """
+        updates = {key: value for key, value in updates.items() if value is not None}
+        if not updates:
+            return
+        self._worksheets[id(worksheet)] = worksheet
+        self._operations.append((id(worksheet), range_address, updates))
+
+    def set_font(self, worksheet: Any, range_address: str, font_name: str = None, font_size: float = None,
+                 bold: bool = None, italic: bool = None, underline: bool = None, font_color: Any = None) -> None:
+        """记录字体设置"""
+        self.record(worksheet, range_address, {
+            'font_name': font_name,
+            'font_size': font_size,
+            'font_bold': bold,
+            'font_italic': italic,
+            'font_underline': (2 if underline else -4142) if underline is not None else None,
+            'font_color': resolve_color(font_color),
+        })
+
+    def set_fill(self, worksheet: Any, range_address: str, fill_color: Any = None) -> None:
+        """记录填充颜色设置"""
+        self.record(worksheet, range_address, {'fill_color': resolve_color(fill_color)})
+
+    def set_borders(self, worksheet: Any, range_address: str, border_style: str = 'xlContinuous',
+                    border_weight: str = 'xlThin', border_color: Any = None) -> None:
+        """记录边框设置"""
+        self.record(worksheet, range_address, {
+            'border_style': LINE_STYLES.get(border_style, border_style),
+            'border_weight': BORDER_WEIGHTS.get(border_weight, border_weight),
+            'border_color': resolve_color(border_color),
+        })
+
+    def set_alignment(self, worksheet: Any, range_address: str, horizontal: str = None,
+                      vertical: str = None, wrap_text: bool = None) -> None:
+        """记录对齐方式设置"""
+        self.record(worksheet, range_address, {
+            'horizontal_alignment': HORIZONTAL.get(horizontal, horizontal),
+            'vertical_alignment': VERTICAL.get(vertical, vertical),
+            'wrap_text': wrap_text,
+        })
+
+    def set_number_format(self, worksheet: Any, range_address: str, number_format: str) -> None:
+        """记录数字格式设置"""
+        self.record(worksheet, range_address, {'number_format': number_format})
+
+    def apply_predefined_format(self, worksheet: Any, range_address: str, format_type: str) -> None:
+        """记录预定义数字格式（number、currency、percentage、integer、date、text）"""
+        if format_type not in PREDEFINED_FORMATS:
+            raise ValueError(f"未知的预定义格式: {format_type}")
+        self.set_number_format(worksheet, range_address, PREDEFINED_FORMATS[format_type])
+
+    def apply_header_style(self, worksheet: Any, range_address: str) -> None:
+        """记录标题行样式：加粗、白字、蓝底、居中"""
+        self.record(worksheet, range_address, {
+            'font_bold': True,
+            'font_size': FORMAT_CONFIG['header_font_size'],
+            'font_color': NAMED_COLORS['WHITE'],
+            'fill_color': NAMED_COLORS['HEADER_BLUE'],
+            'horizontal_alignment': HORIZONTAL['center'],
+        })
+
+    # ---- 转发给 ExcelFormat 的操作 ----
+
+    def create_conditional_format(self, *args, **kwargs) -> None:
+        """记录条件格式，提交时去重后转发给 ExcelFormat"""
+        self._forward('create_conditional_format', args, kwargs)
+
+    def create_table_style(self, *args, **kwargs) -> None:
+        """记录表格样式，提交时去重后转发给 ExcelFormat"""
+        self._forward('create_table_style', args, kwargs)
+
+    # ---- 提交 ----
+
+    def commit(self) -> Dict[str, int]:
+        """
+        应用所有记录的格式
+
+        Returns:
+            统计信息：operations（记录的调用数）、styles（去重后的样式数）、
+            ranges（合并后的矩形区域数）、calls（实际的属性设置次数）
+        """
+        stats = {'operations': len(self._operations) + len(self._forwarded), 'styles': 0, 'ranges': 0, 'calls': 0}
+
+        # 1. 按工作表分组，整列、整行地址在无界面后端裁剪到已使用区域
+        sheet_operations: Dict[int, List[Tuple[List[Rect], Dict[str, Any]]]] = {}
+        for sheet_id, range_address, updates in self._operations:
+            rects = clip_to_used(self._worksheets[sheet_id], parse_areas(range_address))
+            sheet_operations.setdefault(sheet_id, []).append((rects, updates))
+
+        # 2. 在块上合并重叠区域，相同样式组合归入共享样式表，再按样式合并为矩形区域
+        for sheet_id, operations in sheet_operations.items():
+            worksheet = self._worksheets[sheet_id]
+            style_table = coalesce_rects(operations)
+            stats['styles'] += len(style_table)
+            for style, rects in style_table.items():
+                stats['ranges'] += len(rects)
+                for address in join_addresses(rects):
+                    stats['calls'] += self.apply_style(worksheet.Range(address), dict(style))
+
+        # 3. 非单元格样式操作去重后按记录顺序转发
+        seen = set()
+        for method, args, kwargs in self._forwarded:
+            key = (method, repr(args), repr(sorted(kwargs.items())))
+            if key in seen:
+                continue
+            seen.add(key)
+            getattr(self.format_module, method)(*args, **kwargs)
+            stats['calls'] += 1
+
+        self.clear()
+        logger.debug(f"格式事务已提交: {stats}")
+        return stats
+
+    def clear(self) -> None:
+        """丢弃所有未提交的操作"""
+        self._worksheets.clear()
+        self._operations.clear()
+        self._forwarded.clear()
+
+    @staticmethod
+    def apply_style(cell_range: Any, updates: Dict[str, Any]) -> int:
+        """
+        立即在区域上设置一组样式（不经过事务记录）
+
+        Args:
+            cell_range: 区域对象
+            updates: 样式键到值的映射
+
+        Returns:
+            属性设置次数
+        """
+        calls = 0
+        for key, value in updates.items():
+            owner, attribute = STYLE_ATTRIBUTES[key]
+            target = getattr(cell_range, owner) if owner else cell_range
+            setattr(target, attribute, value)
+            calls += 1
+        return calls
+
+    def __enter__(self) -> 'FormatTransaction':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.clear()
+
+    def _forward(self, method: str, args: tuple, kwargs: Dict[str, Any]) -> None:
+        if self.format_module is None:
+            raise ValueError(f"{method} 需要在创建事务时提供 format_module")
+        self._forwarded.append((method, args, kwargs))
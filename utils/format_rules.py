@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午11:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：format_rules.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+按规则批量设置格式
+代替逐个单元格判断并设置格式的宏（如 For Each cell ... If cell.Value > 10000 Then ...）：
+一次读取数据区域，用 NumPy 对整列计算条件得到单元格掩码，
+再把掩码合并为尽量少的矩形区域，同一规则的所有区域以一个样式批量设置。
+不需要启用宏，也不受 SECURITY_CONFIG 中宏信任设置的限制。
+"""
+
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from utils.format_batch import BORDER_WEIGHTS, HORIZONTAL, LINE_STYLES, FormatTransaction, Rect, \
+    join_addresses, mask_to_rects, resolve_color
+from utils.frame_bridge import column_to_array
+from utils.range_address import column_letter_to_index, parse_range
+
+_COMPARISONS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# 规则样式参数到样式键的映射
+_STYLE_KEYS = {
+    'fill_color': ('fill_color', resolve_color),
+    'font_color': ('font_color', resolve_color),
+    'bold': ('font_bold', bool),
+    'italic': ('font_italic', bool),
+    'font_size': ('font_size', float),
+    'number_format': ('number_format', str),
+    'horizontal': ('horizontal_alignment', lambda value: HORIZONTAL.get(value, value)),
+    'border_style': ('border_style', lambda value: LINE_STYLES.get(value, value)),
+    'border_weight': ('border_weight', lambda value: BORDER_WEIGHTS.get(value, value)),
+}
+
+Predicate = Union[Callable[[np.ndarray], np.ndarray], Tuple[Any, ...]]
+
+_COLUMN_LETTERS = re.compile(r'^[A-Za-z]{1,3}$')
+
+
+def numeric_array(values: np.ndarray) -> np.ndarray:
+    """
+    转换为 float64 数组，非数值（文本、空单元格、布尔值）为 NaN，与 VBA 的 IsNumeric 判断一致
+
+    Args:
+        values: column_to_array 的结果
+
+    Returns:
+        float64 数组
+    """
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64, copy=False)
+    if values.dtype.kind == 'b':
+        return np.full(len(values), np.nan)
+    return np.array([value if isinstance(value, (int, float, np.integer, np.floating))
+                     and not isinstance(value, (bool, np.bool_)) else np.nan for value in values], dtype=np.float64)
+
+
+class FormatRule:
+    """
+    格式规则
+
+    用法:
+        FormatRule('工资', ('>', 10000), fill_color='YELLOW', bold=True)
+        FormatRule('D', lambda values: values > 10000, fill_color=(255, 255, 0))
+        FormatRule('绩效', ('in', ['优秀', '良好']), target='row', fill_color='LIGHT_BLUE')
+
+    column 可以是标题名称、列字母或区域内的列序号（从1开始），先按标题匹配（包括 2024 这样的数字标题）；
+    predicate 可以是比较元组（'>'、'>='、'<'、'<='、'=='、'!='、'between'、'in'）
+    或接收整列数组、返回布尔数组的函数，无法比较的值（如文本与数值比较大小）视为不满足；target 为 'cell' 时只设置满足条件的单元格，为 'row' 时设置整行。
+    """
+
+    def __init__(self, column: Union[str, int], predicate: Predicate, target: str = 'cell',
+                 numeric: bool = True, **style):
+        """
+        Args:
+            column: 条件列
+            predicate: 条件
+            target: 'cell' 或 'row'
+            numeric: 为 True 时函数条件收到数值数组（非数值为 NaN），否则收到原始值数组
+            **style: fill_color、font_color、bold、italic、font_size、number_format、horizontal、
+                     border_style、border_weight
+        """
+        if target not in ('cell', 'row'):
+            raise ValueError(f"不支持的规则目标: {target}，可选 'cell'、'row'")
+        unknown = set(style) - set(_STYLE_KEYS)
+        if unknown:
+            raise ValueError(f"不支持的样式参数: {sorted(unknown)}，可选 {list(_STYLE_KEYS)}")
+        self.column = column
+        self.predicate = predicate
+        self.target = target
+        self.numeric = numeric
+        self.style = style
+
+    def updates(self) -> Dict[str, Any]:
+        """转换为 FormatTransaction 使用的样式键"""
+        updates = {}
+        for name, value in self.style.items():
+            if value is not None:
+                key, convert = _STYLE_KEYS[name]
+                updates[key] = convert(value)
+        return updates
+
+    def evaluate(self, values: np.ndarray) -> np.ndarray:
+        """
+        计算条件
+
+        Args:
+            values: 条件列的值（column_to_array 的结果）
+
+        Returns:
+            布尔数组
+        """
+        predicate = self.predicate
+        if callable(predicate):
+            result = predicate(numeric_array(values) if self.numeric else values)
+            return np.asarray(result, dtype=bool)
+        op, *args = predicate
+        if op == 'in':
+            choices = set(args[0])
+            return np.fromiter((value in choices for value in values.tolist()), dtype=bool, count=len(values))
+        if op == 'between':
+            numbers = numeric_array(values)
+            low, high = args
+            return (numbers >= low) & (numbers <= high)
+        if op not in _COMPARISONS:
+            raise ValueError(f"不支持的比较运算: {op}")
+        target = args[0]
+        if isinstance(target, (int, float)) and not isinstance(target, bool):
+            with np.errstate(invalid='ignore'):
+                return _COMPARISONS[op](numeric_array(values), target)
+        compare = _COMPARISONS[op]
+        return np.fromiter((_compare(compare, value, target) for value in values.tolist()),
+                           dtype=bool, count=len(values))
+
+
+def _compare(compare: Callable[[Any, Any], bool], value: Any, target: Any) -> bool:
+    """比较单元格值，空单元格和无法比较的值（例如文本与数值比较大小）为 False"""
+    if value is None:
+        return False
+    try:
+        return bool(compare(value, target))
+    except TypeError:
+        return False
+
+
+def _column_index(column: Union[str, int], header: Optional[Sequence[Any]], first_col: int, width: int) -> int:
+    """
+    条件列在数据区域中的位置（从0开始）
+
+    先按标题查找（数字标题如 2024 也可以直接指定），找不到时整数视为列序号、列字母视为工作表的列。
+    """
+    index = _header_position(column, header)
+    if index is None:
+        if isinstance(column, int) and not isinstance(column, bool):
+            index = column - 1
+        elif isinstance(column, str) and _COLUMN_LETTERS.match(column):
+            index = column_letter_to_index(column) - first_col
+        elif header is not None:
+            raise ValueError(f"标题行中没有条件列: {column!r}，可选 {list(header)}")
+        else:
+            raise ValueError(f"数据区域没有标题行，条件列须为列字母或列序号: {column!r}")
+    if not 0 <= index < width:
+        raise ValueError(f"条件列不在数据区域内: {column}")
+    return index
+
+
+def _header_position(column: Any, header: Optional[Sequence[Any]]) -> Optional[int]:
+    # COM 返回的数字标题为 float，2024 与 2024.0 视为相同，但布尔值不与数字匹配
+    if header is None:
+        return None
+    for position, name in enumerate(header):
+        if name == column and isinstance(name, bool) == isinstance(column, bool):
+            return position
+    return None
+
+
+def evaluate_rules(worksheet: Any, data_range: str, rules: Sequence[FormatRule],
+                   header: bool = True) -> List[Tuple[FormatRule, List[Rect]]]:
+    """
+    计算每条规则命中的矩形区域（一次读取数据区域）
+
+    Args:
+        worksheet: 工作表对象（COM 或无界面后端）
+        data_range: 数据区域地址，例如 'A1:E100001'
+        rules: 规则列表
+        header: 第一行是否为标题
+
+    Returns:
+        [(规则, 矩形区域列表)]
+    """
+    first_row, first_col, last_row, last_col = parse_range(data_range)
+    values = worksheet.Range(data_range).Value
+    if not isinstance(values, tuple):
+        values = ((values,),)
+    names = values[0] if header else None
+    rows = values[1:] if header else values
+    data_first_row = first_row + 1 if header else first_row
+    width = last_col - first_col + 1
+    columns: Dict[int, np.ndarray] = {}
+    results = []
+    for rule in rules:
+        index = _column_index(rule.column, names, first_col, width)
+        if index not in columns:
+            columns[index] = column_to_array([row[index] for row in rows])
+        mask = rule.evaluate(columns[index])
+        if rule.target == 'row':
+            rects = mask_to_rects(mask, data_first_row, first_col)
+            rects = [(top, first_col, bottom, last_col) for top, _, bottom, _ in rects]
+        else:
+            rects = mask_to_rects(mask, data_first_row, first_col + index)
+        results.append((rule, rects))
+    return results
+
+
+def apply_rules(worksheet: Any, data_range: str, rules: Sequence[FormatRule], header: bool = True,
+                transaction: FormatTransaction = None) -> Dict[str, int]:
+    """
+    按规则设置格式，后面的规则覆盖前面规则的同名样式属性
+
+    Args:
+        worksheet: 工作表对象（COM 或无界面后端）
+        data_range: 数据区域地址
+        rules: 规则列表
+        header: 第一行是否为标题
+        transaction: 格式事务；提供时只记录，由调用方统一提交，否则立即设置
+
+    Returns:
+        统计信息：cells（命中的单元格数）、ranges（矩形区域数）、calls（属性设置次数，记录到事务时为 0）
+    """
+    stats = {'cells': 0, 'ranges': 0, 'calls': 0}
+    for rule, rects in evaluate_rules(worksheet, data_range, rules, header):
+        stats['cells'] += sum((bottom - top + 1) * (right - left + 1) for top, left, bottom, right in rects)
+        stats['ranges'] += len(rects)
+        updates = rule.updates()
+        if not rects or not updates:
+            continue
+        for address in join_addresses(rects):
+            if transaction is not None:
+                transaction.record(worksheet, address, updates)
+            else:
+                stats['calls'] += FormatTransaction.apply_style(worksheet.Range(address), updates)
+    logger.debug(f"格式规则已应用: {data_range} {stats}")
+    return stats
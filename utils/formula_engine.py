@@ -0,0 +1,1210 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午08:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：formula_engine.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+进程内公式计算引擎
+解析无界面后端工作簿中的公式（SUM、AVERAGE、COUNT、IF、VLOOKUP、SUMIFS 等常用函数），
+建立单元格依赖关系图。修改某个单元格后只重新计算依赖它的公式，
+区域汇总和条件统计在 NumPy 数组上完成，同一区域的数组会被缓存复用。
+
+用法:
+    engine = workbook.formula_engine()
+    ws.Range('B2').Value = 100
+    ws.Range('B7').Value          # 读取时自动重新计算受影响的公式
+"""
+
+import math
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from loguru import logger
+
+from utils.range_address import MAX_COLUMNS, MAX_ROWS, column_letter_to_index, format_cell, parse_cell
+
+Area = Tuple[int, int, int, int]
+CellKey = Tuple[Any, int, int]
+
+# 手动计算模式（Application.Calculation 的取值）
+MANUAL_CALCULATION = ('manual', -4135)
+
+
+class CellError:
+    """单元格错误值，如 #DIV/0!、#N/A"""
+
+    __slots__ = ('code',)
+
+    def __init__(self, code: str):
+        self.code = code
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, CellError) and other.code == self.code
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+    def __repr__(self) -> str:
+        return self.code
+
+    __str__ = __repr__
+
+
+ERROR_CODES = ('#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A')
+DIV0 = CellError('#DIV/0!')
+VALUE = CellError('#VALUE!')
+REF = CellError('#REF!')
+NAME = CellError('#NAME?')
+NUM = CellError('#NUM!')
+NA = CellError('#N/A')
+
+
+class FormulaError(Exception):
+    """公式求值过程中产生的错误，携带对应的单元格错误值"""
+
+    def __init__(self, error: CellError):
+        super().__init__(error.code)
+        self.error = error
+
+
+class FormulaSyntaxError(ValueError):
+    """公式语法错误"""
+
+
+# ---- 词法与语法分析 ----
+
+_REF = r"\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?|\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}"
+_SHEET = r"(?:'(?:[^']|'')+'|[^\W\d][\w.]*)!"
+_TOKEN_PATTERN = re.compile('|'.join([
+    r"(?P<ws>\s+)",
+    r'(?P<string>"(?:[^"]|"")*")',
+    r"(?P<error>#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A))",
+    rf"(?P<ref>(?:{_SHEET})?(?:{_REF}))(?![\w(!])",
+    r"(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)",
+    r"(?P<func>[A-Za-z_][\w.]*)(?=\s*\()",
+    r"(?P<bool>(?i:TRUE|FALSE))(?![\w(])",
+    r"(?P<name>[A-Za-z_][\w.]*)",
+    r"(?P<op><>|<=|>=|[-+*/^&=<>%(),;])",
+]))
+
+_COMPARISONS = ('=', '<>', '<', '>', '<=', '>=')
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """将公式文本（不含前导 '='）拆分为 (类型, 文本) 列表"""
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if match is None:
+            raise FormulaSyntaxError(f"无法解析的公式: {text[position:]}")
+        kind = match.lastgroup
+        if kind != 'ws':
+            tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _parse_reference(text: str) -> Tuple[Optional[str], Area]:
+    sheet = None
+    if '!' in text:
+        sheet, text = text.rsplit('!', 1)
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+    text = text.replace('$', '')
+    parts = text.split(':')
+    if len(parts) == 2 and parts[0].isalpha():
+        # 整列引用，如 A:D
+        first, last = column_letter_to_index(parts[0]), column_letter_to_index(parts[1])
+        return sheet, (1, min(first, last), MAX_ROWS, max(first, last))
+    row1, col1 = parse_cell(parts[0])
+    row2, col2 = parse_cell(parts[-1])
+    return sheet, (min(row1, row2), min(col1, col2), max(row1, row2), max(col1, col2))
+
+
+class _Parser:
+    """
+    递归下降语法分析，运算符优先级（由低到高）：
+    比较 < & < 加减 < 乘除 < 乘方 < 负号 < 百分号
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self) -> tuple:
+        node = self.comparison()
+        if self.position != len(self.tokens):
+            raise FormulaSyntaxError(f"多余的内容: {self.tokens[self.position][1]}")
+        return node
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, expected: str = None) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] is None or expected is not None and token[1] != expected:
+            raise FormulaSyntaxError(f"缺少 {expected or '表达式'}")
+        self.position += 1
+        return token
+
+    def binary(self, operand: Callable[[], tuple], operators: Tuple[str, ...]) -> tuple:
+        node = operand()
+        while self.peek()[0] == 'op' and self.peek()[1] in operators:
+            operator = self.take()[1]
+            node = ('bin', operator, node, operand())
+        return node
+
+    def comparison(self) -> tuple:
+        return self.binary(self.concat, _COMPARISONS)
+
+    def concat(self) -> tuple:
+        return self.binary(self.additive, ('&',))
+
+    def additive(self) -> tuple:
+        return self.binary(self.multiplicative, ('+', '-'))
+
+    def multiplicative(self) -> tuple:
+        return self.binary(self.power, ('*', '/'))
+
+    def power(self) -> tuple:
+        return self.binary(self.unary, ('^',))
+
+    def unary(self) -> tuple:
+        kind, text = self.peek()
+        if kind == 'op' and text in ('-', '+'):
+            self.take()
+            operand = self.unary()
+            return ('neg', operand) if text == '-' else operand
+        return self.postfix()
+
+    def postfix(self) -> tuple:
+        node = self.primary()
+        while self.peek() == ('op', '%'):
+            self.take()
+            node = ('pct', node)
+        return node
+
+    def primary(self) -> tuple:
+        kind, text = self.take()
+        if kind == 'number':
+            value = float(text)
+            return ('const', int(value) if value.is_integer() and 'e' not in text.lower() and '.' not in text
+                    else value)
+        if kind == 'string':
+            return ('const', text[1:-1].replace('""', '"'))
+        if kind == 'bool':
+            return ('const', text.upper() == 'TRUE')
+        if kind == 'error':
+            return ('const', CellError(text))
+        if kind == 'ref':
+            sheet, area = _parse_reference(text)
+            return ('ref', sheet, area)
+        if kind == 'name':
+            return ('const', NAME)
+        if kind == 'func':
+            self.take('(')
+            args = []
+            if self.peek() != ('op', ')'):
+                while True:
+                    if self.peek()[1] in (',', ';', ')'):
+                        args.append(('const', None))
+                    else:
+                        args.append(self.comparison())
+                    if self.peek()[1] in (',', ';'):
+                        self.take()
+                        continue
+                    break
+            self.take(')')
+            return ('func', text.upper(), args)
+        if (kind, text) == ('op', '('):
+            node = self.comparison()
+            self.take(')')
+            return node
+        raise FormulaSyntaxError(f"意外的符号: {text}")
+
+
+def parse_formula(formula: str) -> tuple:
+    """
+    解析公式为语法树
+
+    Args:
+        formula: 公式文本，例如 '=SUM(B2:B6)'
+
+    Returns:
+        语法树（嵌套元组）
+    """
+    text = formula[1:] if formula.startswith('=') else formula
+    return _Parser(tokenize(text)).parse()
+
+
+def iter_references(tree: tuple) -> Iterator[Tuple[Optional[str], Area]]:
+    """遍历语法树中的所有单元格/区域引用"""
+    kind = tree[0]
+    if kind == 'ref':
+        yield tree[1], tree[2]
+    elif kind == 'bin':
+        yield from iter_references(tree[2])
+        yield from iter_references(tree[3])
+    elif kind in ('neg', 'pct'):
+        yield from iter_references(tree[1])
+    elif kind == 'func':
+        for arg in tree[2]:
+            yield from iter_references(arg)
+
+
+def is_formula(value: Any) -> bool:
+    return isinstance(value, str) and len(value) > 1 and value[0] == '='
+
+
+# ---- 区域数据 ----
+
+class RangeData:
+    """
+    区域的值快照（按行展开），数值数组和查找索引按需生成并随快照缓存
+    """
+
+    __slots__ = ('values', 'rows', 'columns', '_numbers', '_texts', '_lookup')
+
+    def __init__(self, values: List[Any], rows: int, columns: int):
+        self.values = values
+        self.rows = rows
+        self.columns = columns
+        self._numbers: Optional[np.ndarray] = None
+        self._texts: Optional[np.ndarray] = None
+        self._lookup: Dict[int, Dict[Any, int]] = {}
+
+    @property
+    def numbers(self) -> np.ndarray:
+        """数值数组，非数值（文本、布尔、空）为 NaN；区域中有错误值时抛出该错误"""
+        if self._numbers is None:
+            numbers = np.full(len(self.values), np.nan)
+            for position, value in enumerate(self.values):
+                value_type = type(value)
+                if value_type is int or value_type is float:
+                    numbers[position] = value
+                elif value_type is CellError:
+                    raise FormulaError(value)
+            self._numbers = numbers
+        return self._numbers
+
+    @property
+    def texts(self) -> np.ndarray:
+        """小写文本数组（用于不区分大小写的比较），非文本为 None，空单元格为 ''"""
+        if self._texts is None:
+            texts = np.empty(len(self.values), dtype=object)
+            for position, value in enumerate(self.values):
+                texts[position] = value.lower() if isinstance(value, str) else ('' if value is None else None)
+            self._texts = texts
+        return self._texts
+
+    def column(self, index: int) -> List[Any]:
+        return self.values[index::self.columns]
+
+    def lookup_index(self, column: int) -> Dict[Any, int]:
+        """首次出现位置索引：列中的值（文本小写）-> 行偏移"""
+        index = self._lookup.get(column)
+        if index is None:
+            index = self._lookup[column] = {}
+            for row, value in enumerate(self.column(column)):
+                key = value.lower() if isinstance(value, str) else value
+                if key is not None and key not in index:
+                    index[key] = row
+        return index
+
+    def scalar(self) -> Any:
+        if len(self.values) != 1:
+            raise FormulaError(VALUE)
+        return self.values[0]
+
+
+# ---- 值转换 ----
+
+def to_number(value: Any) -> float:
+    if isinstance(value, RangeData):
+        value = value.scalar()
+    value_type = type(value)
+    if value_type is int or value_type is float:
+        return value
+    if value is None:
+        return 0
+    if value_type is bool:
+        return int(value)
+    if value_type is CellError:
+        raise FormulaError(value)
+    if value_type is str:
+        try:
+            return float(value.strip().replace(',', ''))
+        except ValueError:
+            raise FormulaError(VALUE)
+    raise FormulaError(VALUE)
+
+
+def to_text(value: Any) -> str:
+    if isinstance(value, RangeData):
+        value = value.scalar()
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, CellError):
+        raise FormulaError(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def to_bool(value: Any) -> bool:
+    if isinstance(value, RangeData):
+        value = value.scalar()
+    if isinstance(value, CellError):
+        raise FormulaError(value)
+    if isinstance(value, str):
+        if value.upper() in ('TRUE', 'FALSE'):
+            return value.upper() == 'TRUE'
+        raise FormulaError(VALUE)
+    return bool(value)
+
+
+def tidy_number(value: float) -> Any:
+    """整数结果以 int 返回，NaN/无穷大视为 #NUM!"""
+    if isinstance(value, (np.floating, np.integer)):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            raise FormulaError(NUM)
+        if value.is_integer() and abs(value) < 2 ** 53:
+            return int(value)
+    return value
+
+
+def _type_rank(value: Any) -> int:
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def compare(left: Any, right: Any, operator: str) -> bool:
+    """按 Excel 规则比较：数值 < 文本 < 逻辑值，文本不区分大小写，空单元格按对方类型取空值"""
+    if isinstance(left, CellError):
+        raise FormulaError(left)
+    if isinstance(right, CellError):
+        raise FormulaError(right)
+    if left is None:
+        left = '' if isinstance(right, str) else (False if isinstance(right, bool) else 0)
+    if right is None:
+        right = '' if isinstance(left, str) else (False if isinstance(left, bool) else 0)
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        left, right = left_rank, right_rank
+    elif left_rank == 1:
+        left, right = left.lower(), right.lower()
+    if operator == '=':
+        return left == right
+    if operator == '<>':
+        return left != right
+    if operator == '<':
+        return left < right
+    if operator == '>':
+        return left > right
+    if operator == '<=':
+        return left <= right
+    return left >= right
+
+
+# ---- 条件（SUMIF/COUNTIFS 等） ----
+
+_CRITERIA_PATTERN = re.compile(r"^(<=|>=|<>|<|>|=)?(.*)$", re.S)
+
+
+def criteria_mask(data: RangeData, criterion: Any) -> np.ndarray:
+    """
+    计算条件匹配掩码
+
+    Args:
+        data: 条件区域
+        criterion: 条件，如 10、'>=100'、'<>北京'、'产品*'
+
+    Returns:
+        布尔数组
+    """
+    if isinstance(criterion, RangeData):
+        criterion = criterion.scalar()
+    if isinstance(criterion, CellError):
+        raise FormulaError(criterion)
+    if isinstance(criterion, bool):
+        return np.array([value is criterion for value in data.values], dtype=bool)
+    if isinstance(criterion, (int, float)):
+        operator, operand = '=', criterion
+    else:
+        operator, text = _CRITERIA_PATTERN.match(str(criterion or '')).groups()
+        operator = operator or '='
+        try:
+            operand = float(text)
+        except ValueError:
+            operand = text
+
+    if isinstance(operand, float) or isinstance(operand, int):
+        numbers = data.numbers
+        with np.errstate(invalid='ignore'):
+            if operator == '=':
+                return numbers == operand
+            if operator == '<>':
+                return ~(numbers == operand)
+            if operator == '<':
+                return numbers < operand
+            if operator == '>':
+                return numbers > operand
+            if operator == '<=':
+                return numbers <= operand
+            return numbers >= operand
+
+    texts = data.texts
+    operand = operand.lower()
+    if operator in ('=', '<>'):
+        if '*' in operand or '?' in operand:
+            regex = re.compile(_wildcard_to_regex(operand), re.S)
+            mask = np.array([text is not None and regex.fullmatch(text) is not None for text in texts], dtype=bool)
+        elif operand == '':
+            mask = np.array([value is None for value in data.values], dtype=bool)
+        else:
+            mask = texts == operand
+        return mask if operator == '=' else ~mask
+    return np.array([text is not None and text != '' and compare(text, operand, operator) for text in texts],
+                    dtype=bool)
+
+
+def _wildcard_to_regex(pattern: str) -> str:
+    parts = []
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        if char == '~' and position + 1 < len(pattern):
+            parts.append(re.escape(pattern[position + 1]))
+            position += 2
+            continue
+        parts.append('.*' if char == '*' else '.' if char == '?' else re.escape(char))
+        position += 1
+    return ''.join(parts)
+
+
+# ---- 函数 ----
+
+def _numbers_of(args: List[Any]) -> np.ndarray:
+    """区域参数取其中的数值，直接给出的参数按数值转换"""
+    arrays = []
+    for arg in args:
+        if isinstance(arg, RangeData):
+            numbers = arg.numbers
+            arrays.append(numbers[~np.isnan(numbers)])
+        elif arg is not None:
+            arrays.append(np.array([to_number(arg)], dtype=float))
+    return np.concatenate(arrays) if arrays else np.empty(0)
+
+
+def _fn_sum(args: List[Any]) -> Any:
+    return tidy_number(float(np.sum(_numbers_of(args))))
+
+
+def _fn_average(args: List[Any]) -> Any:
+    numbers = _numbers_of(args)
+    if not len(numbers):
+        raise FormulaError(DIV0)
+    return tidy_number(float(np.mean(numbers)))
+
+
+def _fn_min(args: List[Any]) -> Any:
+    numbers = _numbers_of(args)
+    return tidy_number(float(np.min(numbers))) if len(numbers) else 0
+
+
+def _fn_max(args: List[Any]) -> Any:
+    numbers = _numbers_of(args)
+    return tidy_number(float(np.max(numbers))) if len(numbers) else 0
+
+
+def _fn_count(args: List[Any]) -> int:
+    count = 0
+    for arg in args:
+        if isinstance(arg, RangeData):
+            count += int(np.count_nonzero(~np.isnan(_safe_numbers(arg))))
+        else:
+            try:
+                to_number(arg)
+                count += arg is not None
+            except FormulaError:
+                pass
+    return count
+
+
+def _safe_numbers(data: RangeData) -> np.ndarray:
+    # COUNT 忽略区域中的错误值
+    return np.array([value if type(value) in (int, float) else np.nan for value in data.values], dtype=float)
+
+
+def _fn_counta(args: List[Any]) -> int:
+    count = 0
+    for arg in args:
+        if isinstance(arg, RangeData):
+            count += sum(value is not None and value != '' for value in arg.values)
+        else:
+            count += arg is not None
+    return count
+
+
+def _fn_and(args: List[Any]) -> bool:
+    return all(_logicals(args))
+
+
+def _fn_or(args: List[Any]) -> bool:
+    return any(_logicals(args))
+
+
+def _logicals(args: List[Any]) -> List[bool]:
+    values = []
+    for arg in args:
+        if isinstance(arg, RangeData):
+            for value in arg.values:
+                if isinstance(value, CellError):
+                    raise FormulaError(value)
+                if isinstance(value, (bool, int, float)):
+                    values.append(bool(value))
+        else:
+            values.append(to_bool(arg))
+    if not values:
+        raise FormulaError(VALUE)
+    return values
+
+
+def _fn_not(args: List[Any]) -> bool:
+    return not to_bool(_single(args))
+
+
+def _fn_round(args: List[Any]) -> Any:
+    number = to_number(args[0])
+    digits = int(to_number(args[1])) if len(args) > 1 else 0
+    scale = 10 ** digits
+    # Excel 的 ROUND 为四舍五入（远离零），而不是银行家舍入
+    rounded = math.floor(abs(number) * scale + 0.5 + 1e-9) / scale
+    return tidy_number(math.copysign(rounded, number))
+
+
+def _fn_abs(args: List[Any]) -> Any:
+    return tidy_number(abs(to_number(_single(args))))
+
+
+def _fn_len(args: List[Any]) -> int:
+    return len(to_text(_single(args)))
+
+
+def _fn_concatenate(args: List[Any]) -> str:
+    return ''.join(to_text(arg) for arg in args)
+
+
+def _single(args: List[Any]) -> Any:
+    if len(args) != 1:
+        raise FormulaError(VALUE)
+    return args[0]
+
+
+def _require_range(value: Any) -> RangeData:
+    if not isinstance(value, RangeData):
+        raise FormulaError(VALUE)
+    return value
+
+
+def _fn_vlookup(args: List[Any]) -> Any:
+    if len(args) < 3:
+        raise FormulaError(VALUE)
+    lookup = args[0].scalar() if isinstance(args[0], RangeData) else args[0]
+    if isinstance(lookup, CellError):
+        raise FormulaError(lookup)
+    table = _require_range(args[1])
+    column = int(to_number(args[2]))
+    exact = len(args) > 3 and args[3] is not None and not to_bool(args[3])
+    if not 1 <= column <= table.columns:
+        raise FormulaError(REF)
+    if exact:
+        key = lookup.lower() if isinstance(lookup, str) else lookup
+        row = table.lookup_index(0).get(key)
+        if row is None:
+            raise FormulaError(NA)
+    else:
+        # 近似匹配：首列按升序排列，取不大于查找值的最后一行
+        row = None
+        for position, value in enumerate(table.column(0)):
+            if value is None or _type_rank(value) != _type_rank(lookup):
+                continue
+            if compare(value, lookup, '<='):
+                row = position
+            else:
+                break
+        if row is None:
+            raise FormulaError(NA)
+    value = table.values[row * table.columns + column - 1]
+    return 0 if value is None else value
+
+
+def _conditional_mask(args: List[Any], start: int) -> Tuple[np.ndarray, RangeData]:
+    if len(args) < start + 2 or (len(args) - start) % 2:
+        raise FormulaError(VALUE)
+    mask = None
+    shape = None
+    for position in range(start, len(args), 2):
+        data = _require_range(args[position])
+        if shape is not None and (data.rows, data.columns) != shape:
+            raise FormulaError(VALUE)
+        shape = (data.rows, data.columns)
+        current = criteria_mask(data, args[position + 1])
+        mask = current if mask is None else mask & current
+    return mask, _require_range(args[start])
+
+
+def _sum_values(data: RangeData, mask: np.ndarray) -> np.ndarray:
+    if data.rows * data.columns != len(mask):
+        raise FormulaError(VALUE)
+    numbers = data.numbers[mask]
+    return numbers[~np.isnan(numbers)]
+
+
+def _fn_sumifs(args: List[Any]) -> Any:
+    mask, _ = _conditional_mask(args, 1)
+    return tidy_number(float(np.sum(_sum_values(_require_range(args[0]), mask))))
+
+
+def _fn_averageifs(args: List[Any]) -> Any:
+    mask, _ = _conditional_mask(args, 1)
+    numbers = _sum_values(_require_range(args[0]), mask)
+    if not len(numbers):
+        raise FormulaError(DIV0)
+    return tidy_number(float(np.mean(numbers)))
+
+
+def _fn_countifs(args: List[Any]) -> int:
+    mask, _ = _conditional_mask(args, 0)
+    return int(np.count_nonzero(mask))
+
+
+def _fn_sumif(args: List[Any]) -> Any:
+    if len(args) not in (2, 3):
+        raise FormulaError(VALUE)
+    sum_range = args[2] if len(args) == 3 else args[0]
+    return _fn_sumifs([sum_range, args[0], args[1]])
+
+
+def _fn_averageif(args: List[Any]) -> Any:
+    if len(args) not in (2, 3):
+        raise FormulaError(VALUE)
+    average_range = args[2] if len(args) == 3 else args[0]
+    return _fn_averageifs([average_range, args[0], args[1]])
+
+
+def _fn_countif(args: List[Any]) -> int:
+    if len(args) != 2:
+        raise FormulaError(VALUE)
+    return _fn_countifs(args)
+
+
+FUNCTIONS: Dict[str, Callable[[List[Any]], Any]] = {
+    'SUM': _fn_sum,
+    'AVERAGE': _fn_average,
+    'MIN': _fn_min,
+    'MAX': _fn_max,
+    'COUNT': _fn_count,
+    'COUNTA': _fn_counta,
+    'AND': _fn_and,
+    'OR': _fn_or,
+    'NOT': _fn_not,
+    'ROUND': _fn_round,
+    'ABS': _fn_abs,
+    'LEN': _fn_len,
+    'CONCATENATE': _fn_concatenate,
+    'VLOOKUP': _fn_vlookup,
+    'SUMIF': _fn_sumif,
+    'SUMIFS': _fn_sumifs,
+    'COUNTIF': _fn_countif,
+    'COUNTIFS': _fn_countifs,
+    'AVERAGEIF': _fn_averageif,
+    'AVERAGEIFS': _fn_averageifs,
+}
+
+
+# ---- 引擎 ----
+
+class _AreaIndex:
+    """
+    区域索引：按列和行段分桶，查找包含某个单元格的区域时只检查该单元格所在桶中的区域
+
+    跨越很多行段的区域（例如整列引用）按列单独保存。
+    """
+
+    BUCKET_ROWS = 64
+    MAX_BUCKETS = 16
+
+    __slots__ = ('_buckets', '_wide')
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, int], Set[Tuple[Area, Any]]] = {}
+        self._wide: Dict[int, Set[Tuple[Area, Any]]] = {}
+
+    def add(self, area: Area, item: Any) -> None:
+        entry = (area, item)
+        for table, slot in self._slots(area):
+            table.setdefault(slot, set()).add(entry)
+
+    def discard(self, area: Area, item: Any) -> None:
+        entry = (area, item)
+        for table, slot in self._slots(area):
+            entries = table.get(slot)
+            if entries is not None:
+                entries.discard(entry)
+                if not entries:
+                    del table[slot]
+
+    def find(self, row: int, col: int) -> List[Any]:
+        """包含 (row, col) 的区域对应的项"""
+        found = []
+        for entries in (self._buckets.get((col, (row - 1) // self.BUCKET_ROWS)), self._wide.get(col)):
+            if entries:
+                found.extend(item for area, item in entries if area[0] <= row <= area[2])
+        return found
+
+    def _slots(self, area: Area) -> Iterator[Tuple[dict, Any]]:
+        first_row, first_col, last_row, last_col = area
+        first, last = (first_row - 1) // self.BUCKET_ROWS, (last_row - 1) // self.BUCKET_ROWS
+        wide = last - first >= self.MAX_BUCKETS
+        for col in range(first_col, min(last_col, MAX_COLUMNS) + 1):
+            if wide:
+                yield self._wide, col
+            else:
+                for bucket in range(first, last + 1):
+                    yield self._buckets, (col, bucket)
+
+
+class _Formula:
+    __slots__ = ('text', 'tree', 'cells', 'ranges')
+
+    def __init__(self, text: str, tree: tuple, cells: Set[CellKey], ranges: List[Tuple[Any, Area]]):
+        self.text = text
+        self.tree = tree
+        self.cells = cells
+        self.ranges = ranges
+
+
+class FormulaEngine:
+    """
+    工作簿公式引擎
+
+    通过 HeadlessWorkbook.formula_engine() 创建后，工作表的每次写入都会通知引擎：
+    被修改的单元格及其所有下游公式被标记为待计算，读取时（或调用 recalculate() 时）
+    按依赖顺序只计算这些公式。手动计算模式下只在 recalculate() 时计算。
+    """
+
+    def __init__(self, workbook: Any):
+        self.workbook = workbook
+        self._formulas: Dict[CellKey, _Formula] = {}
+        self._values: Dict[CellKey, Any] = {}
+        self._dirty: Set[CellKey] = set()
+        # 单元格 -> 直接引用它的公式
+        self._cell_dependents: Dict[CellKey, Set[CellKey]] = {}
+        # 工作表 -> 区域索引（区域 -> 公式），用于查找引用了某单元格所在区域的公式
+        self._range_dependents: Dict[Any, _AreaIndex] = {}
+        # 工作表 -> 列 -> 该列中的公式行号
+        self._formula_rows: Dict[Any, Dict[int, Set[int]]] = {}
+        # 区域计算结果缓存，以及按单元格查找缓存区域的索引
+        self._range_cache: Dict[Any, Dict[Area, RangeData]] = {}
+        self._cache_index: Dict[Any, _AreaIndex] = {}
+        self._bounds: Dict[Any, Optional[Area]] = {}
+        self.load()
+
+    @property
+    def formula_count(self) -> int:
+        return len(self._formulas)
+
+    @property
+    def pending(self) -> int:
+        """待计算的公式数"""
+        return len(self._dirty)
+
+    def load(self) -> None:
+        """扫描工作簿中的全部公式并建立依赖关系"""
+        for worksheet in self.workbook.Worksheets:
+            for (row, col), value in list(worksheet._cells.items()):
+                if is_formula(value):
+                    self._register((worksheet, row, col), value)
+        logger.debug(f"公式引擎已载入 {len(self._formulas)} 个公式")
+
+    # ---- 写入通知 ----
+
+    def cell_changed(self, worksheet: Any, row: int, col: int, value: Any) -> None:
+        """
+        单元格内容变化（由工作表写入时调用）
+
+        Args:
+            worksheet: 工作表
+            row: 行号
+            col: 列号
+            value: 新内容（公式以 '=' 开头）
+        """
+        key = (worksheet, row, col)
+        if key in self._formulas:
+            if self._formulas[key].text == value:
+                return
+            self._unregister(key)
+        if is_formula(value):
+            self._register(key, value)
+        self._bounds.pop(worksheet, None)
+        self._invalidate_ranges(worksheet, row, col)
+        self._mark_dependents(key)
+
+    # ---- 取值 ----
+
+    def get_value(self, worksheet: Any, row: int, col: int) -> Any:
+        """获取单元格的计算结果（非公式单元格返回其内容）"""
+        key = (worksheet, row, col)
+        if key not in self._formulas:
+            return worksheet._cells.get((row, col))
+        if self._dirty and self._automatic:
+            self.recalculate()
+        return self._values.get(key)
+
+    def resolve(self, worksheet: Any, values: tuple, first_row: int, first_col: int) -> tuple:
+        """
+        将 Range.Formula 形式的二维内容转换为计算结果
+
+        Args:
+            worksheet: 工作表
+            values: 区域内容（二维元组）
+            first_row: 区域起始行
+            first_col: 区域起始列
+        """
+        if self._dirty and self._automatic:
+            self.recalculate()
+        return tuple(
+            tuple(self._display(worksheet, value, first_row + row_offset, first_col + col_offset)
+                  for col_offset, value in enumerate(line))
+            for row_offset, line in enumerate(values)
+        )
+
+    def computed_values(self) -> Dict[CellKey, Any]:
+        """全部公式的计算结果（必要时先重新计算）"""
+        if self._dirty:
+            self.recalculate()
+        return self._values
+
+    def seed(self, values: Dict[CellKey, Any]) -> int:
+        """
+        以已知结果（例如文件中的公式缓存值）作为公式的计算结果，这些公式不再标记为待计算
+
+        Args:
+            values: (工作表, 行, 列) 到计算结果的映射
+
+        Returns:
+            采用的结果数
+        """
+        seeded = 0
+        for key, value in values.items():
+            if key in self._formulas:
+                self._values[key] = value
+                self._dirty.discard(key)
+                seeded += 1
+        logger.debug(f"公式引擎采用缓存值 {seeded} 个，待计算 {len(self._dirty)} 个")
+        return seeded
+
+    def evaluate(self, formula: str, worksheet: Any = None) -> Any:
+        """
+        计算一个不写入单元格的公式，例如校验汇总值
+
+        Args:
+            formula: 公式文本
+            worksheet: 公式中不带工作表名的引用所指的工作表，默认为活动工作表
+
+        Returns:
+            计算结果
+        """
+        if self._dirty:
+            self.recalculate()
+        worksheet = worksheet or self.workbook.ActiveSheet
+        return self._evaluate_tree(parse_formula(formula), worksheet)
+
+    # ---- 计算 ----
+
+    def recalculate(self) -> int:
+        """
+        按依赖顺序计算所有待计算的公式
+
+        Returns:
+            计算的公式数
+        """
+        if not self._dirty:
+            return 0
+        order, cyclic = self._calculation_order()
+        for key in order:
+            worksheet, row, col = key
+            value = 0 if key in cyclic else self._evaluate_tree(self._formulas[key].tree, worksheet)
+            if key not in self._values or self._values[key] != value or type(self._values[key]) is not type(value):
+                self._values[key] = value
+                self._invalidate_ranges(worksheet, row, col)
+        if cyclic:
+            logger.warning(f"检测到循环引用，相关公式按 0 计算: "
+                           f"{', '.join(f'{key[0].Name}!{format_cell(key[1], key[2])}' for key in list(cyclic)[:5])}")
+        self._dirty.clear()
+        return len(order)
+
+    def _calculation_order(self) -> Tuple[List[CellKey], Set[CellKey]]:
+        order: List[CellKey] = []
+        cyclic: Set[CellKey] = set()
+        state: Dict[CellKey, int] = {}  # 1 = 访问中, 2 = 已完成
+        for start in self._dirty:
+            if start in state:
+                continue
+            state[start] = 1
+            stack = [(start, iter(self._dirty_precedents(start)))]
+            while stack:
+                key, precedents = stack[-1]
+                advanced = False
+                for precedent in precedents:
+                    status = state.get(precedent)
+                    if status is None:
+                        state[precedent] = 1
+                        stack.append((precedent, iter(self._dirty_precedents(precedent))))
+                        advanced = True
+                        break
+                    if status == 1:
+                        # 回到正在访问的节点：栈中从该节点开始的公式构成循环
+                        for item, _ in stack[[entry[0] for entry in stack].index(precedent):]:
+                            cyclic.add(item)
+                if not advanced:
+                    stack.pop()
+                    state[key] = 2
+                    order.append(key)
+        return order, cyclic
+
+    def _dirty_precedents(self, key: CellKey) -> Iterator[CellKey]:
+        formula = self._formulas[key]
+        for cell in formula.cells:
+            if cell in self._dirty:
+                yield cell
+        for worksheet, (first_row, first_col, last_row, last_col) in formula.ranges:
+            columns = self._formula_rows.get(worksheet, {})
+            for col in range(first_col, min(last_col, MAX_COLUMNS) + 1):
+                rows = columns.get(col)
+                if not rows:
+                    continue
+                # 遍历区域的行和该列的公式行中较少的一方
+                if last_row - first_row + 1 < len(rows):
+                    candidates = (row for row in range(first_row, last_row + 1) if row in rows)
+                else:
+                    candidates = (row for row in rows if first_row <= row <= last_row)
+                for row in candidates:
+                    if (worksheet, row, col) in self._dirty:
+                        yield worksheet, row, col
+
+    def _evaluate_tree(self, tree: tuple, worksheet: Any) -> Any:
+        try:
+            result = self._eval(tree, worksheet)
+            if isinstance(result, RangeData):
+                result = result.scalar()
+            return 0 if result is None else result
+        except FormulaError as e:
+            return e.error
+        except (ZeroDivisionError, OverflowError):
+            return DIV0
+        except (ValueError, TypeError, IndexError):
+            return VALUE
+
+    def _eval(self, node: tuple, worksheet: Any) -> Any:
+        kind = node[0]
+        if kind == 'const':
+            return node[1]
+        if kind == 'ref':
+            target = self._sheet(node[1], worksheet)
+            first_row, first_col, last_row, last_col = node[2]
+            if first_row == last_row and first_col == last_col:
+                value = self._cell_value(target, first_row, first_col)
+                if isinstance(value, CellError):
+                    raise FormulaError(value)
+                return value
+            return self._range(target, node[2])
+        if kind == 'bin':
+            return self._binary(node[1], self._eval(node[2], worksheet), self._eval(node[3], worksheet))
+        if kind == 'neg':
+            return tidy_number(-to_number(self._eval(node[1], worksheet)))
+        if kind == 'pct':
+            return to_number(self._eval(node[1], worksheet)) / 100
+        name, args = node[1], node[2]
+        if name == 'IF':
+            if not 1 < len(args) < 4:
+                raise FormulaError(VALUE)
+            if to_bool(self._eval(args[0], worksheet)):
+                return self._eval(args[1], worksheet)
+            return self._eval(args[2], worksheet) if len(args) > 2 else False
+        if name == 'IFERROR':
+            if len(args) != 2:
+                raise FormulaError(VALUE)
+            try:
+                value = self._eval(args[0], worksheet)
+                if isinstance(value, RangeData):
+                    value = value.scalar()
+                return value
+            except FormulaError:
+                return self._eval(args[1], worksheet)
+        function = FUNCTIONS.get(name)
+        if function is None:
+            raise FormulaError(NAME)
+        return function([self._eval(arg, worksheet) for arg in args])
+
+    @staticmethod
+    def _binary(operator: str, left: Any, right: Any) -> Any:
+        if operator == '&':
+            return to_text(left) + to_text(right)
+        if operator in _COMPARISONS:
+            if isinstance(left, RangeData):
+                left = left.scalar()
+            if isinstance(right, RangeData):
+                right = right.scalar()
+            return compare(left, right, operator)
+        left, right = to_number(left), to_number(right)
+        if operator == '+':
+            return tidy_number(left + right)
+        if operator == '-':
+            return tidy_number(left - right)
+        if operator == '*':
+            return tidy_number(left * right)
+        if operator == '/':
+            if right == 0:
+                raise FormulaError(DIV0)
+            return tidy_number(left / right)
+        try:
+            return tidy_number(float(left) ** right)
+        except (OverflowError, ZeroDivisionError):
+            raise FormulaError(NUM)
+
+    # ---- 单元格与区域 ----
+
+    @property
+    def _automatic(self) -> bool:
+        return getattr(self.workbook.Application, 'Calculation', 'automatic') not in MANUAL_CALCULATION
+
+    def _display(self, worksheet: Any, value: Any, row: int, col: int) -> Any:
+        return value if not is_formula(value) else self._values.get((worksheet, row, col), value)
+
+    def _sheet(self, name: Optional[str], default: Any) -> Any:
+        if name is None:
+            return default
+        for worksheet in self.workbook.Worksheets:
+            if worksheet.Name.lower() == name.lower():
+                return worksheet
+        raise FormulaError(REF)
+
+    def _cell_value(self, worksheet: Any, row: int, col: int) -> Any:
+        key = (worksheet, row, col)
+        if key in self._formulas:
+            return self._values.get(key)
+        return worksheet._cells.get((row, col))
+
+    def _range(self, worksheet: Any, area: Area) -> RangeData:
+        cache = self._range_cache.setdefault(worksheet, {})
+        data = cache.get(area)
+        if data is None:
+            first_row, first_col, last_row, last_col = self._clip(worksheet, area)
+            cells = worksheet._cells
+            formulas = self._formulas
+            values_of = self._values
+            values = []
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    key = (worksheet, row, col)
+                    values.append(values_of.get(key) if key in formulas else cells.get((row, col)))
+            data = cache[area] = RangeData(values, max(last_row - first_row + 1, 0),
+                                           max(last_col - first_col + 1, 0))
+            self._cache_index.setdefault(worksheet, _AreaIndex()).add(area, area)
+        return data
+
+    def _clip(self, worksheet: Any, area: Area) -> Area:
+        first_row, first_col, last_row, last_col = area
+        if last_row < MAX_ROWS and last_col < MAX_COLUMNS:
+            return area
+        if worksheet not in self._bounds:
+            self._bounds[worksheet] = worksheet.used_bounds()
+        bounds = self._bounds[worksheet]
+        if bounds is None:
+            return first_row, first_col, first_row - 1, last_col
+        return first_row, first_col, min(last_row, bounds[2]), min(last_col, bounds[3])
+
+    def _invalidate_ranges(self, worksheet: Any, row: int, col: int) -> None:
+        cache = self._range_cache.get(worksheet)
+        if not cache:
+            return
+        index = self._cache_index[worksheet]
+        for area in index.find(row, col):
+            del cache[area]
+            index.discard(area, area)
+
+    # ---- 依赖关系 ----
+
+    def _register(self, key: CellKey, text: str) -> None:
+        worksheet, row, col = key
+        try:
+            tree = parse_formula(text)
+        except (FormulaSyntaxError, ValueError) as e:
+            logger.warning(f"无法解析公式 {worksheet.Name}!{format_cell(row, col)} {text}: {e}")
+            tree = ('const', NAME)
+        cells: Set[CellKey] = set()
+        ranges: List[Tuple[Any, Area]] = []
+        for sheet_name, area in iter_references(tree):
+            try:
+                target = self._sheet(sheet_name, worksheet)
+            except FormulaError:
+                continue
+            if area[0] == area[2] and area[1] == area[3]:
+                cells.add((target, area[0], area[1]))
+            else:
+                ranges.append((target, area))
+        formula = self._formulas[key] = _Formula(text, tree, cells, ranges)
+        for cell in formula.cells:
+            self._cell_dependents.setdefault(cell, set()).add(key)
+        for target, area in formula.ranges:
+            self._range_dependents.setdefault(target, _AreaIndex()).add(area, key)
+        self._formula_rows.setdefault(worksheet, {}).setdefault(col, set()).add(row)
+        self._dirty.add(key)
+
+    def _unregister(self, key: CellKey) -> None:
+        worksheet, row, col = key
+        formula = self._formulas.pop(key)
+        self._values.pop(key, None)
+        self._dirty.discard(key)
+        for cell in formula.cells:
+            dependents = self._cell_dependents.get(cell)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._cell_dependents[cell]
+        for target, area in formula.ranges:
+            index = self._range_dependents.get(target)
+            if index is not None:
+                index.discard(area, key)
+        self._formula_rows[worksheet][col].discard(row)
+
+    def _dependents_of(self, key: CellKey) -> Iterator[CellKey]:
+        worksheet, row, col = key
+        yield from self._cell_dependents.get(key, ())
+        index = self._range_dependents.get(worksheet)
+        if index is not None:
+            yield from index.find(row, col)
+
+    def _mark_dependents(self, key: CellKey) -> None:
+        queue = [key]
+        if key in self._formulas:
+            self._dirty.add(key)
+        while queue:
+            current = queue.pop()
+            for dependent in self._dependents_of(current):
+                if dependent not in self._dirty:
+                    self._dirty.add(dependent)
+                    queue.append(dependent)
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 下午03:40
+@Author  ：庄洪奎（ARTHUR)
+@FileName：frame_bridge.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+NumPy / pandas 数据桥接
+在单元格区域与按列存储的 DataFrame 之间整体转换：数值列转换为连续的
+int64/float64 数组，日期列转换为 datetime64，读写都只需要一次区域访问。
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from utils.range_address import format_range, parse_cell
+
+_NUMBER_TYPES = (int, float, np.integer, np.floating)
+_DATE_TYPES = (datetime, date, np.datetime64, pd.Timestamp)
+
+
+def column_to_array(values: Sequence[Any]) -> np.ndarray:
+    """
+    将一列单元格值转换为类型化的 NumPy 数组
+
+    Args:
+        values: 列中的值，空单元格为 None
+
+    Returns:
+        int64 / float64 / bool / datetime64[ns] 数组，无法统一类型时为 object 数组
+    """
+    types = set(map(type, values))
+    has_null = type(None) in types
+    types.discard(type(None))
+    if not types:
+        return np.full(len(values), np.nan)
+    if types == {bool}:
+        if has_null:
+            return np.array(values, dtype=object)
+        return np.array(values, dtype=bool)
+    if bool not in types and all(issubclass(kind, _NUMBER_TYPES) for kind in types):
+        if not has_null and all(issubclass(kind, (int, np.integer)) for kind in types):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if all(issubclass(kind, _DATE_TYPES) for kind in types):
+        return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy(dtype='datetime64[ns]')
+    return np.array(values, dtype=object)
+
+
+def records_to_frame(rows: Sequence[Sequence[Any]], header: bool = True) -> pd.DataFrame:
+    """
+    将二维列表（或 Range.Value 返回的元组）按列转换为 DataFrame
+
+    Args:
+        rows: 行数据
+        header: 第一行是否为列名
+
+    Returns:
+        DataFrame
+    """
+    rows = [list(row) for row in rows]
+    header_row = rows.pop(0) if header and rows else []
+    width = max([len(header_row)] + [len(row) for row in rows])
+    names = column_names(header_row, width) if header else list(range(width))
+    data: Dict[Any, np.ndarray] = dict(zip(names, _rows_to_columns(rows, width)))
+    return pd.DataFrame(data, columns=names)
+
+
+def column_names(header_row: Sequence[Any], width: int) -> List[str]:
+    """
+    生成列名：空标题为 '列N'，重复的标题依次加 '.1'、'.2' 后缀（与 pandas.read_csv 一致）
+
+    Args:
+        header_row: 标题行
+        width: 列数（可以多于标题行的长度）
+
+    Returns:
+        不重复的列名列表
+    """
+    names: List[str] = []
+    used = set()
+    suffixes: Dict[str, int] = {}
+    for position in range(width):
+        name = header_row[position] if position < len(header_row) else None
+        base = str(name) if name is not None else f'列{position + 1}'
+        candidate = base
+        while candidate in used:
+            suffixes[base] = suffixes.get(base, 0) + 1
+            candidate = f'{base}.{suffixes[base]}'
+        used.add(candidate)
+        names.append(candidate)
+    return names
+
+
+def _rows_to_columns(rows: List[List[Any]], width: int) -> List[np.ndarray]:
+    """行数据按列转换为类型化数组（不足 width 的行补 None）"""
+    for row in rows:
+        if len(row) < width:
+            row.extend([None] * (width - len(row)))
+    columns = list(zip(*rows)) if rows else [()] * width
+    return [column_to_array(list(column)) for column in columns[:width]]
+
+
+def _merge_chunks(arrays: List[np.ndarray]) -> np.ndarray:
+    """拼接各块的同一列；各块类型不一致时按整列重新推断类型，结果与一次转换整列相同"""
+    if len(arrays) == 1:
+        return arrays[0]
+    if len({array.dtype for array in arrays}) == 1:
+        return np.concatenate(arrays)
+    values: List[Any] = []
+    for array in arrays:
+        values.extend(_series_to_list(pd.Series(array)))
+    return column_to_array(values)
+
+
+def frame_to_records(frame: pd.DataFrame, header: bool = True, index: bool = False) -> List[List[Any]]:
+    """
+    将 DataFrame 按列转换为可写入区域的二维列表
+
+    数值列整体调用 tolist()，缺失值统一转换为 None。
+
+    Args:
+        frame: DataFrame
+        header: 是否输出列名行
+        index: 是否输出索引列
+
+    Returns:
+        二维列表
+    """
+    if index:
+        frame = frame.reset_index()
+    columns: List[List[Any]] = []
+    for name in frame.columns:
+        columns.append(_series_to_list(frame[name]))
+    rows = [list(row) for row in zip(*columns)] if columns else []
+    if header:
+        rows.insert(0, [str(name) for name in frame.columns])
+    return rows
+
+
+def _series_to_list(series: pd.Series) -> List[Any]:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # 每个类别只转换一次，各行引用同一个对象
+        categories = _series_to_list(pd.Series(series.cat.categories))
+        return [categories[code] if code >= 0 else None for code in series.cat.codes.tolist()]
+    kind = series.dtype.kind
+    if kind in 'iub':
+        return series.tolist()
+    if kind == 'f':
+        values = series.to_numpy()
+        mask = np.isnan(values)
+        result = values.tolist()
+        if mask.any():
+            for position in np.flatnonzero(mask).tolist():
+                result[position] = None
+        return result
+    if kind == 'M':
+        timestamps = series.dt.tz_localize(None) if series.dt.tz is not None else series
+        return [None if value is pd.NaT else value for value in timestamps.dt.to_pydatetime().tolist()]
+    return [None if _is_missing(value) else value for value in series.tolist()]
+
+
+def _is_missing(value: Any) -> bool:
+    if value is None or value is pd.NaT:
+        return True
+    return isinstance(value, float) and value != value
+
+
+def to_frame(worksheet: Any, range_address: str, header: bool = True) -> pd.DataFrame:
+    """
+    读取区域为 DataFrame（一次 Range.Value 访问）
+
+    Args:
+        worksheet: 工作表对象（COM 或无界面后端）
+        range_address: 区域地址，例如 'A1:G101'
+        header: 第一行是否为列名
+
+    Returns:
+        DataFrame
+    """
+    values = worksheet.Range(range_address).Value
+    if not isinstance(values, tuple):
+        values = ((values,),)
+    frame = records_to_frame(values, header=header)
+    logger.debug(f"区域 {range_address} 已转换为 DataFrame: {frame.shape}")
+    return frame
+
+
+def from_frame(worksheet: Any, frame: pd.DataFrame, start_cell: str = 'A1',
+               header: bool = True, index: bool = False) -> str:
+    """
+    将 DataFrame 写入工作表（一次 Range.Value 赋值）
+
+    Args:
+        worksheet: 工作表对象（COM 或无界面后端）
+        frame: DataFrame
+        start_cell: 起始单元格
+        header: 是否写入列名
+        index: 是否写入索引列
+
+    Returns:
+        写入的区域地址
+    """
+    rows = frame_to_records(frame, header=header, index=index)
+    if not rows:
+        return ''
+    start_row, start_col = parse_cell(start_cell)
+    address = format_range(start_row, start_col, start_row + len(rows) - 1, start_col + len(rows[0]) - 1)
+    worksheet.Range(address).Value = rows
+    logger.debug(f"DataFrame {frame.shape} 已写入区域 {address}")
+    return address
+
+
+def read_xlsx_frame(path: str, sheet: Union[int, str, None] = None, columns: Sequence[Union[int, str]] = None,
+                    header: bool = True, chunk_size: int = None) -> pd.DataFrame:
+    """
+    分块读取 xlsx 工作表为 DataFrame，每块按列转换后再拼接
+
+    Args:
+        path: xlsx 文件路径
+        sheet: 工作表名称或序号
+        columns: 需要读取的列（列字母或列号）
+        header: 第一行是否为列名
+        chunk_size: 每块行数
+
+    Returns:
+        DataFrame
+    """
+    from utils.xlsx_reader import XlsxReader
+
+    names = None
+    width = 0
+    chunks: List[Tuple[int, List[np.ndarray]]] = []
+    with XlsxReader(path) as reader:
+        for chunk in reader.iter_chunks(sheet, chunk_size=chunk_size, columns=columns):
+            if names is None and header:
+                names, chunk = list(chunk[0]), chunk[1:]
+                width = len(names)
+            if chunk:
+                rows = [list(row) for row in chunk]
+                chunk_width = max(len(row) for row in rows)
+                width = max(width, chunk_width)
+                chunks.append((len(rows), _rows_to_columns(rows, chunk_width)))
+    # 较早的块可能比后面的块窄，缺少的列按空值补齐
+    data = []
+    for position in range(width):
+        data.append(_merge_chunks([
+            arrays[position] if position < len(arrays) else np.full(length, np.nan)
+            for length, arrays in chunks
+        ]) if chunks else np.array([], dtype=object))
+    labels = column_names(names or [], width) if header else list(range(width))
+    return pd.DataFrame(dict(zip(labels, data)), columns=labels)
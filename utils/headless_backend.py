@@ -0,0 +1,1049 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 上午09:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：headless_backend.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+无界面 Excel 后端
+
+用纯 Python 实现的内存工作簿模型，对外提供与 win32com Excel 对象模型一致的
+常用接口（Workbooks.Add、ActiveSheet、Range(...).Value、Font.Bold 等），
+使各功能模块无需启动 Excel 进程即可在 Linux 等平台上运行，并可保存为真正的 .xlsx 文件。
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+
+from config import CHART_CONFIG, EXCEL_CONFIG, FILE_CONFIG, PRINT_CONFIG
+from utils.range_address import (
+    format_cell, format_range, parse_areas, parse_cell, MAX_ROWS,
+)
+from utils.style_registry import DEFAULT_STYLE_ID, STYLE_REGISTRY
+
+# 常用 Excel 常量（与 COM 取值保持一致）
+XL_CENTER = -4108
+XL_LEFT = -4131
+XL_RIGHT = -4152
+XL_CONTINUOUS = 1
+XL_THIN = 2
+XL_MEDIUM = -4138
+XL_THICK = 4
+XL_SHEET_VISIBLE = -1
+XL_SHEET_HIDDEN = 0
+XL_CATEGORY = 1
+XL_VALUE = 2
+XL_LEGEND_POSITION_BOTTOM = -4107
+XL_LEGEND_POSITION_TOP = -4160
+XL_LEGEND_POSITION_LEFT = -4131
+XL_LEGEND_POSITION_RIGHT = -4152
+XL_DATA_LABELS_SHOW_VALUE = 2
+XL_DATA_LABELS_SHOW_PERCENT = 3
+XL_DATA_LABELS_SHOW_LABEL = 4
+XL_DATA_LABELS_SHOW_LABEL_AND_PERCENT = 5
+
+_LEGEND_POSITIONS = {
+    XL_LEGEND_POSITION_BOTTOM: 'bottom',
+    XL_LEGEND_POSITION_TOP: 'top',
+    XL_LEGEND_POSITION_LEFT: 'left',
+    XL_LEGEND_POSITION_RIGHT: 'right',
+}
+
+# 默认列宽和行高（与 Excel 默认值一致）
+DEFAULT_COLUMN_WIDTH = 8.43
+DEFAULT_ROW_HEIGHT = 15.0
+
+Area = Tuple[int, int, int, int]
+
+
+def rgb(red: int, green: int, blue: int) -> int:
+    """
+    按 VBA RGB() 的规则生成颜色值
+
+    Args:
+        red: 红色分量
+        green: 绿色分量
+        blue: 蓝色分量
+
+    Returns:
+        COM 颜色值（BGR 顺序的整数）
+    """
+    return red + green * 256 + blue * 65536
+
+
+def _contains_formula(values: Any) -> bool:
+    """单个值或二维元组中是否有公式（与 formula_engine.is_formula 的判断一致）"""
+    rows = values if isinstance(values, tuple) else ((values,),)
+    return any(isinstance(value, str) and len(value) > 1 and value[0] == '=' for row in rows for value in row)
+
+
+class _StyleProxy:
+    """样式属性代理，属性赋值会作用到区域内的所有单元格"""
+
+    _attributes: Dict[str, str] = {}
+
+    def __init__(self, cell_range: 'HeadlessRange'):
+        object.__setattr__(self, '_range', cell_range)
+
+    def __getattr__(self, name: str) -> Any:
+        key = type(self)._attributes.get(name)
+        if key is None:
+            raise AttributeError(name)
+        return self._range._get_style_value(key)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        key = type(self)._attributes.get(name)
+        if key is None:
+            raise AttributeError(f"不支持的样式属性: {name}")
+        self._range._set_style({key: value})
+
+
+class HeadlessFont(_StyleProxy):
+    """字体代理"""
+
+    _attributes = {
+        'Name': 'font_name',
+        'Size': 'font_size',
+        'Bold': 'font_bold',
+        'Italic': 'font_italic',
+        'Underline': 'font_underline',
+        'Color': 'font_color',
+    }
+
+
+class HeadlessInterior(_StyleProxy):
+    """填充代理"""
+
+    _attributes = {
+        'Color': 'fill_color',
+    }
+
+
+class HeadlessBorders(_StyleProxy):
+    """边框代理（各条边统一设置）"""
+
+    _attributes = {
+        'LineStyle': 'border_style',
+        'Weight': 'border_weight',
+        'Color': 'border_color',
+    }
+
+    def __call__(self, index: int = None) -> 'HeadlessBorders':
+        # Borders(xlEdgeBottom) 等写法在无界面后端中作用于全部边
+        return self
+
+
+class _Dimension:
+    """Rows / Columns 集合的简化实现"""
+
+    def __init__(self, cell_range: 'HeadlessRange', axis: str):
+        self._range = cell_range
+        self._axis = axis
+
+    @property
+    def Count(self) -> int:
+        first_row, first_col, last_row, last_col = self._range._areas[0]
+        if self._axis == 'rows':
+            return last_row - first_row + 1
+        return last_col - first_col + 1
+
+    def AutoFit(self) -> None:
+        """根据单元格内容估算列宽/行高"""
+        worksheet = self._range.worksheet
+        for first_row, first_col, last_row, last_col in self._range._areas:
+            if self._axis == 'columns':
+                worksheet._auto_fit_columns(first_col, last_col)
+                worksheet._layout_changed()
+            else:
+                for row in range(first_row, last_row + 1):
+                    worksheet._row_heights.pop(row, None)
+                worksheet._layout_changed(first_row)
+
+
+class HeadlessPageSetup:
+    """页面设置，默认值取自 PRINT_CONFIG"""
+
+    def __init__(self):
+        self.Orientation = PRINT_CONFIG['orientation']
+        self.PaperSize = PRINT_CONFIG['paper_size']
+        self.LeftMargin = PRINT_CONFIG['left_margin']
+        self.RightMargin = PRINT_CONFIG['right_margin']
+        self.TopMargin = PRINT_CONFIG['top_margin']
+        self.BottomMargin = PRINT_CONFIG['bottom_margin']
+        self.HeaderMargin = 36
+        self.FooterMargin = 36
+        self.Zoom = PRINT_CONFIG['zoom']
+        self.Order = 1
+        self.FitToPagesWide = None
+        self.FitToPagesTall = None
+        self.PrintArea = ''
+        self.PrintTitleRows = ''
+        self.PrintGridlines = False
+        self.PrintHeadings = False
+        self.CenterHorizontally = False
+        self.CenterVertically = False
+        self.LeftHeader = ''
+        self.CenterHeader = ''
+        self.RightHeader = ''
+        self.LeftFooter = ''
+        self.CenterFooter = ''
+        self.RightFooter = ''
+
+
+class _TextHolder:
+    """ChartTitle / AxisTitle 等只有文本的对象"""
+
+    def __init__(self):
+        self.Text = ''
+
+
+class HeadlessAxis:
+    """图表坐标轴"""
+
+    def __init__(self):
+        self.HasTitle = False
+        self.AxisTitle = _TextHolder()
+
+
+class HeadlessLegend:
+    """图表图例"""
+
+    def __init__(self):
+        self.Position = XL_LEGEND_POSITION_RIGHT
+
+
+class HeadlessChart:
+    """图表，Export 时由 utils.chart_renderer 直接根据数据区域绘制，保存时由 utils.xlsx_charts 写入文件"""
+
+    def __init__(self, chart_object: 'HeadlessChartObject'):
+        self.Parent = chart_object
+        self.ChartType = CHART_CONFIG['default_type']
+        self.HasTitle = False
+        self.ChartTitle = _TextHolder()
+        self.HasLegend = True
+        self.Legend = HeadlessLegend()
+        self.ChartStyle = None
+        self._source: Optional['HeadlessRange'] = None
+        self._plot_by: Optional[int] = None
+        self._axes = {XL_CATEGORY: HeadlessAxis(), XL_VALUE: HeadlessAxis()}
+        self._labels = {'show_values': False, 'show_percentage': False, 'show_category': False}
+
+    def SetSourceData(self, Source: 'HeadlessRange', PlotBy: int = None) -> None:
+        """设置数据区域"""
+        self._source = Source
+        self._plot_by = PlotBy
+
+    def Axes(self, Type: int, AxisGroup: int = 1) -> HeadlessAxis:
+        """获取坐标轴（xlCategory=1，xlValue=2）"""
+        return self._axes[Type]
+
+    def ApplyDataLabels(self, Type: int = XL_DATA_LABELS_SHOW_VALUE, **kwargs) -> None:
+        """显示数据标签"""
+        self._labels = {
+            'show_values': kwargs.get('ShowValue', Type == XL_DATA_LABELS_SHOW_VALUE),
+            'show_percentage': kwargs.get('ShowPercentage', Type in (XL_DATA_LABELS_SHOW_PERCENT,
+                                                                     XL_DATA_LABELS_SHOW_LABEL_AND_PERCENT)),
+            'show_category': kwargs.get('ShowCategoryName', Type in (XL_DATA_LABELS_SHOW_LABEL,
+                                                                     XL_DATA_LABELS_SHOW_LABEL_AND_PERCENT)),
+        }
+
+    def to_spec(self) -> Any:
+        """
+        生成图表描述
+
+        Returns:
+            utils.chart_renderer.ChartSpec
+        """
+        from utils.chart_renderer import chart_spec_from_values
+
+        if self._source is None:
+            raise ValueError("图表尚未设置数据区域")
+        values = self._source.Value
+        if not isinstance(values, tuple):
+            values = ((values,),)
+        legend = _LEGEND_POSITIONS.get(self.Legend.Position, 'right') if self.HasLegend else None
+        category_axis, value_axis = self._axes[XL_CATEGORY], self._axes[XL_VALUE]
+        return chart_spec_from_values(
+            values, self.ChartType, self._plot_by,
+            title=self.ChartTitle.Text if self.HasTitle else '',
+            x_title=category_axis.AxisTitle.Text if category_axis.HasTitle else '',
+            y_title=value_axis.AxisTitle.Text if value_axis.HasTitle else '',
+            legend=legend, width=int(self.Parent.Width), height=int(self.Parent.Height),
+            **self._labels,
+        )
+
+    def Export(self, Filename: str, FilterName: str = None, Interactive: bool = False) -> bool:
+        """
+        导出为图片（.png 或 .svg）
+
+        Args:
+            Filename: 输出文件路径
+        """
+        from utils.chart_renderer import render_chart
+
+        render_chart(self.to_spec(), Filename)
+        return True
+
+
+class HeadlessChartObject:
+    """嵌入工作表的图表容器"""
+
+    def __init__(self, worksheet: 'HeadlessWorksheet', name: str, left: float, top: float,
+                 width: float, height: float):
+        self.Parent = worksheet
+        self.Name = name
+        self.Left = left
+        self.Top = top
+        self.Width = width
+        self.Height = height
+        self.Chart = HeadlessChart(self)
+
+    def Delete(self) -> None:
+        """删除图表"""
+        self.Parent._charts.remove(self)
+
+
+class HeadlessChartObjects:
+    """工作表的图表集合"""
+
+    def __init__(self, worksheet: 'HeadlessWorksheet'):
+        self._worksheet = worksheet
+
+    def Add(self, Left: float, Top: float, Width: float, Height: float) -> HeadlessChartObject:
+        """新建图表"""
+        charts = self._worksheet._charts
+        chart_object = HeadlessChartObject(self._worksheet, f"图表 {len(charts) + 1}", Left, Top, Width, Height)
+        charts.append(chart_object)
+        return chart_object
+
+    def Item(self, index: Union[int, str]) -> HeadlessChartObject:
+        """按序号（从1开始）或名称获取图表"""
+        charts = self._worksheet._charts
+        if isinstance(index, int):
+            return charts[index - 1]
+        for chart_object in charts:
+            if chart_object.Name == index:
+                return chart_object
+        raise KeyError(f"图表不存在: {index}")
+
+    __call__ = Item
+
+    @property
+    def Count(self) -> int:
+        return len(self._worksheet._charts)
+
+    def __len__(self) -> int:
+        return len(self._worksheet._charts)
+
+    def __iter__(self) -> Iterator[HeadlessChartObject]:
+        return iter(list(self._worksheet._charts))
+
+
+class HeadlessRange:
+    """单元格区域，支持逗号分隔的多区域地址"""
+
+    def __init__(self, worksheet: 'HeadlessWorksheet', areas: List[Area]):
+        self.worksheet = worksheet
+        self._areas = areas
+
+    # ---- 地址与尺寸 ----
+
+    @property
+    def Address(self) -> str:
+        addresses = []
+        for area in self._areas:
+            address = format_range(*area)
+            addresses.append(':'.join(self._absolute(part) for part in address.split(':')))
+        return ','.join(addresses)
+
+    @staticmethod
+    def _absolute(cell: str) -> str:
+        row, col = parse_cell(cell)
+        letters = cell.rstrip('0123456789')
+        return f"${letters}${row}"
+
+    @property
+    def Row(self) -> int:
+        return self._areas[0][0]
+
+    @property
+    def Column(self) -> int:
+        return self._areas[0][1]
+
+    @property
+    def Count(self) -> int:
+        return sum((r2 - r1 + 1) * (c2 - c1 + 1) for r1, c1, r2, c2 in self._areas)
+
+    @property
+    def Rows(self) -> _Dimension:
+        return _Dimension(self, 'rows')
+
+    @property
+    def Columns(self) -> _Dimension:
+        return _Dimension(self, 'columns')
+
+    @property
+    def Areas(self) -> List['HeadlessRange']:
+        return [HeadlessRange(self.worksheet, [area]) for area in self._areas]
+
+    def Cells(self, row: int, column: int) -> 'HeadlessRange':
+        """相对于区域左上角的单元格"""
+        first_row, first_col = self._areas[0][0], self._areas[0][1]
+        cell_row, cell_col = first_row + row - 1, first_col + column - 1
+        return HeadlessRange(self.worksheet, [(cell_row, cell_col, cell_row, cell_col)])
+
+    def iter_coordinates(self) -> Iterator[Tuple[int, int]]:
+        """按行遍历区域内所有单元格坐标"""
+        for first_row, first_col, last_row, last_col in self._areas:
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    yield row, col
+
+    def __iter__(self) -> Iterator['HeadlessRange']:
+        for row, col in self.iter_coordinates():
+            yield HeadlessRange(self.worksheet, [(row, col, row, col)])
+
+    # ---- 值 ----
+
+    def _get_formula(self) -> Any:
+        first_row, first_col, last_row, last_col = self._areas[0]
+        cells = self.worksheet._cells
+        if first_row == last_row and first_col == last_col:
+            return cells.get((first_row, first_col))
+        return tuple(
+            tuple(cells.get((row, col)) for col in range(first_col, last_col + 1))
+            for row in range(first_row, last_row + 1)
+        )
+
+    def _get_value(self) -> Any:
+        # 公式单元格返回计算结果（与 COM 的 Value 一致），区域中有公式时按需创建工作簿的公式引擎
+        formulas = self._get_formula()
+        workbook = self.worksheet.Parent
+        engine = workbook._formula_engine
+        if engine is None:
+            if not _contains_formula(formulas):
+                return formulas
+            engine = workbook.formula_engine()
+        first_row, first_col, last_row, last_col = self._areas[0]
+        if first_row == last_row and first_col == last_col:
+            return engine.get_value(self.worksheet, first_row, first_col)
+        return engine.resolve(self.worksheet, formulas, first_row, first_col)
+
+    def _assign(self, value: Any) -> None:
+        worksheet = self.worksheet
+        if isinstance(value, (list, tuple)):
+            first_row, first_col, last_row, last_col = self._areas[0]
+            rows = value if value and isinstance(value[0], (list, tuple)) else [value]
+            for row_offset in range(last_row - first_row + 1):
+                row_values = rows[row_offset] if row_offset < len(rows) else ()
+                for col_offset in range(last_col - first_col + 1):
+                    cell_value = row_values[col_offset] if col_offset < len(row_values) else None
+                    worksheet._set_value(first_row + row_offset, first_col + col_offset, cell_value)
+        else:
+            for row, col in self.iter_coordinates():
+                worksheet._set_value(row, col, value)
+
+    Value = property(_get_value, _assign)
+    Value2 = Value
+    Formula = property(_get_formula, _assign)
+
+    def ClearContents(self) -> None:
+        """清除内容，保留格式"""
+        for row, col in self.iter_coordinates():
+            self.worksheet._set_value(row, col, None)
+
+    def Clear(self) -> None:
+        """清除内容和格式"""
+        self.ClearContents()
+        for row, col in self.iter_coordinates():
+            self.worksheet._styles.pop((row, col), None)
+        self.worksheet._styles_changed(self._areas, True)
+
+    # ---- 格式 ----
+
+    @property
+    def Font(self) -> HeadlessFont:
+        return HeadlessFont(self)
+
+    @property
+    def Interior(self) -> HeadlessInterior:
+        return HeadlessInterior(self)
+
+    @property
+    def Borders(self) -> HeadlessBorders:
+        return HeadlessBorders(self)
+
+    @property
+    def NumberFormat(self) -> Any:
+        return self._get_style_value('number_format')
+
+    @NumberFormat.setter
+    def NumberFormat(self, value: str) -> None:
+        self._set_style({'number_format': value})
+
+    @property
+    def HorizontalAlignment(self) -> Any:
+        return self._get_style_value('horizontal_alignment')
+
+    @HorizontalAlignment.setter
+    def HorizontalAlignment(self, value: Any) -> None:
+        self._set_style({'horizontal_alignment': value})
+
+    @property
+    def VerticalAlignment(self) -> Any:
+        return self._get_style_value('vertical_alignment')
+
+    @VerticalAlignment.setter
+    def VerticalAlignment(self, value: Any) -> None:
+        self._set_style({'vertical_alignment': value})
+
+    @property
+    def WrapText(self) -> Any:
+        return self._get_style_value('wrap_text')
+
+    @WrapText.setter
+    def WrapText(self, value: bool) -> None:
+        self._set_style({'wrap_text': value})
+
+    @property
+    def ColumnWidth(self) -> float:
+        return self.worksheet._column_widths.get(self.Column, DEFAULT_COLUMN_WIDTH)
+
+    @ColumnWidth.setter
+    def ColumnWidth(self, value: float) -> None:
+        for _, first_col, _, last_col in self._areas:
+            for col in range(first_col, last_col + 1):
+                self.worksheet._column_widths[col] = float(value)
+        self.worksheet._layout_changed()
+
+    @property
+    def RowHeight(self) -> float:
+        return self.worksheet._row_heights.get(self.Row, DEFAULT_ROW_HEIGHT)
+
+    @RowHeight.setter
+    def RowHeight(self, value: float) -> None:
+        for first_row, _, last_row, _ in self._areas:
+            for row in range(first_row, last_row + 1):
+                self.worksheet._row_heights[row] = float(value)
+        self.worksheet._layout_changed(min(area[0] for area in self._areas))
+
+    def Merge(self) -> None:
+        """合并单元格"""
+        for area in self._areas:
+            if area[0] != area[2] or area[1] != area[3]:
+                self.worksheet._merged.append(area)
+
+    def UnMerge(self) -> None:
+        """取消合并"""
+        self.worksheet._merged = [
+            area for area in self.worksheet._merged if area not in self._areas
+        ]
+
+    def _get_style_value(self, key: str) -> Any:
+        first_row, first_col = self._areas[0][0], self._areas[0][1]
+        style_id = self.worksheet._styles.get((first_row, first_col), DEFAULT_STYLE_ID)
+        return STYLE_REGISTRY.get(style_id).get(key)
+
+    def _set_style(self, updates: Dict[str, Any]) -> None:
+        # 单元格只保存共享样式编号，相同的“原样式 + 修改”只计算一次
+        styles = self.worksheet._styles
+        apply = STYLE_REGISTRY.updater(updates)
+        for coordinate in self.iter_coordinates():
+            style_id = apply(styles.get(coordinate, DEFAULT_STYLE_ID))
+            if style_id == DEFAULT_STYLE_ID:
+                styles.pop(coordinate, None)
+            else:
+                styles[coordinate] = style_id
+        self.worksheet._styles_changed(self._areas, False)
+
+
+class HeadlessWorksheet:
+    """内存工作表"""
+
+    def __init__(self, workbook: 'HeadlessWorkbook', name: str):
+        self.Parent = workbook
+        self._name = name
+        self.Visible = XL_SHEET_VISIBLE
+        self.PageSetup = HeadlessPageSetup()
+        self._cells: Dict[Tuple[int, int], Any] = {}
+        self._styles: Dict[Tuple[int, int], int] = {}
+        self._column_widths: Dict[int, float] = {}
+        self._row_heights: Dict[int, float] = {}
+        self._merged: List[Area] = []
+        self._charts: List[HeadlessChartObject] = []
+        self._index = None
+        self._pagination = None
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @Name.setter
+    def Name(self, value: str) -> None:
+        for sheet in self.Parent.Worksheets:
+            if sheet is not self and sheet.Name.lower() == value.lower():
+                raise ValueError(f"工作表名称已存在: {value}")
+        if not value or len(value) > 31 or any(ch in value for ch in '[]:*?/\\'):
+            raise ValueError(f"无效的工作表名称: {value}")
+        self._name = value
+
+    @property
+    def Index(self) -> int:
+        return self.Parent.Worksheets._sheets.index(self) + 1
+
+    def Range(self, cell1: Union[str, HeadlessRange],
+              cell2: Union[str, HeadlessRange, None] = None) -> HeadlessRange:
+        """
+        获取区域
+
+        Args:
+            cell1: 区域地址或起始单元格
+            cell2: 结束单元格（可选）
+
+        Returns:
+            区域对象
+        """
+        if cell2 is not None:
+            start = cell1 if isinstance(cell1, str) else format_cell(cell1.Row, cell1.Column)
+            end = cell2 if isinstance(cell2, str) else format_cell(cell2.Row, cell2.Column)
+            return HeadlessRange(self, parse_areas(f"{start}:{end}"))
+        if isinstance(cell1, HeadlessRange):
+            return cell1
+        return HeadlessRange(self, parse_areas(cell1))
+
+    def Cells(self, row: int, column: int) -> HeadlessRange:
+        """按行列号获取单元格"""
+        return HeadlessRange(self, [(row, column, row, column)])
+
+    def ChartObjects(self, Index: Union[int, str] = None) -> Any:
+        """图表集合，指定 Index 时返回其中一个图表"""
+        charts = HeadlessChartObjects(self)
+        return charts if Index is None else charts.Item(Index)
+
+    @property
+    def UsedRange(self) -> HeadlessRange:
+        bounds = self.used_bounds()
+        if bounds is None:
+            return HeadlessRange(self, [(1, 1, 1, 1)])
+        return HeadlessRange(self, [bounds])
+
+    def used_bounds(self) -> Optional[Area]:
+        """
+        计算已使用区域的边界
+
+        Returns:
+            (起始行, 起始列, 结束行, 结束列)，空表返回 None
+        """
+        coordinates = [key for key, value in self._cells.items() if value is not None]
+        coordinates.extend(self._styles.keys())
+        if not coordinates:
+            return None
+        rows = [row for row, _ in coordinates]
+        cols = [col for _, col in coordinates]
+        return min(rows), min(cols), max(rows), max(cols)
+
+    def cell_index(self) -> Any:
+        """
+        获取单元格值的倒排索引（首次调用时建立，之后随写入增量维护）
+
+        Returns:
+            CellIndex 对象
+        """
+        if self._index is None:
+            from utils.cell_index import CellIndex
+            self._index = CellIndex(self)
+        return self._index
+
+    def drop_cell_index(self) -> None:
+        """释放倒排索引，之后的写入不再维护索引"""
+        self._index = None
+
+    def pagination(self, ignore_print_areas: bool = False) -> Any:
+        """
+        获取分页结果（首次调用时计算，之后随行高、列宽和写入增量维护）
+
+        Args:
+            ignore_print_areas: 是否忽略打印区域
+
+        Returns:
+            SheetPagination 对象
+        """
+        if self._pagination is None or self._pagination.ignore_print_areas != ignore_print_areas:
+            from utils.pagination import SheetPagination
+            self._pagination = SheetPagination(self, ignore_print_areas)
+        return self._pagination
+
+    def Calculate(self) -> None:
+        """重新计算工作簿中待计算的公式（需已启用公式引擎）"""
+        self.Parent.formula_engine().recalculate()
+
+    def Activate(self) -> None:
+        """激活工作表"""
+        self.Parent._active_sheet = self
+
+    def ExportAsFixedFormat(self, Type: int, Filename: str, Quality: Any = None, IncludeDocProperties: bool = True,
+                            IgnorePrintAreas: bool = False, **kwargs) -> None:
+        """
+        导出为 PDF（由 utils.pdf_writer 直接生成，不经过打印引擎）
+
+        Args:
+            Type: 导出格式，仅支持 xlTypePDF (0)
+            Filename: 输出文件路径
+            IgnorePrintAreas: 是否忽略打印区域
+        """
+        from utils.pdf_writer import XL_TYPE_PDF, export_pdf
+
+        if Type != XL_TYPE_PDF:
+            raise ValueError(f"无界面后端只支持导出 PDF: Type={Type}")
+        export_pdf([self], Filename, ignore_print_areas=IgnorePrintAreas)
+
+    def Delete(self) -> None:
+        """删除工作表"""
+        self.Parent.Worksheets._remove(self)
+
+    def _set_value(self, row: int, col: int, value: Any) -> None:
+        if not 1 <= row <= MAX_ROWS:
+            raise ValueError(f"行号超出范围: {row}")
+        if self._index is not None:
+            self._index.move((row, col), self._cells.get((row, col)), value)
+        if value is None or value == '':
+            self._cells.pop((row, col), None)
+        else:
+            self._cells[(row, col)] = value
+        if self.Parent._formula_engine is not None:
+            self.Parent._formula_engine.cell_changed(self, row, col, value)
+        if self._pagination is not None:
+            self._pagination.cell_changed(row, col, value is None or value == '')
+        self.Parent.Saved = False
+
+    def _layout_changed(self, row: int = None) -> None:
+        # 行高（从 row 开始）或列宽（row 为 None）变化，通知分页结果
+        if self._pagination is not None:
+            if row is None:
+                self._pagination.columns_changed()
+            else:
+                self._pagination.rows_changed(row)
+
+    def _styles_changed(self, areas: List[Tuple[int, int, int, int]], cleared: bool) -> None:
+        # 单元格格式变化（cleared 为 True 时表示格式被清除），通知分页结果
+        if self._pagination is not None:
+            for area in areas:
+                self._pagination.area_changed(area, cleared)
+
+    def _auto_fit_columns(self, first_col: int, last_col: int) -> None:
+        widths: Dict[int, int] = {}
+        for (row, col), value in self._cells.items():
+            if first_col <= col <= last_col:
+                text = str(value)
+                # 中文等全角字符按两个字符宽度估算
+                length = sum(2 if ord(ch) > 0x2E80 else 1 for ch in text)
+                widths[col] = max(widths.get(col, 0), length)
+        for col, length in widths.items():
+            self._column_widths[col] = min(max(length + 2, DEFAULT_COLUMN_WIDTH), 255.0)
+
+
+class HeadlessSheets:
+    """工作表集合"""
+
+    def __init__(self, workbook: 'HeadlessWorkbook'):
+        self._workbook = workbook
+        self._sheets: List[HeadlessWorksheet] = []
+
+    def Add(self, Before: HeadlessWorksheet = None, After: HeadlessWorksheet = None) -> HeadlessWorksheet:
+        """
+        新建工作表
+
+        Args:
+            Before: 插入到该工作表之前
+            After: 插入到该工作表之后
+
+        Returns:
+            新工作表
+        """
+        sheet = HeadlessWorksheet(self._workbook, self._next_name())
+        if Before is not None:
+            self._sheets.insert(self._sheets.index(Before), sheet)
+        elif After is not None:
+            self._sheets.insert(self._sheets.index(After) + 1, sheet)
+        elif self._sheets:
+            # 与 Excel 行为一致：默认插入到活动工作表之前
+            self._sheets.insert(self._sheets.index(self._workbook.ActiveSheet), sheet)
+        else:
+            self._sheets.append(sheet)
+        self._workbook._active_sheet = sheet
+        return sheet
+
+    def Item(self, index: Union[int, str]) -> HeadlessWorksheet:
+        """按序号（从1开始）或名称获取工作表"""
+        if isinstance(index, int):
+            return self._sheets[index - 1]
+        for sheet in self._sheets:
+            if sheet.Name.lower() == str(index).lower():
+                return sheet
+        raise KeyError(f"工作表不存在: {index}")
+
+    __call__ = Item
+
+    @property
+    def Count(self) -> int:
+        return len(self._sheets)
+
+    def __len__(self) -> int:
+        return len(self._sheets)
+
+    def __iter__(self) -> Iterator[HeadlessWorksheet]:
+        return iter(list(self._sheets))
+
+    def _next_name(self) -> str:
+        existing = {sheet.Name.lower() for sheet in self._sheets}
+        index = len(self._sheets) + 1
+        while f"sheet{index}" in existing:
+            index += 1
+        return f"Sheet{index}"
+
+    def _remove(self, sheet: HeadlessWorksheet) -> None:
+        if len(self._sheets) == 1:
+            raise ValueError("工作簿至少需要保留一个工作表")
+        position = self._sheets.index(sheet)
+        self._sheets.remove(sheet)
+        if self._workbook._active_sheet is sheet:
+            self._workbook._active_sheet = self._sheets[max(position - 1, 0)]
+
+
+class HeadlessWorkbook:
+    """内存工作簿"""
+
+    def __init__(self, application: 'HeadlessApplication', name: str):
+        self.Application = application
+        self.Name = name
+        self.FullName = name
+        self.Saved = True
+        self.Worksheets = HeadlessSheets(self)
+        self.Sheets = self.Worksheets
+        self._active_sheet: Optional[HeadlessWorksheet] = None
+        self._formula_engine = None
+        self.Worksheets.Add()
+        self.Saved = True
+
+    @property
+    def ActiveSheet(self) -> HeadlessWorksheet:
+        return self._active_sheet
+
+    def formula_engine(self) -> Any:
+        """
+        获取公式引擎（首次调用时载入全部公式，之后随写入增量维护）
+
+        Returns:
+            FormulaEngine 对象
+        """
+        if self._formula_engine is None:
+            from utils.formula_engine import FormulaEngine
+            self._formula_engine = FormulaEngine(self)
+        return self._formula_engine
+
+    def SaveAs(self, Filename: str, FileFormat: Any = None, **kwargs) -> None:
+        """
+        另存为 .xlsx 文件
+
+        Args:
+            Filename: 文件路径
+            FileFormat: 文件格式（无界面后端统一保存为 OpenXML 工作簿）
+        """
+        from utils.xlsx_writer import write_workbook
+
+        path = Path(Filename)
+        write_workbook(self, path)
+        self.Name = path.name
+        self.FullName = str(path)
+        self.Saved = True
+
+    def Save(self) -> None:
+        """保存到原路径"""
+        if self.FullName == self.Name and not Path(self.FullName).is_absolute():
+            raise ValueError("工作簿尚未保存过，请使用 SaveAs 指定路径")
+        self.SaveAs(self.FullName)
+
+    def ExportAsFixedFormat(self, Type: int, Filename: str, Quality: Any = None, IncludeDocProperties: bool = True,
+                            IgnorePrintAreas: bool = False, **kwargs) -> None:
+        """
+        把所有可见工作表导出为一个 PDF，页码连续，各工作表并行生成
+
+        Args:
+            Type: 导出格式，仅支持 xlTypePDF (0)
+            Filename: 输出文件路径
+            IgnorePrintAreas: 是否忽略打印区域
+        """
+        from utils.pdf_writer import XL_TYPE_PDF, export_pdf
+
+        if Type != XL_TYPE_PDF:
+            raise ValueError(f"无界面后端只支持导出 PDF: Type={Type}")
+        sheets = [sheet for sheet in self.Worksheets if sheet.Visible == XL_SHEET_VISIBLE]
+        export_pdf(sheets, Filename, ignore_print_areas=IgnorePrintAreas)
+
+    def Close(self, SaveChanges: bool = False) -> None:
+        """关闭工作簿"""
+        if SaveChanges:
+            self.Save()
+        self.Application.Workbooks._remove(self)
+
+
+class HeadlessWorkbooks:
+    """工作簿集合"""
+
+    def __init__(self, application: 'HeadlessApplication'):
+        self._application = application
+        self._workbooks: List[HeadlessWorkbook] = []
+        self._counter = 0
+
+    def Add(self) -> HeadlessWorkbook:
+        """新建工作簿"""
+        self._counter += 1
+        workbook = HeadlessWorkbook(self._application, f"Book{self._counter}")
+        self._workbooks.append(workbook)
+        return workbook
+
+    def Open(self, Filename: str, **kwargs) -> HeadlessWorkbook:
+        """
+        打开 .xlsx 文件
+
+        Args:
+            Filename: 文件路径
+            Lazy: 为 True 时按需载入工作表（默认取 FILE_CONFIG['lazy_open']）
+
+        Returns:
+            工作簿
+        """
+        if kwargs.get('Lazy', FILE_CONFIG.get('lazy_open', False)):
+            from utils.lazy_workbook import open_lazy_workbook
+
+            return open_lazy_workbook(self._application, Filename)
+
+        from utils.xlsx_reader import load_workbook
+
+        return load_workbook(self._application, Filename)
+
+    def Item(self, index: Union[int, str]) -> HeadlessWorkbook:
+        """按序号（从1开始）或名称获取工作簿"""
+        if isinstance(index, int):
+            return self._workbooks[index - 1]
+        for workbook in self._workbooks:
+            if workbook.Name == index:
+                return workbook
+        raise KeyError(f"工作簿不存在: {index}")
+
+    __call__ = Item
+
+    @property
+    def Count(self) -> int:
+        return len(self._workbooks)
+
+    def __len__(self) -> int:
+        return len(self._workbooks)
+
+    def __iter__(self) -> Iterator[HeadlessWorkbook]:
+        return iter(list(self._workbooks))
+
+    def _remove(self, workbook: HeadlessWorkbook) -> None:
+        if workbook in self._workbooks:
+            self._workbooks.remove(workbook)
+
+
+class HeadlessApplication:
+    """无界面 Excel 应用程序对象"""
+
+    def __init__(self):
+        self.Visible = False
+        self.DisplayAlerts = False
+        self.ScreenUpdating = False
+        self.EnableEvents = True
+        self.Calculation = EXCEL_CONFIG['calculation']
+        self.Workbooks = HeadlessWorkbooks(self)
+
+    @property
+    def ActiveWorkbook(self) -> Optional[HeadlessWorkbook]:
+        return self.Workbooks._workbooks[-1] if self.Workbooks._workbooks else None
+
+    @property
+    def ActiveSheet(self) -> Optional[HeadlessWorksheet]:
+        workbook = self.ActiveWorkbook
+        return workbook.ActiveSheet if workbook else None
+
+    def Calculate(self) -> None:
+        """重新计算所有已启用公式引擎的工作簿"""
+        for workbook in self.Workbooks:
+            if workbook._formula_engine is not None:
+                workbook._formula_engine.recalculate()
+
+    def Quit(self) -> None:
+        """退出应用程序，关闭所有工作簿"""
+        self.Workbooks._workbooks.clear()
+
+
+class HeadlessExcelManager:
+    """
+    无界面 Excel 管理器
+
+    与 ExcelManager 保持相同的构造参数和上下文管理器用法，
+    但使用内存中的 HeadlessApplication 代替 COM Excel 进程。
+    """
+
+    def __init__(self, visible: bool = None, alerts: bool = None):
+        self.visible = EXCEL_CONFIG['visible'] if visible is None else visible
+        self.alerts = EXCEL_CONFIG['display_alerts'] if alerts is None else alerts
+        self.app: Optional[HeadlessApplication] = None
+
+    def start(self) -> HeadlessApplication:
+        """启动无界面应用程序"""
+        if self.app is None:
+            self.app = HeadlessApplication()
+            self.app.Visible = self.visible
+            self.app.DisplayAlerts = self.alerts
+            self.app.ScreenUpdating = EXCEL_CONFIG['screen_updating']
+            self.app.EnableEvents = EXCEL_CONFIG['enable_events']
+            logger.debug("无界面 Excel 后端已启动")
+        return self.app
+
+    def get_application(self) -> HeadlessApplication:
+        """获取应用程序对象，未启动时自动启动"""
+        return self.start()
+
+    def is_alive(self) -> bool:
+        """应用程序是否已启动且可用"""
+        return self.app is not None
+
+    def quit(self) -> None:
+        """退出应用程序"""
+        if self.app is not None:
+            self.app.Quit()
+            self.app = None
+            logger.debug("无界面 Excel 后端已退出")
+
+    def __enter__(self) -> 'HeadlessExcelManager':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.quit()
+
+
+def create_excel_manager(backend: str = None, **kwargs) -> Any:
+    """
+    按配置创建 Excel 管理器
+
+    Args:
+        backend: 后端类型，'com' 或 'headless'，默认取 EXCEL_CONFIG['backend']
+        **kwargs: 传递给管理器构造函数的参数
+
+    Returns:
+        Excel 管理器实例
+    """
+    backend = backend or EXCEL_CONFIG.get('backend', 'com')
+    if backend == 'headless':
+        return HeadlessExcelManager(**kwargs)
+    if backend == 'com':
+        from utils.excel_manager import ExcelManager
+        return ExcelManager(**kwargs)
+    raise ValueError(f"未知的后端类型: {backend}")
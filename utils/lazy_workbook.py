@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午10:10
+@Author  ：庄洪奎（ARTHUR)
+@FileName：lazy_workbook.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+按需载入的工作簿
+打开文件时只读取工作簿目录（工作表名称、可见状态和尺寸），
+工作表的单元格在第一次访问时才解析；共享字符串表（映射到临时文件，按需解码）
+和样式表在工作簿打开期间只读取一次，重新解析已释放的工作表时直接复用。
+未修改的工作表可以释放，超过 max_loaded_sheets 时自动释放最久未使用的工作表，
+只处理其中一张表的任务内存占用只与该表有关。
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from config import FILE_CONFIG
+from utils.headless_backend import HeadlessPageSetup, HeadlessWorkbook, HeadlessWorksheet, \
+    XL_SHEET_HIDDEN, XL_SHEET_VISIBLE
+from utils.range_address import format_range, parse_range
+from utils.xlsx_reader import XlsxReader, _load_sheet_layout
+
+Area = Tuple[int, int, int, int]
+
+
+class _SheetData:
+    """工作表解析后的内容"""
+
+    __slots__ = ('cells', 'styles', 'column_widths', 'row_heights', 'merged', 'cached', 'layout')
+
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], Any] = {}
+        self.styles: Dict[Tuple[int, int], int] = {}
+        self.column_widths: Dict[int, float] = {}
+        self.row_heights: Dict[int, float] = {}
+        self.merged: List[Area] = []
+        self.cached: Dict[Tuple[int, int], Any] = {}
+        self.layout: Optional[tuple] = None
+
+    def snapshot(self) -> tuple:
+        """记录载入时的布局，用于判断工作表是否被修改过"""
+        return dict(self.column_widths), dict(self.row_heights), list(self.merged)
+
+
+def _data_property(name: str, doc: str) -> property:
+    def getter(self):
+        return getattr(self._load(), name)
+
+    def setter(self, value):
+        setattr(self._load(), name, value)
+
+    return property(getter, setter, doc=doc)
+
+
+class LazyWorksheet(HeadlessWorksheet):
+    """
+    工作表代理
+
+    Name、Visible、Index 和 Dimensions 不需要解析单元格；
+    访问单元格内容、样式或布局时才从文件中解析。
+    """
+
+    def __init__(self, workbook: 'LazyWorkbook', name: str, state: str, dimension: Optional[str]):
+        self.Parent = workbook
+        self._name = name
+        self.Visible = XL_SHEET_VISIBLE if state == 'visible' else XL_SHEET_HIDDEN
+        self._page_setup = HeadlessPageSetup()
+        self._page_setup_loaded = False
+        self._index = None
+        self._charts = []
+        self._pagination = None
+        self._source_name = name
+        self._dimension = dimension
+        self._data: Optional[_SheetData] = None
+        self._modified = False
+
+    _cells = _data_property('cells', '单元格内容')
+    _styles = _data_property('styles', '单元格样式')
+    _column_widths = _data_property('column_widths', '列宽')
+    _row_heights = _data_property('row_heights', '行高')
+    _merged = _data_property('merged', '合并区域')
+
+    @property
+    def PageSetup(self) -> HeadlessPageSetup:
+        """页面设置（第一次访问时解析工作表）"""
+        if not self._page_setup_loaded:
+            self._load()
+        return self._page_setup
+
+    @PageSetup.setter
+    def PageSetup(self, value: HeadlessPageSetup) -> None:
+        self._page_setup = value
+        self._page_setup_loaded = True
+
+    @property
+    def is_loaded(self) -> bool:
+        """单元格内容是否已解析"""
+        return self._data is not None
+
+    @property
+    def Dimensions(self) -> Optional[str]:
+        """已使用区域地址（未解析时取文件中记录的尺寸）"""
+        if self._data is None:
+            return self._dimension
+        bounds = self.used_bounds()
+        return None if bounds is None else format_range(*bounds)
+
+    @property
+    def is_modified(self) -> bool:
+        """载入后是否被修改过"""
+        data = self._data
+        if data is None:
+            return False
+        return self._modified or data.snapshot() != data.layout
+
+    def used_bounds(self) -> Optional[Area]:
+        if self._data is None and self._dimension:
+            return parse_range(self._dimension)
+        return super().used_bounds()
+
+    def release(self) -> bool:
+        """
+        释放已解析的内容，下次访问时重新解析
+
+        Returns:
+            是否已释放（修改过的工作表不会释放）
+        """
+        if self._data is None:
+            return True
+        if self.is_modified or self.Parent._reader is None:
+            return False
+        self._dimension = self.Dimensions
+        self._data = None
+        self.Parent._loaded.pop(self, None)
+        logger.debug(f"已释放工作表: {self.Name}")
+        return True
+
+    def _set_value(self, row: int, col: int, value: Any) -> None:
+        self._modified = True
+        super()._set_value(row, col, value)
+
+    def _styles_changed(self, areas: List[Area], cleared: bool) -> None:
+        self._modified = True
+        super()._styles_changed(areas, cleared)
+
+    def _load(self) -> _SheetData:
+        data = self._data
+        if data is None:
+            data = self._data = self.Parent._parse_sheet(self)
+        self.Parent._touch(self)
+        return data
+
+
+class LazyWorkbook(HeadlessWorkbook):
+    """按需载入工作表的工作簿"""
+
+    def __init__(self, application: Any, path: str, max_loaded_sheets: int = None, trust_cached: bool = None):
+        """
+        Args:
+            application: HeadlessApplication 实例
+            path: xlsx 文件路径
+            max_loaded_sheets: 同时保留解析结果的工作表数，默认取 FILE_CONFIG['lazy_max_loaded_sheets']
+            trust_cached: 是否信任公式缓存值，默认取 FILE_CONFIG['trust_cached_values']
+        """
+        path = Path(path)
+        super().__init__(application, path.name)
+        self.FullName = str(path)
+        self.max_loaded_sheets = max_loaded_sheets or FILE_CONFIG.get('lazy_max_loaded_sheets', 2)
+        if trust_cached is None:
+            trust_cached = FILE_CONFIG.get('trust_cached_values', True)
+        self._reader: Optional[XlsxReader] = XlsxReader(path)
+        self._trust_cached = trust_cached and not self._reader.full_calc_on_load
+        self._loaded: 'OrderedDict[LazyWorksheet, None]' = OrderedDict()
+        self.Worksheets._sheets = [
+            LazyWorksheet(self, name, self._reader.sheet_state(name), self._reader.sheet_dimension(name))
+            for name in self._reader.sheet_names
+        ]
+        self._active_sheet = self.Worksheets._sheets[0]
+        self.Saved = True
+        logger.info(f"已按需打开工作簿: {path.name}（{len(self.Worksheets)} 个工作表）")
+
+    def formula_engine(self) -> Any:
+        """
+        获取公式引擎，信任缓存值时以文件中的结果作为初始计算结果
+
+        引擎持有全部工作表的公式和依赖关系，因此先解析全部工作表并不再自动释放，
+        否则建立依赖图时工作表会在 max_loaded_sheets 的限制下反复释放和重新解析。
+        """
+        if self._formula_engine is not None:
+            return self._formula_engine
+        self.load_all()
+        engine = super().formula_engine()
+        if self._trust_cached:
+            engine.seed({
+                (sheet, row, col): value
+                for sheet in self.Worksheets for (row, col), value in sheet._load().cached.items()
+            })
+        return engine
+
+    def load_all(self) -> None:
+        """解析全部工作表并不再自动释放"""
+        self.max_loaded_sheets = len(self.Worksheets)
+        for sheet in self.Worksheets:
+            sheet._load()
+
+    def release_all(self) -> int:
+        """
+        释放所有未修改的工作表
+
+        Returns:
+            释放的工作表数
+        """
+        return sum(sheet.release() for sheet in list(self._loaded) if sheet.is_loaded)
+
+    def SaveAs(self, Filename: str, FileFormat: Any = None, **kwargs) -> None:
+        """另存为 .xlsx 文件；覆盖源文件时先解析全部工作表并关闭源文件"""
+        if self._reader is not None and Path(Filename).resolve() == self._reader.path.resolve():
+            self.load_all()
+            self._close_reader()
+        super().SaveAs(Filename, FileFormat, **kwargs)
+
+    def Close(self, SaveChanges: bool = False) -> None:
+        """关闭工作簿和源文件"""
+        super().Close(SaveChanges)
+        self._close_reader()
+
+    def _close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _touch(self, sheet: LazyWorksheet) -> None:
+        loaded = self._loaded
+        if sheet in loaded:
+            loaded.move_to_end(sheet)
+            return
+        loaded[sheet] = None
+        # 超出上限时释放最久未使用且未修改的工作表
+        for candidate in list(loaded):
+            if len(loaded) <= self.max_loaded_sheets:
+                break
+            if candidate is not sheet:
+                candidate.release()
+
+    def _parse_sheet(self, sheet: LazyWorksheet) -> _SheetData:
+        if self._reader is None:
+            raise ValueError(f"工作簿已关闭，无法读取工作表: {sheet.Name}")
+        data = _SheetData()
+        # 解析期间工作表的属性直接指向新内容
+        sheet._data = data
+        cells = data.cells
+        cached = data.cached if self._trust_cached else None
+        for row_number, values in self._reader.iter_rows(sheet._source_name, formulas=True, with_row_number=True,
+                                                         cached_values=cached, styles=data.styles):
+            for col, value in enumerate(values, start=1):
+                if value is not None and value != '':
+                    cells[(row_number, col)] = value
+        # 页面设置只在第一次解析时读取，之后的修改不会因释放后重新解析而丢失
+        _load_sheet_layout(self._reader, sheet._source_name, sheet, with_page_setup=not sheet._page_setup_loaded)
+        sheet._page_setup_loaded = True
+        data.layout = data.snapshot()
+        logger.debug(f"已解析工作表: {sheet.Name}（{len(cells)} 个单元格）")
+        return data
+
+
+def open_lazy_workbook(application: Any, path: str, **kwargs) -> LazyWorkbook:
+    """
+    按需载入方式打开 xlsx 文件并加入应用程序的工作簿集合
+
+    Args:
+        application: HeadlessApplication 实例
+        path: xlsx 文件路径
+        **kwargs: 传递给 LazyWorkbook 的参数
+
+    Returns:
+        LazyWorkbook 实例
+    """
+    workbook = LazyWorkbook(application, path, **kwargs)
+    application.Workbooks._workbooks.append(workbook)
+    return workbook
@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午03:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：manager_pool.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+Excel 管理器实例池
+预先启动若干 Excel 管理器，按需借出和归还，避免每个请求都启动/关闭 Excel。
+支持使用次数上限后回收、空闲超时淘汰以及借出前的存活检查。
+锁内只登记实例的去向（借出、归还或预留名额），启动、检查和关闭 Excel 都在锁外进行，
+一个实例启动缓慢或重试时不会阻塞其他线程借出和归还。
+COM 对象的代理只能在取得它的套间中调用，因此实例放回空闲列表时把 Excel 应用程序对象
+封送到流中（CoMarshalInterThreadInterfaceInStream），借出、检查或关闭前在当前线程解封，
+每个线程使用的都是本套间的代理，与线程按单线程套间还是多线程套间初始化 COM 无关。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+from loguru import logger
+
+from config import PERFORMANCE_CONFIG
+
+# 已初始化 COM 的线程
+_com_state = threading.local()
+
+
+class _PooledManager:
+    """池中的管理器及其使用记录"""
+
+    def __init__(self, manager: Any):
+        self.manager = manager
+        self.uses = 0
+        self.created = time.monotonic()
+        self.last_used = self.created
+        # 空闲时封送的应用程序对象；为 None 时 manager.app 是持有此实例的线程可用的代理
+        self._stream: Any = None
+
+    def detach(self) -> None:
+        """放回空闲列表前，在当前持有实例的线程把 COM 应用程序对象封送到流中（无界面后端无需封送）"""
+        dispatch = getattr(getattr(self.manager, 'app', None), '_oleobj_', None)
+        if dispatch is None or self._stream is not None:
+            return
+        ensure_com_initialized()
+        import pythoncom
+
+        self._stream = pythoncom.CoMarshalInterThreadInterfaceInStream(pythoncom.IID_IDispatch, dispatch)
+
+    def attach(self) -> None:
+        """在当前线程解封应用程序对象，之后 manager.app 为本套间的代理"""
+        if self._stream is None:
+            return
+        ensure_com_initialized()
+        import pythoncom
+        import win32com.client
+
+        stream, self._stream = self._stream, None
+        dispatch = pythoncom.CoGetInterfaceAndReleaseStream(stream, pythoncom.IID_IDispatch)
+        self.manager.app = win32com.client.Dispatch(dispatch)
+
+
+def is_manager_alive(manager: Any) -> bool:
+    """
+    检查管理器是否可用
+
+    优先调用管理器自身的 is_alive()，否则尝试访问应用程序对象。
+
+    Args:
+        manager: Excel 管理器
+
+    Returns:
+        是否可用
+    """
+    try:
+        check = getattr(manager, 'is_alive', None)
+        if check is not None:
+            return bool(check())
+        get_application = getattr(manager, 'get_application', None)
+        if get_application is not None:
+            get_application().Workbooks.Count
+        return True
+    except Exception as e:
+        logger.warning(f"Excel 管理器存活检查失败: {e}")
+        return False
+
+
+def ensure_com_initialized() -> None:
+    """
+    确保当前线程已初始化 COM（每个线程只初始化一次，非 Windows 环境忽略）
+
+    与主线程和 AsyncExcelManager 的工作线程一致按单线程套间初始化；线程已按多线程套间
+    初始化时保持不变。实例通过封送在线程之间传递，两种套间都可以借用。
+    """
+    if getattr(_com_state, 'initialized', False):
+        return
+    try:
+        import pythoncom
+    except ImportError:
+        _com_state.initialized = True
+        return
+    try:
+        pythoncom.CoInitialize()
+    except pythoncom.com_error as e:
+        logger.debug(f"当前线程已按多线程套间初始化 COM: {e}")
+    _com_state.initialized = True
+
+
+def close_open_workbooks(manager: Any) -> None:
+    """归还时关闭管理器中残留的工作簿（不保存）"""
+    get_application = getattr(manager, 'get_application', None)
+    if get_application is None:
+        return
+    for workbook in list(get_application().Workbooks):
+        workbook.Close(SaveChanges=False)
+
+
+class ExcelManagerPool:
+    """
+    Excel 管理器池
+
+    用法:
+        with ExcelManagerPool(size=2, backend='headless') as pool:
+            with pool.manager() as excel_mgr:
+                ...
+    """
+
+    def __init__(self, factory: Callable[[], Any] = None, size: int = 2, max_size: int = None,
+                 max_uses: int = 50, idle_timeout: float = 600, backend: str = None,
+                 reset: Callable[[Any], None] = close_open_workbooks):
+        """
+        Args:
+            factory: 创建管理器的函数，默认按 backend 调用 create_excel_manager
+            size: 预先启动并常驻的实例数
+            max_size: 实例数上限，默认与 size 相同
+            max_uses: 单个实例的最大借出次数，达到后关闭并重建
+            idle_timeout: 超过 size 的空闲实例在空闲多少秒后被关闭
+            backend: Excel 后端类型（仅在未提供 factory 时使用）
+            reset: 实例归还时的清理函数
+        """
+        if factory is None:
+            from utils.headless_backend import create_excel_manager
+
+            def factory():
+                return create_excel_manager(backend)
+
+        self.factory = factory
+        self.size = size
+        self.max_size = max(max_size or size, size)
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.reset = reset
+        self._condition = threading.Condition()
+        self._idle: List[_PooledManager] = []
+        self._in_use: dict = {}
+        # 已预留名额、正在锁外启动或检查的实例数
+        self._pending = 0
+        self._closed = False
+        for _ in range(size):
+            entry = self._detached(self._create())
+            if entry is not None:
+                self._idle.append(entry)
+        logger.info(f"Excel 管理器池已启动: {size} 个实例")
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use_count(self) -> int:
+        return len(self._in_use)
+
+    def checkout(self, timeout: float = None) -> Any:
+        """
+        借出一个可用的管理器
+
+        Args:
+            timeout: 等待空闲实例的最长时间（秒），默认取 PERFORMANCE_CONFIG['timeout']
+
+        Returns:
+            Excel 管理器
+        """
+        timeout = PERFORMANCE_CONFIG['timeout'] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        ensure_com_initialized()
+        entry: Optional[_PooledManager] = None
+        expired: List[_PooledManager] = []
+        try:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Excel 管理器池已关闭")
+                    expired.extend(self._take_expired_locked())
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._total_locked() < self.max_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"等待可用的 Excel 实例超时（{timeout} 秒）")
+                    self._condition.wait(remaining)
+                # 预留名额，在锁外检查或启动实例
+                self._pending += 1
+        finally:
+            self._destroy_all(expired)
+
+        try:
+            if entry is not None and not self._usable(entry):
+                logger.warning("池中的 Excel 实例已失效，关闭后重建")
+                self._destroy(entry)
+                entry = None
+            if entry is None:
+                entry = self._create()
+        except BaseException:
+            self._release_pending()
+            raise
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify()
+            if not self._closed:
+                return self._lend(entry)
+        self._destroy(entry)
+        raise RuntimeError("Excel 管理器池已关闭")
+
+    def checkin(self, manager: Any) -> None:
+        """
+        归还管理器
+
+        Args:
+            manager: 之前借出的管理器
+        """
+        with self._condition:
+            entry = self._in_use.pop(id(manager), None)
+            if entry is None:
+                raise ValueError("归还的管理器不属于此池")
+            recycle = self._closed or entry.uses >= self.max_uses
+            # 清理和重建期间仍占用名额
+            self._pending += 1
+
+        replacement: Optional[_PooledManager] = None
+        try:
+            if not recycle:
+                try:
+                    self.reset(manager)
+                    entry.detach()
+                except Exception as e:
+                    logger.warning(f"清理 Excel 实例失败，将重建: {e}")
+                    recycle = True
+            if recycle:
+                self._destroy(entry)
+                with self._condition:
+                    refill = not self._closed and self._total_locked() <= self.size
+                if refill:
+                    try:
+                        replacement = self._create()
+                    except RuntimeError as e:
+                        # 名额留空，下次借出时按需启动
+                        logger.error(f"重建 Excel 实例失败: {e}")
+                    else:
+                        replacement = self._detached(replacement)
+            else:
+                entry.last_used = time.monotonic()
+                replacement = entry
+        finally:
+            with self._condition:
+                self._pending -= 1
+                if replacement is not None and not self._closed:
+                    self._idle.append(replacement)
+                    replacement = None
+                self._condition.notify()
+        if replacement is not None:
+            self._destroy(replacement)
+
+    @contextmanager
+    def manager(self, timeout: float = None) -> Iterator[Any]:
+        """借出管理器的上下文管理器，退出时自动归还"""
+        manager = self.checkout(timeout)
+        try:
+            yield manager
+        finally:
+            self.checkin(manager)
+
+    def evict_idle(self) -> int:
+        """
+        关闭空闲超时的多余实例
+
+        Returns:
+            关闭的实例数
+        """
+        with self._condition:
+            expired = self._take_expired_locked()
+        self._destroy_all(expired)
+        return len(expired)
+
+    def close(self) -> None:
+        """关闭池中所有空闲实例；借出中的实例在归还时关闭"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        self._destroy_all(idle)
+        logger.info("Excel 管理器池已关闭")
+
+    def __enter__(self) -> 'ExcelManagerPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _lend(self, entry: _PooledManager) -> Any:
+        entry.uses += 1
+        entry.last_used = time.monotonic()
+        self._in_use[id(entry.manager)] = entry
+        return entry.manager
+
+    def _total_locked(self) -> int:
+        return len(self._in_use) + len(self._idle) + self._pending
+
+    def _release_pending(self) -> None:
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify()
+
+    def _create(self) -> _PooledManager:
+        """启动一个实例（在锁外调用，失败时按配置重试）"""
+        ensure_com_initialized()
+        retries = PERFORMANCE_CONFIG['max_retries']
+        last_error: Optional[Exception] = None
+        for attempt in range(1, retries + 1):
+            try:
+                manager = self.factory()
+                manager.__enter__()
+                return _PooledManager(manager)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"启动 Excel 实例失败（第 {attempt}/{retries} 次）: {e}")
+                if attempt < retries:
+                    time.sleep(PERFORMANCE_CONFIG['retry_delay'])
+        raise RuntimeError(f"无法启动 Excel 实例: {last_error}")
+
+    def _detached(self, entry: _PooledManager) -> Optional[_PooledManager]:
+        """封送新建的实例以便放回空闲列表，失败时关闭实例并返回 None"""
+        try:
+            entry.detach()
+        except Exception as e:
+            logger.error(f"封送 Excel 实例失败: {e}")
+            self._destroy(entry)
+            return None
+        return entry
+
+    @staticmethod
+    def _usable(entry: _PooledManager) -> bool:
+        """在当前线程解封空闲实例并检查是否可用"""
+        try:
+            entry.attach()
+        except Exception as e:
+            logger.warning(f"无法在当前线程解封 Excel 实例: {e}")
+            return False
+        return is_manager_alive(entry.manager)
+
+    @staticmethod
+    def _destroy(entry: _PooledManager) -> None:
+        try:
+            entry.attach()
+            entry.manager.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"关闭 Excel 实例失败: {e}")
+
+    def _destroy_all(self, entries: List[_PooledManager]) -> None:
+        for entry in entries:
+            self._destroy(entry)
+        if entries:
+            logger.debug(f"已关闭 {len(entries)} 个空闲的 Excel 实例")
+
+    def _take_expired_locked(self) -> List[_PooledManager]:
+        """取出空闲超时的多余实例（由调用方在锁外关闭）"""
+        now = time.monotonic()
+        expired = []
+        # 只淘汰超出常驻数量的实例，最早空闲的优先
+        self._idle.sort(key=lambda entry: entry.last_used, reverse=True)
+        while self._total_locked() > self.size and self._idle and \
+                now - self._idle[-1].last_used > self.idle_timeout:
+            expired.append(self._idle.pop())
+        return expired
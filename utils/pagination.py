@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午11:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：pagination.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+分页引擎
+根据列宽、行高、页边距和缩放比例计算打印分页，结果按工作表缓存。
+行方向的分页点是从区域第一行开始的贪心切分，某一行之前的分页点不受其后内容的影响，
+因此修改行高或已使用区域变化时只丢弃该行所在页及其后的分页点，再从该页的起始行继续计算；
+列宽变化时只重新切分列（列数远少于行数）；页面设置变化时全部重新计算。
+单元格值的修改不影响行高，也就不会引起重新分页。
+"""
+
+from bisect import bisect_left
+from typing import Any, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.range_address import parse_areas, parse_range
+
+XL_LANDSCAPE = 2
+XL_DOWN_THEN_OVER = 1
+XL_OVER_THEN_DOWN = 2
+
+# 纸张尺寸（磅），键为 XlPaperSize 常量
+PAPER_SIZES = {
+    1: (612.0, 792.0),        # Letter
+    5: (612.0, 1008.0),       # Legal
+    8: (841.89, 1190.55),     # A3
+    9: (595.28, 841.89),      # A4
+    11: (419.53, 595.28),     # A5
+    13: (515.91, 728.5),      # B5 (JIS)
+}
+
+DEFAULT_COLUMN_WIDTH = 8.43
+DEFAULT_ROW_HEIGHT = 15.0
+
+Area = Tuple[int, int, int, int]
+# 页：(打印区域序号, 起始行, 结束行, 起始列, 结束列)
+Page = Tuple[int, int, int, int, int]
+
+
+def fits_to_pages(page_setup: Any) -> bool:
+    """
+    是否按页数缩放打印（与 Excel 一致，只有 Zoom 为 False 时 FitToPagesWide/Tall 才生效）
+
+    Args:
+        page_setup: 页面设置对象
+
+    Returns:
+        是否按页数缩放
+    """
+    return page_setup.Zoom is False and bool(page_setup.FitToPagesWide or page_setup.FitToPagesTall)
+
+
+def column_points(width: float) -> float:
+    """列宽（字符数）换算为磅，与 Excel 默认字体下的换算一致"""
+    return 0.0 if width <= 0 else int(width * 7 + 5) * 0.75
+
+
+def _rows_address(address: str) -> str:
+    """'$1:$2' 形式的整行地址转换为 'A1:A2'"""
+    first, _, last = address.replace('$', '').split('!')[-1].partition(':')
+    return f"A{first}:A{last or first}"
+
+
+class _RowBreaks:
+    """一个打印区域的行分页点：第 i 页为 starts[i]..ends[i]"""
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def truncate(self, row: int) -> None:
+        """丢弃包含 row 的页及其后的页"""
+        index = bisect_left(self.ends, row)
+        del self.starts[index:]
+        del self.ends[index:]
+
+
+class SheetPagination:
+    """
+    工作表的分页结果
+
+    通过 worksheet.pagination() 获取，工作表的行高、列宽和单元格写入会增量通知此对象。
+    """
+
+    def __init__(self, worksheet: Any, ignore_print_areas: bool = False):
+        """
+        Args:
+            worksheet: 无界面后端的工作表
+            ignore_print_areas: 是否忽略打印区域（按已使用区域分页）
+        """
+        self.worksheet = worksheet
+        self.ignore_print_areas = ignore_print_areas
+        self.page_width = 0.0
+        self.page_height = 0.0
+        self.margins = (0.0, 0.0, 0.0, 0.0)
+        self.scale = 1.0
+        self.order = XL_DOWN_THEN_OVER
+        self.title_rows: Optional[Tuple[int, int]] = None
+        self.laid_out_rows = 0
+        self._settings: Optional[tuple] = None
+        self._areas: List[Area] = []
+        self._row_breaks: List[_RowBreaks] = []
+        self._column_groups: Optional[List[List[Tuple[int, int]]]] = None
+        self._pages: Optional[List[Page]] = None
+        # 按页数缩放时各区域的总宽度和总高度，列宽、行高或区域变化时重新计算
+        self._extents: Optional[List[Tuple[float, float]]] = None
+        # 不使用打印区域时缓存已使用区域，随写入增量更新
+        self._bounds: Optional[Area] = None
+        self._bounds_valid = False
+
+    # ---- 尺寸 ----
+
+    def column_width(self, col: int) -> float:
+        """列宽（磅）"""
+        return column_points(self.worksheet._column_widths.get(col, DEFAULT_COLUMN_WIDTH))
+
+    def row_height(self, row: int) -> float:
+        """行高（磅）"""
+        return self.worksheet._row_heights.get(row, DEFAULT_ROW_HEIGHT)
+
+    @property
+    def printable(self) -> Tuple[float, float]:
+        """可打印区域的宽和高（工作表坐标，已按缩放比例换算）"""
+        left, right, top, bottom = self.margins
+        return (self.page_width - left - right) / self.scale, (self.page_height - top - bottom) / self.scale
+
+    @property
+    def areas(self) -> List[Area]:
+        """打印区域（未设置时为已使用区域）"""
+        self.pages()
+        return list(self._areas)
+
+    # ---- 增量通知 ----
+
+    def rows_changed(self, row: int) -> None:
+        """行高从 row 开始发生变化"""
+        for breaks in self._row_breaks:
+            breaks.truncate(row)
+        self._pages = None
+        self._extents = None
+
+    def columns_changed(self) -> None:
+        """列宽发生变化"""
+        self._column_groups = None
+        self._pages = None
+        self._extents = None
+
+    def cell_changed(self, row: int, col: int, empty: bool) -> None:
+        """单元格内容或格式发生变化（只影响以已使用区域分页的工作表）"""
+        if not self._bounds_valid:
+            return
+        bounds = self._bounds
+        if empty:
+            # 清空边界上的单元格可能使已使用区域缩小，下次分页时重新计算
+            if bounds is not None and (row in (bounds[0], bounds[2]) or col in (bounds[1], bounds[3])):
+                self._bounds_valid = False
+        elif bounds is None:
+            self._bounds = (row, col, row, col)
+        elif not (bounds[0] <= row <= bounds[2] and bounds[1] <= col <= bounds[3]):
+            self._bounds = (min(bounds[0], row), min(bounds[1], col), max(bounds[2], row), max(bounds[3], col))
+
+    def area_changed(self, area: Area, empty: bool) -> None:
+        """区域的格式发生变化"""
+        first_row, first_col, last_row, last_col = area
+        self.cell_changed(first_row, first_col, empty)
+        self.cell_changed(last_row, last_col, empty)
+
+    # ---- 分页 ----
+
+    def pages(self) -> List[Page]:
+        """
+        获取分页结果（只重新计算失效的部分）
+
+        Returns:
+            页列表，每页为 (打印区域序号, 起始行, 结束行, 起始列, 结束列)，顺序与打印顺序一致
+        """
+        settings = self._read_settings()
+        if settings != self._settings:
+            self._apply_settings(settings)
+        areas = self._current_areas()
+        if areas != self._areas:
+            self._reconcile(areas)
+        if self._fit_to_page():
+            scale = self._fit_scale()
+            if scale != self.scale:
+                self.scale = scale
+                self._reset_breaks()
+        if self._pages is None:
+            self._pages = self._layout()
+        return self._pages
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages())
+
+    def _read_settings(self) -> tuple:
+        page_setup = self.worksheet.PageSetup
+        return (
+            page_setup.PaperSize, page_setup.Orientation, page_setup.LeftMargin, page_setup.RightMargin,
+            page_setup.TopMargin, page_setup.BottomMargin, page_setup.Zoom, page_setup.FitToPagesWide,
+            page_setup.FitToPagesTall, page_setup.PrintArea, page_setup.PrintTitleRows,
+            getattr(page_setup, 'Order', XL_DOWN_THEN_OVER), self.ignore_print_areas,
+        )
+
+    def _apply_settings(self, settings: tuple) -> None:
+        (paper_size, orientation, left, right, top, bottom, zoom, _, _, _, title_rows, order, _) = settings
+        width, height = PAPER_SIZES.get(paper_size, PAPER_SIZES[9])
+        if orientation == XL_LANDSCAPE:
+            width, height = height, width
+        self.page_width, self.page_height = width, height
+        self.margins = (left, right, top, bottom)
+        self.scale = zoom / 100 if zoom else 1.0
+        self.order = order
+        self.title_rows = None
+        if title_rows:
+            first_row, _, last_row, _ = parse_range(_rows_address(title_rows))
+            self.title_rows = (first_row, last_row)
+        self._settings = settings
+        self._areas = []
+        self._reset_breaks()
+
+    def _current_areas(self) -> List[Area]:
+        print_area = self.worksheet.PageSetup.PrintArea
+        if print_area and not self.ignore_print_areas:
+            return parse_areas(print_area.replace('$', '').split('!')[-1])
+        if not self._bounds_valid:
+            self._bounds = self.worksheet.used_bounds()
+            self._bounds_valid = True
+        return [self._bounds] if self._bounds else []
+
+    def _reconcile(self, areas: List[Area]) -> None:
+        previous = self._areas
+        self._areas = areas
+        self._pages = None
+        self._extents = None
+        if len(previous) != len(areas):
+            self._reset_breaks()
+            return
+        for index, (new, old) in enumerate(zip(areas, previous)):
+            if new[0] != old[0]:
+                self._row_breaks[index] = _RowBreaks()
+            elif new[2] != old[2]:
+                # 区域的最后一行变化：原来的最后一页可能不满，从该页重新计算
+                self._row_breaks[index].truncate(min(new[2], old[2]))
+            if new[1] != old[1] or new[3] != old[3]:
+                self._column_groups = None
+
+    def _reset_breaks(self) -> None:
+        self._row_breaks = [_RowBreaks() for _ in self._areas]
+        self._column_groups = None
+        self._pages = None
+        self._extents = None
+
+    def _fit_to_page(self) -> bool:
+        return fits_to_pages(self.worksheet.PageSetup)
+
+    def _fit_scale(self) -> float:
+        page_setup = self.worksheet.PageSetup
+        wide, tall = page_setup.FitToPagesWide, page_setup.FitToPagesTall
+        left, right, top, bottom = self.margins
+        width, height = self.page_width - left - right, self.page_height - top - bottom
+        if self._extents is None:
+            self._extents = [self._area_extent(area) for area in self._areas]
+        scale = 1.0
+        for total_width, total_height in self._extents:
+            if wide:
+                scale = min(scale, width * wide / total_width if total_width else 1.0)
+            if tall:
+                scale = min(scale, height * tall / total_height if total_height else 1.0)
+        return max(scale, 0.1)
+
+    def _area_extent(self, area: Area) -> Tuple[float, float]:
+        """区域的总宽度和总高度（磅），只遍历设置过列宽、行高的列和行"""
+        first_row, first_col, last_row, last_col = area
+        default_width = column_points(DEFAULT_COLUMN_WIDTH)
+        total_width = (last_col - first_col + 1) * default_width + sum(
+            column_points(width) - default_width
+            for col, width in self.worksheet._column_widths.items() if first_col <= col <= last_col)
+        total_height = (last_row - first_row + 1) * DEFAULT_ROW_HEIGHT + sum(
+            height - DEFAULT_ROW_HEIGHT
+            for row, height in self.worksheet._row_heights.items() if first_row <= row <= last_row)
+        return total_width, total_height
+
+    def _layout(self) -> List[Page]:
+        width, height = self.printable
+        if self.title_rows is not None:
+            height -= sum(self.row_height(row) for row in range(self.title_rows[0], self.title_rows[1] + 1))
+        if self._column_groups is None:
+            self._column_groups = [self._split_columns(area, width) for area in self._areas]
+        pages: List[Page] = []
+        for index, area in enumerate(self._areas):
+            breaks = self._row_breaks[index]
+            self._complete_rows(breaks, area, height)
+            row_groups = list(zip(breaks.starts, breaks.ends))
+            column_groups = self._column_groups[index]
+            if self.order == XL_OVER_THEN_DOWN:
+                pages.extend((index, *rows, *cols) for rows in row_groups for cols in column_groups)
+            else:
+                pages.extend((index, *rows, *cols) for cols in column_groups for rows in row_groups)
+        return pages
+
+    def _split_columns(self, area: Area, limit: float) -> List[Tuple[int, int]]:
+        groups, start, used = [], area[1], 0.0
+        for col in range(area[1], area[3] + 1):
+            width = self.column_width(col)
+            if col > start and used + width > limit + 1e-6:
+                groups.append((start, col - 1))
+                start, used = col, 0.0
+            used += width
+        groups.append((start, area[3]))
+        return groups
+
+    def _complete_rows(self, breaks: _RowBreaks, area: Area, limit: float) -> None:
+        # 从最后一个有效分页点继续切分，结果与从头计算相同
+        first = breaks.ends[-1] + 1 if breaks.ends else area[0]
+        last = area[2]
+        if first > last:
+            return
+        heights = self.worksheet._row_heights
+        start, used = first, 0.0
+        for row in range(first, last + 1):
+            height = heights.get(row, DEFAULT_ROW_HEIGHT)
+            if row > start and used + height > limit + 1e-6:
+                breaks.starts.append(start)
+                breaks.ends.append(row - 1)
+                start, used = row, 0.0
+            used += height
+        breaks.starts.append(start)
+        breaks.ends.append(last)
+        self.laid_out_rows += last - first + 1
+        logger.debug(f"已分页: {self.worksheet.Name} 第 {first}-{last} 行")
@@ -0,0 +1,656 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午10:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：pdf_writer.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+PDF 导出
+不经过 Excel 的打印引擎，直接把无界面后端的工作表输出为 PDF。
+按工作表的 PageSetup（默认值取自 PRINT_CONFIG）确定纸张、方向、页边距和缩放，
+只输出打印区域，分页由 utils.pagination 计算并按工作表缓存，页眉页脚支持 &P、&N、&D、&T、&A、&F 代码。
+每页的内容流生成后立即写入文件，内存占用与总页数无关；
+多个工作表可以在多个进程中并行生成内容流，再按顺序拼接到同一个文件中。
+中文使用 PDF 阅读器自带的 STSong-Light 字体（不嵌入字体文件）。
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from config import FORMAT_CONFIG, PERFORMANCE_CONFIG
+from utils.pagination import DEFAULT_COLUMN_WIDTH, DEFAULT_ROW_HEIGHT, Area, Page, column_points
+from utils.style_registry import STYLE_REGISTRY
+
+# ExportAsFixedFormat 的 Type 参数
+XL_TYPE_PDF = 0
+
+HEADER_FONT_SIZE = 9.0
+CELL_PADDING = 2.0
+
+_HORIZONTAL = {-4108: 'center', -4131: 'left', -4152: 'right', 7: 'center'}
+_VERTICAL = {-4108: 'center', -4160: 'top', -4107: 'bottom'}
+_BORDER_WIDTHS = {1: 0.25, 2: 0.5, -4138: 1.0, 4: 1.5}
+_NO_BORDER = (None, -4142, 'xlNone')
+
+# ---- 单元格文本 ----
+
+_QUOTED = re.compile(r'"([^"]*)"')
+_IGNORED = re.compile(r'\[[^\]]*\]|_.|\*.|\\')
+_NUMBER = re.compile(r'[#0?,]+(?:\.[#0?]+)?|\.[#0?]+')
+_DATE_TOKEN = re.compile(r'yyyy|yy|mmmm|mmm|mm|m|dddd|ddd|dd|d|hh|h|ss|s|.', re.I | re.S)
+
+
+def _format_date(value: Any, number_format: str) -> str:
+    code = _QUOTED.sub(r'\1', _IGNORED.sub('', number_format.split(';')[0]))
+    tokens = _DATE_TOKEN.findall(code)
+    fields = [index for index, token in enumerate(tokens) if token[0].lower() in 'ymdhs']
+    parts = []
+    for index, token in enumerate(tokens):
+        kind, width = token[0].lower(), len(token)
+        if kind not in 'ymdhs':
+            parts.append(token)
+            continue
+        if kind == 'm' and width <= 2:
+            # m/mm 紧跟小时或在秒之前时表示分钟
+            position = fields.index(index)
+            before = tokens[fields[position - 1]][0].lower() if position else ''
+            after = tokens[fields[position + 1]][0].lower() if position + 1 < len(fields) else ''
+            if before == 'h' or after == 's':
+                kind = 'n'
+        if kind == 'y':
+            year = getattr(value, 'year', 1900)
+            parts.append(str(year) if width == 4 else f'{year % 100:02d}')
+        elif kind == 'm' and width > 2:
+            parts.append(value.strftime('%B' if width == 4 else '%b'))
+        elif kind == 'd' and width > 2:
+            parts.append(value.strftime('%A' if width == 4 else '%a'))
+        else:
+            number = getattr(value, {'m': 'month', 'd': 'day', 'h': 'hour', 'n': 'minute', 's': 'second'}[kind], 0)
+            parts.append(f'{number:0{width}d}')
+    return ''.join(parts)
+
+
+def format_value(value: Any, number_format: Optional[str] = None) -> str:
+    """
+    按数字格式把单元格值转换为显示文本（支持常用的数值、百分比、千分位和日期格式）
+
+    Args:
+        value: 单元格值
+        number_format: NumberFormat，例如 '#,##0.00'、'0.0%'、'yyyy-mm-dd'
+
+    Returns:
+        显示文本
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (datetime, date, time)):
+        if not number_format or number_format == 'General':
+            number_format = FORMAT_CONFIG['date_format']
+        if isinstance(value, datetime) and value.time() != time() and not re.search('[hs]', number_format):
+            number_format += ' hh:mm:ss'
+        return _format_date(value, number_format)
+    if not isinstance(value, (int, float)):
+        return str(value)
+    if not number_format or number_format in ('General', '@'):
+        if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f'{value:.10g}' if isinstance(value, float) else str(value)
+    sections = number_format.split(';')
+    section = sections[1] if value < 0 and len(sections) > 1 else sections[0]
+    section = _IGNORED.sub('', section)
+    if value < 0 and len(sections) > 1:
+        value = -value
+    match = _NUMBER.search(_QUOTED.sub('', section))
+    if match is None:
+        return _QUOTED.sub(r'\1', section)
+    pattern = match.group(0)
+    decimals = len(pattern.split('.')[1]) if '.' in pattern else 0
+    grouping = ',' if ',' in pattern.split('.')[0] else ''
+    if '%' in section:
+        value *= 100
+    text = f'{value:{grouping}.{decimals}f}'
+    literal = _QUOTED.sub(lambda quoted: quoted.group(1).replace('0', '\0'), section)
+    number = _NUMBER.search(literal)
+    return (literal[:number.start()] + text + literal[number.end():]).replace('\0', '0')
+
+
+# ---- 工作表快照 ----
+
+@dataclass
+class SheetSnapshot:
+    """工作表打印所需的数据，可在进程间传递"""
+
+    name: str
+    file_name: str
+    page_width: float
+    page_height: float
+    margins: Tuple[float, float, float, float]
+    header_margin: float
+    footer_margin: float
+    scale: float
+    gridlines: bool
+    center_horizontally: bool
+    center_vertically: bool
+    headers: Tuple[str, str, str]
+    footers: Tuple[str, str, str]
+    areas: List[Area]
+    pages: List[Page]
+    title_rows: Optional[Tuple[int, int]]
+    column_widths: Dict[int, float]
+    row_heights: Dict[int, float]
+    cells: Dict[Tuple[int, int], Tuple[str, bool, int]] = field(default_factory=dict)
+    styles: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    merged: List[Area] = field(default_factory=list)
+
+    def width(self, col: int) -> float:
+        return self.column_widths.get(col, self.column_widths.get(0, 0.0))
+
+    def height(self, row: int) -> float:
+        return self.row_heights.get(row, DEFAULT_ROW_HEIGHT)
+
+
+def snapshot_sheet(worksheet: Any, ignore_print_areas: bool = False) -> SheetSnapshot:
+    """
+    读取工作表的页面设置、打印区域和单元格显示文本
+
+    Args:
+        worksheet: 无界面后端的工作表
+        ignore_print_areas: 是否忽略打印区域（输出整个已使用区域）
+
+    Returns:
+        SheetSnapshot
+    """
+    page_setup = worksheet.PageSetup
+    # 分页结果按工作表缓存，数据小幅修改后不需要重新分页
+    layout = worksheet.pagination(ignore_print_areas)
+    pages = list(layout.pages())
+    areas, title_rows = layout.areas, layout.title_rows
+    snapshot = SheetSnapshot(
+        name=worksheet.Name,
+        file_name=worksheet.Parent.Name,
+        page_width=layout.page_width,
+        page_height=layout.page_height,
+        margins=layout.margins,
+        header_margin=page_setup.HeaderMargin,
+        footer_margin=page_setup.FooterMargin,
+        scale=layout.scale,
+        gridlines=bool(page_setup.PrintGridlines),
+        center_horizontally=bool(page_setup.CenterHorizontally),
+        center_vertically=bool(page_setup.CenterVertically),
+        headers=(page_setup.LeftHeader, page_setup.CenterHeader, page_setup.RightHeader),
+        footers=(page_setup.LeftFooter, page_setup.CenterFooter, page_setup.RightFooter),
+        areas=areas,
+        pages=pages,
+        title_rows=title_rows,
+        column_widths={0: column_points(DEFAULT_COLUMN_WIDTH)},
+        row_heights=dict(worksheet._row_heights),
+        merged=list(worksheet._merged),
+    )
+    for col, column_width in worksheet._column_widths.items():
+        snapshot.column_widths[col] = column_points(column_width)
+
+    regions = list(areas)
+    if title_rows is not None and areas:
+        regions.append((title_rows[0], min(area[1] for area in areas),
+                        title_rows[1], max(area[3] for area in areas)))
+
+    def printed(row: int, col: int) -> bool:
+        return any(first_row <= row <= last_row and first_col <= col <= last_col
+                   for first_row, first_col, last_row, last_col in regions)
+
+    engine = worksheet.Parent._formula_engine
+    if engine is None and any(isinstance(value, str) and value.startswith('=') for value in worksheet._cells.values()):
+        engine = worksheet.Parent.formula_engine()
+    styles = worksheet._styles
+    for (row, col), value in worksheet._cells.items():
+        if not printed(row, col):
+            continue
+        if engine is not None and isinstance(value, str) and value.startswith('='):
+            value = engine.get_value(worksheet, row, col)
+        style_id = styles.get((row, col), 0)
+        if style_id not in snapshot.styles:
+            snapshot.styles[style_id] = dict(STYLE_REGISTRY.get(style_id))
+        number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        snapshot.cells[(row, col)] = (format_value(value, snapshot.styles[style_id].get('number_format')),
+                                      number, style_id)
+    # 只有格式（填充、边框）的单元格
+    for (row, col), style_id in styles.items():
+        if (row, col) not in snapshot.cells and printed(row, col):
+            if style_id not in snapshot.styles:
+                snapshot.styles[style_id] = dict(STYLE_REGISTRY.get(style_id))
+            snapshot.cells[(row, col)] = ('', False, style_id)
+    return snapshot
+
+
+# ---- 页面内容 ----
+
+_HEADER_CODE = re.compile(r'&(?:"[^"]*"|\d+|K[0-9A-Fa-f]{6}|[BIUSEXYbiusexy]|[PNDTAFpndtaf]|&)')
+
+
+def expand_header_footer(text: str, page: int, total: int, sheet_name: str, file_name: str,
+                         now: datetime) -> str:
+    """
+    展开页眉页脚代码（&P 页码、&N 总页数、&D 日期、&T 时间、&A 工作表名、&F 文件名），忽略字体格式代码
+
+    Returns:
+        展开后的文本
+    """
+    if not text or '&' not in text:
+        return text or ''
+    values = {
+        'P': str(page), 'N': str(total), 'D': now.strftime('%Y/%m/%d'), 'T': now.strftime('%H:%M'),
+        'A': sheet_name, 'F': file_name, '&': '&',
+    }
+    return _HEADER_CODE.sub(lambda match: values.get(match.group(0)[1:].upper(), ''), text)
+
+
+def _text_width(text: str, size: float) -> float:
+    # ASCII 为半角，其他字符为全角
+    if text.isascii():
+        return size * 0.5 * len(text)
+    return size * sum(0.5 if ord(char) < 128 else 1.0 for char in text)
+
+
+def _pdf_string(text: str) -> str:
+    encoded = text.encode('utf-16-be')
+    if len(encoded) != 2 * len(text):
+        # UniGB-UCS2-H 编码只支持基本多文种平面
+        encoded = ''.join(char if ord(char) <= 0xFFFF else '?' for char in text).encode('utf-16-be')
+    return '<' + encoded.hex() + '>'
+
+
+@lru_cache(maxsize=256)
+def _color(value: Any, stroke: bool = False) -> str:
+    value = int(value)
+    red, green, blue = value & 0xFF, (value >> 8) & 0xFF, (value >> 16) & 0xFF
+    return f'{red / 255:.3f} {green / 255:.3f} {blue / 255:.3f} {"RG" if stroke else "rg"}'
+
+
+def _fit_lines(text: str, width: float, size: float, wrap: bool) -> List[str]:
+    lines = text.split('\n')
+    if not wrap:
+        return lines[:1]
+    wrapped = []
+    for line in lines:
+        current = ''
+        for char in line:
+            if current and _text_width(current + char, size) > width:
+                wrapped.append(current)
+                current = ''
+            current += char
+        wrapped.append(current)
+    return wrapped
+
+
+class _PageCanvas:
+    """一页的内容流"""
+
+    def __init__(self, snapshot: SheetSnapshot):
+        self.snapshot = snapshot
+        self.operations: List[str] = []
+        self._text_styles: Dict[tuple, tuple] = {}
+
+    def text(self, x: float, y: float, text: str, size: float, color: Any = None, bold: bool = False) -> None:
+        operation = f'/F1 {size:.2f} Tf 1 0 0 1 {x:.2f} {y:.2f} Tm {_pdf_string(text)} Tj ET'
+        if bold:
+            # 描边加粗；文本渲染模式属于图形状态，用 q/Q 限定范围
+            self.operations.append(f'q BT {_color(color or 0)} {_color(color or 0, stroke=True)} 2 Tr '
+                                   f'{size * 0.03:.2f} w {operation} Q')
+        else:
+            self.operations.append(f'BT {_color(color or 0)} {operation}')
+
+    def header_footer(self, page: int, total: int, now: datetime) -> None:
+        snapshot = self.snapshot
+        left, right, _, _ = snapshot.margins
+        for texts, y in ((snapshot.headers, snapshot.page_height - snapshot.header_margin - HEADER_FONT_SIZE),
+                         (snapshot.footers, snapshot.footer_margin)):
+            for position, code in zip(('left', 'center', 'right'), texts):
+                text = expand_header_footer(code, page, total, snapshot.name, snapshot.file_name, now)
+                if not text:
+                    continue
+                width = _text_width(text, HEADER_FONT_SIZE)
+                x = {'left': left, 'center': (snapshot.page_width - width) / 2,
+                     'right': snapshot.page_width - right - width}[position]
+                self.text(x, y, text, HEADER_FONT_SIZE)
+
+    def cells(self, rows: List[int], cols: List[int]) -> None:
+        """绘制一页的单元格（rows 可包含重复打印的标题行）"""
+        snapshot = self.snapshot
+        scale = snapshot.scale
+        left, right, top, bottom = snapshot.margins
+        widths = [snapshot.width(col) for col in cols]
+        heights = [snapshot.height(row) for row in rows]
+        total_width, total_height = sum(widths), sum(heights)
+        origin_x, origin_y = left, snapshot.page_height - top
+        if snapshot.center_horizontally:
+            origin_x += (snapshot.page_width - left - right - total_width * scale) / 2
+        if snapshot.center_vertically:
+            origin_y -= (snapshot.page_height - top - bottom - total_height * scale) / 2
+        xs, ys = [0.0], [0.0]
+        for value in widths:
+            xs.append(xs[-1] + value)
+        for value in heights:
+            ys.append(ys[-1] + value)
+        ops = self.operations
+        ops.append(f'q {scale:.4f} 0 0 {scale:.4f} {origin_x:.2f} {origin_y:.2f} cm')
+        # 以下坐标单位为工作表磅，y 轴向下为负
+        col_index = {col: index for index, col in enumerate(cols)}
+        merged = self._merged_on_page(rows, cols, col_index)
+        covered = {cell for area in merged.values() for cell in area[1]}
+        fills, borders, texts = [], [], []
+        cells = snapshot.cells
+        for row_index, row in enumerate(rows):
+            for index, col in enumerate(cols):
+                cell = cells.get((row, col))
+                if cell is None or (row_index, index) in covered:
+                    continue
+                x0, y0 = xs[index], ys[row_index]
+                x1, y1 = xs[index + 1], ys[row_index + 1]
+                if (row_index, index) in merged:
+                    x1, y1 = merged[(row_index, index)][0]
+                text, number, style_id = cell
+                style = snapshot.styles.get(style_id, {})
+                if style.get('fill_color') is not None:
+                    fills.append(f'{_color(style["fill_color"])} {x0:.2f} {-y1:.2f} {x1 - x0:.2f} {y1 - y0:.2f} re f')
+                if style.get('border_style') not in _NO_BORDER:
+                    line_width = _BORDER_WIDTHS.get(style.get('border_weight'), 0.5)
+                    borders.append(f'{_color(style.get("border_color") or 0, stroke=True)} {line_width} w '
+                                   f'{x0:.2f} {-y1:.2f} {x1 - x0:.2f} {y1 - y0:.2f} re S')
+                if text:
+                    texts.append((row_index, index, x0, y0, x1, y1, text, number, style))
+        ops.extend(fills)
+        if snapshot.gridlines:
+            ops.append('0.75 0.75 0.75 RG 0.25 w')
+            ops.extend(f'{x:.2f} 0 m {x:.2f} {-total_height:.2f} l S' for x in xs)
+            ops.extend(f'0 {-y:.2f} m {total_width:.2f} {-y:.2f} l S' for y in ys)
+        ops.extend(borders)
+        for item in texts:
+            self._cell_text(*item, xs, rows, cols)
+        ops.append('Q')
+
+    def _merged_on_page(self, rows: List[int], cols: List[int], col_index: Dict[int, int]) -> Dict[Tuple[int, int], Any]:
+        # 合并区域：左上角单元格 -> ((右下角坐标), 被覆盖的单元格)
+        result = {}
+        if not self.snapshot.merged:
+            return result
+        row_index = {row: index for index, row in enumerate(rows)}
+        snapshot = self.snapshot
+        for first_row, first_col, last_row, last_col in snapshot.merged:
+            if first_row not in row_index or first_col not in col_index:
+                continue
+            start_row, start_col = row_index[first_row], col_index[first_col]
+            inside_rows = [row_index[row] for row in range(first_row, last_row + 1) if row in row_index]
+            inside_cols = [col_index[col] for col in range(first_col, last_col + 1) if col in col_index]
+            x1 = sum(snapshot.width(cols[index]) for index in range(0, inside_cols[-1] + 1))
+            y1 = sum(snapshot.height(rows[index]) for index in range(0, inside_rows[-1] + 1))
+            covered = [(r, c) for r in inside_rows for c in inside_cols if (r, c) != (start_row, start_col)]
+            result[(start_row, start_col)] = ((x1, y1), covered)
+        return result
+
+    def _text_style(self, style: Dict[str, Any], number: bool) -> tuple:
+        key = (id(style), number)
+        cached = self._text_styles.get(key)
+        if cached is None:
+            alignment = style.get('horizontal_alignment')
+            alignment = _HORIZONTAL.get(alignment, alignment if isinstance(alignment, str) else None)
+            cached = self._text_styles[key] = (
+                float(style.get('font_size') or FORMAT_CONFIG['default_font_size']),
+                alignment or ('right' if number else 'left'),
+                bool(style.get('wrap_text')),
+                _VERTICAL.get(style.get('vertical_alignment'), 'bottom'),
+                style.get('font_color'),
+                bool(style.get('font_bold')),
+            )
+        return cached
+
+    def _cell_text(self, row_index: int, index: int, x0: float, y0: float, x1: float, y1: float, text: str,
+                   number: bool, style: Dict[str, Any], xs: List[float], rows: List[int], cols: List[int]) -> None:
+        size, alignment, wrap, vertical, color, bold = self._text_style(style, number)
+        available = x1 - x0 - 2 * CELL_PADDING
+        lines = _fit_lines(text, available, size, wrap) if wrap or '\n' in text else [text]
+        clip_right = x1
+        overflow = len(lines) == 1 and _text_width(lines[0], size) > available
+        if overflow:
+            if number:
+                # 与 Excel 一致：数值放不下时显示 ####
+                lines = ['#' * max(int(available / (size * 0.5)), 1)]
+            elif alignment == 'left':
+                # 文本溢出到右侧的空单元格
+                row = rows[row_index]
+                cells = self.snapshot.cells
+                next_index = index + 1
+                while next_index < len(cols) and not cells.get((row, cols[next_index]), ('',))[0] \
+                        and clip_right - x0 - 2 * CELL_PADDING < _text_width(lines[0], size):
+                    clip_right = xs[next_index + 1]
+                    next_index += 1
+        line_height = size * 1.2
+        block = line_height * len(lines)
+        if vertical == 'top':
+            baseline = y0 + CELL_PADDING + size
+        elif vertical == 'center':
+            baseline = (y0 + y1 - block) / 2 + size
+        else:
+            baseline = y1 - CELL_PADDING - block + line_height - size * 0.2
+        ops = self.operations
+        # 只有放不下的文本才需要裁剪
+        clip = overflow or block > y1 - y0
+        if clip:
+            ops.append(f'q {x0:.2f} {-y1:.2f} {clip_right - x0:.2f} {y1 - y0:.2f} re W n')
+        for line in lines:
+            width = _text_width(line, size)
+            if alignment == 'right':
+                x = x1 - CELL_PADDING - width
+            elif alignment == 'center':
+                x = (x0 + x1 - width) / 2
+            else:
+                x = x0 + CELL_PADDING
+            self.text(x, -baseline, line, size, color, bold)
+            baseline += line_height
+        if clip:
+            ops.append('Q')
+
+    def content(self) -> bytes:
+        return zlib.compress('\n'.join(self.operations).encode('latin-1'))
+
+
+def render_pages(snapshot: SheetSnapshot, first_number: int, total: int, now: datetime) -> Iterator[bytes]:
+    """
+    逐页生成压缩后的内容流
+
+    Args:
+        snapshot: 工作表快照
+        first_number: 第一页的页码
+        total: 全部页数（&N）
+        now: 页眉页脚中 &D、&T 使用的时间
+
+    Yields:
+        每页的内容流（zlib 压缩）
+    """
+    title_rows = list(range(snapshot.title_rows[0], snapshot.title_rows[1] + 1)) if snapshot.title_rows else []
+    for number, (_, first_row, last_row, first_col, last_col) in enumerate(snapshot.pages, start=first_number):
+        canvas = _PageCanvas(snapshot)
+        rows = [row for row in title_rows if row < first_row] + list(range(first_row, last_row + 1))
+        canvas.cells(rows, list(range(first_col, last_col + 1)))
+        canvas.header_footer(number, total, now)
+        yield canvas.content()
+
+
+def _render_part(snapshot: SheetSnapshot, first_number: int, total: int, now: datetime,
+                 part_path: str) -> List[int]:
+    # 在工作进程中把内容流写入临时文件，返回每页的长度
+    lengths = []
+    with open(part_path, 'wb') as part:
+        for content in render_pages(snapshot, first_number, total, now):
+            part.write(content)
+            lengths.append(len(content))
+    return lengths
+
+
+# ---- 文件结构 ----
+
+_FONT_OBJECTS = (
+    b'<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H '
+    b'/DescendantFonts [4 0 R] >>',
+    b'<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light '
+    b'/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> '
+    b'/FontDescriptor 5 0 R /DW 1000 /W [1 95 500] >>',
+    b'<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] '
+    b'/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>',
+)
+
+
+class PdfStream:
+    """
+    顺序写入的 PDF 文件
+
+    对象 1 为目录，2 为页树，3-5 为字体；页面从对象 6 开始，每页占用内容流和页面两个对象。
+    只在内存中保留各对象的偏移量。
+    """
+
+    FIRST_PAGE_OBJECT = 6
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = open(self.path, 'wb')
+        self._offsets = array('q', [0] * self.FIRST_PAGE_OBJECT)
+        self.page_count = 0
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        for number, body in enumerate(_FONT_OBJECTS, start=3):
+            self._object(number, body)
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def _object(self, number: int, body: bytes) -> None:
+        self._offsets[number] = self._file.tell()
+        self._write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+
+    def add_page(self, content: bytes, width: float, height: float) -> None:
+        """写入一页（内容流已压缩）"""
+        self._begin_page(len(content), width, height)
+        self._write(content)
+        self._end_page(width, height)
+
+    def copy_page(self, source: BinaryIO, length: int, width: float, height: float) -> None:
+        """从临时文件复制一页的内容流"""
+        self._begin_page(length, width, height)
+        shutil.copyfileobj(_LimitedReader(source, length), self._file)
+        self._end_page(width, height)
+
+    def _begin_page(self, length: int, width: float, height: float) -> None:
+        number = self.FIRST_PAGE_OBJECT + 2 * self.page_count
+        self._offsets.append(self._file.tell())
+        self._write(b'%d 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n' % (number, length))
+
+    def _end_page(self, width: float, height: float) -> None:
+        content_number = self.FIRST_PAGE_OBJECT + 2 * self.page_count
+        self._write(b'\nendstream\nendobj\n')
+        self._offsets.append(self._file.tell())
+        self._write(
+            b'%d 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>\nendobj\n'
+            % (content_number + 1, width, height, content_number)
+        )
+        self.page_count += 1
+
+    def close(self) -> None:
+        """写入页树、目录和交叉引用表"""
+        if self._file.closed:
+            return
+        self._object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        self._offsets[2] = self._file.tell()
+        self._write(b'2 0 obj\n<< /Type /Pages /Count %d /Kids [' % self.page_count)
+        for start in range(0, self.page_count, 1000):
+            self._write(b''.join(b'%d 0 R ' % (self.FIRST_PAGE_OBJECT + 2 * index + 1)
+                                 for index in range(start, min(start + 1000, self.page_count))))
+        self._write(b'] >>\nendobj\n')
+        xref = self._file.tell()
+        self._write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self._offsets))
+        for start in range(1, len(self._offsets), 1000):
+            self._write(b''.join(b'%010d 00000 n \n' % offset for offset in self._offsets[start:start + 1000]))
+        self._write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(self._offsets), xref))
+        self._file.close()
+
+    def __enter__(self) -> 'PdfStream':
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+
+class _LimitedReader:
+    """只读取前 length 字节的文件包装"""
+
+    def __init__(self, source: BinaryIO, length: int):
+        self._source = source
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        size = self._remaining if size < 0 else min(size, self._remaining)
+        data = self._source.read(size)
+        self._remaining -= len(data)
+        return data
+
+
+def export_pdf(worksheets: Sequence[Any], path: str, ignore_print_areas: bool = False,
+               max_workers: int = None) -> int:
+    """
+    把一个或多个工作表输出为 PDF（页码在各工作表之间连续）
+
+    Args:
+        worksheets: 无界面后端的工作表列表
+        path: 输出文件路径
+        ignore_print_areas: 是否忽略打印区域
+        max_workers: 并行生成的进程数，默认取 PERFORMANCE_CONFIG['max_workers']；为 1 或只有一个工作表时在当前进程生成
+
+    Returns:
+        总页数
+    """
+    snapshots = [snapshot_sheet(worksheet, ignore_print_areas) for worksheet in worksheets]
+    total = sum(len(snapshot.pages) for snapshot in snapshots)
+    first_numbers, number = [], 1
+    for snapshot in snapshots:
+        first_numbers.append(number)
+        number += len(snapshot.pages)
+    now = datetime.now()
+    workers = max_workers or PERFORMANCE_CONFIG.get('max_workers') or os.cpu_count() or 1
+    workers = min(workers, sum(1 for snapshot in snapshots if snapshot.pages))
+
+    with PdfStream(path) as pdf:
+        if workers <= 1:
+            for snapshot, first_number in zip(snapshots, first_numbers):
+                for content in render_pages(snapshot, first_number, total, now):
+                    pdf.add_page(content, snapshot.page_width, snapshot.page_height)
+        else:
+            with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = [os.path.join(directory, f'part{index}.bin') for index in range(len(snapshots))]
+                futures = [executor.submit(_render_part, snapshot, first_number, total, now, part)
+                           for snapshot, first_number, part in zip(snapshots, first_numbers, parts)]
+                # 按工作表顺序拼接，先完成的工作表等待前面的工作表
+                for snapshot, future, part in zip(snapshots, futures, parts):
+                    lengths = future.result()
+                    with open(part, 'rb') as source:
+                        for length in lengths:
+                            pdf.copy_page(source, length, snapshot.page_width, snapshot.page_height)
+                    os.remove(part)
+    logger.info(f"已导出 PDF: {path}（{len(snapshots)} 个工作表，{total} 页）")
+    return total
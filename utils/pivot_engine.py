@@ -0,0 +1,532 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 下午04:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：pivot_engine.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+进程内数据透视引擎
+使用基于哈希的分组汇总计算透视结果，并以静态单元格形式写入目标工作表。
+同一数据源（工作表 + 区域）只解析一次，由 PivotCache 供多个透视表共享；
+缓存保存各分组的部分汇总值，源数据追加行时只更新受影响的分组。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from utils.frame_bridge import records_to_frame, to_frame
+from utils.range_address import format_range, parse_cell, parse_range
+
+# 支持的汇总函数及默认标题前缀（与 Excel 中文版一致）
+CAPTION_PREFIXES = {
+    'xlSum': '求和项',
+    'xlAverage': '平均值项',
+    'xlCount': '计数项',
+    'xlMax': '最大值项',
+    'xlMin': '最小值项',
+}
+
+GRAND_TOTAL = '总计'
+# 空值项目的显示文本（与 Excel 一致）
+BLANK_ITEM = '(空白)'
+
+SourceKey = Tuple[str, str, str]
+
+# 部分汇总值：[数值合计, 数值个数, 非空个数, 最小值, 最大值]
+GroupStats = Dict[tuple, List[Any]]
+
+
+def source_key(worksheet: Any, source_range: str) -> SourceKey:
+    """
+    生成数据源缓存键
+
+    Args:
+        worksheet: 源工作表
+        source_range: 源数据区域
+
+    Returns:
+        (工作簿名称, 工作表名称, 规范化区域地址)
+    """
+    workbook = getattr(worksheet, 'Parent', None)
+    return (getattr(workbook, 'Name', ''), worksheet.Name, format_range(*parse_range(source_range)))
+
+
+class StaticPivotTable:
+    """静态透视表定义及其计算结果"""
+
+    def __init__(self, name: str, source: SourceKey, target_worksheet: Any, target_cell: str):
+        self.Name = name
+        self.source = source
+        self.target_worksheet = target_worksheet
+        self.target_cell = target_cell
+        self.row_fields: List[str] = []
+        self.column_fields: List[str] = []
+        self.data_fields: List[Tuple[str, str, str]] = []
+        self.table_style: Optional[str] = None
+        self.layout: List[List[Any]] = []
+        self.address: str = ''
+
+
+class PivotCache:
+    """
+    透视缓存
+
+    按 (行字段, 列字段, 数据字段) 保存每个分组的部分汇总值。某个字段组合第一次
+    被使用时扫描一次源数据，之后追加的行只合并到对应分组中，不再重新扫描。
+    """
+
+    def __init__(self, key: SourceKey, frame: pd.DataFrame):
+        self.key = key
+        self.first_row, self.first_col, self.last_row, self.last_col = parse_range(key[2])
+        self.columns: List[str] = list(frame.columns)
+        self._chunks: List[pd.DataFrame] = [frame]
+        self._partials: Dict[Tuple[tuple, tuple, str], GroupStats] = {}
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """完整源数据（追加的数据块在需要时才合并）"""
+        if len(self._chunks) > 1:
+            self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+        return self._chunks[0]
+
+    @property
+    def range_address(self) -> str:
+        """当前源数据区域（含追加行）"""
+        return format_range(self.first_row, self.first_col, self.last_row, self.last_col)
+
+    @property
+    def row_count(self) -> int:
+        """数据行数（不含标题行）"""
+        return self.last_row - self.first_row
+
+    def append_rows(self, rows: List[List[Any]]) -> int:
+        """
+        追加数据行并增量更新已有的部分汇总
+
+        Args:
+            rows: 新数据行，列顺序与源区域一致
+
+        Returns:
+            追加的行数
+        """
+        if not rows:
+            return 0
+        width = len(self.columns)
+        chunk = records_to_frame([self.columns] + [list(row)[:width] for row in rows])
+        for (row_keys, col_keys, field), stats in self._partials.items():
+            merge_group_stats(stats, group_stats(chunk, list(row_keys + col_keys), field))
+        self._chunks.append(chunk)
+        self.last_row += len(rows)
+        logger.debug(f"透视缓存 {self.key[1]}!{self.key[2]} 追加 {len(rows)} 行，"
+                     f"增量更新 {len(self._partials)} 组汇总")
+        return len(rows)
+
+    def aggregate(self, row_fields: List[str], column_fields: List[str],
+                  data_fields: List[Tuple[str, str, str]]) -> Dict[str, Dict[tuple, Any]]:
+        """
+        按行/列字段汇总
+
+        Args:
+            row_fields: 行字段
+            column_fields: 列字段
+            data_fields: (字段, 汇总函数, 标题) 列表
+
+        Returns:
+            {标题: {(行键, 列键): 值}}，行键或列键为 () 表示对应方向的总计
+        """
+        # 明细、行小计、列小计、总计四个层级（去掉字段为空时重复的层级）
+        levels: List[Tuple[tuple, tuple]] = []
+        for level in ((tuple(row_fields), tuple(column_fields)), (tuple(row_fields), ()),
+                      ((), tuple(column_fields)), ((), ())):
+            if level not in levels:
+                levels.append(level)
+
+        results: Dict[str, Dict[tuple, Any]] = {}
+        for field, function, caption in data_fields:
+            values: Dict[tuple, Any] = {}
+            for row_keys, col_keys in levels:
+                for keys, stats in self._stats(row_keys, col_keys, field).items():
+                    values[(keys[:len(row_keys)], keys[len(row_keys):])] = finalize_stats(stats, function)
+            results[caption] = values
+        return results
+
+    def _stats(self, row_keys: tuple, col_keys: tuple, field: str) -> GroupStats:
+        partial_key = (row_keys, col_keys, field)
+        stats = self._partials.get(partial_key)
+        if stats is None:
+            stats = self._partials[partial_key] = group_stats(self.frame, list(row_keys + col_keys), field)
+        return stats
+
+
+class PivotEngine:
+    """
+    进程内透视引擎
+
+    接口与 ExcelPivot 的同名方法保持一致，每次字段变化后自动重新计算并写回目标区域。
+    """
+
+    def __init__(self):
+        self._sources: Dict[SourceKey, PivotCache] = {}
+        self._tables: List[StaticPivotTable] = []
+
+    def get_cache(self, source_worksheet: Any, source_range: str) -> PivotCache:
+        """
+        获取数据源对应的透视缓存，不存在时解析源区域并创建
+
+        Args:
+            source_worksheet: 源数据工作表
+            source_range: 源数据区域
+
+        Returns:
+            透视缓存
+        """
+        key = source_key(source_worksheet, source_range)
+        cache = self._sources.get(key)
+        if cache is None:
+            # 追加行后的区域与已有缓存的当前区域相同时直接复用
+            for existing in self._sources.values():
+                if existing.key[:2] == key[:2] and existing.range_address == key[2]:
+                    return existing
+            cache = self._sources[key] = PivotCache(key, to_frame(source_worksheet, key[2]))
+            logger.debug(f"透视数据源已解析: {key[1]}!{key[2]}")
+        return cache
+
+    def create_pivot_table(self, source_worksheet: Any, source_range: str, target_worksheet: Any,
+                           target_cell: str, table_name: str) -> StaticPivotTable:
+        """
+        创建透视表
+
+        Args:
+            source_worksheet: 源数据工作表
+            source_range: 源数据区域（首行为字段名）
+            target_worksheet: 目标工作表
+            target_cell: 目标起始单元格
+            table_name: 透视表名称
+
+        Returns:
+            透视表对象
+        """
+        cache = self.get_cache(source_worksheet, source_range)
+        table = StaticPivotTable(table_name, cache.key, target_worksheet, target_cell)
+        self._tables.append(table)
+        logger.info(f"创建透视表: {table_name}")
+        return table
+
+    def add_row_field(self, pivot_table: StaticPivotTable, field_name: str) -> None:
+        """添加行字段"""
+        self._check_field(pivot_table, field_name)
+        pivot_table.row_fields.append(field_name)
+        self.refresh_pivot_table(pivot_table)
+
+    def add_column_field(self, pivot_table: StaticPivotTable, field_name: str) -> None:
+        """添加列字段"""
+        self._check_field(pivot_table, field_name)
+        pivot_table.column_fields.append(field_name)
+        self.refresh_pivot_table(pivot_table)
+
+    def add_data_field(self, pivot_table: StaticPivotTable, field_name: str,
+                       function: str = 'xlSum', caption: str = None) -> None:
+        """
+        添加数据字段
+
+        Args:
+            pivot_table: 透视表
+            field_name: 字段名称
+            function: 汇总函数，如 'xlSum'、'xlAverage'、'xlCount'
+            caption: 显示标题
+        """
+        self._check_field(pivot_table, field_name)
+        if function not in CAPTION_PREFIXES:
+            raise ValueError(f"不支持的汇总函数: {function}")
+        caption = caption or f"{CAPTION_PREFIXES[function]}:{field_name}"
+        pivot_table.data_fields.append((field_name, function, caption))
+        self.refresh_pivot_table(pivot_table)
+
+    def format_pivot_table(self, pivot_table: StaticPivotTable, style_name: str = None) -> None:
+        """
+        设置透视表格式：标题行和总计行加粗
+
+        Args:
+            pivot_table: 透视表
+            style_name: 表格样式名称（静态透视表仅记录，不套用 Excel 内置样式）
+        """
+        pivot_table.table_style = style_name
+        if not pivot_table.layout:
+            return
+        worksheet = pivot_table.target_worksheet
+        start_row, start_col = parse_cell(pivot_table.target_cell)
+        width = len(pivot_table.layout[0])
+        header_rows = 2 if pivot_table.column_fields else 1
+        last_row = start_row + len(pivot_table.layout) - 1
+        worksheet.Range(format_range(start_row, start_col, start_row + header_rows - 1,
+                                     start_col + width - 1)).Font.Bold = True
+        worksheet.Range(format_range(last_row, start_col, last_row, start_col + width - 1)).Font.Bold = True
+
+    def refresh_pivot_table(self, pivot_table: StaticPivotTable) -> None:
+        """重新计算透视结果并写入目标区域"""
+        layout = self.compute_layout(pivot_table)
+        self._write_layout(pivot_table, layout)
+
+    def get_pivot_table_data(self, pivot_table: StaticPivotTable) -> List[List[Any]]:
+        """获取透视结果（二维列表）"""
+        return [list(row) for row in pivot_table.layout]
+
+    def get_pivot_table_list(self, workbook: Any = None) -> List[StaticPivotTable]:
+        """
+        获取透视表列表
+
+        Args:
+            workbook: 仅返回目标位于该工作簿中的透视表（可选）
+        """
+        if workbook is None:
+            return list(self._tables)
+        return [table for table in self._tables if table.target_worksheet.Parent is workbook]
+
+    def append_source_rows(self, source_worksheet: Any, source_range: str, rows: List[List[Any]]) -> str:
+        """
+        在源数据末尾追加行，并增量刷新所有使用该数据源的透视表
+
+        Args:
+            source_worksheet: 源数据工作表
+            source_range: 源数据区域（创建透视表时使用的地址）
+            rows: 新数据行
+
+        Returns:
+            追加后的源数据区域地址
+        """
+        cache = self.get_cache(source_worksheet, source_range)
+        if rows:
+            start_row = cache.last_row + 1
+            address = format_range(start_row, cache.first_col, start_row + len(rows) - 1, cache.last_col)
+            source_worksheet.Range(address).Value = rows
+            cache.append_rows(rows)
+            self._refresh_dependents(cache)
+        return cache.range_address
+
+    def sync_source(self, source_worksheet: Any, source_range: str) -> int:
+        """
+        检测源工作表中已缓存区域之后新增的行并增量刷新
+
+        Args:
+            source_worksheet: 源数据工作表
+            source_range: 源数据区域（创建透视表时使用的地址）
+
+        Returns:
+            新增的行数
+        """
+        cache = self.get_cache(source_worksheet, source_range)
+        used = source_worksheet.UsedRange
+        used_last_row = used.Row + used.Rows.Count - 1
+        if used_last_row <= cache.last_row:
+            return 0
+        values = source_worksheet.Range(format_range(cache.last_row + 1, cache.first_col,
+                                                     used_last_row, cache.last_col)).Value
+        rows = [list(row) for row in (values if isinstance(values[0], tuple) else (values,))] \
+            if isinstance(values, tuple) else [[values]]
+        # 去掉末尾的空行
+        while rows and all(value is None for value in rows[-1]):
+            rows.pop()
+        count = cache.append_rows(rows)
+        if count:
+            self._refresh_dependents(cache)
+        return count
+
+    def invalidate_source(self, worksheet: Any, source_range: str) -> None:
+        """源数据被修改（而非追加）后清除缓存，下次使用时重新解析"""
+        self._sources.pop(source_key(worksheet, source_range), None)
+
+    def _refresh_dependents(self, cache: PivotCache) -> None:
+        for table in self._tables:
+            if table.source == cache.key:
+                self.refresh_pivot_table(table)
+
+    def compute_layout(self, pivot_table: StaticPivotTable) -> List[List[Any]]:
+        """
+        计算透视表布局
+
+        Args:
+            pivot_table: 透视表
+
+        Returns:
+            二维列表（含标题行和总计行/列）
+        """
+        cache = self._sources[pivot_table.source]
+        return build_layout(
+            cache.aggregate(pivot_table.row_fields, pivot_table.column_fields, pivot_table.data_fields),
+            pivot_table.row_fields, pivot_table.column_fields, pivot_table.data_fields,
+        )
+
+    def _check_field(self, pivot_table: StaticPivotTable, field_name: str) -> None:
+        if field_name not in self._sources[pivot_table.source].columns:
+            raise ValueError(f"数据源中不存在字段: {field_name}")
+
+    def _write_layout(self, pivot_table: StaticPivotTable, layout: List[List[Any]]) -> None:
+        worksheet = pivot_table.target_worksheet
+        if pivot_table.address:
+            worksheet.Range(pivot_table.address).ClearContents()
+        pivot_table.layout = layout
+        if not layout:
+            pivot_table.address = ''
+            return
+        start_row, start_col = parse_cell(pivot_table.target_cell)
+        pivot_table.address = format_range(start_row, start_col, start_row + len(layout) - 1,
+                                           start_col + len(layout[0]) - 1)
+        worksheet.Range(pivot_table.address).Value = layout
+
+
+def _to_native(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def group_stats(frame: pd.DataFrame, group_keys: List[str], field: str) -> GroupStats:
+    """
+    计算各分组的部分汇总值（一次向量化分组）
+
+    Args:
+        frame: 源数据
+        group_keys: 分组字段，为空时整体汇总
+        field: 数据字段
+
+    Returns:
+        {分组键: [数值合计, 数值个数, 非空个数, 最小值, 最大值]}
+    """
+    values = pd.to_numeric(frame[field], errors='coerce')
+    parts = pd.DataFrame({'value': values, 'present': frame[field].notna()})
+    if not group_keys:
+        return {(): [_to_native(values.sum()), int(values.count()), int(parts['present'].sum()),
+                     _to_native(values.min()), _to_native(values.max())]}
+    table = parts.groupby([frame[key] for key in group_keys], sort=False, dropna=False).agg(
+        total=('value', 'sum'), numeric=('value', 'count'), present=('present', 'sum'),
+        low=('value', 'min'), high=('value', 'max'),
+    )
+    stats: GroupStats = {}
+    for keys, total, numeric, present, low, high in zip(
+            table.index, table['total'].tolist(), table['numeric'].tolist(), table['present'].tolist(),
+            table['low'].tolist(), table['high'].tolist()):
+        keys = tuple(_to_native(key) for key in (keys if isinstance(keys, tuple) else (keys,)))
+        stats[keys] = [total, int(numeric), int(present), _to_native(low), _to_native(high)]
+    return stats
+
+
+def merge_group_stats(target: GroupStats, update: GroupStats) -> None:
+    """
+    将新数据块的部分汇总值合并到已有结果中
+
+    Args:
+        target: 已有的部分汇总值（原地更新）
+        update: 新数据块的部分汇总值
+    """
+    for keys, (total, numeric, present, low, high) in update.items():
+        current = target.get(keys)
+        if current is None:
+            target[keys] = [total, numeric, present, low, high]
+            continue
+        current[0] += total
+        current[1] += numeric
+        current[2] += present
+        if low is not None and (current[3] is None or low < current[3]):
+            current[3] = low
+        if high is not None and (current[4] is None or high > current[4]):
+            current[4] = high
+
+
+def finalize_stats(stats: List[Any], function: str) -> Any:
+    """
+    由部分汇总值得到最终结果
+
+    Args:
+        stats: [数值合计, 数值个数, 非空个数, 最小值, 最大值]
+        function: 汇总函数
+
+    Returns:
+        汇总结果
+    """
+    total, numeric, present, low, high = stats
+    if function == 'xlSum':
+        return total
+    if function == 'xlAverage':
+        return total / numeric if numeric else None
+    if function == 'xlCount':
+        return present
+    if function == 'xlMax':
+        return high
+    if function == 'xlMin':
+        return low
+    raise ValueError(f"不支持的汇总函数: {function}")
+
+
+def build_layout(aggregates: Dict[str, Dict[tuple, Any]], row_fields: List[str], column_fields: List[str],
+                 data_fields: List[Tuple[str, str, str]]) -> List[List[Any]]:
+    """
+    将分组结果展开为透视表布局（表格形式，每个行字段一列）
+
+    Args:
+        aggregates: PivotCache.aggregate 的结果
+        row_fields: 行字段
+        column_fields: 列字段
+        data_fields: 数据字段
+
+    Returns:
+        二维列表
+    """
+    if not data_fields:
+        return []
+    captions = [caption for _, _, caption in data_fields]
+    first = aggregates[captions[0]]
+    row_items = sorted({key[0] for key in first if key[0] and len(key[0]) == len(row_fields)}, key=_sort_key)
+    col_items = sorted({key[1] for key in first if key[1] and len(key[1]) == len(column_fields)}, key=_sort_key)
+    if not row_fields:
+        row_items = []
+    if not column_fields:
+        col_items = []
+
+    def label(items: tuple) -> str:
+        return '/'.join(_item_text(item) for item in items)
+
+    # 列头：(列键, 数据字段标题, 显示文本)
+    columns: List[Tuple[tuple, str, str]] = []
+    for col_key in col_items:
+        for caption in captions:
+            columns.append((col_key, caption, label(col_key) if len(captions) == 1 else f"{label(col_key)} - {caption}"))
+    for caption in captions:
+        if column_fields:
+            columns.append(((), caption, GRAND_TOTAL if len(captions) == 1 else f"{GRAND_TOTAL} - {caption}"))
+        else:
+            columns.append(((), caption, caption))
+
+    row_label_width = max(len(row_fields), 1)
+    layout: List[List[Any]] = []
+    if column_fields:
+        title = [captions[0] if len(captions) == 1 else ''] + [''] * (row_label_width - 1)
+        layout.append(title + ['/'.join(column_fields)] + [''] * (len(columns) - 1))
+    header = list(row_fields) if row_fields else ['']
+    layout.append(header + [text for _, _, text in columns])
+
+    for row_key in row_items:
+        line = [_item_text(item) for item in row_key]
+        line += [aggregates[caption].get((row_key, col_key)) for col_key, caption, _ in columns]
+        layout.append(line)
+
+    total = [GRAND_TOTAL] + [''] * (row_label_width - 1)
+    total += [aggregates[caption].get(((), col_key)) for col_key, caption, _ in columns]
+    layout.append(total)
+    return layout
+
+
+def _item_text(item: Any) -> str:
+    return BLANK_ITEM if item is None else str(item)
+
+
+def _sort_key(items: tuple) -> tuple:
+    # 不同类型的项目按 Excel 习惯数字在前、文本在后，空白项目排在最后
+    return tuple((2, 0, '') if item is None else (0, item, '') if isinstance(item, (int, float)) else (1, 0, str(item))
+                 for item in items)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 上午09:12
+@Author  ：庄洪奎（ARTHUR)
+@FileName：range_address.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+单元格地址工具
+提供 A1 样式地址与行列坐标之间的转换
+"""
+
+import re
+from typing import List, Tuple
+
+# Excel 工作表的最大行列数
+MAX_ROWS = 1048576
+MAX_COLUMNS = 16384
+
+_CELL_PATTERN = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+# 整列（'D:D'）和整行（'3:5'）引用的端点
+_COLUMN_PATTERN = re.compile(r"^\$?([A-Za-z]{1,3})$")
+_ROW_PATTERN = re.compile(r"^\$?(\d+)$")
+
+
+def column_letter_to_index(letters: str) -> int:
+    """
+    列字母转换为列号（从1开始）
+
+    Args:
+        letters: 列字母，例如 'A'、'AB'
+
+    Returns:
+        列号
+    """
+    index = 0
+    for char in letters.upper():
+        if not 'A' <= char <= 'Z':
+            raise ValueError(f"无效的列字母: {letters}")
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    if not 1 <= index <= MAX_COLUMNS:
+        raise ValueError(f"列号超出范围: {letters}")
+    return index
+
+
+def column_index_to_letter(index: int) -> str:
+    """
+    列号转换为列字母
+
+    Args:
+        index: 列号（从1开始）
+
+    Returns:
+        列字母
+    """
+    if not 1 <= index <= MAX_COLUMNS:
+        raise ValueError(f"列号超出范围: {index}")
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def parse_cell(address: str) -> Tuple[int, int]:
+    """
+    解析单元格地址
+
+    Args:
+        address: 单元格地址，例如 'B3' 或 '$B$3'
+
+    Returns:
+        (行号, 列号)
+    """
+    match = _CELL_PATTERN.match(address.strip())
+    if not match:
+        raise ValueError(f"无效的单元格地址: {address}")
+    row = int(match.group(2))
+    if not 1 <= row <= MAX_ROWS:
+        raise ValueError(f"行号超出范围: {address}")
+    return row, column_letter_to_index(match.group(1))
+
+
+def parse_range(address: str) -> Tuple[int, int, int, int]:
+    """
+    解析单个区域地址
+
+    Args:
+        address: 区域地址，例如 'A1:G101'、'A1'、整列 'D:F' 或整行 '3:5'
+
+    Returns:
+        (起始行, 起始列, 结束行, 结束列)
+    """
+    parts = [part.strip() for part in address.strip().split(':')]
+    if len(parts) == 1:
+        row, col = parse_cell(parts[0])
+        return row, col, row, col
+    if len(parts) != 2:
+        raise ValueError(f"无效的区域地址: {address}")
+    columns = [_COLUMN_PATTERN.match(part) for part in parts]
+    if all(columns):
+        col1, col2 = (column_letter_to_index(match.group(1)) for match in columns)
+        return 1, min(col1, col2), MAX_ROWS, max(col1, col2)
+    rows = [_ROW_PATTERN.match(part) for part in parts]
+    if all(rows):
+        row1, row2 = (int(match.group(1)) for match in rows)
+        if not (1 <= row1 <= MAX_ROWS and 1 <= row2 <= MAX_ROWS):
+            raise ValueError(f"行号超出范围: {address}")
+        return min(row1, row2), 1, max(row1, row2), MAX_COLUMNS
+    row1, col1 = parse_cell(parts[0])
+    row2, col2 = parse_cell(parts[1])
+    return min(row1, row2), min(col1, col2), max(row1, row2), max(col1, col2)
+
+
+def parse_areas(address: str) -> List[Tuple[int, int, int, int]]:
+    """
+    解析可能包含多个区域的地址（逗号分隔）
+
+    Args:
+        address: 区域地址，例如 'A1:B2,D4'
+
+    Returns:
+        区域坐标列表
+    """
+    return [parse_range(part) for part in address.split(',') if part.strip()]
+
+
+def format_cell(row: int, col: int) -> str:
+    """
+    行列坐标转换为单元格地址
+
+    Args:
+        row: 行号
+        col: 列号
+
+    Returns:
+        单元格地址，例如 'B3'
+    """
+    return f"{column_index_to_letter(col)}{row}"
+
+
+def format_range(first_row: int, first_col: int, last_row: int, last_col: int) -> str:
+    """
+    行列坐标转换为区域地址
+
+    Args:
+        first_row: 起始行
+        first_col: 起始列
+        last_row: 结束行
+        last_col: 结束列
+
+    Returns:
+        区域地址，单个单元格时返回 'B3' 形式
+    """
+    start = format_cell(first_row, first_col)
+    if first_row == last_row and first_col == last_col:
+        return start
+    return f"{start}:{format_cell(last_row, last_col)}"
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午02:00
+@Author  ：庄洪奎（ARTHUR)
+@FileName：report_runner.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+并行报表生成
+将互相独立的工作簿生成任务分发到进程池中执行，每个工作进程持有一个
+Excel 后端实例并在多个任务之间复用，最后汇总所有任务的结果和错误。
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from loguru import logger
+
+from config import ERROR_CONFIG, PERFORMANCE_CONFIG
+from utils.manager_pool import close_open_workbooks
+
+# 工作进程内的 Excel 管理器（每个进程一个）及其创建参数
+_worker_manager: Any = None
+_worker_options: tuple = (None, {})
+
+
+@dataclass
+class ReportJob:
+    """
+    报表任务
+
+    func 的第一个参数为 Excel 管理器，与 main.py 中 demo_* 函数的签名一致；
+    func 必须是模块级函数，以便在进程间传递。
+    """
+
+    name: str
+    func: Callable[..., Any]
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class JobResult:
+    """单个任务的执行结果"""
+
+    name: str
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+    duration: float = 0.0
+    worker_pid: int = 0
+
+
+@dataclass
+class RunSummary:
+    """一次批量运行的汇总结果"""
+
+    results: List[JobResult]
+    duration: float
+
+    @property
+    def succeeded(self) -> List[JobResult]:
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> List[JobResult]:
+        return [result for result in self.results if not result.success]
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        """任务名称到错误信息的映射"""
+        return {result.name: result.error for result in self.failed}
+
+
+def _init_worker(backend: Optional[str], manager_kwargs: Dict[str, Any]) -> None:
+    global _worker_options
+    from multiprocessing.util import Finalize
+
+    _worker_options = (backend, manager_kwargs)
+    _start_worker_manager()
+    # 工作进程通过 os._exit 退出，atexit 不会执行；Finalize 注册的清理在进程退出前执行
+    # （不绑定到管理器对象，重建实例后旧对象被回收时不会触发清理）
+    Finalize(None, _shutdown_worker, exitpriority=10)
+
+
+def _start_worker_manager() -> None:
+    global _worker_manager
+    from utils.headless_backend import create_excel_manager
+
+    backend, manager_kwargs = _worker_options
+    _worker_manager = create_excel_manager(backend, **manager_kwargs)
+    _worker_manager.__enter__()
+
+
+def _shutdown_worker() -> None:
+    global _worker_manager
+    manager, _worker_manager = _worker_manager, None
+    if manager is None:
+        return
+    try:
+        manager.__exit__(None, None, None)
+    except Exception as e:
+        logger.warning(f"关闭工作进程的 Excel 实例失败: {e}")
+
+
+def _run_job(job: ReportJob, deadline: float = None) -> JobResult:
+    """
+    在工作进程中执行任务
+
+    Args:
+        job: 报表任务
+        deadline: 提交方等待结果的截止时间（time.time()），任务结束时已超过则提交方已放弃，
+                  实例可能处于不一致的状态，关闭并重建
+    """
+    start = time.perf_counter()
+    try:
+        result = job.func(_worker_manager, *job.args, **job.kwargs)
+        return JobResult(job.name, True, result=result,
+                         duration=time.perf_counter() - start, worker_pid=os.getpid())
+    except Exception as e:
+        return JobResult(job.name, False, error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc(),
+                         duration=time.perf_counter() - start, worker_pid=os.getpid())
+    finally:
+        # 工作进程在多个任务之间复用，任务留下的工作簿不带入下一个任务
+        try:
+            close_open_workbooks(_worker_manager)
+        except Exception as e:
+            logger.warning(f"关闭任务残留的工作簿失败: {e}")
+        if deadline is not None and time.time() > deadline:
+            logger.warning(f"任务 {job.name} 超时后才结束，重建工作进程的 Excel 实例")
+            _shutdown_worker()
+            _start_worker_manager()
+
+
+def run_reports(jobs: Sequence[ReportJob], max_workers: int = None, backend: str = None,
+                continue_on_error: bool = None, **manager_kwargs) -> RunSummary:
+    """
+    在进程池中并行执行报表任务
+
+    Args:
+        jobs: 报表任务列表
+        max_workers: 工作进程数，默认取 PERFORMANCE_CONFIG['max_workers']，未配置时为 CPU 核数
+        backend: Excel 后端类型（'com' 或 'headless'），默认取 EXCEL_CONFIG['backend']
+        continue_on_error: 任务失败后是否继续执行其余任务，默认取 ERROR_CONFIG['continue_on_error']
+        **manager_kwargs: 传递给 Excel 管理器构造函数的参数
+
+    Returns:
+        汇总结果
+    """
+    max_workers = max_workers or PERFORMANCE_CONFIG.get('max_workers') or os.cpu_count() or 1
+    max_workers = min(max_workers, max(len(jobs), 1))
+    if continue_on_error is None:
+        continue_on_error = ERROR_CONFIG['continue_on_error']
+
+    start = time.perf_counter()
+    logger.info(f"开始并行生成报表: {len(jobs)} 个任务，{max_workers} 个工作进程")
+    results: Dict[int, JobResult] = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(backend, manager_kwargs)) as executor:
+        futures = {executor.submit(_run_job, job): index for index, job in enumerate(jobs)}
+        pending = set(futures)
+        stopped = False
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = jobs[futures[future]]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 工作进程异常退出等无法在任务内部捕获的错误
+                    result = JobResult(job.name, False, error=f"{type(e).__name__}: {e}")
+                results[futures[future]] = result
+                if result.success:
+                    logger.debug(f"报表任务完成: {job.name}（{result.duration:.2f}s）")
+                    continue
+                if ERROR_CONFIG['log_errors']:
+                    logger.error(f"报表任务失败: {job.name}: {result.error}")
+                if not continue_on_error and not stopped:
+                    # 取消尚未开始的任务，已在运行的任务等待其结束
+                    stopped = True
+                    for waiting in list(pending):
+                        if waiting.cancel():
+                            pending.discard(waiting)
+                            results[futures[waiting]] = JobResult(
+                                jobs[futures[waiting]].name, False, error='已取消：之前的任务失败')
+
+    summary = RunSummary([results[index] for index in range(len(jobs))], time.perf_counter() - start)
+    logger.info(f"并行报表生成结束: 成功 {len(summary.succeeded)} 个，失败 {len(summary.failed)} 个，"
+                f"耗时 {summary.duration:.2f}s")
+    return summary
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 上午08:50
+@Author  ：庄洪奎（ARTHUR)
+@FileName：shared_strings.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+共享字符串表
+将 xlsx 中的 sharedStrings.xml 解压到临时文件并以 mmap 映射，
+打开时只扫描每个 <si> 的起始偏移，单元格访问到某个编号时才解码该字符串，
+最近解码的字符串保存在一个小的 LRU 缓存中。
+大量重复文本（产品、地区、销售员名称等）的工作簿不必在打开时构建完整的字符串列表。
+"""
+
+import html
+import mmap
+import re
+import shutil
+import tempfile
+import zipfile
+from array import array
+from collections import OrderedDict
+from typing import Any, Optional
+from loguru import logger
+
+from config import PERFORMANCE_CONFIG
+
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+
+# <si> 起始标签（允许命名空间前缀，包括空的 <si/>）
+_SI_START = re.compile(rb'<(?:[A-Za-z_][\w.-]*:)?si[\s/>]')
+# 拼音注音 <rPh> 不属于单元格文本
+_PHONETIC = re.compile(rb'<(?:[A-Za-z_][\w.-]*:)?rPh\b.*?</(?:[A-Za-z_][\w.-]*:)?rPh>', re.S)
+_TEXT = re.compile(rb'<(?:[A-Za-z_][\w.-]*:)?t(?:\s[^>]*)?>(.*?)</(?:[A-Za-z_][\w.-]*:)?t>', re.S)
+# OOXML 对控制字符的转义，例如 _x000D_
+_OOXML_ESCAPE = re.compile(r'_x([0-9A-Fa-f]{4})_')
+
+
+def decode_shared_string(fragment: bytes) -> str:
+    """
+    解码一个 <si> 片段中的文本（拼接富文本片段，忽略拼音注音）
+
+    Args:
+        fragment: 从 <si> 开始的原始 XML 字节
+
+    Returns:
+        字符串
+    """
+    if b'rPh' in fragment:
+        fragment = _PHONETIC.sub(b'', fragment)
+    text = ''.join(html.unescape(part.decode('utf-8')) for part in _TEXT.findall(fragment))
+    if '_x' in text:
+        text = _OOXML_ESCAPE.sub(lambda match: chr(int(match.group(1), 16)), text)
+    return text
+
+
+class SharedStringTable:
+    """
+    按需解码的共享字符串表
+
+    支持 len() 和按编号取值（table[index]），可直接替代字符串列表。
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, part: str = SHARED_STRINGS_PART, cache_size: int = None):
+        """
+        Args:
+            archive: 已打开的 xlsx 文件
+            part: 共享字符串部件路径
+            cache_size: 已解码字符串的缓存数量，默认取 PERFORMANCE_CONFIG['shared_strings_cache']
+        """
+        self.cache_size = cache_size or PERFORMANCE_CONFIG.get('shared_strings_cache', 4096)
+        self._cache: 'OrderedDict[int, str]' = OrderedDict()
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._offsets = array('q')
+        if part in archive.namelist():
+            self._file = tempfile.TemporaryFile()
+            with archive.open(part) as stream:
+                shutil.copyfileobj(stream, self._file, 1024 * 1024)
+            self._file.flush()
+            if self._file.tell():
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._offsets.extend(match.start() for match in _SI_START.finditer(self._map))
+                # 最后一项的结束位置
+                self._offsets.append(len(self._map))
+        logger.debug(f"已索引共享字符串 {len(self)} 个")
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def __getitem__(self, index: int) -> str:
+        cache = self._cache
+        text = cache.get(index)
+        if text is not None:
+            cache.move_to_end(index)
+            return text
+        if not 0 <= index < len(self):
+            raise IndexError(f"共享字符串编号超出范围: {index}")
+        text = decode_shared_string(self._map[self._offsets[index]:self._offsets[index + 1]])
+        cache[index] = text
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return text
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        """释放映射和临时文件"""
+        self._cache.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'SharedStringTable':
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
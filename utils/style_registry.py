@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 上午10:45
+@Author  ：庄洪奎（ARTHUR)
+@FileName：style_registry.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+样式注册表
+将字体、填充、边框、数字格式等属性组合哈希为共享的样式编号，
+同一会话中的所有单元格、工作表和工作簿共用同一份样式记录。
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+from config import FORMAT_CONFIG
+
+StyleKey = Tuple[Tuple[str, Any], ...]
+
+# 空样式（全部取默认值）的编号
+DEFAULT_STYLE_ID = 0
+
+
+class StyleRegistry:
+    """
+    样式注册表
+
+    样式在注册前会去掉与 FORMAT_CONFIG 默认值相同的属性，
+    因此“显式设置为默认字体”和“未设置”会得到同一个编号。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[StyleKey, int] = {(): DEFAULT_STYLE_ID}
+        self._styles: List[Mapping[str, Any]] = [MappingProxyType({})]
+        self._updates: Dict[Tuple[int, StyleKey], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._styles)
+
+    def intern(self, style: Mapping[str, Any]) -> int:
+        """
+        注册样式并返回其编号，相同的属性组合总是返回同一编号
+
+        Args:
+            style: 样式属性字典
+
+        Returns:
+            样式编号
+        """
+        key = self._normalize(style)
+        style_id = self._ids.get(key)
+        if style_id is not None:
+            return style_id
+        with self._lock:
+            style_id = self._ids.get(key)
+            if style_id is None:
+                style_id = len(self._styles)
+                self._styles.append(MappingProxyType(dict(key)))
+                self._ids[key] = style_id
+        return style_id
+
+    def get(self, style_id: int) -> Mapping[str, Any]:
+        """
+        获取样式属性（只读）
+
+        Args:
+            style_id: 样式编号
+
+        Returns:
+            样式属性映射
+        """
+        return self._styles[style_id]
+
+    def update(self, style_id: int, updates: Mapping[str, Any]) -> int:
+        """
+        在已有样式上修改部分属性，返回新样式的编号（结果会被缓存）
+
+        Args:
+            style_id: 原样式编号
+            updates: 要修改的属性
+
+        Returns:
+            新样式编号
+        """
+        update_key = (style_id, tuple(sorted(updates.items(), key=lambda item: item[0])))
+        result = self._updates.get(update_key)
+        if result is None:
+            merged = dict(self._styles[style_id])
+            merged.update(updates)
+            result = self._updates[update_key] = self.intern(merged)
+        return result
+
+    def updater(self, updates: Mapping[str, Any]):
+        """
+        返回一个“样式编号 -> 新样式编号”的函数，用于批量修改大量单元格
+
+        Args:
+            updates: 要修改的属性
+
+        Returns:
+            带本地缓存的转换函数
+        """
+        cache: Dict[int, int] = {}
+
+        def apply(style_id: int) -> int:
+            result = cache.get(style_id)
+            if result is None:
+                result = cache[style_id] = self.update(style_id, updates)
+            return result
+
+        return apply
+
+    @staticmethod
+    def _normalize(style: Mapping[str, Any]) -> StyleKey:
+        defaults = {
+            'font_name': FORMAT_CONFIG['default_font'],
+            'font_size': FORMAT_CONFIG['default_font_size'],
+        }
+        items = []
+        for key, value in style.items():
+            if value is None or value is False or defaults.get(key) == value:
+                continue
+            items.append((key, value))
+        return tuple(sorted(items, key=lambda item: item[0]))
+
+
+# 会话级共享的样式注册表
+STYLE_REGISTRY = StyleRegistry()
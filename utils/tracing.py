@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/16 下午05:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：tracing.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+调用追踪
+为各功能模块类的公共方法安装计时包装，统计调用次数、耗时分布、
+涉及的单元格数和写出的文件字节数，可输出汇总表或 Chrome trace-event JSON
+（在 chrome://tracing 或 Perfetto 中打开）。
+
+未启用时不安装任何包装，对原有调用没有额外开销。
+"""
+
+import bisect
+import functools
+import importlib
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from loguru import logger
+
+from utils.range_address import parse_areas
+
+# 默认追踪的模块类（模块路径, 类名），不存在的模块会被跳过
+TRACED_CLASSES: List[Tuple[str, str]] = [
+    ('modules.excel_basic', 'ExcelBasic'),
+    ('modules.excel_format', 'ExcelFormat'),
+    ('modules.excel_chart', 'ExcelChart'),
+    ('modules.excel_pivot', 'ExcelPivot'),
+    ('modules.excel_print', 'ExcelPrint'),
+    ('modules.excel_macro', 'ExcelMacro'),
+    ('modules.excel_data', 'ExcelData'),
+    ('utils.pivot_engine', 'PivotEngine'),
+    ('utils.format_batch', 'FormatTransaction'),
+]
+
+# 耗时直方图的桶上界（毫秒），最后一个桶收集其余所有调用
+HISTOGRAM_BOUNDS = (0.1, 1, 10, 100, 1000, 10000)
+
+# 参数中视为输出文件的扩展名
+OUTPUT_SUFFIXES = ('.xlsx', '.xlsm', '.xls', '.csv', '.pdf', '.png', '.jpg', '.gif', '.svg', '.json')
+
+ADDRESS_PATTERN = re.compile(r"^(\$?[A-Za-z]{1,3}\$?\d+(:\$?[A-Za-z]{1,3}\$?\d+)?)(,\s*\$?[A-Za-z]{1,3}\$?\d+"
+                             r"(:\$?[A-Za-z]{1,3}\$?\d+)?)*$")
+
+# 区域地址参数的名称（address、range、Cell1、range_address、data_range、target_cell 等），
+# 其他字符串参数（写入的值、工作表名称）即使形如地址也不计入单元格数
+ADDRESS_PARAMETER_PATTERN = re.compile(r"^(address|range|cell\d*|\w+_(address|range|cell))$", re.IGNORECASE)
+
+
+class OperationStats:
+    """单个方法的累计统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.min_time = float('inf')
+        self.max_time = 0.0
+        self.cells = 0
+        self.bytes_written = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def add(self, duration: float, cells: int, bytes_written: int, failed: bool) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total_time += duration
+        self.min_time = min(self.min_time, duration)
+        self.max_time = max(self.max_time, duration)
+        self.cells += cells
+        self.bytes_written += bytes_written
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, duration * 1000)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}ms"]
+        return {
+            'name': self.name,
+            'count': self.count,
+            'errors': self.errors,
+            'total_time': self.total_time,
+            'mean_time': self.mean_time,
+            'min_time': self.min_time if self.count else 0.0,
+            'max_time': self.max_time,
+            'cells': self.cells,
+            'bytes_written': self.bytes_written,
+            'histogram': dict(zip(labels, self.histogram)),
+        }
+
+
+def count_cells(arguments: Dict[str, Any]) -> int:
+    """
+    估算一次调用涉及的单元格数：统计区域地址参数中的地址字符串和任意参数中的区域对象
+
+    Args:
+        arguments: 参数名称到值的映射（不含 self）
+
+    Returns:
+        单元格数
+    """
+    cells = 0
+    for name, value in arguments.items():
+        if isinstance(value, str):
+            if len(value) < 2 or not ADDRESS_PARAMETER_PATTERN.match(name) or not ADDRESS_PATTERN.match(value):
+                continue
+            try:
+                areas = parse_areas(value.replace('$', ''))
+            except ValueError:
+                continue
+            cells += sum((r2 - r1 + 1) * (c2 - c1 + 1) for r1, c1, r2, c2 in areas)
+        elif hasattr(value, 'iter_coordinates'):
+            # 无界面后端的区域对象可以直接取得单元格数，COM 对象不在此统计以免额外的跨进程调用
+            cells += value.Count
+    return cells
+
+
+def _call_arguments(signature: Optional[inspect.Signature], args: Sequence[Any],
+                    kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """按方法签名把调用参数对应到参数名称（去掉 self），无法绑定时返回空映射"""
+    if signature is None:
+        return {}
+    try:
+        arguments = dict(signature.bind(*args, **kwargs).arguments)
+    except TypeError:
+        return {}
+    arguments.pop(next(iter(signature.parameters), None), None)
+    return arguments
+
+
+def _output_paths(args: Sequence[Any], kwargs: Dict[str, Any]) -> List[str]:
+    return [str(value) for value in (*args, *kwargs.values())
+            if isinstance(value, (str, Path)) and str(value).lower().endswith(OUTPUT_SUFFIXES)]
+
+
+def _file_states(paths: List[str]) -> List[Optional[Tuple[int, int, int]]]:
+    """输出文件调用前后的状态（大小、修改时间、inode），文件不存在时为 None"""
+    states = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            states.append(None)
+            continue
+        states.append((stat.st_size, stat.st_mtime_ns, stat.st_ino))
+    return states
+
+
+def _written_bytes(paths: List[str], before: List[Optional[Tuple[int, int, int]]]) -> int:
+    """调用后新建或发生变化的输出文件的总大小（未变化的已有文件不计入）"""
+    total = 0
+    for previous, current in zip(before, _file_states(paths)):
+        if current is not None and current != previous:
+            total += current[0]
+    return total
+
+
+class Tracer:
+    """
+    调用追踪器
+
+    用法:
+        TRACER.instrument_modules()
+        ...  # 执行报表生成
+        print(TRACER.format_summary())
+        TRACER.export_chrome_trace('output/trace.json')
+        TRACER.uninstrument()
+    """
+
+    def __init__(self, max_events: int = 100000, nested: bool = True):
+        """
+        Args:
+            max_events: 保留的 trace 事件上限，超过后只累计统计不再记录事件
+            nested: 是否记录在其他被追踪调用内部发生的调用，为 False 时每个线程只记录最外层调用
+        """
+        self.max_events = max_events
+        self.nested = nested
+        self._depth = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, OperationStats] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._originals: Dict[type, Dict[str, Any]] = {}
+        self._origin = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        """是否已安装任何包装"""
+        return bool(self._originals)
+
+    def instrument(self, cls: type, methods: Sequence[str] = None, properties: bool = False) -> List[str]:
+        """
+        为类的公共方法安装追踪包装
+
+        属性的读取和赋值分别记为 ``类名.属性`` 和 ``类名.属性=``。
+
+        Args:
+            cls: 要追踪的类
+            methods: 方法或属性名称列表，默认为类中定义的全部公共方法
+            properties: 未指定 methods 时是否同时追踪类中定义的公共属性
+
+        Returns:
+            已包装的方法名称
+        """
+        originals = self._originals.setdefault(cls, {})
+        if methods is None:
+            methods = [name for name, member in vars(cls).items()
+                       if not name.startswith('_') and
+                       (inspect.isfunction(member) or properties and isinstance(member, property))]
+        for name in methods:
+            if name in originals:
+                continue
+            member = vars(cls)[name]
+            originals[name] = member
+            label = f"{cls.__name__}.{name}"
+            if isinstance(member, property):
+                setattr(cls, name, property(member.fget and self._wrap(label, member.fget),
+                                            member.fset and self._wrap(f"{label}=", member.fset),
+                                            member.fdel, member.__doc__))
+            else:
+                setattr(cls, name, self._wrap(label, member))
+        logger.debug(f"已追踪 {cls.__name__} 的 {len(methods)} 个方法")
+        return list(methods)
+
+    def instrument_modules(self, targets: Sequence[Tuple[str, str]] = None) -> List[type]:
+        """
+        追踪各功能模块类（默认为 TRACED_CLASSES），无法导入的模块会被跳过
+
+        Returns:
+            已追踪的类
+        """
+        instrumented = []
+        for module_name, class_name in targets or TRACED_CLASSES:
+            try:
+                cls = getattr(importlib.import_module(module_name), class_name)
+            except (ImportError, AttributeError) as e:
+                logger.debug(f"跳过追踪 {module_name}.{class_name}: {e}")
+                continue
+            self.instrument(cls)
+            instrumented.append(cls)
+        logger.info(f"调用追踪已启用: {', '.join(cls.__name__ for cls in instrumented)}")
+        return instrumented
+
+    def uninstrument(self, cls: type = None) -> None:
+        """
+        移除追踪包装，恢复原始方法
+
+        Args:
+            cls: 要恢复的类，默认恢复全部
+        """
+        classes = [cls] if cls is not None else list(self._originals)
+        for target in classes:
+            for name, member in self._originals.pop(target, {}).items():
+                setattr(target, name, member)
+
+    @contextmanager
+    def span(self, name: str, cells: int = 0) -> Iterator[None]:
+        """手动记录一段代码的耗时"""
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._record(name, start, time.perf_counter() - start, cells, 0, failed)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """按总耗时降序返回各方法的统计"""
+        with self._lock:
+            stats = [item.to_dict() for item in self._stats.values()]
+        return sorted(stats, key=lambda item: item['total_time'], reverse=True)
+
+    def format_summary(self, limit: int = None) -> str:
+        """
+        生成文本汇总表
+
+        Args:
+            limit: 只显示总耗时最高的若干项
+
+        Returns:
+            表格文本
+        """
+        rows = self.summary()[:limit]
+        lines = [f"{'方法':<44}{'次数':>8}{'总耗时(s)':>12}{'平均(ms)':>10}{'最大(ms)':>10}"
+                 f"{'单元格':>12}{'写出字节':>12}"]
+        for item in rows:
+            lines.append(f"{item['name']:<44}{item['count']:>8}{item['total_time']:>12.3f}"
+                         f"{item['mean_time'] * 1000:>10.2f}{item['max_time'] * 1000:>10.2f}"
+                         f"{item['cells']:>12}{item['bytes_written']:>12}")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """
+        导出 Chrome trace-event JSON
+
+        Args:
+            path: 输出文件路径
+        """
+        with self._lock:
+            events = list(self._events)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        logger.info(f"追踪数据已导出: {path}（{len(events)} 个事件）")
+
+    def reset(self) -> None:
+        """清空统计和事件"""
+        with self._lock:
+            self._stats.clear()
+            self._events.clear()
+            self._origin = time.perf_counter()
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        tracer = self
+        try:
+            signature: Optional[inspect.Signature] = inspect.signature(method)
+        except (TypeError, ValueError):
+            signature = None
+
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            if not tracer.nested:
+                if getattr(tracer._depth, 'value', 0):
+                    return method(*args, **kwargs)
+                tracer._depth.value = 1
+                try:
+                    return timed(*args, **kwargs)
+                finally:
+                    tracer._depth.value = 0
+            return timed(*args, **kwargs)
+
+        def timed(*args, **kwargs):
+            paths = _output_paths(args, kwargs)
+            before = _file_states(paths) if paths else []
+            start = time.perf_counter()
+            failed = False
+            try:
+                return method(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                tracer._record(name, start, duration, count_cells(_call_arguments(signature, args, kwargs)),
+                               _written_bytes(paths, before) if paths else 0, failed)
+
+        return traced
+
+    def _record(self, name: str, start: float, duration: float, cells: int,
+                bytes_written: int, failed: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats(name)
+            stats.add(duration, cells, bytes_written, failed)
+            if len(self._events) < self.max_events:
+                event: Dict[str, Any] = {
+                    'name': name,
+                    'cat': name.split('.', 1)[0],
+                    'ph': 'X',
+                    'ts': (start - self._origin) * 1e6,
+                    'dur': duration * 1e6,
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                }
+                args: Dict[str, Any] = {}
+                if cells:
+                    args['cells'] = cells
+                if bytes_written:
+                    args['bytes'] = bytes_written
+                if failed:
+                    args['error'] = True
+                if args:
+                    event['args'] = args
+                self._events.append(event)
+
+
+# 全局追踪器
+TRACER = Tracer()
+
+
+def enable_tracing(targets: Sequence[Tuple[str, str]] = None) -> Tracer:
+    """启用全局追踪器并返回它"""
+    TRACER.instrument_modules(targets)
+    return TRACER
+
+
+def disable_tracing() -> None:
+    """移除全局追踪器的所有包装（保留已收集的统计）"""
+    TRACER.uninstrument()
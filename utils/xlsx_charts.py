@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/17 下午01:30
+@Author  ：庄洪奎（ARTHUR)
+@FileName：xlsx_charts.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+xlsx 图表写入
+将无界面后端工作表中的图表序列化为 DrawingML 图表部件（xl/charts/chartN.xml），
+系列引用工作表中的数据区域，在 Excel 中打开后与用 COM 创建的图表一致。
+"""
+
+from typing import Any, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.range_address import column_index_to_letter
+
+NS_CHART = 'http://schemas.openxmlformats.org/drawingml/2006/chart'
+NS_DRAWING = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+NS_SHEET_DRAWING = 'http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+DRAWING_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.drawing+xml'
+CHART_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.drawingml.chart+xml'
+
+# 1 磅 = 12700 EMU
+_EMU_PER_POINT = 12700
+
+_LEGEND_POSITIONS = {'right': 'r', 'left': 'l', 'top': 't', 'bottom': 'b'}
+
+# 坐标轴编号（同一图表内唯一即可）
+_CATEGORY_AXIS_ID = 50010
+_VALUE_AXIS_ID = 50020
+
+
+def _quote_sheet_name(name: str) -> str:
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _reference(sheet_name: str, first_row: int, first_col: int, last_row: int, last_col: int) -> str:
+    start = f"${column_index_to_letter(first_col)}${first_row}"
+    end = f"${column_index_to_letter(last_col)}${last_row}"
+    address = start if (first_row, first_col) == (last_row, last_col) else f"{start}:{end}"
+    return f"{_quote_sheet_name(sheet_name)}!{address}"
+
+
+def _escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _rich_title(text: str) -> str:
+    return (
+        f'<c:title><c:tx><c:rich><a:bodyPr/><a:p><a:r><a:t>{_escape(text)}</a:t></a:r></a:p></c:rich></c:tx>'
+        f'<c:overlay val="0"/></c:title>'
+    )
+
+
+def chart_series_references(chart: Any) -> Tuple[Optional[str], List[Tuple[Optional[str], str]]]:
+    """
+    按 Excel 的规则把图表数据区域拆分为分类引用和各系列的名称、数值引用
+
+    Args:
+        chart: HeadlessChart 实例（已设置数据区域）
+
+    Returns:
+        (分类引用或 None, [(系列名称引用或 None, 数值引用)])
+    """
+    from utils.chart_renderer import XL_ROWS, split_chart_values
+
+    source = chart._source
+    values = source.Value
+    if not isinstance(values, tuple):
+        values = ((values,),)
+    header, _, has_labels, plot_by = split_chart_values(values, chart._plot_by)
+    if len(source._areas) > 1:
+        logger.warning(f"图表 {chart.Parent.Name} 的数据区域包含多个区域，只写入第一个区域")
+    first_row, first_col, last_row, last_col = source._areas[0]
+    sheet_name = source.worksheet.Name
+    skip_header = 1 if header is not None else 0
+    skip_labels = 1 if has_labels else 0
+
+    if plot_by == XL_ROWS:
+        # 每行一个系列：首列为系列名称，首行为分类
+        start, stop = first_col + skip_header, last_col
+        categories = _reference(sheet_name, first_row, start, first_row, stop) if has_labels else None
+        series = [
+            (_reference(sheet_name, row, first_col, row, first_col) if header is not None else None,
+             _reference(sheet_name, row, start, row, stop))
+            for row in range(first_row + skip_labels, last_row + 1)
+        ]
+    else:
+        start, stop = first_row + skip_header, last_row
+        categories = _reference(sheet_name, start, first_col, stop, first_col) if has_labels else None
+        series = [
+            (_reference(sheet_name, first_row, col, first_row, col) if header is not None else None,
+             _reference(sheet_name, start, col, stop, col))
+            for col in range(first_col + skip_labels, last_col + 1)
+        ]
+    return categories, series
+
+
+def chart_xml(chart: Any) -> str:
+    """
+    生成图表部件
+
+    Args:
+        chart: HeadlessChart 实例（已设置数据区域）
+
+    Returns:
+        chartN.xml 的内容
+    """
+    spec = chart.to_spec()
+    kind = spec.kind
+    categories, series = chart_series_references(chart)
+
+    parts = []
+    for index, (name_ref, values_ref) in enumerate(series):
+        parts.append(f'<c:ser><c:idx val="{index}"/><c:order val="{index}"/>')
+        if name_ref:
+            parts.append(f'<c:tx><c:strRef><c:f>{_escape(name_ref)}</c:f></c:strRef></c:tx>')
+        if kind == 'line':
+            symbol = 'circle' if spec.markers else 'none'
+            parts.append(f'<c:marker><c:symbol val="{symbol}"/></c:marker>')
+        if categories:
+            parts.append(f'<c:cat><c:strRef><c:f>{_escape(categories)}</c:f></c:strRef></c:cat>')
+        parts.append(f'<c:val><c:numRef><c:f>{_escape(values_ref)}</c:f></c:numRef></c:val>')
+        if kind == 'line':
+            parts.append('<c:smooth val="0"/>')
+        parts.append('</c:ser>')
+    series_xml = ''.join(parts)
+
+    labels = ''
+    if spec.show_values or spec.show_percentage or spec.show_category:
+        labels = (
+            f'<c:dLbls><c:showLegendKey val="0"/><c:showVal val="{int(spec.show_values)}"/>'
+            f'<c:showCatName val="{int(spec.show_category)}"/><c:showSerName val="0"/>'
+            f'<c:showPercent val="{int(spec.show_percentage)}"/><c:showBubbleSize val="0"/></c:dLbls>'
+        )
+    axis_ids = f'<c:axId val="{_CATEGORY_AXIS_ID}"/><c:axId val="{_VALUE_AXIS_ID}"/>'
+    if kind == 'pie':
+        plot = f'<c:pieChart><c:varyColors val="1"/>{series_xml}{labels}<c:firstSliceAng val="0"/></c:pieChart>'
+    elif kind == 'line':
+        plot = (f'<c:lineChart><c:grouping val="standard"/><c:varyColors val="0"/>{series_xml}{labels}'
+                f'<c:marker val="1"/>{axis_ids}</c:lineChart>')
+    else:
+        plot = (f'<c:barChart><c:barDir val="col"/><c:grouping val="clustered"/><c:varyColors val="0"/>'
+                f'{series_xml}{labels}<c:gapWidth val="219"/>{axis_ids}</c:barChart>')
+    if kind != 'pie':
+        x_title = _rich_title(spec.x_title) if spec.x_title else ''
+        y_title = _rich_title(spec.y_title) if spec.y_title else ''
+        plot += (
+            f'<c:catAx><c:axId val="{_CATEGORY_AXIS_ID}"/><c:scaling><c:orientation val="minMax"/></c:scaling>'
+            f'<c:delete val="0"/><c:axPos val="b"/>{x_title}<c:crossAx val="{_VALUE_AXIS_ID}"/></c:catAx>'
+            f'<c:valAx><c:axId val="{_VALUE_AXIS_ID}"/><c:scaling><c:orientation val="minMax"/></c:scaling>'
+            f'<c:delete val="0"/><c:axPos val="l"/><c:majorGridlines/>{y_title}'
+            f'<c:crossAx val="{_CATEGORY_AXIS_ID}"/></c:valAx>'
+        )
+
+    title = _rich_title(spec.title) if spec.title else ''
+    legend = ''
+    if spec.legend:
+        legend = (f'<c:legend><c:legendPos val="{_LEGEND_POSITIONS.get(spec.legend, "r")}"/>'
+                  f'<c:overlay val="0"/></c:legend>')
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<c:chartSpace xmlns:c="{NS_CHART}" xmlns:a="{NS_DRAWING}" xmlns:r="{NS_REL}">'
+        f'<c:chart>{title}<c:autoTitleDeleted val="{0 if title else 1}"/>'
+        f'<c:plotArea><c:layout/>{plot}</c:plotArea>{legend}<c:plotVisOnly val="1"/></c:chart>'
+        f'</c:chartSpace>'
+    )
+
+
+def drawing_xml(chart_objects: List[Any]) -> str:
+    """
+    生成工作表的绘图部件，图表按 Left/Top/Width/Height（磅）定位
+
+    Args:
+        chart_objects: HeadlessChartObject 列表，第 N 个对应关系 rIdN
+
+    Returns:
+        drawingN.xml 的内容
+    """
+    anchors = []
+    for index, chart_object in enumerate(chart_objects, start=1):
+        anchors.append(
+            f'<xdr:absoluteAnchor>'
+            f'<xdr:pos x="{int(chart_object.Left * _EMU_PER_POINT)}" y="{int(chart_object.Top * _EMU_PER_POINT)}"/>'
+            f'<xdr:ext cx="{int(chart_object.Width * _EMU_PER_POINT)}" '
+            f'cy="{int(chart_object.Height * _EMU_PER_POINT)}"/>'
+            f'<xdr:graphicFrame macro="">'
+            f'<xdr:nvGraphicFramePr><xdr:cNvPr id="{index + 1}" name="{_escape(chart_object.Name)}"/>'
+            f'<xdr:cNvGraphicFramePr/></xdr:nvGraphicFramePr>'
+            f'<xdr:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/></xdr:xfrm>'
+            f'<a:graphic><a:graphicData uri="{NS_CHART}">'
+            f'<c:chart xmlns:c="{NS_CHART}" r:id="rId{index}"/>'
+            f'</a:graphicData></a:graphic></xdr:graphicFrame><xdr:clientData/></xdr:absoluteAnchor>'
+        )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<xdr:wsDr xmlns:xdr="{NS_SHEET_DRAWING}" xmlns:a="{NS_DRAWING}" xmlns:r="{NS_REL}">'
+        f'{"".join(anchors)}</xdr:wsDr>'
+    )
+
+
+def relationships_xml(targets: List[Tuple[str, str]]) -> str:
+    """
+    生成关系部件
+
+    Args:
+        targets: (关系类型名称, 目标路径) 列表，依次为 rId1、rId2 ...
+
+    Returns:
+        .rels 文件内容
+    """
+    relationships = ''.join(
+        f'<Relationship Id="rId{index}" Type="{REL_TYPE}/{kind}" Target="{target}"/>'
+        for index, (kind, target) in enumerate(targets, start=1)
+    )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="{NS_PKG_REL}">{relationships}</Relationships>'
+    )
+
+
+def exportable_charts(worksheet: Any) -> List[Any]:
+    """
+    工作表中可以写入文件的图表（未设置数据区域的图表跳过并记录警告）
+
+    Args:
+        worksheet: 无界面后端工作表
+
+    Returns:
+        HeadlessChartObject 列表
+    """
+    chart_objects = []
+    for chart_object in getattr(worksheet, '_charts', ()):
+        if chart_object.Chart._source is None:
+            logger.warning(f"图表 {chart_object.Name} 未设置数据区域，保存时跳过")
+            continue
+        chart_objects.append(chart_object)
+    return chart_objects
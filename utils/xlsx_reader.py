@@ -0,0 +1,677 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 下午02:20
+@Author  ：庄洪奎（ARTHUR)
+@FileName：xlsx_reader.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+分块 xlsx 读取
+使用增量 XML 解析逐行读取工作表，支持按列投影和固定大小的行块，
+读取数百 MB 的工作簿时内存占用只与单个行块有关。
+"""
+
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from xml.etree import ElementTree
+
+from config import FILE_CONFIG, PERFORMANCE_CONFIG
+from utils.range_address import column_letter_to_index, parse_range
+from utils.shared_strings import SharedStringTable
+from utils.style_registry import DEFAULT_STYLE_ID, STYLE_REGISTRY
+from utils.xlsx_writer import BORDER_WEIGHTS, BUILTIN_NUMBER_FORMATS, HORIZONTAL_ALIGNMENTS, NS_MAIN, \
+    NS_PKG_REL, VERTICAL_ALIGNMENTS
+
+NS_DOC_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+_ROW = f'{{{NS_MAIN}}}row'
+_CELL = f'{{{NS_MAIN}}}c'
+_VALUE = f'{{{NS_MAIN}}}v'
+_FORMULA = f'{{{NS_MAIN}}}f'
+_INLINE = f'{{{NS_MAIN}}}is'
+_TEXT = f'{{{NS_MAIN}}}t'
+_RUN = f'{{{NS_MAIN}}}r'
+_SHEET_DATA = f'{{{NS_MAIN}}}sheetData'
+_CALC_PR = f'{{{NS_MAIN}}}calcPr'
+_DIMENSION = f'{{{NS_MAIN}}}dimension'
+
+# 内置日期格式编号
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+# 内置数字格式编号到格式代码
+_BUILTIN_FORMAT_CODES = {fmt_id: code for code, fmt_id in BUILTIN_NUMBER_FORMATS.items()}
+_BUILTIN_FORMAT_CODES.update({
+    14: 'm/d/yyyy', 15: 'd-mmm-yy', 16: 'd-mmm', 17: 'mmm-yy', 18: 'h:mm AM/PM', 19: 'h:mm:ss AM/PM',
+    20: 'h:mm', 21: 'h:mm:ss', 22: 'm/d/yyyy h:mm', 45: 'mm:ss', 46: '[h]:mm:ss', 47: 'mm:ss.0',
+})
+# OOXML 到 COM 常量的映射
+_BORDER_WEIGHT_CODES = {name: weight for weight, name in BORDER_WEIGHTS.items()}
+_HORIZONTAL_CODES = {name: code for code, name in HORIZONTAL_ALIGNMENTS.items()}
+_VERTICAL_CODES = {name: code for code, name in VERTICAL_ALIGNMENTS.items()}
+_XL_CONTINUOUS = 1
+_XL_UNDERLINE_SINGLE = 2
+_XL_LANDSCAPE, _XL_PORTRAIT = 2, 1
+_HEADER_SECTION = re.compile(r'&([LCR])')
+_DATE_CODE = re.compile(r'[dmyhs]', re.IGNORECASE)
+_QUOTED = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+_LETTERS = re.compile(r'^[A-Z]+')
+_EPOCH = datetime(1899, 12, 30)
+# t="d" 单元格的 ISO 8601 文本：日期、日期时间或只有时间，可带小数秒和时区标记
+_ISO_DATETIME = re.compile(r'^(?:(\d{4})-(\d{2})-(\d{2}))?(?:T?(\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?)?'
+                           r'(?:Z|[+-]\d{2}:?\d{2})?$')
+
+ColumnSpec = Union[int, str]
+
+
+def from_excel_serial(serial: float) -> datetime:
+    """
+    Excel 序列值转换为 datetime
+
+    Args:
+        serial: Excel 序列值
+
+    Returns:
+        datetime 对象
+    """
+    return _EPOCH + timedelta(days=serial)
+
+
+def parse_iso_datetime(text: str) -> Optional[datetime]:
+    """
+    ISO 8601 文本（t="d" 单元格的值）转换为 datetime
+
+    只有时间部分时日期取 Excel 的日期起点（与序列值的小数部分一致），时区标记忽略。
+
+    Args:
+        text: 例如 '2024-01-02'、'2024-01-02T08:30:00.5Z'、'08:30:00'
+
+    Returns:
+        datetime 对象，无法解析时返回 None
+    """
+    match = _ISO_DATETIME.match(text.strip())
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    if year is None and hour is None:
+        return None
+    try:
+        base = datetime(int(year), int(month), int(day)) if year is not None else _EPOCH
+        return base.replace(hour=int(hour or 0), minute=int(minute or 0), second=int(second or 0),
+                            microsecond=int(fraction.ljust(6, '0')) if fraction else 0)
+    except ValueError:
+        return None
+
+
+def is_date_format(code: str) -> bool:
+    """判断数字格式代码是否为日期时间格式"""
+    return bool(_DATE_CODE.search(_QUOTED.sub('', code)))
+
+
+def parse_number(text: str) -> Union[int, float]:
+    """数值文本转换为 int 或 float"""
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    return int(text)
+
+
+def _column_index(spec: ColumnSpec) -> int:
+    return spec if isinstance(spec, int) else column_letter_to_index(spec)
+
+
+def _text_of(element: ElementTree.Element) -> str:
+    """拼接 <si>/<is> 中的文本和富文本片段（忽略拼音注音 rPh）"""
+    parts = []
+    for child in element:
+        if child.tag == _TEXT:
+            parts.append(child.text or '')
+        elif child.tag == _RUN:
+            text = child.find(_TEXT)
+            if text is not None:
+                parts.append(text.text or '')
+    return ''.join(parts)
+
+
+class XlsxReader:
+    """
+    xlsx 增量读取器
+
+    只在需要时解析工作表 XML；行在产出后立即从解析树中释放。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: xlsx 文件路径
+        """
+        self.path = Path(path)
+        self._archive = zipfile.ZipFile(self.path)
+        self._sheets: List[Tuple[str, str, str]] = []
+        self._shared_strings: Optional[SharedStringTable] = None
+        self._date_styles: Optional[set] = None
+        self._cell_styles: Optional[List[int]] = None
+        # (工作表序号, 名称) -> 定义名称的内容，例如 (0, '_xlnm.Print_Area')
+        self.defined_names: Dict[Tuple[int, str], str] = {}
+        self.full_calc_on_load = False
+        self._load_workbook_index()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """工作表名称列表"""
+        return [name for name, _, _ in self._sheets]
+
+    def sheet_state(self, sheet: Union[int, str]) -> str:
+        """工作表可见状态：visible、hidden 或 veryHidden"""
+        return self._sheet_entry(sheet)[2]
+
+    def sheet_dimension(self, sheet: Union[int, str]) -> Optional[str]:
+        """
+        工作表记录的已使用区域（只读取 sheetData 之前的部分，不解析单元格）
+
+        Returns:
+            区域地址，例如 'A1:G101'；文件中没有记录时返回 None
+        """
+        with self._archive.open(self._sheet_entry(sheet)[1]) as stream:
+            for event, element in ElementTree.iterparse(stream, events=('start',)):
+                if element.tag == _DIMENSION:
+                    return element.get('ref')
+                if element.tag == _SHEET_DATA:
+                    break
+        return None
+
+    def release_caches(self) -> None:
+        """释放已解析的共享字符串和样式信息，下次读取时重新解析"""
+        if self._shared_strings is not None:
+            self._shared_strings.close()
+        self._shared_strings = None
+        self._date_styles = None
+        self._cell_styles = None
+
+    def cell_styles(self) -> List[int]:
+        """
+        cellXfs 序号到样式注册表编号的映射（字体、填充、边框、数字格式和对齐方式）
+
+        Returns:
+            样式编号列表，第 i 项对应单元格的 s="i"
+        """
+        if self._cell_styles is None:
+            self._load_styles()
+        return self._cell_styles
+
+    def iter_rows(self, sheet: Union[int, str, None] = None, columns: Sequence[ColumnSpec] = None,
+                  min_row: int = 1, max_row: int = None, formulas: bool = False,
+                  with_row_number: bool = False,
+                  cached_values: Dict[Tuple[int, int], Any] = None,
+                  styles: Dict[Tuple[int, int], int] = None) -> Iterator[Any]:
+        """
+        逐行读取工作表
+
+        Args:
+            sheet: 工作表名称或序号（从1开始），默认第一个工作表
+            columns: 需要读取的列（列字母或列号），未列出的列不会被解码
+            min_row: 起始行号
+            max_row: 结束行号
+            formulas: 为 True 时公式单元格返回 '=...' 公式文本，否则返回缓存值
+            with_row_number: 为 True 时产出 (行号, 行数据)
+            cached_values: formulas 为 True 时可传入一个字典，
+                           读取过程中收集公式单元格的缓存值，键为 (行号, 列号)
+            styles: 可传入一个字典，读取过程中收集单元格的样式注册表编号（默认样式不收集）
+
+        Yields:
+            行数据列表；指定 columns 时按 columns 顺序排列
+        """
+        projection = None
+        if columns is not None:
+            projection = {_column_index(spec): position for position, spec in enumerate(columns)}
+        width = len(columns) if columns is not None else None
+        shared_strings = self._get_shared_strings()
+        date_styles = self._get_date_styles()
+        cell_styles = self.cell_styles() if styles is not None else None
+
+        with self._archive.open(self._sheet_entry(sheet)[1]) as stream:
+            sheet_data = None
+            row_number = 0
+            for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == _SHEET_DATA:
+                        sheet_data = element
+                    continue
+                if element.tag != _ROW:
+                    continue
+                row_number = int(element.get('r', row_number + 1))
+                if row_number < min_row:
+                    sheet_data.clear()
+                    continue
+                if max_row is not None and row_number > max_row:
+                    break
+
+                values: List[Any] = [None] * width if width is not None else []
+                col = 0
+                for cell in element.iter(_CELL):
+                    reference = cell.get('r')
+                    col = column_letter_to_index(_LETTERS.match(reference).group()) if reference else col + 1
+                    if projection is not None:
+                        position = projection.get(col)
+                        if position is None:
+                            continue
+                    else:
+                        position = col - 1
+                        if position >= len(values):
+                            values.extend([None] * (position + 1 - len(values)))
+                    value = values[position] = self._cell_value(cell, shared_strings, date_styles, formulas)
+                    if cell_styles is not None:
+                        style = int(cell.get('s', 0))
+                        if style and style < len(cell_styles) and cell_styles[style] != DEFAULT_STYLE_ID:
+                            styles[(row_number, col)] = cell_styles[style]
+                    if cached_values is not None and formulas and isinstance(value, str) and value.startswith('='):
+                        cached = self._cached_result(cell, shared_strings, date_styles)
+                        if cached is not None:
+                            cached_values[(row_number, col)] = cached
+                # 已处理的行立即释放，避免解析树随行数增长
+                sheet_data.clear()
+                yield (row_number, values) if with_row_number else values
+
+    def iter_chunks(self, sheet: Union[int, str, None] = None, chunk_size: int = None,
+                    columns: Sequence[ColumnSpec] = None, **kwargs) -> Iterator[List[List[Any]]]:
+        """
+        按固定行数分块读取
+
+        Args:
+            sheet: 工作表名称或序号
+            chunk_size: 每块行数，默认取 PERFORMANCE_CONFIG['batch_size']
+            columns: 需要读取的列
+            **kwargs: 传递给 iter_rows 的其他参数
+
+        Yields:
+            行数据列表组成的块
+        """
+        chunk_size = chunk_size or PERFORMANCE_CONFIG['batch_size']
+        chunk: List[List[Any]] = []
+        for row in self.iter_rows(sheet, columns=columns, **kwargs):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def read_range(self, sheet: Union[int, str, None], address: str, formulas: bool = False) -> List[List[Any]]:
+        """
+        读取指定区域，缺失的单元格以 None 填充
+
+        Args:
+            sheet: 工作表名称或序号
+            address: 区域地址，例如 'A1:G101'
+            formulas: 是否返回公式文本
+
+        Returns:
+            二维列表
+        """
+        first_row, first_col, last_row, last_col = parse_range(address)
+        columns = list(range(first_col, last_col + 1))
+        rows = {
+            number: values for number, values in self.iter_rows(
+                sheet, columns=columns, min_row=first_row, max_row=last_row,
+                formulas=formulas, with_row_number=True)
+        }
+        return [rows.get(number, [None] * len(columns)) for number in range(first_row, last_row + 1)]
+
+    def close(self) -> None:
+        """关闭文件"""
+        self.release_caches()
+        self._archive.close()
+
+    def __enter__(self) -> 'XlsxReader':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    # ---- 内部实现 ----
+
+    def _cell_value(self, cell: ElementTree.Element, shared_strings: Sequence[str],
+                    date_styles: set, formulas: bool) -> Any:
+        cell_type = cell.get('t', 'n')
+        if formulas:
+            formula = cell.find(_FORMULA)
+            if formula is not None and formula.text:
+                return '=' + formula.text
+        if cell_type == 'inlineStr':
+            inline = cell.find(_INLINE)
+            return _text_of(inline) if inline is not None else None
+        value = cell.find(_VALUE)
+        if value is None or value.text is None:
+            return None
+        text = value.text
+        if cell_type == 's':
+            return shared_strings[int(text)]
+        if cell_type == 'b':
+            return text == '1'
+        if cell_type in ('str', 'e'):
+            return text
+        if cell_type == 'd':
+            parsed = parse_iso_datetime(text)
+            return parsed if parsed is not None else text
+        number = parse_number(text)
+        style = cell.get('s')
+        if style is not None and int(style) in date_styles:
+            return from_excel_serial(number)
+        return number
+
+    def _cached_result(self, cell: ElementTree.Element, shared_strings: Sequence[str], date_styles: set) -> Any:
+        """公式单元格的缓存值，错误值转换为 CellError"""
+        value = self._cell_value(cell, shared_strings, date_styles, False)
+        if value is not None and cell.get('t') == 'e':
+            from utils.formula_engine import CellError
+            return CellError(value)
+        return value
+
+    def _sheet_entry(self, sheet: Union[int, str, None]) -> Tuple[str, str, str]:
+        if sheet is None:
+            return self._sheets[0]
+        if isinstance(sheet, int):
+            return self._sheets[sheet - 1]
+        for entry in self._sheets:
+            if entry[0].lower() == sheet.lower():
+                return entry
+        raise KeyError(f"工作表不存在: {sheet}")
+
+    def _load_workbook_index(self) -> None:
+        relationships = {}
+        rels = ElementTree.fromstring(self._archive.read('xl/_rels/workbook.xml.rels'))
+        for relationship in rels.iter(f'{{{NS_PKG_REL}}}Relationship'):
+            target = relationship.get('Target')
+            if target.startswith('/'):
+                part = target.lstrip('/')
+            else:
+                part = posixpath.normpath(posixpath.join('xl', target))
+            relationships[relationship.get('Id')] = part
+
+        workbook = ElementTree.fromstring(self._archive.read('xl/workbook.xml'))
+        for sheet in workbook.iter(f'{{{NS_MAIN}}}sheet'):
+            rel_id = sheet.get(f'{{{NS_DOC_REL}}}id')
+            self._sheets.append((sheet.get('name'), relationships[rel_id], sheet.get('state', 'visible')))
+        calc_pr = workbook.find(_CALC_PR)
+        if calc_pr is not None:
+            self.full_calc_on_load = calc_pr.get('fullCalcOnLoad') in ('1', 'true')
+        for defined_name in workbook.iter(f'{{{NS_MAIN}}}definedName'):
+            if defined_name.get('localSheetId') is not None and defined_name.text:
+                self.defined_names[(int(defined_name.get('localSheetId')), defined_name.get('name'))] = \
+                    defined_name.text
+
+    def _get_shared_strings(self) -> SharedStringTable:
+        # 只建立偏移索引，字符串在单元格访问时才解码
+        if self._shared_strings is None:
+            self._shared_strings = SharedStringTable(self._archive)
+        return self._shared_strings
+
+    def _get_date_styles(self) -> set:
+        if self._date_styles is None:
+            self._load_styles()
+        return self._date_styles
+
+    def _load_styles(self) -> None:
+        self._date_styles = set()
+        self._cell_styles = []
+        if 'xl/styles.xml' not in self._archive.namelist():
+            return
+        stylesheet = ElementTree.fromstring(self._archive.read('xl/styles.xml'))
+        custom = {
+            int(fmt.get('numFmtId')): fmt.get('formatCode', '')
+            for fmt in stylesheet.iter(f'{{{NS_MAIN}}}numFmt')
+        }
+        cell_xfs = stylesheet.find(f'{{{NS_MAIN}}}cellXfs')
+        if cell_xfs is None:
+            return
+        xfs = cell_xfs.findall(f'{{{NS_MAIN}}}xf')
+        for index, xf in enumerate(xfs):
+            fmt_id = int(xf.get('numFmtId', 0))
+            if fmt_id in _BUILTIN_DATE_FORMATS or (fmt_id in custom and is_date_format(custom[fmt_id])):
+                self._date_styles.add(index)
+        self._cell_styles = _register_cell_styles(stylesheet, xfs, custom)
+
+
+def _element_color(element: Optional[ElementTree.Element]) -> Optional[int]:
+    """<color rgb="FFRRGGBB"/> 转换为 COM 颜色值（BGR 整数）；主题色和索引色忽略"""
+    if element is None:
+        return None
+    argb = element.get('rgb')
+    if not argb or len(argb) < 6:
+        return None
+    red, green, blue = int(argb[-6:-4], 16), int(argb[-4:-2], 16), int(argb[-2:], 16)
+    return red | (green << 8) | (blue << 16)
+
+
+def _flag(element: Optional[ElementTree.Element]) -> bool:
+    return element is not None and element.get('val', '1') not in ('0', 'false')
+
+
+def _font_style(font: ElementTree.Element) -> Dict[str, Any]:
+    style: Dict[str, Any] = {}
+    name, size = font.find(f'{{{NS_MAIN}}}name'), font.find(f'{{{NS_MAIN}}}sz')
+    if name is not None:
+        style['font_name'] = name.get('val')
+    if size is not None:
+        style['font_size'] = parse_number(size.get('val'))
+    if _flag(font.find(f'{{{NS_MAIN}}}b')):
+        style['font_bold'] = True
+    if _flag(font.find(f'{{{NS_MAIN}}}i')):
+        style['font_italic'] = True
+    underline = font.find(f'{{{NS_MAIN}}}u')
+    if underline is not None and underline.get('val', 'single') != 'none':
+        style['font_underline'] = _XL_UNDERLINE_SINGLE
+    style['font_color'] = _element_color(font.find(f'{{{NS_MAIN}}}color'))
+    return style
+
+
+def _fill_style(fill: ElementTree.Element) -> Dict[str, Any]:
+    pattern = fill.find(f'{{{NS_MAIN}}}patternFill')
+    if pattern is None or pattern.get('patternType') != 'solid':
+        return {}
+    return {'fill_color': _element_color(pattern.find(f'{{{NS_MAIN}}}fgColor'))}
+
+
+def _border_style(border: ElementTree.Element) -> Dict[str, Any]:
+    # 单元格样式只记录一种边框（四边相同），取第一条有线型的边
+    for edge in ('left', 'right', 'top', 'bottom'):
+        element = border.find(f'{{{NS_MAIN}}}{edge}')
+        if element is not None and element.get('style') in _BORDER_WEIGHT_CODES:
+            return {
+                'border_style': _XL_CONTINUOUS,
+                'border_weight': _BORDER_WEIGHT_CODES[element.get('style')],
+                'border_color': _element_color(element.find(f'{{{NS_MAIN}}}color')),
+            }
+    return {}
+
+
+def _register_cell_styles(stylesheet: ElementTree.Element, xfs: List[ElementTree.Element],
+                          custom_formats: Dict[int, str]) -> List[int]:
+    """把 cellXfs 的每一项转换为样式字典并登记到样式注册表"""
+    tables = []
+    for group, item, convert in (('fonts', 'font', _font_style), ('fills', 'fill', _fill_style),
+                                 ('borders', 'border', _border_style)):
+        parent = stylesheet.find(f'{{{NS_MAIN}}}{group}')
+        elements = [] if parent is None else parent.findall(f'{{{NS_MAIN}}}{item}')
+        tables.append([convert(element) for element in elements])
+    fonts, fills, borders = tables
+    style_ids = []
+    for xf in xfs:
+        style: Dict[str, Any] = {}
+        for table, attribute in ((fonts, 'fontId'), (fills, 'fillId'), (borders, 'borderId')):
+            position = int(xf.get(attribute, 0))
+            if position < len(table):
+                style.update(table[position])
+        fmt_id = int(xf.get('numFmtId', 0))
+        code = custom_formats.get(fmt_id) or _BUILTIN_FORMAT_CODES.get(fmt_id)
+        if code and code != 'General':
+            style['number_format'] = code
+        alignment = xf.find(f'{{{NS_MAIN}}}alignment')
+        if alignment is not None:
+            style['horizontal_alignment'] = _HORIZONTAL_CODES.get(alignment.get('horizontal'))
+            style['vertical_alignment'] = _VERTICAL_CODES.get(alignment.get('vertical'))
+            style['wrap_text'] = alignment.get('wrapText') in ('1', 'true') or None
+        style_ids.append(STYLE_REGISTRY.intern(style))
+    return style_ids
+
+
+def _split_header_footer(text: str) -> Dict[str, str]:
+    """拆分页眉页脚的 &L、&C、&R 三段（没有分段代码的文本属于中间段）"""
+    sections = {'L': '', 'C': '', 'R': ''}
+    current, position = 'C', 0
+    for match in _HEADER_SECTION.finditer(text):
+        # '&&' 是转义的 '&'，其后的字母不是分段代码
+        preceding = text[:match.start()]
+        if (len(preceding) - len(preceding.rstrip('&'))) % 2:
+            continue
+        sections[current] += text[position:match.start()]
+        current, position = match.group(1), match.end()
+    sections[current] += text[position:]
+    return sections
+
+
+def _strip_sheet_names(text: str) -> str:
+    """'Sheet1'!$A$1:$E$9,'Sheet1'!$G$1 转换为 $A$1:$E$9,$G$1"""
+    return ','.join(part.rpartition('!')[2] for part in text.split(','))
+
+
+def iter_sheet_rows(path: str, sheet: Union[int, str, None] = None,
+                    columns: Sequence[ColumnSpec] = None, chunk_size: int = None) -> Iterator[List[List[Any]]]:
+    """
+    按块读取 xlsx 工作表的便捷函数
+
+    Args:
+        path: xlsx 文件路径
+        sheet: 工作表名称或序号
+        columns: 需要读取的列
+        chunk_size: 每块行数
+
+    Yields:
+        行块
+    """
+    with XlsxReader(path) as reader:
+        yield from reader.iter_chunks(sheet, chunk_size=chunk_size, columns=columns)
+
+
+def load_workbook(application: Any, path: str, trust_cached: bool = None) -> Any:
+    """
+    将 xlsx 文件载入为无界面后端的工作簿（保留值、公式、单元格格式、合并单元格、列宽行高和页面设置）
+
+    信任缓存值时，文件中公式的缓存结果直接作为公式引擎的计算结果，
+    打开后读取公式单元格不会触发重算；只有之后被修改的单元格的下游公式才会重新计算。
+    文件标记了打开后完整重算（fullCalcOnLoad）时不使用缓存值。
+
+    Args:
+        application: HeadlessApplication 实例
+        path: xlsx 文件路径
+        trust_cached: 是否信任公式缓存值，默认取 FILE_CONFIG['trust_cached_values']
+
+    Returns:
+        HeadlessWorkbook 实例
+    """
+    from utils.headless_backend import XL_SHEET_HIDDEN
+
+    path = Path(path)
+    if trust_cached is None:
+        trust_cached = FILE_CONFIG.get('trust_cached_values', True)
+    workbook = application.Workbooks.Add()
+    cached_results: Dict[Tuple[Any, int, int], Any] = {}
+    with XlsxReader(path) as reader:
+        trust_cached = trust_cached and not reader.full_calc_on_load
+        first_sheet = workbook.ActiveSheet
+        previous = None
+        for name in reader.sheet_names:
+            if previous is None:
+                worksheet = first_sheet
+            else:
+                worksheet = workbook.Worksheets.Add(After=previous)
+            worksheet.Name = name
+            if reader.sheet_state(name) != 'visible':
+                worksheet.Visible = XL_SHEET_HIDDEN
+            cached_values: Optional[Dict[Tuple[int, int], Any]] = {} if trust_cached else None
+            for row_number, values in reader.iter_rows(name, formulas=True, with_row_number=True,
+                                                       cached_values=cached_values, styles=worksheet._styles):
+                for col, value in enumerate(values, start=1):
+                    if value is not None:
+                        worksheet._set_value(row_number, col, value)
+            if cached_values:
+                cached_results.update(((worksheet, row, col), value) for (row, col), value in cached_values.items())
+            _load_sheet_layout(reader, name, worksheet)
+            previous = worksheet
+        first_sheet.Activate()
+    if cached_results:
+        workbook.formula_engine().seed(cached_results)
+    workbook.Name = path.name
+    workbook.FullName = str(path)
+    workbook.Saved = True
+    return workbook
+
+
+def _load_sheet_layout(reader: XlsxReader, sheet: str, worksheet: Any, with_page_setup: bool = True) -> None:
+    """读取合并单元格、列宽、行高和页面设置（with_page_setup 为 False 时不读取页面设置）"""
+    if not with_page_setup:
+        from utils.headless_backend import HeadlessPageSetup
+
+        # 页面设置写入一个丢弃的对象，保留工作表上已有的设置
+        page_setup = HeadlessPageSetup()
+    else:
+        page_setup = worksheet.PageSetup
+    fit_to_page = False
+    with reader._archive.open(reader._sheet_entry(sheet)[1]) as stream:
+        for _, element in ElementTree.iterparse(stream):
+            tag = element.tag
+            if tag == f'{{{NS_MAIN}}}col' and element.get('width'):
+                for col in range(int(element.get('min')), int(element.get('max')) + 1):
+                    worksheet._column_widths[col] = float(element.get('width'))
+            elif tag == _ROW:
+                if element.get('customHeight') and element.get('ht'):
+                    worksheet._row_heights[int(element.get('r'))] = float(element.get('ht'))
+                element.clear()
+            elif tag == f'{{{NS_MAIN}}}mergeCell':
+                worksheet._merged.append(parse_range(element.get('ref')))
+            elif tag == f'{{{NS_MAIN}}}pageSetUpPr':
+                fit_to_page = element.get('fitToPage') in ('1', 'true')
+            elif tag == f'{{{NS_MAIN}}}printOptions':
+                page_setup.CenterHorizontally = element.get('horizontalCentered') in ('1', 'true')
+                page_setup.CenterVertically = element.get('verticalCentered') in ('1', 'true')
+                page_setup.PrintHeadings = element.get('headings') in ('1', 'true')
+                page_setup.PrintGridlines = element.get('gridLines') in ('1', 'true')
+            elif tag == f'{{{NS_MAIN}}}pageMargins':
+                # 文件中的页边距以英寸为单位
+                for attribute, name in (('left', 'LeftMargin'), ('right', 'RightMargin'), ('top', 'TopMargin'),
+                                        ('bottom', 'BottomMargin'), ('header', 'HeaderMargin'),
+                                        ('footer', 'FooterMargin')):
+                    if element.get(attribute) is not None:
+                        setattr(page_setup, name, round(float(element.get(attribute)) * 72, 2))
+            elif tag == f'{{{NS_MAIN}}}pageSetup':
+                if element.get('paperSize'):
+                    page_setup.PaperSize = int(element.get('paperSize'))
+                if element.get('orientation'):
+                    page_setup.Orientation = _XL_LANDSCAPE if element.get('orientation') == 'landscape' \
+                        else _XL_PORTRAIT
+                if fit_to_page:
+                    # 按页数缩放时 Zoom 为 False，0 表示该方向不限页数
+                    page_setup.Zoom = False
+                    page_setup.FitToPagesWide = int(element.get('fitToWidth', 1)) or False
+                    page_setup.FitToPagesTall = int(element.get('fitToHeight', 1)) or False
+                elif element.get('scale'):
+                    page_setup.Zoom = int(element.get('scale'))
+            elif tag in (f'{{{NS_MAIN}}}oddHeader', f'{{{NS_MAIN}}}oddFooter'):
+                kind = 'Header' if tag.endswith('Header') else 'Footer'
+                sections = _split_header_footer(element.text or '')
+                for code, position in (('L', 'Left'), ('C', 'Center'), ('R', 'Right')):
+                    setattr(page_setup, f'{position}{kind}', sections[code])
+    if not with_page_setup:
+        return
+    sheet_index = reader.sheet_names.index(reader._sheet_entry(sheet)[0])
+    print_area = reader.defined_names.get((sheet_index, '_xlnm.Print_Area'))
+    if print_area:
+        page_setup.PrintArea = _strip_sheet_names(print_area)
+    print_titles = reader.defined_names.get((sheet_index, '_xlnm.Print_Titles'))
+    if print_titles:
+        # 只保留重复标题行（$1:$3 形式），标题列不受支持
+        rows = [part for part in _strip_sheet_names(print_titles).split(',') if part.replace('$', '')[:1].isdigit()]
+        if rows:
+            page_setup.PrintTitleRows = rows[0]
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 下午01:10
+@Author  ：庄洪奎（ARTHUR)
+@FileName：xlsx_stream.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+流式 xlsx 写入
+逐行接收数据（列表或生成器），按批次把工作表 XML 直接写入压缩包，
+内存占用与总行数无关，适合百万行级别的数据导出。
+重复出现的文本登记到共享字符串表，每个不同的字符串在文件中只保存一次；
+pandas 分类列的每个类别只登记一次，各行直接引用类别编号。
+"""
+
+import itertools
+import zipfile
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence
+from loguru import logger
+
+from config import FORMAT_CONFIG, PERFORMANCE_CONFIG
+from utils.range_address import column_index_to_letter, parse_cell
+from utils.xlsx_writer import (
+    BOOL_TYPES, NS_MAIN, NS_REL, NUMBER_TYPES, SharedStrings, StyleSheet, format_number, number_cell_xml,
+    text_xml, to_excel_serial, write_package_parts, xml_attr, xml_text,
+)
+
+
+class StreamingXlsxWriter:
+    """
+    流式 xlsx 写入器
+
+    每个工作表只遍历一次数据源，每累计 batch_size 行就写入一次压缩流。
+    """
+
+    def __init__(self, path: str, batch_size: int = None, shared_strings: bool = True,
+                 max_shared_strings: int = None):
+        """
+        Args:
+            path: 输出文件路径
+            batch_size: 每次写入的行数，默认取 PERFORMANCE_CONFIG['batch_size']
+            shared_strings: 是否把文本登记到共享字符串表（False 时写为内联字符串）
+            max_shared_strings: 共享字符串表的不同字符串上限，超过后新的文本写为内联字符串，
+                                默认取 PERFORMANCE_CONFIG['max_shared_strings']
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size or PERFORMANCE_CONFIG['batch_size']
+        self.max_shared_strings = (max_shared_strings or PERFORMANCE_CONFIG.get('max_shared_strings', 1000000)) \
+            if shared_strings else 0
+        self._shared_strings = SharedStrings()
+        self._archive: Optional[zipfile.ZipFile] = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED)
+        self._sheet_names: List[str] = []
+        self._styles = StyleSheet()
+        self._date_style = self._styles.style_index({'number_format': FORMAT_CONFIG['date_format']})
+        self._letters: List[str] = ['']
+
+    def write_sheet(self, name: str, rows: Iterable[Sequence[Any]], start_cell: str = 'A1') -> int:
+        """
+        写入一个工作表
+
+        Args:
+            name: 工作表名称
+            rows: 行数据的可迭代对象，可以是生成器
+            start_cell: 起始单元格
+
+        Returns:
+            写入的行数
+        """
+        if self._archive is None:
+            raise ValueError("写入器已关闭")
+        if any(existing.lower() == name.lower() for existing in self._sheet_names):
+            raise ValueError(f"工作表名称已存在: {name}")
+        self._sheet_names.append(name)
+        sheet_index = len(self._sheet_names)
+        start_row, start_col = parse_cell(start_cell)
+
+        selected = ' tabSelected="1"' if sheet_index == 1 else ''
+        row_count = 0
+        with self._archive.open(f'xl/worksheets/sheet{sheet_index}.xml', 'w', force_zip64=True) as stream:
+            stream.write((
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<worksheet xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+                f'<sheetViews><sheetView workbookViewId="0"{selected}/>'
+                f'</sheetViews><sheetFormatPr defaultRowHeight="15"/><sheetData>'
+            ).encode('utf-8'))
+
+            batch: List[str] = []
+            for row_values in rows:
+                batch.append(self._row_xml(start_row + row_count, start_col, row_values))
+                row_count += 1
+                if len(batch) >= self.batch_size:
+                    stream.write(''.join(batch).encode('utf-8'))
+                    batch.clear()
+            if batch:
+                stream.write(''.join(batch).encode('utf-8'))
+
+            stream.write('</sheetData></worksheet>'.encode('utf-8'))
+
+        logger.debug(f"流式写入工作表 '{name}' 完成，共 {row_count} 行")
+        return row_count
+
+    def write_frame(self, name: str, frame: Any, start_cell: str = 'A1',
+                    header: bool = True, index: bool = False) -> int:
+        """
+        按列写入 DataFrame，分类（Categorical）列的每个类别只登记一次共享字符串
+
+        Args:
+            name: 工作表名称
+            frame: pandas DataFrame
+            start_cell: 起始单元格
+            header: 是否写入列名
+            index: 是否写入索引列
+
+        Returns:
+            写入的行数（含列名行）
+        """
+        import pandas as pd
+        from utils.frame_bridge import _series_to_list
+
+        if index:
+            frame = frame.reset_index()
+        columns: List[Sequence[Any]] = []
+        for column in frame.columns:
+            series = frame[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                columns.append(self._category_refs(series))
+            else:
+                columns.append(_series_to_list(series))
+        rows: Iterable[Sequence[Any]] = zip(*columns)
+        if header:
+            rows = itertools.chain([[str(column) for column in frame.columns]], rows)
+        return self.write_sheet(name, rows, start_cell)
+
+    def close(self) -> None:
+        """写入工作簿结构并关闭文件"""
+        if self._archive is None:
+            return
+        if not self._sheet_names:
+            self.write_sheet('Sheet1', [])
+        sheets = ''.join(
+            f'<sheet name={xml_attr(name)} sheetId="{index}" r:id="rId{index}"/>'
+            for index, name in enumerate(self._sheet_names, start=1)
+        )
+        self._archive.writestr(
+            'xl/workbook.xml',
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><sheets>{sheets}</sheets></workbook>'
+        )
+        self._archive.writestr('xl/styles.xml', self._styles.to_xml())
+        self._archive.writestr('xl/sharedStrings.xml', self._shared_strings.to_xml())
+        write_package_parts(self._archive, len(self._sheet_names))
+        self._archive.close()
+        self._archive = None
+        logger.info(f"流式写入完成: {self.path}（共享字符串 {len(self._shared_strings.index)} 个）")
+
+    def _column_letter(self, col: int) -> str:
+        letters = self._letters
+        while len(letters) <= col:
+            letters.append(column_index_to_letter(len(letters)))
+        return letters[col]
+
+    def _category_refs(self, series: Any) -> List[Optional['_SharedString']]:
+        """分类列转换为共享字符串引用，同一类别的各行引用同一个对象"""
+        shared_strings = self._shared_strings
+        refs = [_SharedString(shared_strings.intern(str(category))) for category in series.cat.categories]
+        return [refs[code] if code >= 0 else None for code in series.cat.codes.tolist()]
+
+    def _string_xml(self, reference: str, text: str) -> str:
+        shared_strings = self._shared_strings
+        position = shared_strings.index.get(text)
+        if position is None and len(shared_strings.index) >= self.max_shared_strings:
+            return f'<c r="{reference}" t="inlineStr"><is>{text_xml(text)}</is></c>'
+        return f'<c r="{reference}" t="s"><v>{shared_strings.add(text)}</v></c>'
+
+    def _row_xml(self, row: int, start_col: int, values: Sequence[Any]) -> str:
+        cells = []
+        for offset, value in enumerate(values):
+            if value is None or value == '':
+                continue
+            reference = f'{self._column_letter(start_col + offset)}{row}'
+            if type(value) is _SharedString:
+                self._shared_strings.count += 1
+                cells.append(f'<c r="{reference}" t="s"><v>{value.position}</v></c>')
+            elif isinstance(value, BOOL_TYPES):
+                cells.append(f'<c r="{reference}" t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, NUMBER_TYPES):
+                cells.append(number_cell_xml(reference, '', value))
+            elif isinstance(value, (datetime, date, time)):
+                if value != value:
+                    # pandas 的 NaT
+                    continue
+                serial = format_number(to_excel_serial(value))
+                cells.append(f'<c r="{reference}" s="{self._date_style}"><v>{serial}</v></c>')
+            else:
+                text = str(value)
+                if text.startswith('=') and len(text) > 1:
+                    cells.append(f'<c r="{reference}"><f>{xml_text(text[1:])}</f></c>')
+                else:
+                    cells.append(self._string_xml(reference, text))
+        return f'<row r="{row}">{"".join(cells)}</row>'
+
+    def __enter__(self) -> 'StreamingXlsxWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class _SharedString:
+    """已登记的共享字符串编号"""
+
+    __slots__ = ('position',)
+
+    def __init__(self, position: int):
+        self.position = position
+
+
+def stream_range_values(path: str, rows: Iterable[Sequence[Any]], sheet_name: str = 'Sheet1',
+                        start_cell: str = 'A1', batch_size: int = None) -> int:
+    """
+    以流式方式将行数据写入新的 xlsx 文件
+
+    Args:
+        path: 输出文件路径
+        rows: 行数据的可迭代对象，可以是生成器
+        sheet_name: 工作表名称
+        start_cell: 起始单元格
+        batch_size: 每次写入的行数
+
+    Returns:
+        写入的行数
+    """
+    with StreamingXlsxWriter(path, batch_size=batch_size) as writer:
+        return writer.write_sheet(sheet_name, rows, start_cell)
@@ -0,0 +1,679 @@
+# -*- coding: utf-8 -*-
+"""
+@Time    ：2026/10/15 上午10:05
+@Author  ：庄洪奎（ARTHUR)
+@FileName：xlsx_writer.py
+@Software：PyCharm
+@Subions ：zhk0459
+"""
+"""
+xlsx 文件写入
+将无界面后端的内存工作簿序列化为 Office Open XML 格式
+"""
+
+import math
+import re
+import zipfile
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+import numpy as np
+from loguru import logger
+
+from config import FILE_CONFIG, FORMAT_CONFIG
+from utils.pagination import fits_to_pages
+from utils.range_address import column_index_to_letter, format_range
+from utils.style_registry import DEFAULT_STYLE_ID, STYLE_REGISTRY
+
+# 内置数字格式编号
+BUILTIN_NUMBER_FORMATS = {
+    'General': 0,
+    '0': 1,
+    '0.00': 2,
+    '#,##0': 3,
+    '#,##0.00': 4,
+    '0%': 9,
+    '0.00%': 10,
+    '0.00E+00': 11,
+    '@': 49,
+}
+
+# COM 对齐常量到 OOXML 的映射
+HORIZONTAL_ALIGNMENTS = {
+    -4108: 'center', -4131: 'left', -4152: 'right', 1: 'general',
+    7: 'centerContinuous', -4130: 'justify', 5: 'fill',
+}
+VERTICAL_ALIGNMENTS = {-4108: 'center', -4160: 'top', -4107: 'bottom', -4130: 'justify'}
+
+# COM 边框粗细到 OOXML 的映射
+BORDER_WEIGHTS = {1: 'hair', 2: 'thin', -4138: 'medium', 4: 'thick'}
+
+# 页面方向
+ORIENTATIONS = {1: 'portrait', 2: 'landscape'}
+
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_EPOCH = datetime(1899, 12, 30)
+
+NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+StyleKey = Tuple[Tuple[str, Any], ...]
+
+# 按数值写入的类型（含 NumPy 标量）；布尔值需要先于数值判断
+BOOL_TYPES = (bool, np.bool_)
+NUMBER_TYPES = (int, float, np.integer, np.floating)
+
+
+def xml_text(value: Any) -> str:
+    """转义 XML 文本并去除非法控制字符"""
+    return escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+
+
+def text_xml(text: str) -> str:
+    """生成字符串的 <t> 元素，首尾有空白时声明 xml:space="preserve"，否则 Excel 会去掉这些空白"""
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f'<t{space}>{xml_text(text)}</t>'
+
+
+def xml_attr(value: Any) -> str:
+    """转义 XML 属性值（含引号）"""
+    return quoteattr(_ILLEGAL_XML_CHARS.sub('', str(value)))
+
+
+def to_excel_serial(value: Any) -> float:
+    """
+    日期时间转换为 Excel 序列值
+
+    Args:
+        value: datetime、date 或 time
+
+    Returns:
+        Excel 序列值
+    """
+    if isinstance(value, datetime):
+        delta = value.replace(tzinfo=None) - _EPOCH
+    elif isinstance(value, date):
+        delta = datetime(value.year, value.month, value.day) - _EPOCH
+    elif isinstance(value, time):
+        return (value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6) / 86400
+    else:
+        raise TypeError(f"不支持的日期类型: {type(value)}")
+    return delta.days + delta.seconds / 86400 + delta.microseconds / 86400e6
+
+
+def color_to_argb(color: Any) -> str:
+    """
+    颜色值转换为 ARGB 十六进制字符串
+
+    Args:
+        color: COM 颜色值（BGR 整数）或 'RRGGBB' 字符串
+
+    Returns:
+        'FFRRGGBB' 形式的字符串
+    """
+    if isinstance(color, str):
+        return 'FF' + color.lstrip('#').upper()[-6:]
+    color = int(color)
+    red, green, blue = color & 0xFF, (color >> 8) & 0xFF, (color >> 16) & 0xFF
+    return f"FF{red:02X}{green:02X}{blue:02X}"
+
+
+def format_number(value: Any) -> str:
+    """数值（含 NumPy 标量）转换为 XML 文本"""
+    if isinstance(value, BOOL_TYPES):
+        return '1' if value else '0'
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return repr(value) if math.isfinite(value) else '0'
+    return str(int(value))
+
+
+def number_cell_xml(reference: str, style_attr: str, value: Any) -> str:
+    """数值单元格：NaN 写为空单元格，无穷大写为 #NUM! 错误值"""
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        if value != value:
+            return f'<c r="{reference}"{style_attr}/>' if style_attr else ''
+        return f'<c r="{reference}"{style_attr} t="e"><v>#NUM!</v></c>'
+    return f'<c r="{reference}"{style_attr}><v>{format_number(value)}</v></c>'
+
+
+class StyleSheet:
+    """样式表，负责字体、填充、边框、数字格式的去重和编号"""
+
+    def __init__(self):
+        default_font = (('font_name', FORMAT_CONFIG['default_font']),
+                        ('font_size', FORMAT_CONFIG['default_font_size']))
+        self.fonts: Dict[StyleKey, int] = {default_font: 0}
+        # 前两个填充是 Excel 保留的默认值
+        self.fills: Dict[StyleKey, int] = {(('pattern', 'none'),): 0, (('pattern', 'gray125'),): 1}
+        self.borders: Dict[StyleKey, int] = {(): 0}
+        self.number_formats: Dict[str, int] = {}
+        self.cell_xfs: Dict[Tuple[int, int, int, int, StyleKey], int] = {(0, 0, 0, 0, ()): 0}
+        self._registered: Dict[int, int] = {DEFAULT_STYLE_ID: 0}
+
+    def registered_index(self, style_id: int) -> int:
+        """
+        获取样式注册表编号对应的 cellXfs 序号（每个编号只转换一次）
+
+        Args:
+            style_id: STYLE_REGISTRY 中的样式编号
+
+        Returns:
+            样式序号
+        """
+        index = self._registered.get(style_id)
+        if index is None:
+            index = self._registered[style_id] = self.style_index(STYLE_REGISTRY.get(style_id))
+        return index
+
+    def style_index(self, style: Mapping[str, Any]) -> int:
+        """
+        获取单元格样式对应的 cellXfs 序号
+
+        Args:
+            style: 单元格样式字典
+
+        Returns:
+            样式序号
+        """
+        if not style:
+            return 0
+        font_key = (
+            ('font_name', style.get('font_name') or FORMAT_CONFIG['default_font']),
+            ('font_size', style.get('font_size') or FORMAT_CONFIG['default_font_size']),
+        ) + tuple(
+            (key, style[key]) for key in ('font_bold', 'font_italic', 'font_underline', 'font_color')
+            if style.get(key) not in (None, False)
+        )
+        font_id = self.fonts.setdefault(font_key, len(self.fonts))
+
+        fill_id = 0
+        if style.get('fill_color') is not None:
+            fill_key = (('pattern', 'solid'), ('fill_color', style['fill_color']))
+            fill_id = self.fills.setdefault(fill_key, len(self.fills))
+
+        border_id = 0
+        if style.get('border_style') or style.get('border_weight'):
+            border_key = tuple(
+                (key, style.get(key)) for key in ('border_style', 'border_weight', 'border_color')
+            )
+            border_id = self.borders.setdefault(border_key, len(self.borders))
+
+        num_fmt_id = self._number_format_id(style.get('number_format'))
+        alignment = tuple(
+            (key, style[key]) for key in ('horizontal_alignment', 'vertical_alignment', 'wrap_text')
+            if style.get(key) is not None
+        )
+        xf_key = (font_id, fill_id, border_id, num_fmt_id, alignment)
+        return self.cell_xfs.setdefault(xf_key, len(self.cell_xfs))
+
+    def _number_format_id(self, number_format: str) -> int:
+        if not number_format:
+            return 0
+        if number_format in BUILTIN_NUMBER_FORMATS:
+            return BUILTIN_NUMBER_FORMATS[number_format]
+        return self.number_formats.setdefault(number_format, 164 + len(self.number_formats))
+
+    def to_xml(self) -> str:
+        """生成 styles.xml 内容"""
+        parts = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<styleSheet xmlns="{NS_MAIN}">']
+        if self.number_formats:
+            parts.append(f'<numFmts count="{len(self.number_formats)}">')
+            for code, fmt_id in self.number_formats.items():
+                parts.append(f'<numFmt numFmtId="{fmt_id}" formatCode={xml_attr(code)}/>')
+            parts.append('</numFmts>')
+
+        parts.append(f'<fonts count="{len(self.fonts)}">')
+        for font_key in self.fonts:
+            font = dict(font_key)
+            parts.append('<font>')
+            if font.get('font_bold'):
+                parts.append('<b/>')
+            if font.get('font_italic'):
+                parts.append('<i/>')
+            if font.get('font_underline') not in (None, False, -4142):
+                parts.append('<u/>')
+            parts.append(f'<sz val="{font["font_size"]}"/>')
+            if font.get('font_color') is not None:
+                parts.append(f'<color rgb="{color_to_argb(font["font_color"])}"/>')
+            parts.append(f'<name val={xml_attr(font["font_name"])}/>')
+            parts.append('</font>')
+        parts.append('</fonts>')
+
+        parts.append(f'<fills count="{len(self.fills)}">')
+        for fill_key in self.fills:
+            fill = dict(fill_key)
+            if fill['pattern'] == 'solid':
+                parts.append(
+                    f'<fill><patternFill patternType="solid">'
+                    f'<fgColor rgb="{color_to_argb(fill["fill_color"])}"/><bgColor indexed="64"/>'
+                    f'</patternFill></fill>'
+                )
+            else:
+                parts.append(f'<fill><patternFill patternType="{fill["pattern"]}"/></fill>')
+        parts.append('</fills>')
+
+        parts.append(f'<borders count="{len(self.borders)}">')
+        for border_key in self.borders:
+            border = dict(border_key)
+            if not border:
+                parts.append('<border><left/><right/><top/><bottom/><diagonal/></border>')
+                continue
+            line_style = BORDER_WEIGHTS.get(border.get('border_weight') or 2, 'thin')
+            if border.get('border_style') == -4142:
+                line_style = None
+            color = ''
+            if border.get('border_color') is not None:
+                color = f'<color rgb="{color_to_argb(border["border_color"])}"/>'
+            edges = []
+            for edge in ('left', 'right', 'top', 'bottom'):
+                if line_style:
+                    edges.append(f'<{edge} style="{line_style}">{color}</{edge}>')
+                else:
+                    edges.append(f'<{edge}/>')
+            parts.append(f'<border>{"".join(edges)}<diagonal/></border>')
+        parts.append('</borders>')
+
+        parts.append('<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>')
+        parts.append(f'<cellXfs count="{len(self.cell_xfs)}">')
+        for font_id, fill_id, border_id, num_fmt_id, alignment in self.cell_xfs:
+            attributes = (
+                f'numFmtId="{num_fmt_id}" fontId="{font_id}" fillId="{fill_id}" '
+                f'borderId="{border_id}" xfId="0"'
+            )
+            if num_fmt_id:
+                attributes += ' applyNumberFormat="1"'
+            if font_id:
+                attributes += ' applyFont="1"'
+            if fill_id:
+                attributes += ' applyFill="1"'
+            if border_id:
+                attributes += ' applyBorder="1"'
+            if alignment:
+                align = dict(alignment)
+                align_attrs = []
+                if 'horizontal_alignment' in align:
+                    value = align['horizontal_alignment']
+                    align_attrs.append(f'horizontal="{HORIZONTAL_ALIGNMENTS.get(value, value)}"')
+                if 'vertical_alignment' in align:
+                    value = align['vertical_alignment']
+                    align_attrs.append(f'vertical="{VERTICAL_ALIGNMENTS.get(value, value)}"')
+                if align.get('wrap_text'):
+                    align_attrs.append('wrapText="1"')
+                parts.append(f'<xf {attributes} applyAlignment="1"><alignment {" ".join(align_attrs)}/></xf>')
+            else:
+                parts.append(f'<xf {attributes}/>')
+        parts.append('</cellXfs>')
+        parts.append('<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>')
+        parts.append('</styleSheet>')
+        return ''.join(parts)
+
+
+class SharedStrings:
+    """共享字符串表"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.count = 0
+
+    def add(self, text: str) -> int:
+        """登记字符串的一次引用并返回其序号"""
+        self.count += 1
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.index)
+        return position
+
+    def intern(self, text: str) -> int:
+        """登记字符串但不计入引用次数（引用由调用方另行累计）"""
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.index)
+        return position
+
+    def to_xml(self) -> str:
+        """生成 sharedStrings.xml 内容"""
+        parts = [
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<sst xmlns="{NS_MAIN}" count="{self.count}" uniqueCount="{len(self.index)}">'
+        ]
+        for text in self.index:
+            parts.append(f'<si>{text_xml(text)}</si>')
+        parts.append('</sst>')
+        return ''.join(parts)
+
+
+def header_footer_text(left: str, center: str, right: str) -> str:
+    """拼接页眉页脚的左中右三段"""
+    text = ''
+    if left:
+        text += f'&L{left}'
+    if center:
+        text += f'&C{center}'
+    if right:
+        text += f'&R{right}'
+    return text
+
+
+def _formula_xml(reference: str, style_attr: str, formula: str, cached: Any) -> str:
+    """公式单元格：有计算结果时一并写入 <v> 缓存值，读取方无需重新计算"""
+    formula_xml = f'<f>{xml_text(formula)}</f>'
+    if cached is None:
+        return f'<c r="{reference}"{style_attr}>{formula_xml}</c>'
+    if isinstance(cached, bool):
+        return f'<c r="{reference}"{style_attr} t="b">{formula_xml}<v>{int(cached)}</v></c>'
+    if isinstance(cached, (int, float)):
+        if not math.isfinite(cached):
+            return f'<c r="{reference}"{style_attr} t="e">{formula_xml}<v>#NUM!</v></c>'
+        return f'<c r="{reference}"{style_attr}>{formula_xml}<v>{format_number(cached)}</v></c>'
+    if isinstance(cached, (datetime, date, time)):
+        return f'<c r="{reference}"{style_attr}>{formula_xml}<v>{format_number(to_excel_serial(cached))}</v></c>'
+    from utils.formula_engine import CellError
+
+    if isinstance(cached, CellError):
+        return f'<c r="{reference}"{style_attr} t="e">{formula_xml}<v>{xml_text(cached.code)}</v></c>'
+    return f'<c r="{reference}"{style_attr} t="str">{formula_xml}<v>{xml_text(cached)}</v></c>'
+
+
+def _cell_xml(reference: str, value: Any, style_id: int, shared_strings: SharedStrings,
+              cached: Any = None) -> str:
+    style_attr = f' s="{style_id}"' if style_id else ''
+    if isinstance(value, BOOL_TYPES):
+        return f'<c r="{reference}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, NUMBER_TYPES):
+        return number_cell_xml(reference, style_attr, value)
+    if isinstance(value, (datetime, date, time)):
+        if value != value:
+            # pandas 的 NaT
+            return f'<c r="{reference}"{style_attr}/>' if style_attr else ''
+        return f'<c r="{reference}"{style_attr}><v>{format_number(to_excel_serial(value))}</v></c>'
+    text = str(value)
+    if text.startswith('=') and len(text) > 1:
+        return _formula_xml(reference, style_attr, text[1:], cached)
+    return f'<c r="{reference}"{style_attr} t="s"><v>{shared_strings.add(text)}</v></c>'
+
+
+def _sheet_xml(worksheet: Any, styles: StyleSheet, shared_strings: SharedStrings,
+               cached_values: Mapping[Tuple[Any, int, int], Any] = None, drawing: bool = False) -> str:
+    parts = [
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<worksheet xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+    ]
+    page_setup = worksheet.PageSetup
+    fit_to_page = fits_to_pages(page_setup)
+    if fit_to_page:
+        parts.append('<sheetPr><pageSetUpPr fitToPage="1"/></sheetPr>')
+    bounds = worksheet.used_bounds()
+    parts.append(f'<dimension ref="{format_range(*bounds) if bounds else "A1"}"/>')
+    selected = ' tabSelected="1"' if worksheet.Parent.ActiveSheet is worksheet else ''
+    parts.append(f'<sheetViews><sheetView workbookViewId="0"{selected}/></sheetViews>')
+    parts.append('<sheetFormatPr defaultRowHeight="15"/>')
+
+    if worksheet._column_widths:
+        parts.append('<cols>')
+        for col in sorted(worksheet._column_widths):
+            width = worksheet._column_widths[col]
+            parts.append(f'<col min="{col}" max="{col}" width="{width:.2f}" customWidth="1"/>')
+        parts.append('</cols>')
+
+    # 按行分组输出单元格
+    rows: Dict[int, List[int]] = {}
+    for row, col in set(worksheet._cells) | set(worksheet._styles):
+        rows.setdefault(row, []).append(col)
+    for row in worksheet._row_heights:
+        rows.setdefault(row, [])
+
+    parts.append('<sheetData>')
+    for row in sorted(rows):
+        height = worksheet._row_heights.get(row)
+        height_attr = f' ht="{height}" customHeight="1"' if height is not None else ''
+        parts.append(f'<row r="{row}"{height_attr}>')
+        for col in sorted(rows[row]):
+            reference = f'{column_index_to_letter(col)}{row}'
+            value = worksheet._cells.get((row, col))
+            registered_id = worksheet._styles.get((row, col), DEFAULT_STYLE_ID)
+            if isinstance(value, (datetime, date)) and not STYLE_REGISTRY.get(registered_id).get('number_format'):
+                registered_id = STYLE_REGISTRY.update(registered_id, {'number_format': FORMAT_CONFIG['date_format']})
+            style_id = styles.registered_index(registered_id)
+            if value is None:
+                parts.append(f'<c r="{reference}" s="{style_id}"/>')
+            else:
+                cached = cached_values.get((worksheet, row, col)) if cached_values else None
+                parts.append(_cell_xml(reference, value, style_id, shared_strings, cached))
+        parts.append('</row>')
+    parts.append('</sheetData>')
+
+    if worksheet._merged:
+        parts.append(f'<mergeCells count="{len(worksheet._merged)}">')
+        for area in worksheet._merged:
+            parts.append(f'<mergeCell ref="{format_range(*area)}"/>')
+        parts.append('</mergeCells>')
+
+    if page_setup.PrintGridlines or page_setup.PrintHeadings or \
+            page_setup.CenterHorizontally or page_setup.CenterVertically:
+        parts.append(
+            f'<printOptions horizontalCentered="{int(bool(page_setup.CenterHorizontally))}" '
+            f'verticalCentered="{int(bool(page_setup.CenterVertically))}" '
+            f'headings="{int(bool(page_setup.PrintHeadings))}" '
+            f'gridLines="{int(bool(page_setup.PrintGridlines))}"/>'
+        )
+    parts.append(
+        f'<pageMargins left="{page_setup.LeftMargin / 72:.4f}" right="{page_setup.RightMargin / 72:.4f}" '
+        f'top="{page_setup.TopMargin / 72:.4f}" bottom="{page_setup.BottomMargin / 72:.4f}" '
+        f'header="{page_setup.HeaderMargin / 72:.4f}" footer="{page_setup.FooterMargin / 72:.4f}"/>'
+    )
+    setup_attrs = (
+        f'paperSize="{page_setup.PaperSize}" '
+        f'orientation="{ORIENTATIONS.get(page_setup.Orientation, "portrait")}"'
+    )
+    if fit_to_page:
+        setup_attrs += (
+            f' fitToWidth="{page_setup.FitToPagesWide or 0}" fitToHeight="{page_setup.FitToPagesTall or 0}"'
+        )
+    elif page_setup.Zoom:
+        setup_attrs += f' scale="{int(page_setup.Zoom)}"'
+    parts.append(f'<pageSetup {setup_attrs}/>')
+
+    header = header_footer_text(page_setup.LeftHeader, page_setup.CenterHeader, page_setup.RightHeader)
+    footer = header_footer_text(page_setup.LeftFooter, page_setup.CenterFooter, page_setup.RightFooter)
+    if header or footer:
+        parts.append('<headerFooter>')
+        if header:
+            parts.append(f'<oddHeader>{xml_text(header)}</oddHeader>')
+        if footer:
+            parts.append(f'<oddFooter>{xml_text(footer)}</oddFooter>')
+        parts.append('</headerFooter>')
+    if drawing:
+        parts.append('<drawing r:id="rId1"/>')
+    parts.append('</worksheet>')
+    return ''.join(parts)
+
+
+def _quote_sheet_name(name: str) -> str:
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _workbook_xml(worksheets: List[Any], active_index: int, full_calc_on_load: bool = False) -> str:
+    parts = [
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+        f'<bookViews><workbookView activeTab="{active_index}"/></bookViews><sheets>'
+    ]
+    defined_names = []
+    for index, worksheet in enumerate(worksheets, start=1):
+        state = '' if worksheet.Visible not in (False, 0, 2) else ' state="hidden"'
+        parts.append(f'<sheet name={xml_attr(worksheet.Name)} sheetId="{index}"{state} r:id="rId{index}"/>')
+        print_area = worksheet.PageSetup.PrintArea
+        if print_area:
+            absolute = ','.join(
+                f"{_quote_sheet_name(worksheet.Name)}!{area}" for area in _absolute_areas(print_area)
+            )
+            defined_names.append(
+                f'<definedName name="_xlnm.Print_Area" localSheetId="{index - 1}">{xml_text(absolute)}</definedName>'
+            )
+        title_rows = worksheet.PageSetup.PrintTitleRows
+        if title_rows:
+            first, _, last = title_rows.replace('$', '').split('!')[-1].partition(':')
+            titles = f"{_quote_sheet_name(worksheet.Name)}!${first}:${last or first}"
+            defined_names.append(
+                f'<definedName name="_xlnm.Print_Titles" localSheetId="{index - 1}">{xml_text(titles)}</definedName>'
+            )
+    parts.append('</sheets>')
+    if defined_names:
+        parts.append(f'<definedNames>{"".join(defined_names)}</definedNames>')
+    if full_calc_on_load:
+        parts.append('<calcPr fullCalcOnLoad="1"/>')
+    parts.append('</workbook>')
+    return ''.join(parts)
+
+
+def _absolute_areas(address: str) -> List[str]:
+    areas = []
+    for area in address.replace('$', '').split(','):
+        cells = []
+        for cell in area.strip().split(':'):
+            letters = cell.rstrip('0123456789')
+            cells.append(f"${letters}${cell[len(letters):]}")
+        areas.append(':'.join(cells))
+    return areas
+
+
+def formula_results(workbook: Any) -> Dict[Tuple[Any, int, int], Any]:
+    """
+    计算工作簿中全部公式的结果
+
+    已启用公式引擎的工作簿直接取引擎的结果（只计算待计算的公式）；
+    否则临时创建一个引擎计算一遍，不改变工作簿的取值方式。
+
+    Args:
+        workbook: HeadlessWorkbook 实例
+
+    Returns:
+        (工作表, 行, 列) 到计算结果的映射
+    """
+    from utils.formula_engine import FormulaEngine
+
+    engine = workbook._formula_engine
+    if engine is None:
+        engine = FormulaEngine(workbook)
+    if not engine.formula_count:
+        return {}
+    return engine.computed_values()
+
+
+def write_workbook(workbook: Any, path: Path, cache_values: bool = None) -> None:
+    """
+    将内存工作簿写入 .xlsx 文件
+
+    Args:
+        workbook: HeadlessWorkbook 实例
+        path: 输出文件路径
+        cache_values: 是否在保存时计算公式并写入缓存值，默认取 FILE_CONFIG['cache_formula_values']；
+                      不写入时在文件中标记打开后需完整重算
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    worksheets = list(workbook.Worksheets)
+    styles = StyleSheet()
+    shared_strings = SharedStrings()
+    active_index = worksheets.index(workbook.ActiveSheet) if workbook.ActiveSheet in worksheets else 0
+    if cache_values is None:
+        cache_values = FILE_CONFIG.get('cache_formula_values', True)
+    cached_values = formula_results(workbook) if cache_values else None
+    # 不写缓存值时，含公式的文件标记为打开后完整重算
+    full_calc_on_load = not cache_values and any(
+        isinstance(value, str) and value.startswith('=') and len(value) > 1
+        for worksheet in worksheets for value in worksheet._cells.values()
+    )
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        overrides: List[Tuple[str, str]] = []
+        for index, worksheet in enumerate(worksheets, start=1):
+            has_drawing = _write_charts(archive, worksheet, index, overrides)
+            archive.writestr(f'xl/worksheets/sheet{index}.xml',
+                             _sheet_xml(worksheet, styles, shared_strings, cached_values, has_drawing))
+        archive.writestr('xl/workbook.xml', _workbook_xml(worksheets, active_index, full_calc_on_load))
+        archive.writestr('xl/styles.xml', styles.to_xml())
+        archive.writestr('xl/sharedStrings.xml', shared_strings.to_xml())
+        write_package_parts(archive, len(worksheets), overrides)
+
+    logger.debug(f"已写入 xlsx 文件: {path}（{len(worksheets)} 个工作表）")
+
+
+def _write_charts(archive: zipfile.ZipFile, worksheet: Any, sheet_index: int,
+                  overrides: List[Tuple[str, str]]) -> bool:
+    """写入工作表的绘图和图表部件，返回是否写入了绘图"""
+    from utils.xlsx_charts import CHART_CONTENT_TYPE, DRAWING_CONTENT_TYPE, chart_xml, drawing_xml, \
+        exportable_charts, relationships_xml
+
+    chart_objects = exportable_charts(worksheet)
+    if not chart_objects:
+        return False
+    # 图表编号在整个工作簿内递增
+    first_chart = sum(1 for part, _ in overrides if part.startswith('/xl/charts/')) + 1
+    chart_numbers = range(first_chart, first_chart + len(chart_objects))
+    drawing = f'drawing{sheet_index}.xml'
+    archive.writestr(f'xl/worksheets/_rels/sheet{sheet_index}.xml.rels',
+                     relationships_xml([('drawing', f'../drawings/{drawing}')]))
+    archive.writestr(f'xl/drawings/{drawing}', drawing_xml(chart_objects))
+    archive.writestr(f'xl/drawings/_rels/{drawing}.rels',
+                     relationships_xml([('chart', f'../charts/chart{number}.xml') for number in chart_numbers]))
+    overrides.append((f'/xl/drawings/{drawing}', DRAWING_CONTENT_TYPE))
+    for number, chart_object in zip(chart_numbers, chart_objects):
+        archive.writestr(f'xl/charts/chart{number}.xml', chart_xml(chart_object.Chart))
+        overrides.append((f'/xl/charts/chart{number}.xml', CHART_CONTENT_TYPE))
+    return True
+
+
+def write_package_parts(archive: zipfile.ZipFile, sheet_count: int,
+                        overrides: Sequence[Tuple[str, str]] = ()) -> None:
+    """
+    写入内容类型和关系等包结构文件
+
+    Args:
+        archive: 已打开的 zip 文件
+        sheet_count: 工作表数量
+        overrides: 其他部件的 (路径, 内容类型)，例如绘图和图表
+    """
+    sheet_types = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+        f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for index in range(1, sheet_count + 1)
+    ) + ''.join(f'<Override PartName="{part}" ContentType="{content_type}"/>' for part, content_type in overrides)
+    archive.writestr(
+        '[Content_Types].xml',
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '<Override PartName="/xl/sharedStrings.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+        f'{sheet_types}</Types>'
+    )
+    archive.writestr(
+        '_rels/.rels',
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="{NS_PKG_REL}">'
+        f'<Relationship Id="rId1" Type="{REL_TYPE}/officeDocument" Target="xl/workbook.xml"/>'
+        f'</Relationships>'
+    )
+    sheet_rels = ''.join(
+        f'<Relationship Id="rId{index}" Type="{REL_TYPE}/worksheet" Target="worksheets/sheet{index}.xml"/>'
+        for index in range(1, sheet_count + 1)
+    )
+    archive.writestr(
+        'xl/_rels/workbook.xml.rels',
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="{NS_PKG_REL}">{sheet_rels}'
+        f'<Relationship Id="rId{sheet_count + 1}" Type="{REL_TYPE}/styles" Target="styles.xml"/>'
+        f'<Relationship Id="rId{sheet_count + 2}" Type="{REL_TYPE}/sharedStrings" Target="sharedStrings.xml"/>'
+        f'</Relationships>'
+    )